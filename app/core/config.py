@@ -81,6 +81,10 @@ class Settings(BaseSettings):
     QUEUE_VISIBILITY_TIMEOUT: int = Field(default=300)  # 5分钟
     QUEUE_MAX_RETRIES: int = Field(default=3)
     WORKER_HEARTBEAT_INTERVAL: int = Field(default=30)  # 30秒
+    # 单个 worker 同时执行的分析任务数（专用线程池大小）
+    WORKER_CONCURRENCY: int = Field(default=2)
+    # 收到 SIGTERM 后等待进行中任务完成的最长时间（秒），超时后未开始分析的任务放回队列、分析中的任务标记失败；0 表示一直等待
+    WORKER_DRAIN_TIMEOUT_SECONDS: float = Field(default=0)
 
 
     # 队列轮询/清理间隔（秒）
@@ -141,12 +145,24 @@ class Settings(BaseSettings):
     METRICS_ENABLED: bool = Field(default=True)
     HEALTH_CHECK_INTERVAL: int = Field(default=60)  # 60秒
 
+    # 操作日志后台写入：有界队列（满时丢弃）+ 按数量/时间批量 insert_many
+    OPLOG_QUEUE_MAX_SIZE: int = Field(default=10000)
+    OPLOG_BATCH_SIZE: int = Field(default=200)
+    OPLOG_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0)
+
+    # Python 备份/导出：每批读取的文档数、并行写出的集合数
+    BACKUP_BATCH_SIZE: int = Field(default=1000)
+    BACKUP_PARALLEL_COLLECTIONS: int = Field(default=2)
+
 
     # 配置真相来源（方案A）：file|db|hybrid
     # - file：以文件/env 为准（推荐，生产缺省）
     # - db：以数据库为准（仅兼容旧版，不推荐）
     # - hybrid：文件/env 优先，DB 作为兜底
     CONFIG_SOT: str = Field(default="file")
+    # 系统配置快照（system_configs）的兜底校验间隔（秒）：写入时通过 Redis 推送失效，
+    # 超过该时间未收到通知时只比对 version 字段
+    CONFIG_SNAPSHOT_MAX_AGE_SECONDS: float = Field(default=30.0)
 
 
     # 基础信息同步任务配置（可配置调度）
@@ -181,6 +197,18 @@ class Settings(BaseSettings):
         default=True,
         description="自动检测Tushare rt_k接口权限，付费用户自动切换到高频模式（5秒）"
     )
+    QUOTES_DELTA_UPSERT_ENABLED: bool = Field(
+        default=True,
+        description="增量写入：只把价格/成交量等发生变化的股票写入 market_quotes"
+    )
+    QUOTES_FULL_REFRESH_SECONDS: int = Field(
+        default=1800,
+        description="增量写入模式下的全量写入间隔（秒），用于兜底修正被外部修改的文档"
+    )
+    QUOTES_TRADE_DATE_CACHE_SECONDS: int = Field(
+        default=600,
+        description="最新交易日缓存时间（秒），跨自然日自动失效"
+    )
 
     # Tushare基础配置
     TUSHARE_TOKEN: str = Field(default="", description="Tushare API Token")
@@ -218,6 +246,8 @@ class Settings(BaseSettings):
     AKSHARE_FINANCIAL_SYNC_CRON: str = Field(default="0 4 * * 0", description="财务数据同步CRON表达式")  # 周日凌晨4点
     AKSHARE_STATUS_CHECK_ENABLED: bool = Field(default=True, description="启用状态检查")
     AKSHARE_STATUS_CHECK_CRON: str = Field(default="30 * * * *", description="状态检查CRON表达式")  # 每小时30分
+    AKSHARE_HISTORICAL_SYNC_CONCURRENCY: int = Field(default=8, ge=1, le=64, description="历史数据同步并发拉取股票数")
+    AKSHARE_SYNC_RATE_PER_SECOND: float = Field(default=5.0, gt=0, description="AKShare同步调用频率上限（次/秒，所有同步任务共享）")
 
     # AKShare数据初始化配置
     AKSHARE_INIT_HISTORICAL_DAYS: int = Field(default=365, ge=1, le=3650, description="初始化历史数据天数")
@@ -244,6 +274,8 @@ class Settings(BaseSettings):
     BAOSTOCK_HISTORICAL_SYNC_CRON: str = Field(default="0 18 * * 1-5", description="历史数据同步CRON表达式")  # 工作日18点
     BAOSTOCK_STATUS_CHECK_ENABLED: bool = Field(default=True, description="启用状态检查")
     BAOSTOCK_STATUS_CHECK_CRON: str = Field(default="45 * * * *", description="状态检查CRON表达式")  # 每小时45分
+    BAOSTOCK_HISTORICAL_SYNC_CONCURRENCY: int = Field(default=1, ge=1, le=16, description="历史数据同步并发拉取股票数（BaoStock为全局会话，建议保持1）")
+    BAOSTOCK_SYNC_RATE_PER_SECOND: float = Field(default=5.0, gt=0, description="BaoStock同步调用频率上限（次/秒，所有同步任务共享）")
 
     # BaoStock数据初始化配置
     BAOSTOCK_INIT_HISTORICAL_DAYS: int = Field(default=365, ge=1, le=3650, description="初始化历史数据天数")
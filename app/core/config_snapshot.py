@@ -0,0 +1,190 @@
+"""
+系统配置快照（system_configs 激活文档的进程内副本）
+
+- 异步代码（ConfigService / ConfigProvider）和同步的 tradingagents 数据层共用同一份快照，
+  命中时不做任何 IO
+- 快照按文档 version 维护：ConfigService 写入后调用 notify_system_config_changed()，
+  本进程立即失效，并通过 Redis pub/sub 通知其他进程（API / worker）失效
+- 兜底：距上次校验超过 CONFIG_SNAPSHOT_MAX_AGE_SECONDS 时只查询 version 字段，
+  版本未变则继续使用快照（覆盖脚本直接改库、订阅断开期间错过通知等情况）
+
+快照中的文档由所有调用方共享，只读；需要修改请先复制。
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANGED_CHANNEL = "config:system:changed"
+
+_ACTIVE = {"is_active": True}
+_LATEST = [("version", -1)]
+# 读取失败后的重试间隔（秒），期间继续使用旧快照
+_RETRY_SECONDS = 5.0
+
+
+class SystemConfigSnapshot:
+    """按 version 缓存的激活系统配置文档（线程安全）"""
+
+    def __init__(self, max_age_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._doc: Optional[Dict[str, Any]] = None
+        self._version: Optional[int] = None
+        self._stale = True
+        self._generation = 0
+        self._checked_at = 0.0
+        self._retry_at = 0.0
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self, version: Optional[int] = None) -> None:
+        """标记快照过期；已持有不低于 version 的快照时忽略"""
+        with self._lock:
+            if version is not None and self._version is not None and not self._stale and version <= self._version:
+                return
+            self._stale = True
+            self._generation += 1
+            self._retry_at = 0.0
+
+    def _needs_refresh(self) -> bool:
+        now = self._clock()
+        if now < self._retry_at:
+            return False
+        return self._stale or now - self._checked_at >= self.max_age_seconds
+
+    def _can_revalidate(self) -> bool:
+        """快照未被显式失效时只需比对 version"""
+        return not self._stale and self._doc is not None
+
+    def _accept(self, doc: Optional[Dict[str, Any]], generation: int) -> None:
+        with self._lock:
+            if doc is not None and doc.get("version") != self._version:
+                logger.info(f"🔄 系统配置快照已更新: version {self._version} → {doc.get('version')}")
+            self._doc = doc
+            self._version = doc.get("version") if doc else None
+            self._checked_at = self._clock()
+            # 加载期间又收到失效通知时保持过期，下次读取再刷新
+            if generation == self._generation:
+                self._stale = False
+
+    def _touch(self) -> None:
+        with self._lock:
+            self._checked_at = self._clock()
+
+    def _on_error(self, error: Exception) -> Optional[Dict[str, Any]]:
+        if self._doc is None:
+            raise error
+        with self._lock:
+            self._retry_at = self._clock() + _RETRY_SECONDS
+        logger.warning(f"⚠️ 刷新系统配置快照失败，继续使用 version {self._version}: {error}")
+        return self._doc
+
+    async def get(self, db=None) -> Optional[Dict[str, Any]]:
+        """异步读取（Motor）；快照有效时不访问数据库"""
+        if not self._needs_refresh():
+            return self._doc
+        generation = self._generation
+        try:
+            if db is None:
+                from app.core.database import get_mongo_db
+                db = get_mongo_db()
+            collection = db.system_configs
+            if self._can_revalidate():
+                head = await collection.find_one(_ACTIVE, {"version": 1}, sort=_LATEST)
+                if head is not None and head.get("version") == self._version:
+                    self._touch()
+                    return self._doc
+            self._accept(await collection.find_one(_ACTIVE, sort=_LATEST), generation)
+        except Exception as e:
+            return self._on_error(e)
+        return self._doc
+
+    def get_sync(self, db=None) -> Optional[Dict[str, Any]]:
+        """同步读取（PyMongo），供 tradingagents 数据层使用；快照有效时不访问数据库"""
+        if not self._needs_refresh():
+            return self._doc
+        generation = self._generation
+        try:
+            if db is None:
+                from app.core.database import get_mongo_db_sync
+                db = get_mongo_db_sync()
+            collection = db.system_configs
+            if self._can_revalidate():
+                head = collection.find_one(_ACTIVE, {"version": 1}, sort=_LATEST)
+                if head is not None and head.get("version") == self._version:
+                    self._touch()
+                    return self._doc
+            self._accept(collection.find_one(_ACTIVE, sort=_LATEST), generation)
+        except Exception as e:
+            return self._on_error(e)
+        return self._doc
+
+
+_snapshot: Optional[SystemConfigSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_system_config_snapshot() -> SystemConfigSnapshot:
+    """获取全局系统配置快照"""
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = SystemConfigSnapshot(
+                    max_age_seconds=float(getattr(settings, "CONFIG_SNAPSHOT_MAX_AGE_SECONDS", 30.0))
+                )
+    return _snapshot
+
+
+async def notify_system_config_changed(version: Optional[int] = None) -> None:
+    """系统配置写入后调用：本进程快照立即失效，并通知其他进程"""
+    get_system_config_snapshot().invalidate(version)
+    try:
+        from app.core.database import get_redis_client
+        await get_redis_client().publish(CONFIG_CHANGED_CHANNEL, json.dumps({"version": version}))
+    except Exception as e:
+        logger.debug(f"发布配置变更通知失败（其他进程将在快照到期后刷新）: {e}")
+
+
+async def run_config_change_listener() -> None:
+    """订阅配置变更通知并使本进程快照失效（作为后台任务运行，断线自动重连）"""
+    from app.core.database import get_redis_client
+
+    snapshot = get_system_config_snapshot()
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_redis_client().pubsub()
+            await pubsub.subscribe(CONFIG_CHANGED_CHANNEL)
+            logger.info(f"📡 已订阅系统配置变更通知: {CONFIG_CHANGED_CHANNEL}")
+            # 订阅建立前的变更可能已错过
+            snapshot.invalidate()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    version = json.loads(message["data"]).get("version")
+                except Exception:
+                    version = None
+                snapshot.invalidate(version)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ 配置变更订阅中断，5秒后重连: {e}")
+            await asyncio.sleep(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
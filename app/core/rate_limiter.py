@@ -6,7 +6,7 @@ import asyncio
 import time
 import logging
 from collections import deque
-from typing import Optional
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -188,10 +188,87 @@ class BaoStockRateLimiter(RateLimiter):
         )
 
 
+class TokenBucketRateLimiter:
+    """
+    令牌桶速率限制器
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个（允许短时突发），
+    用于在多个并发同步任务之间共享同一数据源的调用配额。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, name: str = "TokenBucket"):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即长期平均调用频率）
+            capacity: 桶容量（最大突发调用次数），默认等于 rate（至少为1）
+            name: 限制器名称（用于日志）
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.name = name
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+        # 统计信息
+        self.total_calls = 0
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+
+        logger.info(f"🔧 {self.name} 初始化: {rate}次/秒, 突发上限 {self.capacity:g}")
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        获取一个令牌
+        令牌不足时等待补充（等待者按先后顺序获得令牌）
+        """
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                self.total_waits += 1
+                self.total_wait_time += wait_time
+                logger.debug(f"⏳ {self.name} 令牌不足，等待 {wait_time:.2f}秒")
+                await asyncio.sleep(wait_time)
+                self._refill()
+            self.tokens -= 1
+            self.total_calls += 1
+
+    def get_stats(self) -> dict:
+        """获取统计信息"""
+        return {
+            "name": self.name,
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "available_tokens": self.tokens,
+            "total_calls": self.total_calls,
+            "total_waits": self.total_waits,
+            "total_wait_time": self.total_wait_time,
+            "avg_wait_time": self.total_wait_time / self.total_waits if self.total_waits > 0 else 0
+        }
+
+    def reset_stats(self):
+        """重置统计信息"""
+        self.total_calls = 0
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+        logger.info(f"🔄 {self.name} 统计信息已重置")
+
+
 # 全局速率限制器实例
 _tushare_limiter: Optional[TushareRateLimiter] = None
 _akshare_limiter: Optional[AKShareRateLimiter] = None
 _baostock_limiter: Optional[BaoStockRateLimiter] = None
+_sync_limiters: Dict[str, TokenBucketRateLimiter] = {}
 
 
 def get_tushare_rate_limiter(tier: str = "standard", safety_margin: float = 0.8) -> TushareRateLimiter:
@@ -218,11 +295,25 @@ def get_baostock_rate_limiter() -> BaoStockRateLimiter:
     return _baostock_limiter
 
 
+def get_sync_rate_limiter(provider: str, rate: float, capacity: Optional[float] = None) -> TokenBucketRateLimiter:
+    """
+    获取数据同步使用的令牌桶（按数据源单例，所有同步任务共享）
+
+    rate / capacity 只在首次创建时生效。
+    """
+    limiter = _sync_limiters.get(provider)
+    if limiter is None:
+        limiter = TokenBucketRateLimiter(rate=rate, capacity=capacity, name=f"SyncRateLimiter({provider})")
+        _sync_limiters[provider] = limiter
+    return limiter
+
+
 def reset_all_limiters():
     """重置所有速率限制器"""
     global _tushare_limiter, _akshare_limiter, _baostock_limiter
     _tushare_limiter = None
     _akshare_limiter = None
     _baostock_limiter = None
+    _sync_limiters.clear()
     logger.info("🔄 所有速率限制器已重置")
 
@@ -253,6 +253,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logging.getLogger("webapi").warning(f"Failed to apply dynamic settings: {e}")
 
+    # 操作日志后台批量写入
+    from app.services.operation_log_writer import get_operation_log_writer
+    get_operation_log_writer().start()
+
+    # 订阅系统配置变更通知（其他进程写入配置后使本进程快照失效）
+    from app.core.config_snapshot import run_config_change_listener
+    config_listener_task = asyncio.create_task(run_config_change_listener())
+
     # 显示配置摘要
     await _print_config_summary(logger)
 
@@ -589,6 +597,14 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Scheduler shutdown error: {e}")
 
+        config_listener_task.cancel()
+
+        # 写出尚未落库的操作日志（需在关闭数据库连接之前）
+        try:
+            await get_operation_log_writer().stop()
+        except Exception as e:
+            logger.warning(f"Operation log writer shutdown error: {e}")
+
         # 关闭 UserService MongoDB 连接
         try:
             from app.services.user_service import user_service
@@ -10,7 +10,7 @@ from typing import Optional, Dict, Any
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.services.operation_log_service import log_operation
+from app.services.operation_log_service import log_operation, enqueue_operation_log
 from app.models.operation_log import ActionType
 
 logger = logging.getLogger("webapi")
@@ -77,10 +77,10 @@ class OperationLogMiddleware(BaseHTTPMiddleware):
         # 计算耗时
         duration_ms = int((time.time() - start_time) * 1000)
 
-        # 异步记录操作日志
+        # 记录操作日志（进入后台写入队列，不等待数据库写入）
         if user_info:
             try:
-                await self._log_operation(
+                self._log_operation(
                     user_info=user_info,
                     method=method,
                     path=path,
@@ -227,7 +227,7 @@ class OperationLogMiddleware(BaseHTTPMiddleware):
         else:
             return f"{action_verb} {path}"
 
-    async def _log_operation(
+    def _log_operation(
         self,
         user_info: Dict[str, Any],
         method: str,
@@ -260,8 +260,8 @@ class OperationLogMiddleware(BaseHTTPMiddleware):
             if not success:
                 error_message = f"HTTP {response.status_code}"
 
-            # 记录操作日志
-            await log_operation(
+            # 记录操作日志（后台批量写入）
+            enqueue_operation_log(
                 user_id=user_info.get("id", ""),
                 username=user_info.get("username", "unknown"),
                 action_type=action_type,
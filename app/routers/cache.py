@@ -24,12 +24,12 @@ async def get_cache_stats(current_user: dict = Depends(get_current_user)):
         dict: 缓存统计数据
     """
     try:
-        from tradingagents.dataflows.cache import get_cache
+        from tradingagents.dataflows.cache import get_async_cache
         
-        cache = get_cache()
+        cache = get_async_cache()
         
-        # 获取缓存统计
-        stats = cache.get_cache_stats()
+        # 获取缓存统计（文件缓存需要遍历目录，在缓存 I/O 线程池中执行）
+        stats = await cache.run(cache.cache.get_cache_stats)
         
         logger.info(f"用户 {current_user['username']} 获取缓存统计")
         
@@ -68,12 +68,12 @@ async def cleanup_old_cache(
         dict: 清理结果
     """
     try:
-        from tradingagents.dataflows.cache import get_cache
+        from tradingagents.dataflows.cache import get_async_cache
         
-        cache = get_cache()
+        cache = get_async_cache()
         
         # 清理过期缓存
-        cache.clear_old_cache(days)
+        await cache.run(cache.cache.clear_old_cache, days)
         
         logger.info(f"用户 {current_user['username']} 清理了 {days} 天前的缓存")
         
@@ -99,13 +99,13 @@ async def clear_all_cache(current_user: dict = Depends(get_current_user)):
         dict: 清理结果
     """
     try:
-        from tradingagents.dataflows.cache import get_cache
+        from tradingagents.dataflows.cache import get_async_cache
 
-        cache = get_cache()
+        cache = get_async_cache()
 
         # 清空所有缓存（清理所有过期和未过期的缓存）
         # 使用 clear_old_cache(0) 来清理所有缓存
-        cache.clear_old_cache(0)
+        await cache.run(cache.cache.clear_old_cache, 0)
 
         logger.warning(f"用户 {current_user['username']} 清空了所有缓存")
 
@@ -139,14 +139,14 @@ async def get_cache_details(
         dict: 缓存详情列表
     """
     try:
-        from tradingagents.dataflows.cache import get_cache
+        from tradingagents.dataflows.cache import get_async_cache
         
-        cache = get_cache()
+        cache = get_async_cache()
         
         # 获取缓存详情
         # 注意：这个方法可能需要在缓存类中实现
         try:
-            details = cache.get_cache_details(page=page, page_size=page_size)
+            details = await cache.run(cache.cache.get_cache_details, page=page, page_size=page_size)
         except AttributeError:
             # 如果缓存类没有实现这个方法，返回空列表
             details = {
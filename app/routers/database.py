@@ -33,7 +33,7 @@ class ImportRequest(BaseModel):
 class ExportRequest(BaseModel):
     """导出请求"""
     collections: List[str] = []  # 空列表表示导出所有集合
-    format: str = "json"  # json, csv
+    format: str = "json"  # json, ndjson（tar 归档）, csv, xlsx
     sanitize: bool = False  # 是否脱敏（清空敏感字段，用于演示系统）
 
 # 响应模型
@@ -179,9 +179,14 @@ async def import_data(
         logger.info(f"   格式: {format}")
         logger.info(f"   覆盖模式: {overwrite}")
 
-        # 读取文件内容
-        content = await file.read()
-        logger.info(f"   文件大小: {len(content)} 字节")
+        if format.lower() == "ndjson" or (file.filename or "").lower().endswith((".tar", ".tar.gz", ".tgz")):
+            # tar 归档直接从上传的临时文件流式导入，不整体读入内存
+            format = "ndjson"
+            content = file.file
+        else:
+            # 读取文件内容
+            content = await file.read()
+            logger.info(f"   文件大小: {len(content)} 字节")
 
         result = await database_service.import_data(
             content=content,
@@ -38,4 +38,17 @@ async def healthz():
 @router.get("/readyz")
 async def readyz():
     """Kubernetes就绪检查"""
-    return {"ready": True}
\ No newline at end of file
+    return {"ready": True}
+
+@router.get("/health/data-sources")
+async def data_sources_health():
+    """数据源熔断器状态、错误率与耗时直方图（按数据源）"""
+    from tradingagents.dataflows.circuit_breaker import get_circuit_breaker_registry
+    return {
+        "success": True,
+        "data": {
+            "timestamp": int(time.time()),
+            "sources": get_circuit_breaker_registry().snapshot(),
+        },
+        "message": "ok"
+    }
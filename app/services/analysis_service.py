@@ -5,7 +5,6 @@
 
 import asyncio
 import uuid
-import json
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Callable
@@ -21,6 +20,7 @@ from tradingagents.utils.logging_init import init_logging
 init_logging()
 
 from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.graph_pool import get_trading_graph_pool
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.services.simple_analysis_service import create_analysis_config, get_provider_by_model_name
 from app.models.analysis import (
@@ -52,7 +52,6 @@ class AnalysisService:
         self.queue_service = QueueService(redis_client)
         # 初始化使用统计服务
         self.usage_service = UsageStatisticsService()
-        self._trading_graph_cache = {}
         # 进度跟踪器缓存
         self._progress_trackers: Dict[str, RedisProgressTracker] = {}
 
@@ -80,21 +79,14 @@ class AnalysisService:
             return PyObjectId(new_object_id)
     
     def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
-        """获取或创建TradingAgents图实例（带缓存）- 与单股分析保持一致"""
-        config_key = json.dumps(config, sort_keys=True)
-
-        if config_key not in self._trading_graph_cache:
-            # 直接使用完整配置，不再合并DEFAULT_CONFIG（因为create_analysis_config已经处理了）
-            # 这与单股分析服务和web目录的方式一致
-            self._trading_graph_cache[config_key] = TradingAgentsGraph(
-                selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
-                debug=config.get("debug", False),
-                config=config
-            )
-
-            logger.info(f"创建新的TradingAgents实例: {config.get('llm_provider', 'default')}")
-
-        return self._trading_graph_cache[config_key]
+        """获取TradingAgents图实例（来自全局图实例池）- 与单股分析保持一致"""
+        # 直接使用完整配置，不再合并DEFAULT_CONFIG（因为create_analysis_config已经处理了）
+        # 这与单股分析服务和web目录的方式一致
+        return get_trading_graph_pool().acquire(
+            config,
+            selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
+            debug=config.get("debug", False),
+        )
 
     def _execute_analysis_sync_with_progress(self, task: AnalysisTask, progress_tracker: RedisProgressTracker) -> AnalysisResult:
         """同步执行分析任务（在线程池中运行，带进度跟踪）"""
@@ -197,12 +189,8 @@ class AnalysisService:
             start_time = datetime.now(timezone.utc)
             analysis_date = task.parameters.analysis_date or datetime.now().strftime("%Y-%m-%d")
 
-            # 创建进度回调函数
-            def progress_callback(message: str):
-                progress_tracker.update_progress(message)
-
-            # 调用现有的分析方法（同步调用，传递进度回调）
-            _, decision = trading_graph.propagate(task.symbol, analysis_date, progress_callback)
+            # 调用现有的分析方法（同步调用；propagate 不接受进度回调，进度由上下文步骤更新）
+            _, decision = trading_graph.propagate(task.symbol, analysis_date)
 
             execution_time = (datetime.now(timezone.utc) - start_time).total_seconds()
 
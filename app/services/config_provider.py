@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 import os
 
+from app.core.config_snapshot import get_system_config_snapshot
 from app.services.config_service import config_service
 
 
@@ -11,7 +12,8 @@ class ConfigProvider:
     """Effective configuration provider with simple env→DB merge and TTL cache.
 
     - Priority: ENV > DB
-    - Cache TTL: configurable (default 60s)
+    - DB settings come from the in-process system config snapshot (no query per call)
+    - Cache TTL: configurable (default 60s); also dropped as soon as the snapshot version changes
     - Invalidate on writes: caller should invoke `invalidate()` after writes
     """
 
@@ -19,19 +21,27 @@ class ConfigProvider:
         self._ttl = timedelta(seconds=ttl_seconds)
         self._cache_settings: Optional[Dict[str, Any]] = None
         self._cache_time: Optional[datetime] = None
+        self._cache_version: Optional[int] = None
 
     def invalidate(self) -> None:
         self._cache_settings = None
         self._cache_time = None
+        self._cache_version = None
 
     def _is_cache_valid(self) -> bool:
         return (
             self._cache_settings is not None
             and self._cache_time is not None
+            and self._cache_version == get_system_config_snapshot().version
             and __import__("datetime").datetime.now(__import__("datetime").timezone.utc) - self._cache_time < self._ttl
         )
 
     async def get_effective_system_settings(self) -> Dict[str, Any]:
+        # Revalidates the snapshot when due; a no-op while it is fresh
+        try:
+            await get_system_config_snapshot().get()
+        except Exception:
+            pass
         if self._is_cache_valid():
             return dict(self._cache_settings or {})
 
@@ -67,6 +77,7 @@ class ConfigProvider:
 
         # Cache
         self._cache_settings = dict(merged)
+        self._cache_version = getattr(cfg, "version", None) if cfg else None
         self._cache_time = __import__("datetime").datetime.now(__import__("datetime").timezone.utc)
         return dict(merged)
     async def get_system_settings_meta(self) -> Dict[str, Dict[str, Any]]:
@@ -4,6 +4,7 @@
 
 import time
 import asyncio
+import copy
 import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -11,6 +12,7 @@ from app.utils.timezone import now_tz
 from bson import ObjectId
 
 from app.core.database import get_mongo_db
+from app.core.config_snapshot import get_system_config_snapshot, notify_system_config_changed
 from app.core.unified_config import unified_config
 from app.models.config import (
     SystemConfig, LLMConfig, DataSourceConfig, DatabaseConfig,
@@ -277,6 +279,7 @@ class ConfigService:
                             }
                         )
                         logger.info(f"✅ [优先级同步] system_configs 版本更新: {version} -> {version + 1}")
+                        await notify_system_config_changed(version + 1)
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
@@ -347,6 +350,7 @@ class ConfigService:
                         }
                     )
                     print(f"✅ [优先级同步] 已同步更新 system_configs 集合，新版本: {config_data.get('version', 0) + 1}")
+                    await notify_system_config_changed(config_data.get("version", 0) + 1)
                 else:
                     print(f"⚠️ [优先级同步] 没有找到需要更新的数据源配置")
             else:
@@ -360,20 +364,14 @@ class ConfigService:
             return False
 
     async def get_system_config(self) -> Optional[SystemConfig]:
-        """获取系统配置 - 优先从数据库获取最新数据"""
+        """获取系统配置 - 读取按 version 维护的进程内快照（写入后由 notify_system_config_changed 失效）"""
         try:
-            # 直接从数据库获取最新配置，避免缓存问题
             db = await self._get_db()
-            config_collection = db.system_configs
-
-            config_data = await config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
+            config_data = await get_system_config_snapshot().get(db)
 
             if config_data:
-                print(f"📊 从数据库获取配置，版本: {config_data.get('version', 0)}, LLM配置数量: {len(config_data.get('llm_configs', []))}")
-                return SystemConfig(**config_data)
+                # 快照文档由所有调用方共享，调用方可能修改返回的配置后再保存，这里复制一份
+                return SystemConfig(**copy.deepcopy(config_data))
 
             # 如果没有配置，创建默认配置
             print("⚠️ 数据库中没有配置，创建默认配置")
@@ -552,6 +550,7 @@ class ConfigService:
 
             insert_result = await config_collection.insert_one(config_dict)
             print(f"📝 新配置ID: {insert_result.inserted_id}")
+            await notify_system_config_changed(config.version)
 
             # 验证保存结果
             saved_config = await config_collection.find_one({"_id": insert_result.inserted_id})
@@ -1,19 +1,30 @@
 """
 Backup, import, and export routines extracted from DatabaseService.
+
+Python 备份/导出按集合游标分批流式写出，内存占用与数据库大小无关：
+- 备份 / ndjson 导出：tar 归档，包含 manifest.json 和每个集合一个 <集合名>.ndjson.gz
+  （每行一个 MongoDB Extended JSON 文档，ObjectId/datetime 等类型可无损还原），
+  多个集合可并行写出（BACKUP_PARALLEL_COLLECTIONS）
+- json 导出：与旧版结构相同的 {"export_info", "data"} 文件，逐批追加写出
+- 导入 tar 归档时逐行读取、按批 insert_many
+纯 Python 实现，不依赖 mongodump。
 """
 from __future__ import annotations
 
+import io
 import json
 import os
 import gzip
 import asyncio
 import subprocess
 import shutil
+import tarfile
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
 import logging
 
-from bson import ObjectId
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError
 
 from app.core.database import get_mongo_db
 from app.core.config import settings
@@ -134,47 +145,151 @@ async def create_backup_native(name: str, backup_dir: str, collections: Optional
     }
 
 
-async def create_backup(name: str, backup_dir: str, collections: Optional[List[str]] = None, user_id: str | None = None) -> Dict[str, Any]:
+# 进度回调：(集合名, 已处理文档数, 集合文档总数估计)
+ProgressCallback = Callable[[str, int, int], None]
+
+_EXTENDED_JSON = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+_ARCHIVE_SUFFIX = ".ndjson.gz"
+_MANIFEST = "manifest.json"
+
+
+def _batch_size() -> int:
+    return max(1, int(getattr(settings, "BACKUP_BATCH_SIZE", 1000)))
+
+
+def _write_ndjson_lines(fh, docs: List[dict]) -> None:
+    fh.write("".join(json_util.dumps(doc, json_options=_EXTENDED_JSON) + "\n" for doc in docs))
+
+
+async def _dump_collection_ndjson(
+    db,
+    collection_name: str,
+    part_path: str,
+    *,
+    sanitize: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """把一个集合按批写入 gzip 压缩的 NDJSON 文件，返回文档数"""
+    batch_size = _batch_size()
+    collection = db[collection_name]
+    total = await collection.estimated_document_count()
+    count = 0
+    fh = await asyncio.to_thread(gzip.open, part_path, "wt", encoding="utf-8")
+    try:
+        batch: List[dict] = []
+        # users 集合在脱敏模式下不导出实际用户数据
+        if not (sanitize and collection_name == "users"):
+            async for doc in collection.find().batch_size(batch_size):
+                batch.append(_sanitize_document(doc) if sanitize else doc)
+                if len(batch) >= batch_size:
+                    await asyncio.to_thread(_write_ndjson_lines, fh, batch)
+                    count += len(batch)
+                    batch = []
+                    if progress:
+                        progress(collection_name, count, total)
+        if batch:
+            await asyncio.to_thread(_write_ndjson_lines, fh, batch)
+            count += len(batch)
+    finally:
+        await asyncio.to_thread(fh.close)
+
+    if progress:
+        progress(collection_name, count, total)
+    logger.info(f"✅ 已写出集合 {collection_name}: {count} 条文档")
+    return count
+
+
+async def write_ndjson_archive(
+    archive_path: str,
+    collections: List[str],
+    *,
+    info: Dict[str, Any],
+    sanitize: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
     """
-    创建数据库备份（Python 实现，兼容性好但速度较慢）
+    将集合流式写入 tar 归档（manifest.json + 每个集合一个 .ndjson.gz）
 
-    对于大数据量（>100MB），建议使用 create_backup_native() 方法
+    各集合先并行写入暂存目录，再依次加入归档；返回 {集合名: 文档数}。
+    """
+    db = get_mongo_db()
+    staging_dir = archive_path + ".parts"
+    await asyncio.to_thread(os.makedirs, staging_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(max(1, int(getattr(settings, "BACKUP_PARALLEL_COLLECTIONS", 2))))
+
+    async def _dump(collection_name: str) -> int:
+        async with semaphore:
+            part_path = os.path.join(staging_dir, collection_name + _ARCHIVE_SUFFIX)
+            return await _dump_collection_ndjson(
+                db, collection_name, part_path, sanitize=sanitize, progress=progress
+            )
+
+    try:
+        results = await asyncio.gather(*(_dump(name) for name in collections))
+        counts = dict(zip(collections, results))
+        manifest = {**info, "format": "ndjson", "collections": collections, "counts": counts}
+
+        def _build_archive():
+            with tarfile.open(archive_path, "w") as tar:
+                data = json.dumps(manifest, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+                member = tarfile.TarInfo(_MANIFEST)
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+                for name in collections:
+                    tar.add(os.path.join(staging_dir, name + _ARCHIVE_SUFFIX), arcname=name + _ARCHIVE_SUFFIX)
+            return os.path.getsize(archive_path)
+
+        await asyncio.to_thread(_build_archive)
+        return counts
+    finally:
+        await asyncio.to_thread(shutil.rmtree, staging_dir, ignore_errors=True)
+
+
+def _log_progress(collection_name: str, done: int, total: int) -> None:
+    if total:
+        logger.info(f"📊 备份进度 {collection_name}: {done}/{total} ({min(done / total, 1):.0%})")
+
+
+async def create_backup(
+    name: str,
+    backup_dir: str,
+    collections: Optional[List[str]] = None,
+    user_id: str | None = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    创建数据库备份（Python 实现，不依赖 mongodump）
+
+    按集合游标分批流式写入 tar 归档（每个集合一个 gzip 压缩的 NDJSON），内存占用恒定；
+    mongodump 可用时 DatabaseService 仍优先使用 create_backup_native()。
     """
     db = get_mongo_db()
 
     backup_id = str(ObjectId())
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"backup_{name}_{timestamp}.json.gz"
+    backup_filename = f"backup_{name}_{timestamp}.tar"
     backup_path = os.path.join(backup_dir, backup_filename)
 
     if not collections:
         collections = await db.list_collection_names()
-
-    backup_data: Dict[str, Any] = {
-        "backup_id": backup_id,
-        "name": name,
-        "created_at": datetime.utcnow().isoformat(),
-        "created_by": user_id,
-        "collections": collections,
-        "data": {},
-    }
-
-    for collection_name in collections:
-        collection = db[collection_name]
-        documents: List[dict] = []
-        async for doc in collection.find():
-            documents.append(serialize_document(doc))
-        backup_data["data"][collection_name] = documents
+        collections = [c for c in collections if not c.startswith("system.")]
 
     os.makedirs(backup_dir, exist_ok=True)
 
-    # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-    def _write_backup():
-        with gzip.open(backup_path, "wt", encoding="utf-8") as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
-        return os.path.getsize(backup_path)
+    created_at = datetime.utcnow()
+    try:
+        counts = await write_ndjson_archive(
+            backup_path,
+            collections,
+            info={"backup_id": backup_id, "name": name, "created_at": created_at.isoformat(), "created_by": user_id},
+            progress=progress or _log_progress,
+        )
+    except Exception:
+        if os.path.exists(backup_path):
+            await asyncio.to_thread(os.remove, backup_path)
+        raise
 
-    file_size = await asyncio.to_thread(_write_backup)
+    file_size = await asyncio.to_thread(os.path.getsize, backup_path)
 
     backup_meta = {
         "_id": ObjectId(backup_id),
@@ -183,8 +298,10 @@ async def create_backup(name: str, backup_dir: str, collections: Optional[List[s
         "file_path": backup_path,
         "size": file_size,
         "collections": collections,
-        "created_at": datetime.utcnow(),
+        "document_counts": counts,
+        "created_at": created_at,
         "created_by": user_id,
+        "backup_type": "ndjson",
     }
 
     await db.database_backups.insert_one(backup_meta)
@@ -196,7 +313,9 @@ async def create_backup(name: str, backup_dir: str, collections: Optional[List[s
         "file_path": backup_path,
         "size": file_size,
         "collections": collections,
+        "document_counts": counts,
         "created_at": backup_meta["created_at"].isoformat(),
+        "backup_type": "ndjson",
     }
 
 
@@ -262,14 +381,120 @@ def _convert_date_fields(doc: dict) -> dict:
     return doc
 
 
-async def import_data(content: bytes, collection: str, *, format: str = "json", overwrite: bool = False, filename: str | None = None) -> Dict[str, Any]:
+def _read_ndjson_batch(reader, batch_size: int) -> List[dict]:
+    docs: List[dict] = []
+    for line in reader:
+        line = line.strip()
+        if line:
+            docs.append(json_util.loads(line, json_options=_EXTENDED_JSON))
+            if len(docs) >= batch_size:
+                break
+    return docs
+
+
+async def _insert_batch(collection_obj, docs: List[dict]) -> tuple[int, int]:
+    """insert_many(ordered=False)，返回 (插入数, 跳过数)；_id 重复的文档跳过"""
+    try:
+        res = await collection_obj.insert_many(docs, ordered=False)
+        return len(res.inserted_ids), 0
+    except BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        return inserted, len(docs) - inserted
+
+
+async def import_archive(
+    fileobj: BinaryIO,
+    *,
+    overwrite: bool = False,
+    batch_size: Optional[int] = None,
+    filename: str | None = None,
+) -> Dict[str, Any]:
+    """
+    流式导入 tar 归档（create_backup / ndjson 导出的格式）
+
+    归档按顺序读取，每个集合逐行解析、按 batch_size 批量 insert_many，
+    不会把整个文件或整个集合读入内存。
+    """
+    db = get_mongo_db()
+    batch_size = batch_size or _batch_size()
+    counts: Dict[str, int] = {}
+    total_skipped = 0
+    manifest: Dict[str, Any] = {}
+
+    tar = await asyncio.to_thread(tarfile.open, fileobj=fileobj, mode="r|*")
+    try:
+        while True:
+            member = await asyncio.to_thread(tar.next)
+            if member is None:
+                break
+            if not member.isfile():
+                continue
+            name = os.path.basename(member.name)
+
+            if name == _MANIFEST:
+                raw = await asyncio.to_thread(lambda: tar.extractfile(member).read())
+                manifest = json.loads(raw.decode("utf-8"))
+                logger.info(f"📋 归档信息: 创建时间={manifest.get('created_at')}, 集合数={len(manifest.get('collections', []))}")
+                continue
+            if not name.endswith(_ARCHIVE_SUFFIX):
+                logger.warning(f"⚠️ 跳过归档中的未知文件: {member.name}")
+                continue
+
+            coll_name = name[: -len(_ARCHIVE_SUFFIX)]
+            collection_obj = db[coll_name]
+            if overwrite:
+                deleted = await collection_obj.delete_many({})
+                logger.info(f"🗑️ 清空集合 {coll_name}：删除 {deleted.deleted_count} 条文档")
+
+            reader = io.TextIOWrapper(gzip.GzipFile(fileobj=tar.extractfile(member)), encoding="utf-8")
+            inserted = 0
+            while True:
+                docs = await asyncio.to_thread(_read_ndjson_batch, reader, batch_size)
+                if not docs:
+                    break
+                batch_inserted, batch_skipped = await _insert_batch(collection_obj, docs)
+                inserted += batch_inserted
+                total_skipped += batch_skipped
+
+            counts[coll_name] = inserted
+            logger.info(f"✅ 导入集合 {coll_name}：{inserted} 条文档")
+    finally:
+        await asyncio.to_thread(tar.close)
+
+    return {
+        "mode": "archive",
+        "collections": [c for c, n in counts.items() if n],
+        "total_collections": len([n for n in counts.values() if n]),
+        "total_inserted": sum(counts.values()),
+        "skipped": total_skipped,
+        "document_counts": counts,
+        "source": manifest.get("name") or manifest.get("created_at"),
+        "filename": filename,
+        "format": "ndjson",
+        "overwrite": overwrite,
+    }
+
+
+async def import_data(
+    content: Union[bytes, BinaryIO],
+    collection: str,
+    *,
+    format: str = "json",
+    overwrite: bool = False,
+    filename: str | None = None,
+) -> Dict[str, Any]:
     """
     导入数据到数据库
 
-    支持两种导入模式：
+    支持三种导入模式：
     1. 单集合模式：导入数据到指定集合
     2. 多集合模式：导入包含多个集合的导出文件（自动检测）
+    3. 归档模式：format="ndjson" 或传入文件对象时，流式导入 tar 归档（见 import_archive）
     """
+    if format.lower() == "ndjson" or not isinstance(content, (bytes, bytearray)):
+        fileobj = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+        return await import_archive(fileobj, overwrite=overwrite, filename=filename)
+
     db = get_mongo_db()
 
     if format.lower() == "json":
@@ -445,9 +670,62 @@ def _sanitize_document(doc: Any) -> Any:
         return doc
 
 
-async def export_data(collections: Optional[List[str]] = None, *, export_dir: str, format: str = "json", sanitize: bool = False) -> str:
-    import pandas as pd
+async def _write_json_export(file_path: str, collections: List[str], *, sanitize: bool) -> None:
+    """逐批写出与旧版相同结构的 JSON 导出文件：{"export_info": ..., "data": {集合: [文档...]}}"""
+    db = get_mongo_db()
+    batch_size = _batch_size()
+    export_info = {
+        "created_at": datetime.utcnow().isoformat(),
+        "collections": collections,
+        "format": "json",
+    }
+
+    def _encode(doc: dict) -> str:
+        doc = serialize_document(doc)
+        if sanitize:
+            doc = _sanitize_document(doc)
+        return json.dumps(doc, ensure_ascii=False, default=str)
+
+    fh = await asyncio.to_thread(open, file_path, "w", encoding="utf-8")
+    try:
+        header = '{"export_info": ' + json.dumps(export_info, ensure_ascii=False) + ', "data": {'
+        await asyncio.to_thread(fh.write, header)
+        for index, collection_name in enumerate(collections):
+            prefix = ", " if index else ""
+            await asyncio.to_thread(fh.write, f"{prefix}{json.dumps(collection_name)}: [")
+            # users 集合在脱敏模式下只导出空数组（保留结构，不导出实际用户数据）
+            if not (sanitize and collection_name == "users"):
+                first = True
+                chunk: List[str] = []
+                async for doc in db[collection_name].find().batch_size(batch_size):
+                    chunk.append(("\n" if first else ",\n") + _encode(doc))
+                    first = False
+                    if len(chunk) >= batch_size:
+                        await asyncio.to_thread(fh.write, "".join(chunk))
+                        chunk = []
+                if chunk:
+                    await asyncio.to_thread(fh.write, "".join(chunk))
+            await asyncio.to_thread(fh.write, "]")
+        await asyncio.to_thread(fh.write, "}}\n")
+    finally:
+        await asyncio.to_thread(fh.close)
+
+
+async def export_data(
+    collections: Optional[List[str]] = None,
+    *,
+    export_dir: str,
+    format: str = "json",
+    sanitize: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    """
+    导出数据
 
+    - json：逐批流式写出（结构与旧版一致，可直接导入）
+    - ndjson：tar 归档（每个集合一个 .ndjson.gz，保留 BSON 类型），支持流式导入
+    - csv / xlsx：表格格式需要整体构建 DataFrame，仍在内存中完成，适合小数据量
+    """
     # 🔥 使用异步数据库连接
     db = get_mongo_db()
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -459,6 +737,29 @@ async def export_data(collections: Optional[List[str]] = None, *, export_dir: st
 
     os.makedirs(export_dir, exist_ok=True)
 
+    if format.lower() == "json":
+        filename = f"export_{timestamp}.json"
+        file_path = os.path.join(export_dir, filename)
+        await _write_json_export(file_path, collections, sanitize=sanitize)
+        return file_path
+
+    if format.lower() == "ndjson":
+        filename = f"export_{timestamp}.tar"
+        file_path = os.path.join(export_dir, filename)
+        await write_ndjson_archive(
+            file_path,
+            collections,
+            info={"created_at": datetime.utcnow().isoformat(), "sanitized": sanitize},
+            sanitize=sanitize,
+            progress=progress,
+        )
+        return file_path
+
+    if format.lower() not in ["csv", "xlsx", "excel"]:
+        raise Exception(f"不支持的导出格式: {format}")
+
+    import pandas as pd
+
     all_data: Dict[str, List[dict]] = {}
     for collection_name in collections:
         collection = db[collection_name]
@@ -478,26 +779,6 @@ async def export_data(collections: Optional[List[str]] = None, *, export_dir: st
     if sanitize:
         all_data = _sanitize_document(all_data)
 
-    if format.lower() == "json":
-        filename = f"export_{timestamp}.json"
-        file_path = os.path.join(export_dir, filename)
-        export_data_dict = {
-            "export_info": {
-                "created_at": datetime.utcnow().isoformat(),
-                "collections": collections,
-                "format": format,
-            },
-            "data": all_data,
-        }
-
-        # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-        def _write_json():
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(export_data_dict, f, ensure_ascii=False, indent=2)
-
-        await asyncio.to_thread(_write_json)
-        return file_path
-
     if format.lower() == "csv":
         filename = f"export_{timestamp}.csv"
         file_path = os.path.join(export_dir, filename)
@@ -518,20 +799,16 @@ async def export_data(collections: Optional[List[str]] = None, *, export_dir: st
         await asyncio.to_thread(_write_csv)
         return file_path
 
-    if format.lower() in ["xlsx", "excel"]:
-        filename = f"export_{timestamp}.xlsx"
-        file_path = os.path.join(export_dir, filename)
-
-        # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-        def _write_excel():
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-                for collection_name, documents in all_data.items():
-                    df = pd.DataFrame(documents) if documents else pd.DataFrame()
-                    sheet = collection_name[:31]
-                    df.to_excel(writer, sheet_name=sheet, index=False)
-
-        await asyncio.to_thread(_write_excel)
-        return file_path
-
-    raise Exception(f"不支持的导出格式: {format}")
+    filename = f"export_{timestamp}.xlsx"
+    file_path = os.path.join(export_dir, filename)
 
+    # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
+    def _write_excel():
+        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            for collection_name, documents in all_data.items():
+                df = pd.DataFrame(documents) if documents else pd.DataFrame()
+                sheet = collection_name[:31]
+                df.to_excel(writer, sheet_name=sheet, index=False)
+
+    await asyncio.to_thread(_write_excel)
+    return file_path
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from app.core.database import get_mongo_db
+from app.services.indicator_state_service import SNAPSHOT_COLLECTION
 # from app.models.screening import ScreeningCondition  # 避免循环导入
 
 logger = logging.getLogger(__name__)
@@ -53,6 +54,19 @@ class DatabaseScreeningService:
             "volume": "volume",                # 成交量
         }
         
+        # 技术指标字段（由同步任务物化到 stock_indicator_snapshot，按 code 关联）
+        self.snapshot_collection_name = SNAPSHOT_COLLECTION
+        self.technical_fields = {
+            "ma20": "ma20",
+            "rsi14": "rsi14",
+            "kdj_k": "kdj_k",
+            "kdj_d": "kdj_d",
+            "kdj_j": "kdj_j",
+            "dif": "dif",
+            "dea": "dea",
+            "macd_hist": "macd_hist",
+        }
+
         # 支持的操作符
         self.operators = {
             ">": "$gt",
@@ -67,22 +81,30 @@ class DatabaseScreeningService:
             "contains": "$regex",   # 字符串包含
         }
     
-    async def can_handle_conditions(self, conditions: List[Dict[str, Any]]) -> bool:
+    async def can_handle_conditions(
+        self,
+        conditions: List[Dict[str, Any]],
+        order_by: Optional[List[Dict[str, str]]] = None,
+    ) -> bool:
         """
         检查是否可以完全通过数据库筛选处理这些条件
         
         Args:
             conditions: 筛选条件列表
+            order_by: 排序条件（按技术指标排序同样依赖指标快照）
             
         Returns:
             bool: 是否可以处理
         """
+        needs_snapshot = self.sorts_by_technical(order_by)
         for condition in conditions:
             field = condition.get("field") if isinstance(condition, dict) else condition.field
             operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
             
             # 检查字段是否支持
-            if field not in self.basic_fields:
+            if field in self.technical_fields:
+                needs_snapshot = True
+            elif field not in self.basic_fields:
                 logger.debug(f"字段 {field} 不支持数据库筛选")
                 return False
             
@@ -90,9 +112,24 @@ class DatabaseScreeningService:
             if operator not in self.operators:
                 logger.debug(f"操作符 {operator} 不支持数据库筛选")
                 return False
+
+        # 技术指标条件依赖指标快照；快照尚未生成时交由传统方式计算
+        if needs_snapshot:
+            try:
+                db = get_mongo_db()
+                if await db[self.snapshot_collection_name].estimated_document_count() == 0:
+                    logger.info("ℹ️ 指标快照为空，技术指标条件无法下推到数据库")
+                    return False
+            except Exception as e:
+                logger.warning(f"⚠️ 检查指标快照失败: {e}")
+                return False
         
         return True
     
+    def sorts_by_technical(self, order_by: Optional[List[Dict[str, str]]]) -> bool:
+        """排序条件中是否包含技术指标字段"""
+        return any(order.get("field") in self.technical_fields for order in order_by or [])
+
     async def screen_stocks(
         self,
         conditions: List[Dict[str, Any]],
@@ -143,14 +180,33 @@ class DatabaseScreeningService:
                 source = enabled_sources[0] if enabled_sources else 'tushare'
                 logger.info(f"✅ [database_screening] 最终使用的数据源: {source}")
 
+            # 技术指标条件先在指标快照上做范围查询，得到候选代码
+            basic_conditions, technical_conditions = self._split_technical_conditions(conditions)
+            technical_map: Optional[Dict[str, Dict[str, Any]]] = None
+            snapshot_date = await self._latest_snapshot_date()
+            if technical_conditions:
+                technical_map = await self._query_indicator_snapshot(technical_conditions, snapshot_date)
+                if not technical_map:
+                    logger.info("✅ 数据库筛选完成: 指标快照中无满足技术条件的股票")
+                    return [], 0
+
             # 构建查询条件（现在视图已包含实时行情数据，可以直接查询所有字段）
-            query = await self._build_query(conditions)
+            query = await self._build_query(basic_conditions)
+            if technical_map is not None:
+                code_filter = {"code": {"$in": list(technical_map.keys())}}
+                query = {"$and": [query, code_filter]} if "code" in query else {**query, **code_filter}
 
             # 🔥 添加数据源筛选
             query["source"] = source
 
             logger.info(f"📋 数据库查询条件: {query}")
 
+            # 技术指标不在视图中：按指标快照的值排序后再分页
+            if self.sorts_by_technical(order_by):
+                return await self._screen_sorted_by_snapshot(
+                    collection, query, order_by, offset, limit, technical_map, snapshot_date, source
+                )
+
             # 构建排序条件
             sort_conditions = self._build_sort_conditions(order_by)
 
@@ -179,6 +235,7 @@ class DatabaseScreeningService:
             # 批量查询财务数据（ROE等）- 如果视图中没有包含
             if codes:
                 await self._enrich_with_financial_data(results, codes)
+                await self._enrich_with_indicator_snapshot(results, codes, technical_map, snapshot_date)
 
             logger.info(f"✅ 数据库筛选完成: 总数={total_count}, 返回={len(results)}, 数据源={source}")
 
@@ -188,8 +245,140 @@ class DatabaseScreeningService:
             logger.error(f"❌ 数据库筛选失败: {e}")
             raise Exception(f"数据库筛选失败: {str(e)}")
     
-    async def _build_query(self, conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """构建MongoDB查询条件"""
+    async def _screen_sorted_by_snapshot(
+        self,
+        collection,
+        query: Dict[str, Any],
+        order_by: List[Dict[str, str]],
+        offset: int,
+        limit: int,
+        technical_map: Optional[Dict[str, Dict[str, Any]]],
+        snapshot_date: Optional[str],
+        source: str,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        排序条件包含技术指标时：取出所有命中的视图文档，关联指标快照后在内存中排序再分页。
+
+        命中集合不超过全市场股票数，排序规则与 ScreeningService 一致（空值排在最后）。
+        """
+        docs = [doc async for doc in collection.find(query)]
+        codes = [doc.get("code") for doc in docs]
+        if technical_map is None:
+            technical_map = await self._load_indicator_snapshot(codes, snapshot_date)
+
+        def _value(doc: Dict[str, Any], field: str) -> Any:
+            if field in self.technical_fields:
+                return (technical_map.get(doc.get("code")) or {}).get(self.technical_fields[field])
+            return doc.get(self.basic_fields.get(field, field))
+
+        for order in reversed(order_by):  # 后者优先级低
+            field = order.get("field")
+            if field not in self.technical_fields and field not in self.basic_fields:
+                continue
+            desc = order.get("direction", "desc").lower() == "desc"
+            # 空值始终排在最后：先按值排序，再按是否为空稳定排序
+            present = [d for d in docs if _value(d, field) is not None]
+            missing = [d for d in docs if _value(d, field) is None]
+            present.sort(key=lambda d: _value(d, field), reverse=desc)
+            docs = present + missing
+
+        results = [self._format_result(doc) for doc in docs[offset:offset + limit]]
+        page_codes = [r.get("code") for r in results]
+        if page_codes:
+            await self._enrich_with_financial_data(results, page_codes)
+            await self._enrich_with_indicator_snapshot(results, page_codes, technical_map, snapshot_date)
+
+        logger.info(f"✅ 数据库筛选完成(按技术指标排序): 总数={len(docs)}, 返回={len(results)}, 数据源={source}")
+        return results, len(docs)
+
+    def _split_technical_conditions(
+        self, conditions: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """拆分为 视图条件 与 指标快照条件"""
+        basic_conditions = []
+        technical_conditions = []
+        for condition in conditions:
+            field = condition.get("field") if isinstance(condition, dict) else condition.field
+            if field in self.technical_fields:
+                technical_conditions.append(condition)
+            else:
+                basic_conditions.append(condition)
+        return basic_conditions, technical_conditions
+
+    async def _latest_snapshot_date(self) -> Optional[str]:
+        """指标快照的最新交易日（停牌/退市股票的快照停留在旧日期）"""
+        try:
+            db = get_mongo_db()
+            doc = await db[self.snapshot_collection_name].find_one(
+                {"trade_date": {"$ne": None}}, {"_id": 0, "trade_date": 1}, sort=[("trade_date", -1)]
+            )
+            return doc.get("trade_date") if doc else None
+        except Exception as e:
+            logger.warning(f"⚠️ 查询指标快照最新交易日失败: {e}")
+            return None
+
+    async def _query_indicator_snapshot(
+        self, conditions: List[Dict[str, Any]], snapshot_date: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """在 stock_indicator_snapshot 上执行技术指标范围查询，返回 {code: 指标值}（只取 snapshot_date 当日的快照）"""
+        db = get_mongo_db()
+        query = await self._build_query(conditions, self.technical_fields)
+        if snapshot_date:
+            query["trade_date"] = snapshot_date
+        logger.info(f"📋 指标快照查询条件: {query}")
+
+        projection = {"_id": 0, "code": 1}
+        projection.update({f: 1 for f in self.technical_fields.values()})
+        result: Dict[str, Dict[str, Any]] = {}
+        async for doc in db[self.snapshot_collection_name].find(query, projection):
+            code = doc.pop("code", None)
+            if code:
+                result[code] = doc
+        logger.info(f"📊 指标快照命中 {len(result)} 只股票")
+        return result
+
+    async def _enrich_with_indicator_snapshot(
+        self,
+        results: List[Dict[str, Any]],
+        codes: List[str],
+        technical_map: Optional[Dict[str, Dict[str, Any]]] = None,
+        snapshot_date: Optional[str] = None,
+    ) -> None:
+        """用指标快照填充结果中的技术指标（已按技术条件查询过时直接复用；过期快照不回显）"""
+        try:
+            if technical_map is None:
+                technical_map = await self._load_indicator_snapshot(codes, snapshot_date)
+
+            for result in results:
+                values = technical_map.get(result.get("code")) or {}
+                for field, db_field in self.technical_fields.items():
+                    if values.get(db_field) is not None:
+                        result[field] = values[db_field]
+        except Exception as e:
+            logger.warning(f"⚠️ 填充技术指标失败: {e}")
+
+    async def _load_indicator_snapshot(
+        self, codes: List[str], snapshot_date: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """按代码加载 snapshot_date 当日的指标快照，返回 {code: 指标值}"""
+        db = get_mongo_db()
+        query: Dict[str, Any] = {"code": {"$in": codes}}
+        if snapshot_date:
+            query["trade_date"] = snapshot_date
+        projection = {"_id": 0, "code": 1}
+        projection.update({f: 1 for f in self.technical_fields.values()})
+        technical_map: Dict[str, Dict[str, Any]] = {}
+        async for doc in db[self.snapshot_collection_name].find(query, projection):
+            technical_map[doc.pop("code")] = doc
+        return technical_map
+
+    async def _build_query(
+        self,
+        conditions: List[Dict[str, Any]],
+        field_map: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """构建MongoDB查询条件（field_map 缺省为视图字段映射）"""
+        field_map = self.basic_fields if field_map is None else field_map
         query = {}
 
         for condition in conditions:
@@ -200,9 +389,9 @@ class DatabaseScreeningService:
             logger.info(f"🔍 [_build_query] 处理条件: field={field}, operator={operator}, value={value}")
 
             # 映射字段名
-            db_field = self.basic_fields.get(field)
+            db_field = field_map.get(field)
             if not db_field:
-                logger.warning(f"⚠️ [_build_query] 字段 {field} 不在 basic_fields 映射中，跳过")
+                logger.warning(f"⚠️ [_build_query] 字段 {field} 不在字段映射中，跳过")
                 continue
 
             logger.info(f"✅ [_build_query] 字段映射: {field} -> {db_field}")
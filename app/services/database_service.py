@@ -9,7 +9,7 @@ import gzip
 import shutil
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union, BinaryIO
 from bson import ObjectId
 import motor.motor_asyncio
 import redis.asyncio as redis
@@ -167,9 +167,9 @@ class DatabaseService:
         """清理操作日志（委托子模块）"""
         return await _db_cleanup.cleanup_operation_logs(days)
 
-    async def import_data(self, content: bytes, collection: str, format: str = "json",
+    async def import_data(self, content: Union[bytes, BinaryIO], collection: str, format: str = "json",
                          overwrite: bool = False, filename: str = None) -> Dict[str, Any]:
-        """导入数据（委托子模块）"""
+        """导入数据（委托子模块；tar 归档可直接传入文件对象流式导入）"""
         return await _db_backups.import_data(content, collection, format=format, overwrite=overwrite, filename=filename)
 
     async def export_data(self, collections: List[str] = None, format: str = "json", sanitize: bool = False) -> str:
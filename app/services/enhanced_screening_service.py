@@ -64,10 +64,13 @@ class EnhancedScreeningService:
             # 分析筛选条件
             analysis = self._analyze_conditions(conditions)
 
-            # 决定使用哪种筛选方式
+            # 决定使用哪种筛选方式（技术指标条件/排序可由指标快照下推到数据库）
+            needs_snapshot = (analysis["needs_technical_indicators"] or
+                              self.db_service.sorts_by_technical(order_by))
             if (use_database_optimization and
                 analysis["can_use_database"] and
-                not analysis["needs_technical_indicators"]):
+                (not needs_snapshot or
+                 await self.db_service.can_handle_conditions(conditions, order_by))):
 
                 # 使用数据库优化筛选
                 result = await self._screen_with_database(
@@ -12,8 +12,8 @@ import re
 import asyncio
 from collections import defaultdict
 
-# 复用现有缓存系统
-from tradingagents.dataflows.cache import get_cache
+# 复用现有缓存系统（异步门面，不阻塞事件循环）
+from tradingagents.dataflows.cache import get_async_cache
 
 # 复用现有数据源提供者
 from tradingagents.dataflows.providers.hk.hk_stock import HKStockProvider
@@ -39,8 +39,8 @@ class ForeignStockService:
     }
 
     def __init__(self, db=None):
-        # 使用统一缓存系统（自动选择 MongoDB/Redis/File）
-        self.cache = get_cache()
+        # 使用统一缓存系统（自动选择 MongoDB/Redis/File）的异步门面
+        self.cache = get_async_cache()
 
         # 初始化港股数据源提供者
         self.hk_provider = HKStockProvider()
@@ -130,13 +130,13 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="hk_realtime_quote"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股行情: {code}")
                     return self._parse_cached_data(cached_data, 'HK', code)
@@ -148,12 +148,12 @@ class ForeignStockService:
         async with lock:
             # 🔥 再次检查缓存（可能在等待锁的过程中，其他请求已经完成并缓存了数据）
             # 即使 force_refresh=True，也要检查是否有其他并发请求刚刚完成
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="hk_realtime_quote"
             )
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     # 检查缓存时间，如果是最近1秒内的，说明是并发请求刚刚缓存的
                     try:
@@ -227,7 +227,7 @@ class ForeignStockService:
             formatted_data = self._format_hk_quote(quote_data, code, data_source)
 
             # 6. 保存到缓存
-            self.cache.save_stock_data(
+            await self.cache.save_stock_data(
                 symbol=code,
                 data=json.dumps(formatted_data, ensure_ascii=False),
                 data_source="hk_realtime_quote"
@@ -301,13 +301,13 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="us_realtime_quote"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股行情: {code}")
                     return self._parse_cached_data(cached_data, 'US', code)
@@ -318,12 +318,12 @@ class ForeignStockService:
 
         async with lock:
             # 🔥 再次检查缓存（可能在等待锁的过程中，其他请求已经完成并缓存了数据）
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="us_realtime_quote"
             )
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     # 检查缓存时间，如果是最近1秒内的，说明是并发请求刚刚缓存的
                     try:
@@ -412,7 +412,7 @@ class ForeignStockService:
             }
 
             # 6. 保存到缓存
-            self.cache.save_stock_data(
+            await self.cache.save_stock_data(
                 symbol=code,
                 data=json.dumps(formatted_data, ensure_ascii=False),
                 data_source="us_realtime_quote"
@@ -533,13 +533,13 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="hk_basic_info"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股基础信息: {code}")
                     return self._parse_cached_data(cached_data, 'HK', code)
@@ -596,7 +596,7 @@ class ForeignStockService:
         formatted_data = self._format_hk_info(info_data, code, data_source)
 
         # 5. 保存到缓存
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(formatted_data, ensure_ascii=False),
             data_source="hk_basic_info"
@@ -612,13 +612,13 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source="us_basic_info"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股基础信息: {code}")
                     return self._parse_cached_data(cached_data, 'US', code)
@@ -699,7 +699,7 @@ class ForeignStockService:
         }
 
         # 5. 保存到缓存
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(formatted_data, ensure_ascii=False),
             data_source="us_basic_info"
@@ -716,13 +716,13 @@ class ForeignStockService:
         # 1. 检查缓存（除非强制刷新）
         cache_key_str = f"hk_kline_{period}_{limit}"
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source=cache_key_str
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股K线: {code}")
                     return self._parse_cached_kline(cached_data)
@@ -776,7 +776,7 @@ class ForeignStockService:
             raise Exception(f"无法获取港股{code}的K线数据：所有数据源均失败")
 
         # 4. 保存到缓存
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(kline_data, ensure_ascii=False),
             data_source=cache_key_str
@@ -793,13 +793,13 @@ class ForeignStockService:
         # 1. 检查缓存（除非强制刷新）
         cache_key_str = f"us_kline_{period}_{limit}"
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await self.cache.find_cached_stock_data(
                 symbol=code,
                 data_source=cache_key_str
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股K线: {code}")
                     return self._parse_cached_kline(cached_data)
@@ -853,7 +853,7 @@ class ForeignStockService:
             raise Exception(f"无法获取美股{code}的K线数据：所有数据源均失败")
 
         # 4. 保存到缓存
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(kline_data, ensure_ascii=False),
             data_source=cache_key_str
@@ -1219,13 +1219,13 @@ class ForeignStockService:
 
         # 1. 尝试从缓存获取
         cache_key_str = f"hk_news_{days}_{limit}"
-        cache_key = self.cache.find_cached_stock_data(
+        cache_key = await self.cache.find_cached_stock_data(
             symbol=code,
             data_source=cache_key_str
         )
 
         if cache_key:
-            cached_data = self.cache.load_stock_data(cache_key)
+            cached_data = await self.cache.load_stock_data(cache_key)
             if cached_data:
                 logger.info(f"⚡ 从缓存获取港股新闻: {code}")
                 return json.loads(cached_data)
@@ -1289,7 +1289,7 @@ class ForeignStockService:
         }
 
         # 5. 缓存数据
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(result, ensure_ascii=False),
             data_source=cache_key_str
@@ -1315,13 +1315,13 @@ class ForeignStockService:
 
         # 1. 尝试从缓存获取
         cache_key_str = f"us_news_{days}_{limit}"
-        cache_key = self.cache.find_cached_stock_data(
+        cache_key = await self.cache.find_cached_stock_data(
             symbol=code,
             data_source=cache_key_str
         )
 
         if cache_key:
-            cached_data = self.cache.load_stock_data(cache_key)
+            cached_data = await self.cache.load_stock_data(cache_key)
             if cached_data:
                 logger.info(f"⚡ 从缓存获取美股新闻: {code}")
                 return json.loads(cached_data)
@@ -1385,7 +1385,7 @@ class ForeignStockService:
         }
 
         # 5. 缓存数据
-        self.cache.save_stock_data(
+        await self.cache.save_stock_data(
             symbol=code,
             data=json.dumps(result, ensure_ascii=False),
             data_source=cache_key_str
@@ -5,23 +5,60 @@
 """
 import asyncio
 import logging
+import time
 from datetime import datetime, date
 from typing import Dict, Any, List, Optional, Union
+import numpy as np
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
 
 from app.core.database import get_database
 
 logger = logging.getLogger(__name__)
 
 
+class AdaptiveBatchSizer:
+    """
+    根据 bulk_write 耗时调整批量大小
+
+    写入耗时低于目标一半且整批写满时批量翻倍，超过目标时减半，
+    在 [minimum, maximum] 之间变化。
+    """
+
+    def __init__(self, initial: int = 1000, minimum: int = 200, maximum: int = 5000, target_seconds: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = max(minimum, min(initial, maximum))
+
+    def record(self, count: int, seconds: float) -> None:
+        if seconds > self.target_seconds:
+            self.size = max(self.minimum, self.size // 2)
+        elif seconds < self.target_seconds / 2 and count >= self.size:
+            self.size = min(self.maximum, self.size * 2)
+
+
 class HistoricalDataService:
     """统一历史数据管理服务"""
-    
+
+    # 可选字段 -> 源数据列（按优先级）
+    _OPTIONAL_FIELDS = {
+        "turnover_rate": ('turnover_rate', 'turn'),
+        "volume_ratio": ('volume_ratio',),
+        "pe": ('pe',),
+        "pb": ('pb',),
+        "ps": ('ps',),
+        "adjustflag": ('adjustflag', 'adj_factor'),
+        "tradestatus": ('tradestatus',),
+        "isST": ('isST',),
+    }
+
     def __init__(self):
         """初始化服务"""
         self.db = None
         self.collection = None
+        self.batch_sizer = AdaptiveBatchSizer()
         
     async def initialize(self):
         """初始化数据库连接"""
@@ -96,7 +133,6 @@ class HistoricalDataService:
                 logger.warning(f"⚠️ {symbol} 历史数据为空，跳过保存")
                 return 0
 
-            from datetime import datetime
             total_start = datetime.now()
 
             logger.info(f"💾 开始保存 {symbol} 历史数据: {len(data)}条记录 (数据源: {data_source})")
@@ -104,85 +140,24 @@ class HistoricalDataService:
             # ⏱️ 性能监控：单位转换
             convert_start = datetime.now()
             # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
-                # 成交额：千元 -> 元
-                if 'amount' in data.columns:
-                    data['amount'] = data['amount'] * 1000
-                elif 'turnover' in data.columns:
-                    data['turnover'] = data['turnover'] * 1000
-
-                # 成交量：手 -> 股
-                if 'volume' in data.columns:
-                    data['volume'] = data['volume'] * 100
-                elif 'vol' in data.columns:
-                    data['vol'] = data['vol'] * 100
-
-            # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
-            if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
-                # 使用 shift(1) 将 close 列向下移动一行，得到前一天的收盘价
-                data['pre_close'] = data['close'].shift(1)
-                logger.debug(f"✅ {symbol} 添加 pre_close 字段（从前一天的 close 获取）")
-
+            data = self._convert_units(symbol, data, data_source, market)
             convert_duration = (datetime.now() - convert_start).total_seconds()
 
-            # ⏱️ 性能监控：构建操作列表
+            # ⏱️ 性能监控：构建文档（列式向量化转换）
             prepare_start = datetime.now()
-            # 准备批量操作
-            operations = []
-            saved_count = 0
-            batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
-
-            for date_index, row in data.iterrows():
-                try:
-                    # 标准化数据（传递日期索引）
-                    doc = self._standardize_record(symbol, row, data_source, market, period, date_index)
-
-                    # 创建upsert操作
-                    filter_doc = {
-                        "symbol": doc["symbol"],
-                        "trade_date": doc["trade_date"],
-                        "data_source": doc["data_source"],
-                        "period": doc["period"]
-                    }
-
-                    from pymongo import ReplaceOne
-                    operations.append(ReplaceOne(
-                        filter=filter_doc,
-                        replacement=doc,
-                        upsert=True
-                    ))
-
-                    # 批量执行（每200条）
-                    if len(operations) >= batch_size:
-                        batch_write_start = datetime.now()
-                        batch_saved = await self._execute_bulk_write_with_retry(symbol, operations)
-                        batch_write_duration = (datetime.now() - batch_write_start).total_seconds()
-                        logger.debug(f"   批量写入 {len(operations)} 条，耗时 {batch_write_duration:.2f}秒")
-                        saved_count += batch_saved
-                        operations = []
-
-                except Exception as e:
-                    # 获取日期信息用于错误日志
-                    date_str = str(date_index) if hasattr(date_index, '__str__') else 'unknown'
-                    logger.error(f"❌ 处理记录失败 {symbol} {date_str}: {e}")
-                    continue
-
+            docs = self._build_documents(symbol, data, data_source, market, period)
             prepare_duration = (datetime.now() - prepare_start).total_seconds()
 
-            # ⏱️ 性能监控：最后一批写入
-            final_write_start = datetime.now()
-            # 执行剩余操作
-            if operations:
-                saved_count += await self._execute_bulk_write_with_retry(
-                    symbol, operations
-                )
-            final_write_duration = (datetime.now() - final_write_start).total_seconds()
+            # ⏱️ 性能监控：批量写入（批量大小按写入耗时自适应）
+            write_start = datetime.now()
+            saved_count = await self._write_documents(symbol, docs)
+            write_duration = (datetime.now() - write_start).total_seconds()
 
             total_duration = (datetime.now() - total_start).total_seconds()
             logger.info(
                 f"✅ {symbol} 历史数据保存完成: {saved_count}条记录，"
                 f"总耗时 {total_duration:.2f}秒 "
-                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.2f}秒, 最后写入: {final_write_duration:.2f}秒)"
+                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.3f}秒, 写入: {write_duration:.2f}秒)"
             )
             return saved_count
             
@@ -190,6 +165,234 @@ class HistoricalDataService:
             logger.error(f"❌ 保存历史数据失败 {symbol}: {e}")
             return 0
 
+    async def save_historical_data_many(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily"
+    ) -> int:
+        """
+        批量保存多只股票的历史数据（多只股票的文档合并到同一批 bulk_write 中）
+
+        Args:
+            frames: {股票代码: 历史数据DataFrame}
+            data_source: 数据源 (tushare/akshare/baostock)
+            market: 市场类型 (CN/HK/US)
+            period: 数据周期 (daily/weekly/monthly)
+
+        Returns:
+            保存的记录数量（所有股票合计）
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        total_start = datetime.now()
+        docs: List[Dict[str, Any]] = []
+        symbols = 0
+        for symbol, data in frames.items():
+            if data is None or data.empty:
+                continue
+            try:
+                data = self._convert_units(symbol, data, data_source, market)
+                docs.extend(self._build_documents(symbol, data, data_source, market, period))
+                symbols += 1
+            except Exception as e:
+                logger.error(f"❌ 处理历史数据失败 {symbol}: {e}")
+
+        if not docs:
+            return 0
+
+        prepare_duration = (datetime.now() - total_start).total_seconds()
+        try:
+            saved_count = await self._write_documents(f"{symbols}只股票", docs)
+        except Exception as e:
+            logger.error(f"❌ 批量保存历史数据失败 ({symbols}只股票): {e}")
+            return 0
+
+        total_duration = (datetime.now() - total_start).total_seconds()
+        logger.info(
+            f"✅ 批量保存历史数据完成: {symbols}只股票 {saved_count}条记录，"
+            f"总耗时 {total_duration:.2f}秒 (准备: {prepare_duration:.3f}秒)"
+        )
+        return saved_count
+
+    def _convert_units(self, symbol: str, data: pd.DataFrame, data_source: str, market: str) -> pd.DataFrame:
+        """在 DataFrame 层面做单位转换并补充 pre_close（向量化操作）"""
+        if data_source == "tushare":
+            # 成交额：千元 -> 元
+            if 'amount' in data.columns:
+                data['amount'] = data['amount'] * 1000
+            elif 'turnover' in data.columns:
+                data['turnover'] = data['turnover'] * 1000
+
+            # 成交量：手 -> 股
+            if 'volume' in data.columns:
+                data['volume'] = data['volume'] * 100
+            elif 'vol' in data.columns:
+                data['vol'] = data['vol'] * 100
+
+        # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
+        if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
+            # 使用 shift(1) 将 close 列向下移动一行，得到前一天的收盘价
+            data['pre_close'] = data['close'].shift(1)
+            logger.debug(f"✅ {symbol} 添加 pre_close 字段（从前一天的 close 获取）")
+        return data
+
+    def _build_documents(
+        self,
+        symbol: str,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str,
+        period: str = "daily"
+    ) -> List[Dict[str, Any]]:
+        """
+        把 DataFrame 整体转换为 MongoDB 文档列表
+
+        字段规则与 _standardize_record 一致，但按列做取值、类型转换与涨跌计算，
+        最后一次性 to_dict('records')。向量化转换失败时退回逐行标准化。
+        """
+        try:
+            return self._build_documents_vectorized(symbol, data, data_source, market, period)
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol} 向量化转换失败，改为逐行处理: {e}")
+
+        docs = []
+        for date_index, row in data.iterrows():
+            try:
+                docs.append(self._standardize_record(symbol, row, data_source, market, period, date_index))
+            except Exception as e:
+                logger.error(f"❌ 处理记录失败 {symbol} {date_index}: {e}")
+        return docs
+
+    def _build_documents_vectorized(
+        self,
+        symbol: str,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str,
+        period: str
+    ) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+
+        def num(*cols: str) -> np.ndarray:
+            return self._numeric_column(data, *cols)
+
+        close = num('close')
+        pre_close = num('pre_close', 'preclose')
+        # 计算涨跌数据（close / pre_close 为空或为 0 时使用原始字段）
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_pre_close = ~np.isnan(close) & (close != 0) & ~np.isnan(pre_close) & (pre_close != 0)
+            change = np.round(close - pre_close, 4)
+            pct_chg = np.round(change / pre_close * 100, 4)
+
+        columns = {
+            "open": num('open'),
+            "high": num('high'),
+            "low": num('low'),
+            "close": close,
+            "pre_close": pre_close,
+            # OHLCV数据（单位转换已在 DataFrame 层面完成）
+            "volume": num('volume', 'vol'),
+            "amount": num('amount', 'turnover'),
+            "change": np.where(has_pre_close, change, num('change')),
+            "pct_chg": np.where(has_pre_close, pct_chg, num('pct_chg', 'change_percent')),
+        }
+
+        # 可选字段：只有源数据中存在对应列时才写入
+        for key, sources in self._OPTIONAL_FIELDS.items():
+            if any(col in data.columns for col in sources):
+                columns[key] = num(*sources)
+
+        keys = ["trade_date"] + list(columns)
+        values = [self._trade_date_column(data)]
+        for arr in columns.values():
+            # tolist() 得到 Python float，NaN 转为 None
+            values.append([None if v != v else v for v in arr.tolist()] if np.isnan(arr).any() else arr.tolist())
+
+        head = {
+            "symbol": symbol,
+            "code": symbol,  # 添加 code 字段，与 symbol 保持一致（向后兼容）
+            "full_symbol": self._get_full_symbol(symbol, market),
+            "market": market,
+            "period": period,
+            "data_source": data_source,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1
+        }
+        return [{**head, **dict(zip(keys, row))} for row in zip(*values)]
+
+    @staticmethod
+    def _numeric_column(data: pd.DataFrame, *columns: str) -> np.ndarray:
+        """按优先级取第一个非空值并转为 float 数组，列都不存在时返回全 NaN"""
+        result = None
+        for col in columns:
+            if col not in data.columns:
+                continue
+            series = data[col]
+            if series.dtype.kind in 'fiub':
+                values = series.to_numpy(dtype=float)
+            else:
+                values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+            result = values if result is None else np.where(np.isnan(result), values, result)
+        if result is None:
+            return np.full(len(data), np.nan)
+        return result
+
+    def _trade_date_column(self, data: pd.DataFrame) -> List[str]:
+        """交易日期列：优先 date / trade_date 列，其次日期类型的索引，否则使用当前日期"""
+        dates: List[Optional[str]] = [None] * len(data)
+        for col in ('date', 'trade_date'):
+            if col not in data.columns:
+                continue
+            source = data[col]
+            if pd.api.types.is_datetime64_any_dtype(source):
+                formatted = source.dt.strftime('%Y-%m-%d').tolist()
+            else:
+                formatted = [None if pd.isna(v) else self._format_date(v) for v in source.tolist()]
+            dates = [d if isinstance(d, str) else f for d, f in zip(dates, formatted)]
+            if all(isinstance(d, str) for d in dates):
+                return dates
+
+        index = data.index
+        if isinstance(index, pd.DatetimeIndex):
+            fallback = index.strftime('%Y-%m-%d').tolist()
+        else:
+            fallback = [
+                self._format_date(value if isinstance(value, (date, datetime, pd.Timestamp)) else None)
+                for value in index
+            ]
+        return [d if isinstance(d, str) else f for d, f in zip(dates, fallback)]
+
+    async def _write_documents(self, label: str, docs: List[Dict[str, Any]]) -> int:
+        """按自适应批量大小执行 upsert，返回保存的记录数"""
+        saved_count = 0
+        pos = 0
+        while pos < len(docs):
+            batch = docs[pos:pos + self.batch_sizer.size]
+            pos += len(batch)
+            operations = [
+                ReplaceOne(
+                    filter={
+                        "symbol": doc["symbol"],
+                        "trade_date": doc["trade_date"],
+                        "data_source": doc["data_source"],
+                        "period": doc["period"]
+                    },
+                    replacement=doc,
+                    upsert=True
+                )
+                for doc in batch
+            ]
+            write_start = time.perf_counter()
+            saved_count += await self._execute_bulk_write_with_retry(label, operations)
+            elapsed = time.perf_counter() - write_start
+            self.batch_sizer.record(len(operations), elapsed)
+            logger.debug(f"   批量写入 {len(operations)} 条，耗时 {elapsed:.2f}秒，下一批 {self.batch_sizer.size} 条")
+        return saved_count
+
     async def _execute_bulk_write_with_retry(
         self,
         symbol: str,
@@ -448,6 +651,39 @@ class HistoricalDataService:
             logger.error(f"❌ 获取最新日期失败 {symbol}: {e}")
             return None
     
+    async def get_latest_dates(
+        self,
+        data_source: str,
+        period: str = "daily",
+        symbols: Optional[List[str]] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        一次聚合获取所有股票的最新数据日期
+
+        按 symbol 分组取 trade_date 最大值（沿 symbol_date_index 顺序扫描），
+        用于增量同步前批量确定各股票的起始日期，替代逐只股票查询。
+
+        Returns:
+            {symbol: 最新交易日期}；查询失败返回 None（调用方应退回逐只查询）
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        match: Dict[str, Any] = {"data_source": data_source, "period": period}
+        if symbols is not None:
+            match["symbol"] = {"$in": list(symbols)}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"symbol": 1, "trade_date": -1}},
+            {"$group": {"_id": "$symbol", "latest": {"$first": "$trade_date"}}},
+        ]
+        try:
+            cursor = self.collection.aggregate(pipeline, allowDiskUse=True, hint="symbol_date_index")
+            return {doc["_id"]: doc["latest"] async for doc in cursor}
+        except Exception as e:
+            logger.error(f"❌ 批量获取最新日期失败 ({data_source}/{period}): {e}")
+            return None
+
     async def get_data_statistics(self) -> Dict[str, Any]:
         """获取数据统计信息"""
         if self.collection is None:
@@ -0,0 +1,292 @@
+"""
+增量指标状态服务
+
+为每只股票在 ``stock_indicator_state`` 集合中维护一份 IndicatorState（滚动窗口缓冲、EMA 递推值、
+KDJ 上一期 K/D），日线同步完成后一次性加载全市场状态，只用新到的K线推进，再批量写回。
+首次出现的股票使用最近 WARMUP_DAYS 天的历史回放建立状态。
+
+推进后同时把每只股票最新一根K线上的指标值物化到 ``stock_indicator_snapshot``（每只股票一条，
+技术字段建索引），供 DatabaseScreeningService 直接用范围查询筛选技术指标。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from app.services.screening.panel import DEFAULT_SOURCE_PRIORITY
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+from tradingagents.tools.analysis.streaming import IndicatorState
+
+logger = logging.getLogger("agents")
+
+STATE_COLLECTION = "stock_indicator_state"
+SNAPSHOT_COLLECTION = "stock_indicator_snapshot"
+# 快照中建立单字段索引的技术指标（用于范围查询）
+SNAPSHOT_INDEXED_FIELDS = ("ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist")
+# 新股票建立状态时回放的历史天数（自然日）
+WARMUP_DAYS = 365
+
+_BAR_FIELDS = ("open", "high", "low", "close", "volume", "amount")
+
+
+def _pick_source(sources: Iterable[str], preferred: Optional[str], source_priority: Sequence[str]) -> Optional[str]:
+    """已有状态沿用原数据源；否则按优先级选择，保证一只股票的状态只由同一来源的K线推进"""
+    sources = [s for s in sources if s]
+    if preferred and preferred in sources:
+        return preferred
+    if preferred:
+        return None
+    rank = {s: i for i, s in enumerate(source_priority)}
+    return min(sources, key=lambda s: rank.get(s, len(rank))) if sources else None
+
+
+def advance_states(
+    records: pd.DataFrame,
+    states: Dict[str, IndicatorState],
+    sources: Dict[str, str],
+    specs: Optional[List[IndicatorSpec]] = None,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> List[str]:
+    """
+    用长表K线（symbol, trade_date, data_source, 行情字段）推进各股票的状态（原地修改）。
+
+    只处理晚于状态 last_trade_date 的K线；不存在状态的股票新建状态。
+    返回被推进过的股票代码列表。
+    """
+    if records is None or records.empty:
+        return []
+
+    df = records.copy()
+    df["symbol"] = df["symbol"].astype(str).str.zfill(6)
+    if "data_source" not in df.columns:
+        df["data_source"] = None
+    df = df.sort_values(["symbol", "trade_date"], kind="mergesort")
+
+    advanced: List[str] = []
+    for symbol, group in df.groupby("symbol", sort=False):
+        source = _pick_source(group["data_source"].dropna().unique(), sources.get(symbol), source_priority)
+        if source is not None:
+            group = group[group["data_source"] == source]
+        elif sources.get(symbol):
+            continue
+        group = group.drop_duplicates(subset=["trade_date"], keep="last")
+
+        state = states.get(symbol)
+        if state is None:
+            state = IndicatorState(specs)
+        if state.last_trade_date:
+            group = group[group["trade_date"] > state.last_trade_date]
+        if group.empty:
+            continue
+
+        state.update_many(group, date_col="trade_date")
+        states[symbol] = state
+        sources[symbol] = source
+        advanced.append(symbol)
+    return advanced
+
+
+def snapshot_doc(symbol: str, state: IndicatorState, data_source: Optional[str], now: datetime) -> Dict[str, Any]:
+    """最新一根K线上的指标值；NaN 存为 None，避免参与范围比较"""
+    doc: Dict[str, Any] = {
+        "code": symbol,
+        "symbol": symbol,
+        "trade_date": state.last_trade_date,
+        "data_source": data_source,
+        "close": state.prev_close,
+        "updated_at": now,
+    }
+    doc.update(state.values)
+    return {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in doc.items()}
+
+
+class IndicatorStateService:
+    """全市场增量指标状态的加载、推进与持久化"""
+
+    def __init__(self, db: Any = None, specs: Optional[List[IndicatorSpec]] = None):
+        self._db = db
+        self.specs = specs
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.core.database import get_mongo_db_sync
+            self._db = get_mongo_db_sync()
+        return self._db
+
+    def ensure_indexes(self) -> None:
+        coll = self.db[STATE_COLLECTION]
+        coll.create_index([("symbol", 1), ("period", 1)], unique=True, name="symbol_period_unique", background=True)
+        coll.create_index([("last_trade_date", -1)], name="last_trade_date_index", background=True)
+
+        snap = self.db[SNAPSHOT_COLLECTION]
+        snap.create_index([("code", 1)], unique=True, name="code_unique", background=True)
+        snap.create_index([("trade_date", -1)], name="trade_date_index", background=True)
+        for f in SNAPSHOT_INDEXED_FIELDS:
+            snap.create_index([(f, 1)], name=f"{f}_index", background=True)
+
+    def load_states(self, symbols: Optional[Sequence[str]] = None, period: str = "daily"):
+        """一次查询加载状态，返回 (states, sources)"""
+        query: Dict[str, Any] = {"period": period}
+        if symbols:
+            query["symbol"] = {"$in": [str(s).zfill(6) for s in symbols]}
+        states: Dict[str, IndicatorState] = {}
+        sources: Dict[str, str] = {}
+        for doc in self.db[STATE_COLLECTION].find(query, {"_id": 0}, batch_size=5000):
+            try:
+                states[doc["symbol"]] = IndicatorState.from_dict(doc["state"])
+                sources[doc["symbol"]] = doc.get("data_source")
+            except Exception as e:
+                logger.warning(f"⚠️ 指标状态损坏，将重新回放历史: {doc.get('symbol')} - {e}")
+        return states, sources
+
+    def save_states(
+        self,
+        symbols: Iterable[str],
+        states: Dict[str, IndicatorState],
+        sources: Dict[str, str],
+        period: str = "daily",
+    ) -> int:
+        """批量写回指定股票的状态"""
+        from pymongo import UpdateOne
+
+        symbols = list(symbols)
+        now = datetime.utcnow()
+        ops = []
+        for symbol in symbols:
+            state = states[symbol]
+            ops.append(UpdateOne(
+                {"symbol": symbol, "period": period},
+                {"$set": {
+                    "symbol": symbol,
+                    "period": period,
+                    "data_source": sources.get(symbol),
+                    "last_trade_date": state.last_trade_date,
+                    "state": state.to_dict(),
+                    "updated_at": now,
+                }},
+                upsert=True,
+            ))
+        written = self._bulk_write(STATE_COLLECTION, ops)
+        if period == "daily":
+            self._bulk_write(SNAPSHOT_COLLECTION, [
+                UpdateOne({"code": symbol}, {"$set": snapshot_doc(symbol, states[symbol], sources.get(symbol), now)}, upsert=True)
+                for symbol in symbols
+            ])
+        return written
+
+    def _bulk_write(self, collection: str, ops: List[Any]) -> int:
+        written = 0
+        for i in range(0, len(ops), 1000):
+            result = self.db[collection].bulk_write(ops[i:i + 1000], ordered=False)
+            written += result.upserted_count + result.modified_count
+        return written
+
+    def _load_bars(self, query: Dict[str, Any]) -> pd.DataFrame:
+        projection = {"_id": 0, "symbol": 1, "trade_date": 1, "data_source": 1}
+        projection.update({k: 1 for k in _BAR_FIELDS})
+        cursor = self.db["stock_daily_quotes"].find(query, projection, batch_size=10000)
+        return pd.DataFrame(list(cursor))
+
+    def advance_market(
+        self,
+        end_date: Optional[str] = None,
+        symbols: Optional[Sequence[str]] = None,
+        period: str = "daily",
+    ) -> Dict[str, Any]:
+        """
+        用 stock_daily_quotes 中新增的K线推进全市场（或指定股票）的指标状态。
+
+        已有状态的股票只读取 last_trade_date 之后的K线；没有状态的股票回放最近 WARMUP_DAYS 天历史。
+        """
+        end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+        states, sources = self.load_states(symbols, period)
+
+        base: Dict[str, Any] = {"period": period, "trade_date": {"$lte": end_date}}
+        if symbols:
+            base["symbol"] = {"$in": [str(s).zfill(6) for s in symbols]}
+
+        # 按 last_trade_date 分组，每组只读取各自之后的K线（停牌股的旧日期不会拉低全市场的起点）
+        by_date: Dict[str, List[str]] = {}
+        undated: List[str] = []
+        for symbol, state in states.items():
+            if state.last_trade_date:
+                by_date.setdefault(state.last_trade_date, []).append(symbol)
+            else:
+                undated.append(symbol)
+
+        frames = []
+        for since, group in sorted(by_date.items()):
+            if since >= end_date:
+                continue
+            q = dict(base, trade_date={"$gt": since, "$lte": end_date}, symbol={"$in": group})
+            frames.append(self._load_bars(q))
+
+        # 没有状态的股票：以最近一段时间内有日线的股票为全集
+        recent = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=15)).strftime("%Y-%m-%d")
+        universe = self.db["stock_daily_quotes"].distinct(
+            "symbol", dict(base, trade_date={"$gte": recent, "$lte": end_date})
+        )
+        missing = sorted({str(s).zfill(6) for s in universe} - set(states.keys()))
+        # 状态中没有 last_trade_date 的股票同样回放历史
+        warmup = missing + sorted(undated)
+        if warmup:
+            start = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=WARMUP_DAYS)).strftime("%Y-%m-%d")
+            q = dict(base, trade_date={"$gte": start, "$lte": end_date}, symbol={"$in": warmup})
+            frames.append(self._load_bars(q))
+
+        frames = [f for f in frames if not f.empty]
+        records = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        advanced = advance_states(records, states, sources, self.specs)
+        written = self.save_states(advanced, states, sources, period) if advanced else 0
+
+        stats = {
+            "end_date": end_date,
+            "states": len(states),
+            "advanced": len(advanced),
+            "new": len(set(advanced) & set(missing)),
+            "bars": int(len(records)),
+            "written": written,
+        }
+        logger.info(
+            f"📊 增量指标推进完成: 推进 {stats['advanced']} 只(新建 {stats['new']}), "
+            f"K线 {stats['bars']} 条, 写回 {written} 条"
+        )
+        return stats
+
+
+_indicator_state_service: Optional[IndicatorStateService] = None
+_indexes_ready = False
+
+
+def get_indicator_state_service() -> IndicatorStateService:
+    global _indicator_state_service
+    if _indicator_state_service is None:
+        _indicator_state_service = IndicatorStateService()
+    return _indicator_state_service
+
+
+async def refresh_indicator_snapshot(
+    symbols: Optional[Sequence[str]] = None,
+    end_date: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    日线同步完成后调用：推进增量指标状态并刷新 stock_indicator_snapshot。
+
+    在线程中执行（pymongo + CPU 计算），失败只记录告警，不影响同步任务本身。
+    """
+    global _indexes_ready
+    service = get_indicator_state_service()
+    try:
+        if not _indexes_ready:
+            await asyncio.to_thread(service.ensure_indexes)
+            _indexes_ready = True
+        return await asyncio.to_thread(service.advance_market, end_date, symbols)
+    except Exception as e:
+        logger.warning(f"⚠️ 指标快照刷新失败（已忽略）: {e}")
+        return None
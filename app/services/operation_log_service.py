@@ -27,6 +27,46 @@ class OperationLogService:
     def __init__(self):
         self.collection_name = "operation_logs"
     
+    @staticmethod
+    def build_log_doc(
+        user_id: str,
+        username: str,
+        log_data: OperationLogCreate,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """构建日志文档"""
+        # 🔥 使用 naive datetime（不带时区信息），MongoDB 会按原样存储，不会转换为 UTC
+        current_time = now_tz().replace(tzinfo=None)  # 移除时区信息，保留本地时间值
+        return {
+            "user_id": user_id,
+            "username": username,
+            "action_type": log_data.action_type,
+            "action": log_data.action,
+            "details": log_data.details or {},
+            "success": log_data.success,
+            "error_message": log_data.error_message,
+            "duration_ms": log_data.duration_ms,
+            "ip_address": ip_address or log_data.ip_address,
+            "user_agent": user_agent or log_data.user_agent,
+            "session_id": log_data.session_id,
+            "timestamp": current_time,  # naive datetime，MongoDB 按原样存储
+            "created_at": current_time  # naive datetime，MongoDB 按原样存储
+        }
+
+    def enqueue_log(
+        self,
+        user_id: str,
+        username: str,
+        log_data: OperationLogCreate,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> bool:
+        """日志交给后台写入器批量写入，不等待数据库；队列满时返回 False"""
+        from app.services.operation_log_writer import get_operation_log_writer
+        doc = self.build_log_doc(user_id, username, log_data, ip_address, user_agent)
+        return get_operation_log_writer().submit(doc)
+
     async def create_log(
         self,
         user_id: str,
@@ -38,26 +78,8 @@ class OperationLogService:
         """创建操作日志"""
         try:
             db = get_mongo_db()
+            log_doc = self.build_log_doc(user_id, username, log_data, ip_address, user_agent)
 
-            # 构建日志文档
-            # 🔥 使用 naive datetime（不带时区信息），MongoDB 会按原样存储，不会转换为 UTC
-            current_time = now_tz().replace(tzinfo=None)  # 移除时区信息，保留本地时间值
-            log_doc = {
-                "user_id": user_id,
-                "username": username,
-                "action_type": log_data.action_type,
-                "action": log_data.action,
-                "details": log_data.details or {},
-                "success": log_data.success,
-                "error_message": log_data.error_message,
-                "duration_ms": log_data.duration_ms,
-                "ip_address": ip_address or log_data.ip_address,
-                "user_agent": user_agent or log_data.user_agent,
-                "session_id": log_data.session_id,
-                "timestamp": current_time,  # naive datetime，MongoDB 按原样存储
-                "created_at": current_time  # naive datetime，MongoDB 按原样存储
-            }
-            
             # 插入数据库
             result = await db[self.collection_name].insert_one(log_doc)
             
@@ -282,3 +304,32 @@ async def log_operation(
         session_id=session_id
     )
     return await service.create_log(user_id, username, log_data, ip_address, user_agent)
+
+
+def enqueue_operation_log(
+    user_id: str,
+    username: str,
+    action_type: str,
+    action: str,
+    details: Optional[Dict[str, Any]] = None,
+    success: bool = True,
+    error_message: Optional[str] = None,
+    duration_ms: Optional[int] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> bool:
+    """记录操作日志（后台批量写入，不阻塞调用方），用于请求路径上的自动记录"""
+    service = get_operation_log_service()
+    log_data = OperationLogCreate(
+        action_type=action_type,
+        action=action,
+        details=details,
+        success=success,
+        error_message=error_message,
+        duration_ms=duration_ms,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        session_id=session_id
+    )
+    return service.enqueue_log(user_id, username, log_data, ip_address, user_agent)
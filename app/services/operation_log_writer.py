@@ -0,0 +1,160 @@
+"""
+操作日志后台写入器
+
+OperationLogMiddleware 不再在请求路径上 insert_one：日志文档进入有界内存队列，
+由后台任务按数量（batch_size）或时间（flush_interval）阈值批量 insert_many。
+队列满时丢弃新日志并计数（不阻塞请求）；应用关闭时写出队列中剩余的日志。
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_mongo_db
+
+logger = logging.getLogger("webapi")
+
+
+class OperationLogWriter:
+    """有界队列 + 批量写入的操作日志写入器"""
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        collection_name: str = "operation_logs",
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.collection_name = collection_name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 后台任务中进行中的批量写入（shield 保护，停止时需等待其完成）
+        self._inflight: Optional[asyncio.Future] = None
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._last_drop_warning = 0.0
+
+    # ---- 生命周期 ----
+
+    def start(self) -> None:
+        """在当前事件循环中启动后台写入任务"""
+        if self._task is not None and not self._task.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run(), name="operation-log-writer")
+        logger.info(
+            f"📝 操作日志后台写入已启动: 队列上限 {self.max_queue_size}, "
+            f"批量 {self.batch_size}, 间隔 {self.flush_interval}s"
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """停止后台任务，等待进行中的批量写入并写出队列中剩余的日志（总计最多 timeout 秒）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        async def _drain():
+            # 返回前确保写入已结束，之后关闭 MongoDB 连接不会让这一批丢失
+            if self._inflight is not None:
+                await self._inflight
+                self._inflight = None
+            await self.flush()
+
+        try:
+            await asyncio.wait_for(_drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ 关闭时写出操作日志超时，剩余 {self.pending} 条未写入")
+        logger.info(f"📝 操作日志后台写入已停止: {self.get_stats()}")
+
+    # ---- 写入 ----
+
+    def submit(self, doc: Dict[str, Any]) -> bool:
+        """日志进入队列（不等待写入）；队列满时丢弃并返回 False"""
+        if self._queue is None or self._task is None or self._task.done():
+            self.start()
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            now = time.monotonic()
+            if now - self._last_drop_warning >= 60:
+                self._last_drop_warning = now
+                logger.warning(f"⚠️ 操作日志队列已满（{self.max_queue_size}），已丢弃 {self._stats['dropped']} 条")
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+                pending, batch = batch, []
+                # 停止时不打断进行中的写入，stop() 会等待它完成
+                self._inflight = asyncio.ensure_future(self._write(pending))
+                await asyncio.shield(self._inflight)
+                self._inflight = None
+        except asyncio.CancelledError:
+            # 已取出但尚未写入的日志
+            if batch:
+                await self._write(batch)
+            raise
+
+    async def flush(self) -> None:
+        """同步写出队列中当前所有日志"""
+        while self.pending:
+            batch: List[Dict[str, Any]] = []
+            while self.pending and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            db = get_mongo_db()
+            await db[self.collection_name].insert_many(batch, ordered=False)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+            logger.debug(f"📝 批量写入操作日志 {len(batch)} 条")
+        except Exception as e:
+            self._stats["failed"] += len(batch)
+            logger.error(f"❌ 批量写入操作日志失败（{len(batch)} 条）: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "pending": self.pending}
+
+
+_writer: Optional[OperationLogWriter] = None
+
+
+def get_operation_log_writer() -> OperationLogWriter:
+    """获取全局操作日志写入器"""
+    global _writer
+    if _writer is None:
+        _writer = OperationLogWriter(
+            max_queue_size=int(getattr(settings, "OPLOG_QUEUE_MAX_SIZE", 10000)),
+            batch_size=int(getattr(settings, "OPLOG_BATCH_SIZE", 200)),
+            flush_interval=float(getattr(settings, "OPLOG_FLUSH_INTERVAL_SECONDS", 1.0)),
+        )
+    return _writer
@@ -0,0 +1,146 @@
+"""
+行情写入快照
+
+QuotesIngestionService 在内存中保存每只股票最近一次写入 market_quotes 的字段值，
+每个采集周期先与快照比对，只把发生变化的股票写入 MongoDB（停牌、午休、收盘后
+大部分股票价格不变）。快照按股票代码分配行号，数值存放在一个 NumPy 矩阵中。
+
+采集在工作线程中完成：拉取行情后直接整理为 QuoteBatch（代码列表 + 数值矩阵），
+事件循环只负责异步批量写入。最新交易日由 TradeDateCache 缓存，避免每个周期重复解析。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+QUOTE_FIELDS = ("close", "pct_chg", "amount", "volume", "open", "high", "low", "pre_close")
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def quote_rows(quotes: Sequence[Mapping]) -> np.ndarray:
+    """把行情字典列表转为 (N, len(QUOTE_FIELDS)) 的 float64 矩阵，缺失值为 NaN"""
+    rows = np.full((len(quotes), len(QUOTE_FIELDS)), np.nan)
+    for i, q in enumerate(quotes):
+        rows[i] = [_to_float(q.get(f)) for f in QUOTE_FIELDS]
+    return rows
+
+
+@dataclass
+class QuoteBatch:
+    """一次采集的行情批次：6 位代码、原始行情字典与对应的数值矩阵（行序一致）"""
+
+    codes: List[str]
+    quotes: List[Mapping]
+    rows: np.ndarray
+    source: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def build_quote_batch(
+    quotes_map: Mapping[str, Mapping],
+    normalize_code: Callable[[str], str],
+    source: Optional[str] = None,
+) -> QuoteBatch:
+    """把 {原始代码: 行情} 整理为 QuoteBatch；代码标准化后为空的条目被丢弃，重复代码以后出现的为准"""
+    normalized: Dict[str, Mapping] = {}
+    for code, q in quotes_map.items():
+        if not code:
+            continue
+        code6 = normalize_code(code)
+        if code6:
+            normalized[code6] = q
+    quotes = list(normalized.values())
+    return QuoteBatch(codes=list(normalized), quotes=quotes, rows=quote_rows(quotes), source=source)
+
+
+class TradeDateCache:
+    """
+    最新交易日缓存
+
+    按自然日缓存，跨日或超过 ttl_seconds 后失效（盘中交易日不会变化，
+    TTL 只用于兜底修正节假日判断错误等情况）。
+    """
+
+    def __init__(self, ttl_seconds: float = 600, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entry: Optional[Tuple[str, str, float]] = None  # (自然日, 交易日, 写入时间)
+
+    def get(self, today: str) -> Optional[str]:
+        entry = self._entry
+        if entry is None or entry[0] != today or self._clock() - entry[2] >= self.ttl_seconds:
+            return None
+        return entry[1]
+
+    def put(self, today: str, trade_date: str) -> None:
+        self._entry = (today, trade_date, self._clock())
+
+    def clear(self) -> None:
+        self._entry = None
+
+
+class QuoteSnapshot:
+    """market_quotes 最近一次写入值的内存快照"""
+
+    def __init__(self, capacity: int = 8192):
+        self._index: Dict[str, int] = {}
+        self._values = np.full((capacity, len(QUOTE_FIELDS)), np.nan)
+        self._trade_dates: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self) -> None:
+        self._index.clear()
+        self._trade_dates.clear()
+        self._values[:] = np.nan
+
+    def _slot(self, code: str) -> int:
+        slot = self._index.get(code)
+        if slot is None:
+            slot = len(self._index)
+            if slot >= len(self._values):
+                grown = np.full((len(self._values) * 2, len(QUOTE_FIELDS)), np.nan)
+                grown[:len(self._values)] = self._values
+                self._values = grown
+            self._index[code] = slot
+            self._trade_dates.append(None)
+        return slot
+
+    def diff(self, codes: Sequence[str], rows: np.ndarray, trade_date: str) -> np.ndarray:
+        """
+        返回布尔数组：对应股票是否需要写入（新股票、交易日变化或任一字段变化）。
+        NaN 与 NaN 视为相同。
+        """
+        slots = np.fromiter((self._index.get(c, -1) for c in codes), dtype=np.int64, count=len(codes))
+        changed = np.ones(len(codes), dtype=bool)
+        known = slots >= 0
+        if not known.any():
+            return changed
+
+        prev = self._values[slots[known]]
+        cur = rows[known]
+        same_values = ((prev == cur) | (np.isnan(prev) & np.isnan(cur))).all(axis=1)
+        same_date = np.fromiter((self._trade_dates[s] == trade_date for s in slots[known]), dtype=bool,
+                                count=int(known.sum()))
+        changed[known] = ~(same_values & same_date)
+        return changed
+
+    def update(self, codes: Iterable[str], rows: np.ndarray, trade_date: str) -> None:
+        """写入成功后更新快照"""
+        for code, row in zip(codes, rows):
+            slot = self._slot(code)
+            self._values[slot] = row
+            self._trade_dates[slot] = trade_date
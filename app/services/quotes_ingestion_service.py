@@ -1,14 +1,18 @@
+import asyncio
 import logging
+import time
 from datetime import datetime, time as dtime, timedelta
 from typing import Dict, Optional, Tuple, List
 from zoneinfo import ZoneInfo
 from collections import deque
 
-from pymongo import UpdateOne
+import numpy as np
+from pymongo import UpdateMany, UpdateOne
 
 from app.core.config import settings
 from app.core.database import get_mongo_db
 from app.services.data_sources.manager import DataSourceManager
+from app.services.quote_snapshot import QuoteBatch, QuoteSnapshot, TradeDateCache, build_quote_batch
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +48,15 @@ class QuotesIngestionService:
         self._rotation_sources = ["tushare", "akshare_eastmoney", "akshare_sina"]
         self._rotation_index = 0  # 当前轮换索引
 
+        # 增量写入：内存快照记录上次写入的值，只写入发生变化的股票
+        self._snapshot = QuoteSnapshot()
+        self._snapshot_refreshed_at: Optional[float] = None  # 上次全量写入时间（time.monotonic）
+        self.delta_stats = {"changed": 0, "unchanged": 0, "total_changed": 0, "total_unchanged": 0}
+
+        # 交易日缓存：复用同一个 DataSourceManager，按自然日/TTL 缓存最新交易日
+        self._data_source_manager: Optional[DataSourceManager] = None
+        self._trade_date_cache = TradeDateCache(ttl_seconds=settings.QUOTES_TRADE_DATE_CACHE_SECONDS)
+
     @staticmethod
     def _normalize_stock_code(code: str) -> str:
         """
@@ -108,6 +121,8 @@ class QuotesIngestionService:
             source: 数据源名称
             records_count: 记录数量
             error_msg: 错误信息
+
+        同时记录最近一次增量写入的变化/未变化股票数（changed_count / unchanged_count）。
         """
         try:
             db = get_mongo_db()
@@ -124,6 +139,8 @@ class QuotesIngestionService:
                 "records_count": records_count,
                 "interval_seconds": settings.QUOTES_INGEST_INTERVAL_SECONDS,
                 "error_message": error_msg,
+                "changed_count": self.delta_stats["changed"] if success else 0,
+                "unchanged_count": self.delta_stats["unchanged"] if success else 0,
                 "updated_at": now,
             }
 
@@ -364,17 +381,67 @@ class QuotesIngestionService:
         except Exception:
             return True
 
-    async def _bulk_upsert(self, quotes_map: Dict[str, Dict], trade_date: str, source: Optional[str] = None) -> None:
+    def _get_data_source_manager(self) -> DataSourceManager:
+        if self._data_source_manager is None:
+            self._data_source_manager = DataSourceManager()
+        return self._data_source_manager
+
+    async def _get_latest_trade_date(self) -> Optional[str]:
+        """
+        最新交易日（带缓存）
+
+        缓存未命中时在工作线程中通过数据源解析；解析失败返回 None 且不缓存。
+        """
+        today = datetime.now(self.tz).strftime("%Y%m%d")
+        cached = self._trade_date_cache.get(today)
+        if cached:
+            return cached
+        try:
+            manager = self._get_data_source_manager()
+            trade_date = await asyncio.to_thread(manager.find_latest_trade_date_with_fallback)
+        except Exception as e:
+            logger.warning(f"⚠️ 获取最新交易日失败: {e}")
+            return None
+        if trade_date:
+            self._trade_date_cache.put(today, str(trade_date))
+            return str(trade_date)
+        return None
+
+    def _full_refresh_due(self, force_full: bool = False) -> bool:
+        """是否需要全量写入（未启用增量、首次写入或距上次全量写入超过配置间隔）"""
+        if force_full or not settings.QUOTES_DELTA_UPSERT_ENABLED or self._snapshot_refreshed_at is None:
+            return True
+        return time.monotonic() - self._snapshot_refreshed_at >= settings.QUOTES_FULL_REFRESH_SECONDS
+
+    async def _bulk_upsert(
+        self, quotes_map: Dict[str, Dict], trade_date: str, source: Optional[str] = None, force_full: bool = False
+    ) -> None:
+        # 使用标准化方法处理股票代码（去掉交易所前缀，如 sz000001 -> 000001）
+        batch = build_quote_batch(quotes_map, self._normalize_stock_code, source)
+        await self._write_batch(batch, trade_date, force_full=force_full)
+
+    async def _write_batch(self, batch: QuoteBatch, trade_date: str, force_full: bool = False) -> None:
+        """把已整理好的行情批次写入 market_quotes（只做比对与异步批量写入，不做阻塞 IO）"""
         db = get_mongo_db()
         coll = db[self.collection_name]
+        codes, quotes, rows, source = batch.codes, batch.quotes, batch.rows, batch.source
+
+        # 与上次写入的快照比对，只写入变化的股票（定期全量写入一次兜底）
+        full_refresh = self._full_refresh_due(force_full)
+        if full_refresh:
+            changed = [True] * len(codes)
+        else:
+            changed = self._snapshot.diff(codes, rows, trade_date).tolist()
+        changed_count = sum(changed)
+        self.delta_stats["changed"] = changed_count
+        self.delta_stats["unchanged"] = len(codes) - changed_count
+        self.delta_stats["total_changed"] += changed_count
+        self.delta_stats["total_unchanged"] += len(codes) - changed_count
+
         ops = []
         updated_at = datetime.now(self.tz)
-        for code, q in quotes_map.items():
-            if not code:
-                continue
-            # 使用标准化方法处理股票代码（去掉交易所前缀，如 sz000001 -> 000001）
-            code6 = self._normalize_stock_code(code)
-            if not code6:
+        for code6, q, is_changed in zip(codes, quotes, changed):
+            if not is_changed:
                 continue
 
             # 🔥 日志：记录写入的成交量值
@@ -402,12 +469,30 @@ class QuotesIngestionService:
                     upsert=True,
                 )
             )
-        if not ops:
+        if not codes:
             logger.info("无可写入的数据，跳过")
             return
-        result = await coll.bulk_write(ops, ordered=False)
+        # 未变化的股票只刷新 updated_at（接口以它作为行情时间戳），整批一条 update_many
+        unchanged = [c for c, ch in zip(codes, changed) if not ch]
+        if unchanged:
+            ops.append(UpdateMany({"code": {"$in": unchanged}}, {"$set": {"updated_at": updated_at}}))
+        try:
+            result = await coll.bulk_write(ops, ordered=False)
+        except Exception:
+            # 写入结果未知，清空快照，下次全量写入
+            self._snapshot.clear()
+            self._snapshot_refreshed_at = None
+            raise
+
+        mask = np.asarray(changed, dtype=bool)
+        self._snapshot.update([c for c, ch in zip(codes, changed) if ch], rows[mask], trade_date)
+        if full_refresh:
+            self._snapshot_refreshed_at = time.monotonic()
+
         logger.info(
-            f"✅ 行情入库完成 source={source}, matched={result.matched_count}, upserted={len(result.upserted_ids) if result.upserted_ids else 0}, modified={result.modified_count}"
+            f"✅ 行情入库完成 source={source}, {'全量' if full_refresh else '增量'}写入 {changed_count} 只"
+            f"（未变化 {len(unchanged)} 只，仅刷新 updated_at）, matched={result.matched_count}, "
+            f"upserted={len(result.upserted_ids) if result.upserted_ids else 0}, modified={result.modified_count}"
         )
 
     async def backfill_from_historical_data(self) -> None:
@@ -429,16 +514,11 @@ class QuotesIngestionService:
             logger.info("📊 market_quotes 集合为空，开始从历史数据导入")
 
             db = get_mongo_db()
-            manager = DataSourceManager()
 
-            # 获取最新交易日
-            try:
-                latest_trade_date = manager.find_latest_trade_date_with_fallback()
-                if not latest_trade_date:
-                    logger.warning("⚠️ 无法获取最新交易日，跳过历史数据导入")
-                    return
-            except Exception as e:
-                logger.warning(f"⚠️ 获取最新交易日失败: {e}，跳过历史数据导入")
+            # 获取最新交易日（缓存）
+            latest_trade_date = await self._get_latest_trade_date()
+            if not latest_trade_date:
+                logger.warning("⚠️ 无法获取最新交易日，跳过历史数据导入")
                 return
 
             logger.info(f"📊 从历史数据集合导入 {latest_trade_date} 的收盘数据到 market_quotes")
@@ -487,7 +567,7 @@ class QuotesIngestionService:
                 }
 
             if quotes_map:
-                await self._bulk_upsert(quotes_map, latest_trade_date, "historical_data")
+                await self._bulk_upsert(quotes_map, latest_trade_date, "historical_data", force_full=True)
                 logger.info(f"✅ 成功从历史数据导入 {len(quotes_map)} 条收盘数据到 market_quotes")
             else:
                 logger.warning("⚠️ 历史数据转换后为空，无法导入")
@@ -500,17 +580,14 @@ class QuotesIngestionService:
     async def backfill_last_close_snapshot(self) -> None:
         """一次性补齐上一笔收盘快照（用于冷启动或数据陈旧）。允许在休市期调用。"""
         try:
-            manager = DataSourceManager()
-            # 使用近实时快照作为兜底，休市期返回的即为最后收盘数据
-            quotes_map, source = manager.get_realtime_quotes_with_fallback()
-            if not quotes_map:
+            manager = self._get_data_source_manager()
+            # 使用近实时快照作为兜底，休市期返回的即为最后收盘数据（在工作线程中拉取并整理）
+            batch = await asyncio.to_thread(self._fetch_fallback_batch, manager)
+            if not batch:
                 logger.warning("backfill: 未获取到行情数据，跳过")
                 return
-            try:
-                trade_date = manager.find_latest_trade_date_with_fallback() or datetime.now(self.tz).strftime("%Y%m%d")
-            except Exception:
-                trade_date = datetime.now(self.tz).strftime("%Y%m%d")
-            await self._bulk_upsert(quotes_map, trade_date, source)
+            trade_date = await self._get_latest_trade_date() or datetime.now(self.tz).strftime("%Y%m%d")
+            await self._write_batch(batch, trade_date, force_full=True)
         except Exception as e:
             logger.error(f"❌ backfill 行情补数失败: {e}")
 
@@ -526,8 +603,7 @@ class QuotesIngestionService:
                 return
 
             # 如果集合不为空但数据陈旧，使用实时接口更新
-            manager = DataSourceManager()
-            latest_td = manager.find_latest_trade_date_with_fallback()
+            latest_td = await self._get_latest_trade_date()
             if await self._collection_stale(latest_td):
                 logger.info("🔁 触发休市期/启动期 backfill 以填充最新收盘数据")
                 await self.backfill_last_close_snapshot()
@@ -594,6 +670,29 @@ class QuotesIngestionService:
             logger.error(f"从 {source_type} 获取行情失败: {e}")
             return None, None
 
+    def _fetch_fallback_batch(self, manager: DataSourceManager) -> Optional[QuoteBatch]:
+        """（工作线程）按数据源优先级拉取行情并整理为批次"""
+        quotes_map, source = manager.get_realtime_quotes_with_fallback()
+        if not quotes_map:
+            return None
+        return build_quote_batch(quotes_map, self._normalize_stock_code, source)
+
+    def _fetch_quote_batch(
+        self, source_type: str, akshare_api: Optional[str] = None
+    ) -> Tuple[Optional[QuoteBatch], Optional[str]]:
+        """
+        （工作线程）从指定数据源拉取行情并整理为批次
+
+        网络请求、DataFrame 解析与代码标准化都在这里完成，事件循环只负责写入。
+
+        Returns:
+            (batch, source_name)
+        """
+        quotes_map, source_name = self._fetch_quotes_from_source(source_type, akshare_api)
+        if not quotes_map:
+            return None, source_name
+        return build_quote_batch(quotes_map, self._normalize_stock_code, source_name), source_name
+
     async def run_once(self) -> None:
         """
         执行一次采集与入库
@@ -615,7 +714,7 @@ class QuotesIngestionService:
             # 首次运行：检测 Tushare 权限
             if settings.QUOTES_AUTO_DETECT_TUSHARE_PERMISSION and not self._tushare_permission_checked:
                 logger.info("🔍 首次运行，检测 Tushare rt_k 接口权限...")
-                has_premium = self._check_tushare_permission()
+                has_premium = await asyncio.to_thread(self._check_tushare_permission)
 
                 if has_premium:
                     logger.info(
@@ -630,10 +729,10 @@ class QuotesIngestionService:
             # 获取下一个数据源
             source_type, akshare_api = self._get_next_source()
 
-            # 尝试获取行情
-            quotes_map, source_name = self._fetch_quotes_from_source(source_type, akshare_api)
+            # 尝试获取行情（阻塞的拉取与解析放到工作线程，避免卡住事件循环）
+            batch, source_name = await asyncio.to_thread(self._fetch_quote_batch, source_type, akshare_api)
 
-            if not quotes_map:
+            if not batch:
                 logger.warning(f"⚠️ {source_name or source_type} 未获取到行情数据，跳过本次入库")
                 # 记录失败状态
                 await self._record_sync_status(
@@ -644,21 +743,17 @@ class QuotesIngestionService:
                 )
                 return
 
-            # 获取交易日
-            try:
-                manager = DataSourceManager()
-                trade_date = manager.find_latest_trade_date_with_fallback() or datetime.now(self.tz).strftime("%Y%m%d")
-            except Exception:
-                trade_date = datetime.now(self.tz).strftime("%Y%m%d")
+            # 获取交易日（缓存）
+            trade_date = await self._get_latest_trade_date() or datetime.now(self.tz).strftime("%Y%m%d")
 
             # 入库
-            await self._bulk_upsert(quotes_map, trade_date, source_name)
+            await self._write_batch(batch, trade_date)
 
             # 记录成功状态
             await self._record_sync_status(
                 success=True,
                 source=source_name,
-                records_count=len(quotes_map),
+                records_count=len(batch),
                 error_msg=None
             )
 
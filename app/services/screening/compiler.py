@@ -0,0 +1,318 @@
+"""
+Compiler for the screening condition DSL.
+
+A condition tree is validated once and turned into a ``ConditionPlan``: the list of
+fields it depends on, the number of trailing rows it needs (2 when cross_up/cross_down
+is used) and a tree of predicates ordered cheapest-first with short-circuiting.
+Plans are cached by a hash of the condition JSON so repeated screens skip parsing.
+
+The same plan can be executed against a single row (dict / Series), a per-symbol
+DataFrame or a cross-sectional panel (one row per symbol).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_COMPARE_OPS = {">", "<", ">=", "<=", "==", "!=", "between"}
+_CROSS_OPS = {"cross_up", "cross_down"}
+
+# 编译缓存大小（按条件 JSON 哈希）
+PLAN_CACHE_SIZE = 256
+
+
+def _to_float(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except Exception:
+        return None
+
+
+def _compare(left, right, op: str):
+    if op == ">":
+        return left > right
+    if op == "<":
+        return left < right
+    if op == ">=":
+        return left >= right
+    if op == "<=":
+        return left <= right
+    if op == "==":
+        return left == right
+    return left != right
+
+
+class _Node:
+    cost: int = 0
+    fields: Tuple[str, ...] = ()
+    lookback: int = 1
+
+    def eval_row(self, t0: Mapping[str, Any], t1: Optional[Mapping[str, Any]]) -> bool:
+        raise NotImplementedError
+
+    def eval_mask(self, t0: "_Columns", t1: Optional["_Columns"]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class _Columns:
+    """面板行的列访问器：按需把字段转为 float 数组并缓存"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.n = len(frame)
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str) -> np.ndarray:
+        arr = self._cache.get(name)
+        if arr is None:
+            if name in self.frame.columns:
+                arr = pd.to_numeric(self.frame[name], errors="coerce").to_numpy(dtype=float)
+            else:
+                arr = np.full(self.n, np.nan)
+            self._cache[name] = arr
+        return arr
+
+
+@dataclass
+class _Const(_Node):
+    value: bool
+
+    def eval_row(self, t0, t1) -> bool:
+        return self.value
+
+    def eval_mask(self, t0, t1) -> np.ndarray:
+        return np.full(t0.n, self.value, dtype=bool)
+
+
+@dataclass
+class _Compare(_Node):
+    field: str
+    op: str
+    value: Optional[float] = None
+    right_field: Optional[str] = None
+
+    def __post_init__(self):
+        self.fields = (self.field,) if self.right_field is None else (self.field, self.right_field)
+        self.cost = len(self.fields)
+
+    def eval_row(self, t0, t1) -> bool:
+        left = t0.get(self.field)
+        if pd.isna(left):
+            return False
+        right = t0.get(self.right_field) if self.right_field is not None else self.value
+        try:
+            return bool(_compare(float(left), float(right), self.op))
+        except Exception:
+            return False
+
+    def eval_mask(self, t0, t1) -> np.ndarray:
+        left = t0.get(self.field)
+        right = t0.get(self.right_field) if self.right_field is not None else self.value
+        with np.errstate(invalid="ignore"):
+            return ~np.isnan(left) & _compare(left, right, self.op)
+
+
+@dataclass
+class _Between(_Node):
+    field: str
+    lo: float
+    hi: float
+
+    def __post_init__(self):
+        self.fields = (self.field,)
+        self.cost = 2
+
+    def eval_row(self, t0, t1) -> bool:
+        left = t0.get(self.field)
+        if pd.isna(left):
+            return False
+        try:
+            return self.lo <= float(left) <= self.hi
+        except Exception:
+            return False
+
+    def eval_mask(self, t0, t1) -> np.ndarray:
+        left = t0.get(self.field)
+        with np.errstate(invalid="ignore"):
+            return (left >= self.lo) & (left <= self.hi)
+
+
+@dataclass
+class _Cross(_Node):
+    field: str
+    right_field: str
+    up: bool
+
+    def __post_init__(self):
+        self.fields = (self.field, self.right_field)
+        self.lookback = 2
+        self.cost = 4
+
+    def eval_row(self, t0, t1) -> bool:
+        if t1 is None:
+            return False
+        a0, a1 = t0.get(self.field), t1.get(self.field)
+        b0, b1 = t0.get(self.right_field), t1.get(self.right_field)
+        if any(pd.isna([a0, a1, b0, b1])):
+            return False
+        if self.up:
+            return bool((a1 <= b1) and (a0 > b0))
+        return bool((a1 >= b1) and (a0 < b0))
+
+    def eval_mask(self, t0, t1) -> np.ndarray:
+        if t1 is None:
+            return np.zeros(t0.n, dtype=bool)
+        a0, a1 = t0.get(self.field), t1.get(self.field)
+        b0, b1 = t0.get(self.right_field), t1.get(self.right_field)
+        with np.errstate(invalid="ignore"):
+            if self.up:
+                return (a1 <= b1) & (a0 > b0)
+            return (a1 >= b1) & (a0 < b0)
+
+
+@dataclass
+class _Group(_Node):
+    is_and: bool
+    children: List[_Node] = field(default_factory=list)
+
+    def __post_init__(self):
+        # 便宜的谓词排前面，配合短路减少求值量（布尔逻辑与顺序无关）
+        self.children.sort(key=lambda c: c.cost)
+        self.fields = tuple(dict.fromkeys(f for c in self.children for f in c.fields))
+        self.lookback = max((c.lookback for c in self.children), default=1)
+        self.cost = sum(c.cost for c in self.children)
+
+    def eval_row(self, t0, t1) -> bool:
+        if self.is_and:
+            return all(c.eval_row(t0, t1) for c in self.children)
+        return any(c.eval_row(t0, t1) for c in self.children)
+
+    def eval_mask(self, t0, t1) -> np.ndarray:
+        acc = np.full(t0.n, self.is_and, dtype=bool)
+        for c in self.children:
+            if self.is_and:
+                acc &= c.eval_mask(t0, t1)
+                if not acc.any():
+                    break
+            else:
+                acc |= c.eval_mask(t0, t1)
+                if acc.all():
+                    break
+        return acc
+
+
+def _build(node: Dict[str, Any], allowed_fields: frozenset, allowed_ops: frozenset) -> _Node:
+    if not node:
+        return _Const(True)
+
+    if node.get("op") == "group" or "children" in node:
+        logic = (node.get("logic") or "AND").upper()
+        is_and = logic != "OR"
+        children: List[_Node] = []
+        for c in node.get("children", []):
+            child = _build(c, allowed_fields, allowed_ops)
+            if isinstance(child, _Const):
+                # 常量折叠：AND 中的 False / OR 中的 True 决定整组结果
+                if child.value != is_and:
+                    return _Const(child.value)
+                continue
+            children.append(child)
+        if not children:
+            return _Const(is_and)
+        if len(children) == 1:
+            return children[0]
+        return _Group(is_and=is_and, children=children)
+
+    f = node.get("field")
+    op = node.get("op")
+    if f not in allowed_fields or op not in allowed_ops:
+        return _Const(False)
+
+    rf = node.get("right_field")
+    if op in _CROSS_OPS:
+        if rf not in allowed_fields:
+            return _Const(False)
+        return _Cross(field=f, right_field=rf, up=(op == "cross_up"))
+
+    if op not in _COMPARE_OPS:
+        return _Const(False)
+
+    if rf:
+        if rf not in allowed_fields or op == "between":
+            return _Const(False)
+        return _Compare(field=f, op=op, right_field=rf)
+
+    raw = node.get("value")
+    if op == "between":
+        if not isinstance(raw, (list, tuple)) or len(raw) != 2:
+            return _Const(False)
+        lo, hi = _to_float(raw[0]), _to_float(raw[1])
+        if lo is None or hi is None:
+            return _Const(False)
+        return _Between(field=f, lo=lo, hi=hi)
+
+    value = _to_float(raw)
+    if value is None:
+        return _Const(False)
+    return _Compare(field=f, op=op, value=value)
+
+
+@dataclass
+class ConditionPlan:
+    """编译后的筛选条件"""
+
+    key: str
+    fields: Tuple[str, ...]
+    lookback: int
+    root: _Node
+
+    def evaluate_row(self, t0: Mapping[str, Any], t1: Optional[Mapping[str, Any]] = None) -> bool:
+        """对单行求值（t1 为上一行，仅交叉类条件使用）"""
+        return self.root.eval_row(t0, t1)
+
+    def evaluate_frame(self, df: pd.DataFrame) -> bool:
+        """对单只股票的 DataFrame 求值（使用最后 lookback 行）"""
+        if isinstance(self.root, _Const):
+            return self.root.value
+        if df is None or df.empty:
+            return False
+        t1 = df.iloc[-2] if self.lookback >= 2 and len(df) >= 2 else None
+        return self.root.eval_row(df.iloc[-1], t1)
+
+    def evaluate_panel(self, t0: pd.DataFrame, t1: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """对横截面求值：t0/t1 为以股票为行、字段为列的表，返回布尔掩码"""
+        c0 = _Columns(t0)
+        c1 = _Columns(t1) if t1 is not None and self.lookback >= 2 else None
+        return self.root.eval_mask(c0, c1)
+
+
+def _payload(node: Dict[str, Any]) -> str:
+    return json.dumps(node or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def condition_key(node: Dict[str, Any]) -> str:
+    """条件 JSON 的稳定哈希（键排序后序列化）"""
+    return hashlib.sha1(_payload(node).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_cached(key: str, payload: str, allowed_fields: frozenset, allowed_ops: frozenset) -> ConditionPlan:
+    root = _build(json.loads(payload), allowed_fields, allowed_ops)
+    return ConditionPlan(key=key, fields=tuple(root.fields), lookback=root.lookback, root=root)
+
+
+def compile_conditions(
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+) -> ConditionPlan:
+    """校验并编译条件树；相同条件（及字段/操作符白名单）命中缓存直接返回已编译计划"""
+    payload = _payload(node)
+    key = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return _compile_cached(key, payload, frozenset(allowed_fields), frozenset(allowed_ops))
@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional, Iterable
 import pandas as pd
 import numpy as np
 
+from app.services.screening.compiler import compile_conditions
+
 
 def collect_fields_from_conditions(node: Dict[str, Any], allowed_fields: Iterable[str]) -> List[str]:
     if not node:
@@ -81,80 +83,24 @@ def evaluate_conditions(
     allowed_fields: Iterable[str],
     allowed_ops: Iterable[str],
 ) -> bool:
-    if not node:
-        return True
-    # group 节点
-    if node.get("op") == "group" or "children" in node:
-        logic = (node.get("logic") or "AND").upper()
-        children = node.get("children", [])
-        if logic not in {"AND", "OR"}:
-            logic = "AND"
-        flags = [evaluate_conditions(df, c, allowed_fields, allowed_ops) for c in children]
-        return all(flags) if logic == "AND" else any(flags)
-
-    # 叶子：字段比较
-    field = node.get("field")
-    op = node.get("op")
-    if field not in allowed_fields or op not in set(allowed_ops):
-        return False
+    """对单只股票的 DataFrame 求值（经编译缓存，条件树只解析一次）"""
+    return compile_conditions(node, allowed_fields, allowed_ops).evaluate_frame(df)
 
-    # 需要最近两行（交叉）
-    if op in {"cross_up", "cross_down"}:
-        right_field = node.get("right_field")
-        if right_field not in allowed_fields:
-            return False
-        if len(df) < 2:
-            return False
-        t0 = df.iloc[-1]
-        t1 = df.iloc[-2]
-        a0 = t0.get(field)
-        a1 = t1.get(field)
-        b0 = t0.get(right_field)
-        b1 = t1.get(right_field)
-        if any(pd.isna([a0, a1, b0, b1])):
-            return False
-        if op == "cross_up":
-            return (a1 <= b1) and (a0 > b0)
-        else:
-            return (a1 >= b1) and (a0 < b0)
 
-    # 普通比较：最近一行
-    t0 = df.iloc[-1]
-    left = t0.get(field)
-    if pd.isna(left):
-        return False
-
-    if node.get("right_field"):
-        rf = node.get("right_field")
-        if rf not in allowed_fields:
-            return False
-        right = t0.get(rf)
-    else:
-        right = node.get("value")
+def evaluate_conditions_mask(
+    t0: pd.DataFrame,
+    t1: Optional[pd.DataFrame],
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+) -> np.ndarray:
+    """
+    横截面版本的 evaluate_conditions：对所有股票一次性求值，返回布尔掩码。
 
-    try:
-        if op == ">":
-            return float(left) > float(right)
-        if op == "<":
-            return float(left) < float(right)
-        if op == ">=":
-            return float(left) >= float(right)
-        if op == "<=":
-            return float(left) <= float(right)
-        if op == "==":
-            return float(left) == float(right)
-        if op == "!=":
-            return float(left) != float(right)
-        if op == "between":
-            lo_hi = right if isinstance(right, (list, tuple)) else (None, None)
-            lo, hi = lo_hi if isinstance(lo_hi, (list, tuple)) and len(lo_hi) == 2 else (None, None)
-            if lo is None or hi is None:
-                return False
-            v = float(left)
-            return float(lo) <= v <= float(hi)
-    except Exception:
-        return False
-    return False
+    t0/t1 为以股票代码为索引、字段为列的表，分别对应每只股票的最近一行与倒数第二行
+    （t1 可为 None，此时交叉类条件全部为 False）。语义与逐只调用 evaluate_conditions 一致。
+    """
+    return compile_conditions(node, allowed_fields, allowed_ops).evaluate_panel(t0, t1)
 
 
 def safe_float(v: Any) -> Optional[float]:
@@ -0,0 +1,152 @@
+"""
+Cross-sectional K-line panel for screening.
+
+Loads the recent daily bars of the whole universe from ``stock_daily_quotes`` in one
+query and lays them out as right-aligned wide frames (rows = bars, columns = codes),
+so indicators and condition masks can be evaluated for every symbol at once.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("agents")
+
+# 同一股票存在多个数据源时的取用优先级（越靠前越优先）
+DEFAULT_SOURCE_PRIORITY = ("tushare", "akshare", "baostock")
+
+# stock_daily_quotes 字段 -> 面板字段（与 ScreeningService 的小写列约定一致）
+PANEL_FIELD_MAP = {
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "volume": "vol",
+    "amount": "amount",
+}
+
+
+@dataclass
+class DailyPanel:
+    """右对齐的日线面板：fields[name].iloc[-1] 为每只股票各自的最新一根K线"""
+
+    codes: List[str]
+    fields: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    last_trade_date: Optional[pd.Series] = None
+
+    @property
+    def empty(self) -> bool:
+        return not self.codes
+
+    def current_mask(self) -> np.ndarray:
+        """最新K线日期等于面板最新交易日的股票（停牌/数据滞后的股票为 False），顺序同 codes"""
+        if self.last_trade_date is None or self.last_trade_date.empty:
+            return np.ones(len(self.codes), dtype=bool)
+        return (self.last_trade_date == self.last_trade_date.max()).to_numpy()
+
+
+def panel_row(fields: Dict[str, pd.DataFrame], codes: List[str], offset: int = -1) -> Optional[pd.DataFrame]:
+    """取每只股票倒数第 ``-offset`` 根K线，返回 以代码为索引、字段为列 的表；深度不足时返回 None"""
+    if not fields or not codes:
+        return None
+    depth = len(next(iter(fields.values())))
+    if depth < -offset:
+        return None
+    data = {name: frame.iloc[offset].to_numpy() for name, frame in fields.items()}
+    return pd.DataFrame(data, index=pd.Index(codes, name="code"))
+
+
+def build_panel(
+    records: pd.DataFrame,
+    max_bars: Optional[int] = None,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> DailyPanel:
+    """
+    将长表（symbol, trade_date, data_source, 行情字段）转换为右对齐面板。
+
+    每只股票只保留优先级最高的一个数据源，避免不同来源的K线混在同一序列中。
+    """
+    if records is None or records.empty:
+        return DailyPanel(codes=[])
+
+    df = records.rename(columns=PANEL_FIELD_MAP)
+    df["symbol"] = df["symbol"].astype(str).str.zfill(6)
+
+    if "data_source" in df.columns:
+        rank_map = {s: i for i, s in enumerate(source_priority)}
+        rank = df["data_source"].map(rank_map).fillna(len(rank_map)).astype(int)
+        best = rank.groupby(df["symbol"]).transform("min")
+        df = df[rank == best]
+
+    df = (
+        df.sort_values(["symbol", "trade_date"], kind="mergesort")
+        .drop_duplicates(subset=["symbol", "trade_date"], keep="last")
+    )
+
+    codes, col_idx = np.unique(df["symbol"].to_numpy(), return_inverse=True)
+    pos_from_end = df.groupby("symbol", sort=False).cumcount(ascending=False).to_numpy()
+    depth = int(pos_from_end.max()) + 1
+    if max_bars:
+        depth = min(depth, int(max_bars))
+    keep = pos_from_end < depth
+    rows = depth - 1 - pos_from_end[keep]
+    cols = col_idx[keep]
+
+    code_list = [str(c) for c in codes]
+    fields: Dict[str, pd.DataFrame] = {}
+    for name in PANEL_FIELD_MAP.values():
+        if name not in df.columns:
+            continue
+        arr = np.full((depth, len(code_list)), np.nan)
+        arr[rows, cols] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)[keep]
+        fields[name] = pd.DataFrame(arr, columns=code_list)
+
+    last_trade_date = df.groupby("symbol", sort=True)["trade_date"].last()
+    last_trade_date.index = code_list
+    return DailyPanel(codes=code_list, fields=fields, last_trade_date=last_trade_date)
+
+
+def load_daily_panel(
+    symbols: Optional[Sequence[str]],
+    start_date: str,
+    end_date: str,
+    max_bars: Optional[int] = None,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+    db: Any = None,
+) -> DailyPanel:
+    """
+    一次查询从 stock_daily_quotes 加载 [start_date, end_date] 内所有股票的日线并构建面板。
+
+    Args:
+        symbols: 股票代码集合，None 表示不限制
+        start_date/end_date: YYYY-MM-DD
+        max_bars: 每只股票最多保留的K线数量
+        db: 同步 pymongo Database，缺省使用 get_mongo_db_sync()
+    """
+    if db is None:
+        from app.core.database import get_mongo_db_sync
+        db = get_mongo_db_sync()
+
+    query: Dict[str, Any] = {
+        "period": "daily",
+        "trade_date": {"$gte": start_date, "$lte": end_date},
+    }
+    if symbols:
+        query["symbol"] = {"$in": [str(s).zfill(6) for s in symbols]}
+
+    projection = {"_id": 0, "symbol": 1, "trade_date": 1, "data_source": 1}
+    projection.update({k: 1 for k in PANEL_FIELD_MAP})
+
+    cursor = db["stock_daily_quotes"].find(query, projection, batch_size=10000)
+    records = pd.DataFrame(list(cursor))
+    if records.empty:
+        logger.warning(f"⚠️ stock_daily_quotes 在 {start_date}~{end_date} 无日线数据，无法构建筛选面板")
+        return DailyPanel(codes=[])
+
+    panel = build_panel(records, max_bars=max_bars, source_priority=source_priority)
+    logger.info(f"📊 筛选面板加载完成: {len(panel.codes)} 只股票, {len(records)} 条K线")
+    return panel
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 import pandas as pd
 import numpy as np
 
 # 统一指标库
-from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many, compute_panel
 # 统一多数据源DF接口（按优先级降级）
 from tradingagents.dataflows.data_source_manager import get_data_source_manager
 from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
@@ -20,6 +20,8 @@ from app.services.screening.eval_utils import (
     evaluate_fund_conditions as _evaluate_fund_conditions_util,
     safe_float as _safe_float_util,
 )
+from app.services.screening.compiler import ConditionPlan, compile_conditions
+from app.services.screening.panel import load_daily_panel, panel_row
 
 # --- DSL 约束 ---
 ALLOWED_FIELDS = {
@@ -54,6 +56,45 @@ FUND_FIELDS = {"pe", "pb", "roe", "market_cap"}
 
 ALLOWED_OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
 
+# 技术指标字段 -> 指标规格（固定参数，逐只路径与横截面路径共用）
+FIELD_SPECS: Dict[str, IndicatorSpec] = {
+    "ma5": IndicatorSpec("ma", {"n": 5}),
+    "ma10": IndicatorSpec("ma", {"n": 10}),
+    "ma20": IndicatorSpec("ma", {"n": 20}),
+    "ma60": IndicatorSpec("ma", {"n": 60}),
+    "ema12": IndicatorSpec("ema", {"n": 12}),
+    "ema26": IndicatorSpec("ema", {"n": 26}),
+    "dif": IndicatorSpec("macd"),
+    "dea": IndicatorSpec("macd"),
+    "macd_hist": IndicatorSpec("macd"),
+    "rsi14": IndicatorSpec("rsi", {"n": 14}),
+    "boll_mid": IndicatorSpec("boll", {"n": 20, "k": 2}),
+    "boll_upper": IndicatorSpec("boll", {"n": 20, "k": 2}),
+    "boll_lower": IndicatorSpec("boll", {"n": 20, "k": 2}),
+    "atr14": IndicatorSpec("atr", {"n": 14}),
+    "kdj_k": IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+    "kdj_d": IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+    "kdj_j": IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+}
+
+
+def specs_for_fields(fields: Iterable[str], exclude: Iterable[IndicatorSpec] = ()) -> List[IndicatorSpec]:
+    """按字段推导需要计算的指标规格（去重、保持顺序），可排除已计算的规格"""
+    specs: List[IndicatorSpec] = []
+    excluded = list(exclude)
+    for f in fields:
+        spec = FIELD_SPECS.get(f)
+        if spec is not None and spec not in specs and spec not in excluded:
+            specs.append(spec)
+    return specs
+
+
+# 结果中回显的技术指标字段
+RESULT_TECH_FIELDS = ["ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist"]
+
+# K线回看窗口（自然日）
+LOOKBACK_DAYS = 220
+
 
 @dataclass
 class ScreeningParams:
@@ -76,16 +117,12 @@ class ScreeningService:
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
         symbols = self._get_universe()
-        # 为控制时长，先限制样本规模（后续用批量/缓存优化）
-        symbols = symbols[:120]
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=220)
+        end_date = datetime.strptime(params.date, "%Y-%m-%d") if params.date else datetime.now()
+        start_date = end_date - timedelta(days=LOOKBACK_DAYS)
         end_s = end_date.strftime("%Y-%m-%d")
         start_s = start_date.strftime("%Y-%m-%d")
 
-        results: List[Dict[str, Any]] = []
-
         # 解析条件中涉及的字段，决定是否需要技术指标/行情
         needed_fields = self._collect_fields_from_conditions(conditions)
         order_fields = {o.get("field") for o in (params.order_by or []) if o.get("field")}
@@ -94,6 +131,79 @@ class ScreeningService:
         need_base = any(f in BASE_FIELDS for f in all_needed) or need_tech
         need_fund = any(f in FUND_FIELDS for f in all_needed)
 
+        # 条件树编译一次（按条件哈希缓存），其字段列表决定需要计算哪些指标
+        plan = compile_conditions(conditions, ALLOWED_FIELDS, ALLOWED_OPS)
+        filter_specs = specs_for_fields(list(plan.fields) + sorted(order_fields))
+
+        results: Optional[List[Dict[str, Any]]] = None
+        if need_base:
+            # 优先走横截面面板：一次加载全市场K线，向量化计算指标并以掩码评估条件
+            results = self._run_panel(symbols, plan, filter_specs, start_s, end_s, need_tech)
+        if results is None:
+            results = self._run_per_symbol(
+                symbols, conditions, plan, filter_specs, start_s, end_s, need_base, need_tech, need_fund
+            )
+
+        return self._paginate(results, params)
+
+    def _run_panel(
+        self,
+        symbols: List[str],
+        plan: ConditionPlan,
+        filter_specs: List[IndicatorSpec],
+        start_s: str,
+        end_s: str,
+        need_tech: bool,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """横截面筛选；面板不可用（数据库无数据/异常）时返回 None 以便回退逐只路径"""
+        try:
+            panel = load_daily_panel(symbols, start_s, end_s)
+        except Exception as e:
+            logger.warning(f"⚠️ 加载筛选面板失败，回退逐只筛选: {e}")
+            return None
+        if panel.empty:
+            return None
+
+        base = dict(panel.fields)
+        close = base["close"]
+        base["pct_chg"] = (close / close.shift(1) - 1.0) * 100.0
+        fields = compute_panel(base, filter_specs) if filter_specs else base
+
+        t0 = panel_row(fields, panel.codes, -1)
+        t1 = panel_row(fields, panel.codes, -2) if plan.lookback >= 2 else None
+        # 右对齐后停牌股的“最新一根”是旧K线，不参与当日条件筛选
+        current = panel.current_mask()
+        mask = plan.evaluate_panel(t0, t1) & current
+        hits = t0[mask]
+        stale = len(panel.codes) - int(current.sum())
+        if stale:
+            logger.info(f"⏭️ 横截面筛选: {stale} 只股票最新K线早于 {panel.last_trade_date.max()}（停牌/数据滞后），不参与筛选")
+        logger.info(f"📊 横截面筛选: {len(panel.codes)} 只股票, 命中 {len(hits)} 只")
+
+        # 回显用的指标只对命中的股票计算
+        display_specs = specs_for_fields(RESULT_TECH_FIELDS, exclude=filter_specs) if need_tech else []
+        if display_specs and not hits.empty:
+            sub = compute_panel({k: v[hits.index] for k, v in base.items()}, display_specs)
+            hits = hits.assign(**{k: v.iloc[-1].to_numpy() for k, v in sub.items() if k not in hits.columns})
+
+        return [self._build_item(code, row, need_tech) for code, row in hits.iterrows()]
+
+    def _run_per_symbol(
+        self,
+        symbols: List[str],
+        conditions: Dict[str, Any],
+        plan: ConditionPlan,
+        filter_specs: List[IndicatorSpec],
+        start_s: str,
+        end_s: str,
+        need_base: bool,
+        need_tech: bool,
+        need_fund: bool,
+    ) -> List[Dict[str, Any]]:
+        """逐只筛选（面板不可用时的回退路径，或纯基本面条件）"""
+        results: List[Dict[str, Any]] = []
+        display_specs = specs_for_fields(RESULT_TECH_FIELDS, exclude=filter_specs) if need_tech else []
+
         for code in symbols:
             try:
                 dfc = None
@@ -114,30 +224,17 @@ class ScreeningService:
                     if "close" in dfu.columns:
                         dfu["pct_chg"] = dfu["close"].pct_change() * 100.0
 
-                    # 仅在需要技术指标时计算
-                    if need_tech:
-                        specs = [
-                            IndicatorSpec("ma", {"n": 5}),
-                            IndicatorSpec("ma", {"n": 10}),
-                            IndicatorSpec("ma", {"n": 20}),
-                            IndicatorSpec("ema", {"n": 12}),
-                            IndicatorSpec("ema", {"n": 26}),
-                            IndicatorSpec("macd"),
-                            IndicatorSpec("rsi", {"n": 14}),
-                            IndicatorSpec("boll", {"n": 20, "k": 2}),
-                            IndicatorSpec("atr", {"n": 14}),
-                            IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
-                        ]
-                        dfc = compute_many(dfu, specs)
-                    else:
-                        dfc = dfu
-
-                    last = dfc.iloc[-1]
+                    # 仅计算条件/排序用到的指标
+                    dfc = compute_many(dfu, filter_specs) if filter_specs else dfu
 
                 # 评估条件（若条件完全是基本面且不涉及行情/技术，这里可跳过K线）
                 passes = True
                 if need_base:
-                    passes = self._evaluate_conditions(dfc, conditions)
+                    passes = plan.evaluate_frame(dfc)
+                    if passes:
+                        if display_specs:
+                            dfc = compute_many(dfc, display_specs)
+                        last = dfc.iloc[-1]
                 elif need_fund and not need_base and not need_tech:
                     # 仅基本面条件：使用基本面快照判断
                     snap = get_cn_fund_snapshot(code)
@@ -147,25 +244,25 @@ class ScreeningService:
                         passes = self._evaluate_fund_conditions(snap, conditions)
 
                 if passes:
-                    item = {"code": code}
-                    if last is not None:
-                        item.update({
-                            "close": self._safe_float(last.get("close")),
-                            "pct_chg": self._safe_float(last.get("pct_chg")),
-                            "amount": self._safe_float(last.get("amount")),
-                            "ma20": self._safe_float(last.get("ma20")) if need_tech else None,
-                            "rsi14": self._safe_float(last.get("rsi14")) if need_tech else None,
-                            "kdj_k": self._safe_float(last.get("kdj_k")) if need_tech else None,
-                            "kdj_d": self._safe_float(last.get("kdj_d")) if need_tech else None,
-                            "kdj_j": self._safe_float(last.get("kdj_j")) if need_tech else None,
-                            "dif": self._safe_float(last.get("dif")) if need_tech else None,
-                            "dea": self._safe_float(last.get("dea")) if need_tech else None,
-                            "macd_hist": self._safe_float(last.get("macd_hist")) if need_tech else None,
-                        })
-                    results.append(item)
+                    results.append(self._build_item(code, last, need_tech))
             except Exception:
                 continue
 
+        return results
+
+    def _build_item(self, code: str, last: Optional[pd.Series], need_tech: bool) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"code": code}
+        if last is not None:
+            item.update({
+                "close": self._safe_float(last.get("close")),
+                "pct_chg": self._safe_float(last.get("pct_chg")),
+                "amount": self._safe_float(last.get("amount")),
+            })
+            for f in RESULT_TECH_FIELDS:
+                item[f] = self._safe_float(last.get(f)) if need_tech else None
+        return item
+
+    def _paginate(self, results: List[Dict[str, Any]], params: ScreeningParams) -> Dict[str, Any]:
         total = len(results)
         # 排序
         if params.order_by:
@@ -184,6 +281,7 @@ class ScreeningService:
             "total": total,
             "items": page_items,
         }
+
     def _evaluate_fund_conditions(self, snap: Dict[str, Any], node: Dict[str, Any]) -> bool:
         """Delegate fundamental condition evaluation to utils to keep service slim."""
         return _evaluate_fund_conditions_util(snap, node, FUND_FIELDS)
@@ -206,9 +304,10 @@ class ScreeningService:
     def _get_universe(self) -> List[str]:
         """获取A股代码集合：从 MongoDB stock_basic_info 集合获取所有A股股票代码"""
         try:
-            from app.core.database import get_mongo_db
+            from app.core.database import get_mongo_db_sync
 
-            db = get_mongo_db()
+            # 同步上下文：使用 pymongo 客户端（motor 游标不能同步迭代）
+            db = get_mongo_db_sync()
             collection = db.stock_basic_info
 
             # 查询所有A股股票代码（兼容不同的数据结构）
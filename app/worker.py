@@ -2,6 +2,11 @@
 TradingAgents-CN WebAPI Worker
 
 Consumes tasks from Redis queue and processes them using actual stock analysis.
+
+Up to WORKER_CONCURRENCY tasks run at the same time, each in a dedicated bounded thread
+pool. Per-user and global limits (DEFAULT_USER_CONCURRENT_LIMIT / GLOBAL_CONCURRENT_LIMIT)
+are enforced on the same Redis processing sets that QueueService uses. On SIGTERM the
+worker stops taking new tasks and waits for in-flight ones to finish.
 """
 
 import asyncio
@@ -9,10 +14,12 @@ import json
 import logging
 import signal
 import sys
+import threading
 import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 # Add project root to path for importing analysis runner
 project_root = Path(__file__).parent.parent
@@ -21,6 +28,12 @@ sys.path.insert(0, str(project_root))
 from app.core.logging_config import setup_logging
 from app.core.database import init_db, close_db, get_redis_client
 from app.core.config import settings
+from app.services.queue.helpers import (
+    check_global_concurrent_limit,
+    check_user_concurrent_limit,
+    mark_task_processing,
+    unmark_task_processing,
+)
 
 # Redis keys (must match queue_service)
 READY_LIST = "qa:ready"
@@ -51,7 +64,22 @@ async def publish_progress(task_id: str, message: str, step: Optional[int] = Non
         logger.warning(f"Failed to publish progress for task {task_id}: {e}")
 
 
-async def process_task(task_id: str) -> None:
+class _AnalysisClaim:
+    """Decides once whether the analysis thread or the shutdown path owns a task"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner: Optional[str] = None
+
+    def claim(self, owner: str) -> bool:
+        with self._lock:
+            if self._owner is None:
+                self._owner = owner
+            return self._owner == owner
+
+
+async def process_task(task_id: str, executor: Optional[Executor] = None) -> None:
+    """Run one analysis task; the blocking analysis runs in ``executor`` (default loop executor)"""
     r = get_redis_client()
     key = TASK_PREFIX + task_id
 
@@ -59,14 +87,21 @@ async def process_task(task_id: str) -> None:
     data = await r.hgetall(key)
     if not data:
         logger.warning(f"Task not found: {task_id}")
+        # Release the slot worker_loop reserved (no hash, so it was reserved under user "")
+        await unmark_task_processing(r, task_id, "")
         return
 
-    # Mark processing
+    # Mark processing (idempotent: worker_loop already reserved the slot before scheduling)
     now = int(time.time())
+    task_user = data.get("user", "")
     await r.hset(key, mapping={"status": "processing", "started_at": str(now)})
-    await r.sadd(SET_PROCESSING, task_id)
+    await mark_task_processing(r, task_id, task_user)
     logger.info(f"Processing task {task_id} | user={data.get('user')} symbol={data.get('symbol')}")
 
+    # Cancelling the coroutine cannot stop a running executor thread, so a task is only
+    # re-queued on shutdown if its analysis has not started yet
+    claim = _AnalysisClaim()
+
     try:
         # Parse params
         params = {}
@@ -101,6 +136,8 @@ async def process_task(task_id: str) -> None:
 
             # Wrap the sync function in an async executor
             def sync_analysis():
+                if not claim.claim("thread"):
+                    return None
                 # Define a thread-safe callback to publish progress from worker thread
                 def safe_progress(msg, step=None, total=None):
                     asyncio.run_coroutine_threadsafe(
@@ -118,7 +155,7 @@ async def process_task(task_id: str) -> None:
                 )
 
             # Run analysis in thread pool to avoid blocking
-            analysis_result = await loop.run_in_executor(None, sync_analysis)
+            analysis_result = await loop.run_in_executor(executor, sync_analysis)
 
             await progress_callback("✅ 分析完成，正在保存结果...")
 
@@ -161,7 +198,7 @@ async def process_task(task_id: str) -> None:
             "completed_at": str(finished),
             "result": json.dumps(result, ensure_ascii=False),
         })
-        await r.srem(SET_PROCESSING, task_id)
+        await unmark_task_processing(r, task_id, task_user)
         if status == "completed":
             await r.sadd(SET_COMPLETED, task_id)
         else:
@@ -169,6 +206,25 @@ async def process_task(task_id: str) -> None:
 
         logger.info(f"Task {task_id} {status}")
 
+    except asyncio.CancelledError:
+        if claim.claim("shutdown"):
+            # Analysis never started: put it back for another worker
+            logger.warning(f"🔄 Task {task_id} interrupted by shutdown, re-queued")
+            await r.hset(key, mapping={"status": "queued"})
+            await unmark_task_processing(r, task_id, task_user)
+            await r.lpush(READY_LIST, task_id)
+        else:
+            # The analysis thread keeps running until the process exits and its result is
+            # lost; re-queueing would run the same analysis twice, so fail the task instead
+            logger.warning(f"⚠️ Task {task_id} interrupted by shutdown while analysis was running, marked failed")
+            await r.hset(key, mapping={
+                "status": "failed",
+                "completed_at": str(int(time.time())),
+                "error": "Worker 关闭时分析仍在执行，任务已中断，请重新提交",
+            })
+            await unmark_task_processing(r, task_id, task_user)
+            await r.sadd(SET_FAILED, task_id)
+        raise
     except Exception as e:
         logger.exception(f"Task {task_id} processing failed: {e}")
         finished = int(time.time())
@@ -177,28 +233,97 @@ async def process_task(task_id: str) -> None:
             "completed_at": str(finished),
             "error": str(e),
         })
-        await r.srem(SET_PROCESSING, task_id)
+        await unmark_task_processing(r, task_id, task_user)
         await r.sadd(SET_FAILED, task_id)
         await publish_progress(task_id, f"❌ 处理失败: {str(e)}")
 
 
-async def worker_loop(stop_event: asyncio.Event):
+async def _wait_or_stop(stop_event: asyncio.Event, seconds: float) -> None:
+    """Sleep up to ``seconds``, returning early when shutdown is requested"""
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _drain(in_flight: Dict[str, asyncio.Task], timeout: float) -> None:
+    """
+    Wait for in-flight tasks up to ``timeout`` (>0), then cancel the rest.
+
+    Cancelled tasks whose analysis has not started are re-queued; tasks already running in an
+    executor thread are marked failed instead, since the thread cannot be stopped.
+    """
+    if not in_flight:
+        return
+    logger.info(f"🔄 Draining {len(in_flight)} in-flight task(s) before exit")
+    _, pending = await asyncio.wait(set(in_flight.values()), timeout=timeout if timeout > 0 else None)
+    if pending:
+        logger.warning(f"⚠️ Drain timed out after {timeout}s, cancelling {len(pending)} task(s)")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def worker_loop(stop_event: asyncio.Event, concurrency: Optional[int] = None):
+    """
+    Pull tasks from READY_LIST and keep up to ``concurrency`` of them in flight.
+
+    A task is only popped when this worker has a free slot and the global processing set is
+    below GLOBAL_CONCURRENT_LIMIT; a task whose user already has DEFAULT_USER_CONCURRENT_LIMIT
+    tasks processing goes back to the tail of the queue.
+    """
     r = get_redis_client()
-    logger.info("Worker loop started")
-    while not stop_event.is_set():
-        try:
-            # BLPOP returns (list, task_id) when an item is available
-            item: Optional[list] = await r.blpop(READY_LIST, timeout=5)
-            if not item:
-                continue
-            _, task_id = item
-            await process_task(task_id)
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.exception(f"Worker loop error: {e}")
-            await asyncio.sleep(1)
-    logger.info("Worker loop stopped")
+    concurrency = max(1, int(concurrency or getattr(settings, "WORKER_CONCURRENCY", 1)))
+    user_limit = int(getattr(settings, "DEFAULT_USER_CONCURRENT_LIMIT", 3))
+    global_limit = int(getattr(settings, "GLOBAL_CONCURRENT_LIMIT", 50))
+    poll_interval = float(getattr(settings, "QUEUE_POLL_INTERVAL_SECONDS", 1.0))
+    drain_timeout = float(getattr(settings, "WORKER_DRAIN_TIMEOUT_SECONDS", 0))
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="analysis")
+    in_flight: Dict[str, asyncio.Task] = {}
+    logger.info(
+        f"Worker loop started | concurrency={concurrency} "
+        f"user_limit={user_limit} global_limit={global_limit}"
+    )
+    try:
+        while not stop_event.is_set():
+            try:
+                if len(in_flight) >= concurrency:
+                    await asyncio.wait(
+                        set(in_flight.values()), timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    continue
+                if not await check_global_concurrent_limit(r, global_limit):
+                    await _wait_or_stop(stop_event, poll_interval)
+                    continue
+
+                # BLPOP returns (list, task_id) when an item is available
+                item: Optional[list] = await r.blpop(READY_LIST, timeout=5)
+                if not item:
+                    continue
+                _, task_id = item
+
+                user_id = await r.hget(TASK_PREFIX + task_id, "user") or ""
+                if not await check_user_concurrent_limit(r, user_id, user_limit):
+                    await r.rpush(READY_LIST, task_id)
+                    logger.debug(f"⏭️ User {user_id} at concurrency limit ({user_limit}), task {task_id} deferred")
+                    await _wait_or_stop(stop_event, poll_interval)
+                    continue
+
+                # Reserve the slot before scheduling so the next limit checks see it
+                await mark_task_processing(r, task_id, user_id)
+                task = asyncio.create_task(process_task(task_id, executor=executor))
+                in_flight[task_id] = task
+                task.add_done_callback(lambda _t, tid=task_id: in_flight.pop(tid, None))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.exception(f"Worker loop error: {e}")
+                await asyncio.sleep(1)
+    finally:
+        await _drain(in_flight, drain_timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Worker loop stopped")
 
 
 async def main():
@@ -230,9 +355,14 @@ async def main():
             # Windows may not support signal handlers in event loop
             pass
 
+    # Keep the system config snapshot in sync with writes from the API process
+    from app.core.config_snapshot import run_config_change_listener
+    config_listener_task = asyncio.create_task(run_config_change_listener())
+
     try:
         await worker_loop(stop_event)
     finally:
+        config_listener_task.cancel()
         await close_db()
 
 
@@ -7,9 +7,14 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
+from app.core.config import settings
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import get_sync_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_state_service import refresh_indicator_snapshot
 from app.services.news_data_service import get_news_data_service
+from app.worker.sync_pipeline import run_sync_pipeline
+from app.worker.sync_planner import IncrementalSyncPlan, plan_incremental_sync
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 
 logger = logging.getLogger(__name__)
@@ -561,6 +566,9 @@ class AKShareSyncService:
             "start_time": datetime.utcnow(),
             "end_time": None,
             "duration": 0,
+            "symbols_per_second": 0.0,
+            "rows_per_second": 0.0,
+            "skipped_count": 0,
             "errors": []
         }
 
@@ -570,6 +578,7 @@ class AKShareSyncService:
                 end_date = datetime.now().strftime('%Y-%m-%d')
 
             # 2. 确定要同步的股票列表
+            requested_symbols = symbols
             if symbols is None:
                 basic_info_cursor = self.db.stock_basic_info.find({}, {"code": 1})
                 symbols = [doc["code"] async for doc in basic_info_cursor]
@@ -590,11 +599,20 @@ class AKShareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
+            # 增量模式：一次聚合确定各股票起始日期（本次同步内复用），已是最新的股票不再请求数据源
+            start_dates = None
+            if incremental and not start_date:
+                plan = await self._plan_incremental_sync(symbols, end_date, period, requested_symbols is not None)
+                if plan is not None:
+                    start_dates = plan.start_dates
+                    stats["skipped_count"] = len(plan.up_to_date)
+                    symbols = plan.symbols
+
             # 4. 批量处理
             for i in range(0, len(symbols), self.batch_size):
                 batch = symbols[i:i + self.batch_size]
                 batch_stats = await self._process_historical_batch(
-                    batch, start_date, end_date, period, incremental
+                    batch, start_date, end_date, period, incremental, start_dates
                 )
 
                 # 更新统计
@@ -603,24 +621,28 @@ class AKShareSyncService:
                 stats["total_records"] += batch_stats["total_records"]
                 stats["errors"].extend(batch_stats["errors"])
 
-                # 进度日志
+                # 进度日志（限流由共享令牌桶控制，批次之间无需额外等待）
                 progress = min(i + self.batch_size, len(symbols))
                 logger.info(f"📈 历史数据同步进度: {progress}/{len(symbols)} "
                            f"(成功: {stats['success_count']}, 记录: {stats['total_records']})")
 
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
-
             # 4. 完成统计
             stats["end_time"] = datetime.utcnow()
             stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+            if stats["duration"] > 0:
+                stats["symbols_per_second"] = round(stats["success_count"] / stats["duration"], 3)
+                stats["rows_per_second"] = round(stats["total_records"] / stats["duration"], 1)
 
             logger.info(f"🎉 历史数据同步完成！")
             logger.info(f"📊 总计: {stats['total_processed']}只股票, "
                        f"成功: {stats['success_count']}, "
                        f"记录: {stats['total_records']}条, "
-                       f"耗时: {stats['duration']:.2f}秒")
+                       f"耗时: {stats['duration']:.2f}秒, "
+                       f"吞吐: {stats['symbols_per_second']}只/秒 {stats['rows_per_second']}条/秒")
+
+            # 5. 日线写入后推进增量指标并刷新指标快照
+            if period == "daily" and stats["total_records"] > 0:
+                await refresh_indicator_snapshot(symbols=requested_symbols, end_date=end_date)
 
             return stats
 
@@ -635,9 +657,14 @@ class AKShareSyncService:
         start_date: str,
         end_date: str,
         period: str = "daily",
-        incremental: bool = False
+        incremental: bool = False,
+        start_dates: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """处理历史数据批次"""
+        """
+        处理历史数据批次
+
+        start_dates 为增量同步计划给出的各股票起始日期，提供时不再逐只查询最后同步日期。
+        """
         batch_stats = {
             "success_count": 0,
             "error_count": 0,
@@ -645,54 +672,47 @@ class AKShareSyncService:
             "errors": []
         }
 
-        for symbol in batch:
-            try:
-                # 确定该股票的起始日期
-                symbol_start_date = start_date
-                if not symbol_start_date:
-                    if incremental:
-                        # 增量同步：获取该股票的最后日期
-                        symbol_start_date = await self._get_last_sync_date(symbol)
-                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
-                    else:
-                        # 全量同步：最近1年
-                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-
-                # 获取历史数据
-                hist_data = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
-
-                if hist_data is not None and not hist_data.empty:
-                    # 保存到统一历史数据集合
-                    if self.historical_service is None:
-                        self.historical_service = await get_historical_data_service()
-
-                    saved_count = await self.historical_service.save_historical_data(
-                        symbol=symbol,
-                        data=hist_data,
-                        data_source="akshare",
-                        market="CN",
-                        period=period
-                    )
+        if self.historical_service is None:
+            self.historical_service = await get_historical_data_service()
 
-                    batch_stats["success_count"] += 1
-                    batch_stats["total_records"] += saved_count
-                    logger.debug(f"✅ {symbol}历史数据同步成功: {saved_count}条记录")
+        async def fetch(symbol: str):
+            # 确定该股票的起始日期
+            symbol_start_date = start_date or (start_dates or {}).get(symbol)
+            if not symbol_start_date:
+                if incremental:
+                    # 增量同步：获取该股票的最后日期
+                    symbol_start_date = await self._get_last_sync_date(symbol)
+                    logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
                 else:
-                    batch_stats["error_count"] += 1
-                    batch_stats["errors"].append({
-                        "code": symbol,
-                        "error": "历史数据为空",
-                        "context": "_process_historical_batch"
-                    })
+                    # 全量同步：最近1年
+                    symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
 
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                batch_stats["errors"].append({
-                    "code": symbol,
-                    "error": str(e),
-                    "context": "_process_historical_batch"
-                })
+            # 获取历史数据
+            return await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
 
+        async def save(symbol: str, hist_data) -> int:
+            # 保存到统一历史数据集合
+            saved_count = await self.historical_service.save_historical_data(
+                symbol=symbol,
+                data=hist_data,
+                data_source="akshare",
+                market="CN",
+                period=period
+            )
+            logger.debug(f"✅ {symbol}历史数据同步成功: {saved_count}条记录")
+            return saved_count
+
+        # 多只股票并发拉取（共享 AKShare 令牌桶限流），拉取与写入流水线重叠
+        pipeline_stats = await run_sync_pipeline(
+            batch,
+            fetch,
+            save,
+            concurrency=settings.AKSHARE_HISTORICAL_SYNC_CONCURRENCY,
+            rate_limiter=get_sync_rate_limiter("akshare", settings.AKSHARE_SYNC_RATE_PER_SECOND),
+            context="_process_historical_batch",
+        )
+        for key in batch_stats:
+            batch_stats[key] += pipeline_stats[key]
         return batch_stats
 
     async def _get_last_sync_date(self, symbol: str = None) -> str:
@@ -728,16 +748,7 @@ class AKShareSyncService:
                         {"list_date": 1}
                     )
                     if stock_info and stock_info.get("list_date"):
-                        list_date = stock_info["list_date"]
-                        # 处理不同的日期格式
-                        if isinstance(list_date, str):
-                            # 格式可能是 "20100101" 或 "2010-01-01"
-                            if len(list_date) == 8 and list_date.isdigit():
-                                return f"{list_date[:4]}-{list_date[4:6]}-{list_date[6:]}"
-                            else:
-                                return list_date
-                        else:
-                            return list_date.strftime('%Y-%m-%d')
+                        return self._format_list_date(stock_info["list_date"])
 
                     # 如果没有上市日期，从1990年开始
                     logger.warning(f"⚠️ {symbol}: 未找到上市日期，从1990-01-01开始同步")
@@ -751,6 +762,54 @@ class AKShareSyncService:
             # 出错时返回30天前，确保不漏数据
             return (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
+    @staticmethod
+    def _format_list_date(list_date) -> str:
+        """上市日期转为 YYYY-MM-DD（格式可能是 "20100101"、"2010-01-01" 或 datetime）"""
+        if isinstance(list_date, str):
+            if len(list_date) == 8 and list_date.isdigit():
+                return f"{list_date[:4]}-{list_date[4:6]}-{list_date[6:]}"
+            return list_date
+        return list_date.strftime('%Y-%m-%d')
+
+    async def _plan_incremental_sync(
+        self,
+        symbols: List[str],
+        end_date: str,
+        period: str,
+        filter_symbols: bool = False
+    ) -> Optional[IncrementalSyncPlan]:
+        """
+        生成增量同步计划
+
+        一次聚合取得所有股票的最新日期，没有历史数据的股票一次查询取得上市日期。
+        聚合失败时返回 None，调用方退回逐只查询最后同步日期。
+        """
+        if self.historical_service is None:
+            self.historical_service = await get_historical_data_service()
+
+        latest_dates = await self.historical_service.get_latest_dates(
+            "akshare", period, symbols if filter_symbols else None
+        )
+        if latest_dates is None:
+            return None
+
+        list_dates: Dict[str, str] = {}
+        missing = [symbol for symbol in symbols if symbol not in latest_dates]
+        if missing:
+            cursor = self.db.stock_basic_info.find({"code": {"$in": missing}}, {"code": 1, "list_date": 1})
+            async for doc in cursor:
+                if doc.get("list_date"):
+                    list_dates[doc["code"]] = self._format_list_date(doc["list_date"])
+
+        def default_start(symbol: str) -> str:
+            if symbol not in list_dates:
+                logger.warning(f"⚠️ {symbol}: 未找到上市日期，从1990-01-01开始同步")
+            return list_dates.get(symbol, "1990-01-01")
+
+        return plan_incremental_sync(
+            symbols, latest_dates, end_date, default_start, skip_up_to_date=(period == "daily")
+        )
+
     async def sync_financial_data(self, symbols: List[str] = None) -> Dict[str, Any]:
         """
         同步财务数据
@@ -11,7 +11,11 @@ from dataclasses import dataclass
 
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.rate_limiter import get_sync_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_state_service import refresh_indicator_snapshot
+from app.worker.sync_pipeline import run_sync_pipeline
+from app.worker.sync_planner import IncrementalSyncPlan, plan_incremental_sync
 from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,8 @@ class BaoStockSyncStats:
     quotes_count: int = 0
     historical_records: int = 0
     financial_records: int = 0
+    symbols_per_second: float = 0.0
+    rows_per_second: float = 0.0
     errors: List[str] = None
     
     def __post_init__(self):
@@ -385,24 +391,42 @@ class BaoStockSyncService:
             else:
                 logger.info(f"🔄 开始BaoStock{period_name}历史数据同步 (最近{days}天到{end_date})...")
 
+            # 增量模式：一次聚合确定各股票起始日期（本次同步内复用），已是最新的股票不再请求数据源
+            start_dates = None
+            if use_incremental:
+                plan = await self._plan_incremental_sync(stock_codes, end_date, period)
+                if plan is not None:
+                    start_dates = plan.start_dates
+                    stock_codes = plan.symbols
+
             logger.info(f"📊 开始同步{len(stock_codes)}只股票的历史数据...")
 
-            # 批量处理
+            # 批量处理（限流由共享令牌桶控制，批次之间无需额外等待）
+            sync_start = datetime.now()
+            synced_symbols = 0
             for i in range(0, len(stock_codes), batch_size):
                 batch = stock_codes[i:i + batch_size]
-                batch_stats = await self._sync_historical_batch(batch, days, end_date, period, use_incremental)
+                batch_stats = await self._sync_historical_batch(batch, days, end_date, period, use_incremental, start_dates)
                 
                 stats.historical_records += batch_stats.historical_records
                 stats.errors.extend(batch_stats.errors)
+                synced_symbols += len(batch) - len(batch_stats.errors)
                 
                 logger.info(f"📊 批次进度: {i + len(batch)}/{len(stock_codes)}, "
                           f"记录: {batch_stats.historical_records}, "
                           f"错误: {len(batch_stats.errors)}")
-                
-                # 避免API限制
-                await asyncio.sleep(0.5)
+
+            duration = (datetime.now() - sync_start).total_seconds()
+            if duration > 0:
+                stats.symbols_per_second = round(synced_symbols / duration, 3)
+                stats.rows_per_second = round(stats.historical_records / duration, 1)
             
-            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录")
+            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录, "
+                        f"吞吐: {stats.symbols_per_second}只/秒 {stats.rows_per_second}条/秒")
+
+            # 日线写入后推进增量指标并刷新指标快照
+            if period == "daily" and stats.historical_records > 0:
+                await refresh_indicator_snapshot(end_date=end_date)
             return stats
             
         except Exception as e:
@@ -416,37 +440,51 @@ class BaoStockSyncService:
         days: int,
         end_date: str,
         period: str = "daily",
-        incremental: bool = False
+        incremental: bool = False,
+        start_dates: Optional[Dict[str, str]] = None
     ) -> BaoStockSyncStats:
-        """同步历史数据批次"""
-        stats = BaoStockSyncStats()
-
-        for code in code_batch:
-            try:
-                # 确定该股票的起始日期
-                if incremental:
-                    # 增量同步：获取该股票的最后日期
-                    start_date = await self._get_last_sync_date(code)
-                    logger.debug(f"📅 {code}: 从 {start_date} 开始同步")
-                elif days >= 3650:
-                    # 全历史同步
-                    start_date = "1990-01-01"
-                else:
-                    # 固定天数同步
-                    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-
-                hist_data = await self.provider.get_historical_data(code, start_date, end_date, period)
-
-                if hist_data is not None and not hist_data.empty:
-                    # 更新数据库
-                    records_count = await self._update_historical_data(code, hist_data, period)
-                    stats.historical_records += records_count
-                else:
-                    stats.errors.append(f"获取{code}历史数据失败")
+        """
+        同步历史数据批次
 
-            except Exception as e:
-                stats.errors.append(f"处理{code}历史数据失败: {e}")
+        start_dates 为增量同步计划给出的各股票起始日期，提供时不再逐只查询最后同步日期。
+        """
+        stats = BaoStockSyncStats()
 
+        async def fetch(code: str):
+            # 确定该股票的起始日期
+            if start_dates and code in start_dates:
+                start_date = start_dates[code]
+            elif incremental:
+                # 增量同步：获取该股票的最后日期
+                start_date = await self._get_last_sync_date(code)
+                logger.debug(f"📅 {code}: 从 {start_date} 开始同步")
+            elif days >= 3650:
+                # 全历史同步
+                start_date = "1990-01-01"
+            else:
+                # 固定天数同步
+                start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+            return await self.provider.get_historical_data(code, start_date, end_date, period)
+
+        async def save(code: str, hist_data) -> int:
+            return await self._update_historical_data(code, hist_data, period)
+
+        # BaoStock 每次查询都会 login/logout 全局会话，默认只有1个拉取并发，
+        # 但拉取下一只股票与写入上一只股票仍然流水线重叠
+        pipeline_stats = await run_sync_pipeline(
+            code_batch,
+            fetch,
+            save,
+            concurrency=self.settings.BAOSTOCK_HISTORICAL_SYNC_CONCURRENCY,
+            rate_limiter=get_sync_rate_limiter("baostock", self.settings.BAOSTOCK_SYNC_RATE_PER_SECOND),
+            context="_sync_historical_batch",
+        )
+        stats.historical_records = pipeline_stats["total_records"]
+        stats.errors = [
+            f"获取{err['code']}历史数据失败" if err["error"] == "历史数据为空" else f"处理{err['code']}历史数据失败: {err['error']}"
+            for err in pipeline_stats["errors"]
+        ]
         return stats
 
     async def _update_historical_data(self, code: str, hist_data, period: str = "daily") -> int:
@@ -525,6 +563,23 @@ class BaoStockSyncService:
             # 出错时返回30天前，确保不漏数据
             return (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
+    async def _plan_incremental_sync(
+        self, stock_codes: List[str], end_date: str, period: str
+    ) -> Optional[IncrementalSyncPlan]:
+        """一次聚合取得所有股票的最新日期并生成增量同步计划；聚合失败时返回 None（退回逐只查询）"""
+        if self.historical_service is None:
+            self.historical_service = await get_historical_data_service()
+
+        latest_dates = await self.historical_service.get_latest_dates("baostock", period)
+        if latest_dates is None:
+            return None
+
+        # 没有历史数据的股票与逐只查询时一致：从30天前开始
+        default_start = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        return plan_incremental_sync(
+            stock_codes, latest_dates, end_date, lambda code: default_start, skip_up_to_date=(period == "daily")
+        )
+
     async def check_service_status(self) -> Dict[str, Any]:
         """检查服务状态"""
         try:
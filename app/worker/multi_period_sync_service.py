@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_state_service import refresh_indicator_snapshot
 from app.worker.tushare_sync_service import TushareSyncService
 from app.worker.akshare_sync_service import AKShareSyncService
 from app.worker.baostock_sync_service import BaoStockSyncService
@@ -132,7 +133,11 @@ class MultiPeriodSyncService:
             logger.info(f"✅ 多周期数据同步完成: "
                        f"日线{stats.daily_records}, 周线{stats.weekly_records}, "
                        f"月线{stats.monthly_records}条记录")
-            
+
+            # 日线写入后推进增量指标并刷新指标快照
+            if stats.daily_records > 0:
+                await refresh_indicator_snapshot(end_date=end_date)
+
             return stats
             
         except Exception as e:
@@ -202,6 +207,7 @@ class MultiPeriodSyncService:
     ) -> Dict[str, Any]:
         """同步批次周期数据"""
         stats = {"records": 0, "success": 0, "errors": 0}
+        frames: Dict[str, Any] = {}
         
         for symbol in symbols:
             try:
@@ -222,16 +228,7 @@ class MultiPeriodSyncService:
                     continue
                 
                 if hist_data is not None and not hist_data.empty:
-                    # 保存到数据库
-                    saved_count = await self.historical_service.save_historical_data(
-                        symbol=symbol,
-                        data=hist_data,
-                        data_source=data_source,
-                        market="CN",
-                        period=period
-                    )
-                    
-                    stats["records"] += saved_count
+                    frames[symbol] = hist_data
                     stats["success"] += 1
                 else:
                     stats["errors"] += 1
@@ -239,6 +236,15 @@ class MultiPeriodSyncService:
             except Exception as e:
                 logger.error(f"❌ {symbol}-{period}同步失败: {e}")
                 stats["errors"] += 1
+
+        # 整批股票合并写入数据库（多只股票共用 bulk_write）
+        if frames:
+            stats["records"] += await self.historical_service.save_historical_data_many(
+                frames,
+                data_source=data_source,
+                market="CN",
+                period=period
+            )
         
         return stats
     
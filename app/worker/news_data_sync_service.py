@@ -12,6 +12,7 @@ from app.services.news_data_service import get_news_data_service
 from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
+from tradingagents.dataflows.news.near_duplicate import dedupe_near_duplicates, publish_day
 
 logger = logging.getLogger(__name__)
 
@@ -417,7 +418,7 @@ class NewsDataSyncService:
         return keywords[:10]  # 最多返回10个关键词
     
     def _deduplicate_news(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重新闻"""
+        """去重新闻（精确去重 + 转载/改写的近似重复聚类）"""
         seen = set()
         unique_news = []
         
@@ -428,7 +429,15 @@ class NewsDataSyncService:
                 seen.add(key)
                 unique_news.append(news)
         
-        return unique_news
+        # 同一通稿的多家转载只入库一条：保留正文最完整的版本
+        # 被合并的新闻不会入库，因此只合并同一股票、同一天、带正文的新闻（模板化公告标题不参与）
+        return dedupe_near_duplicates(
+            unique_news,
+            text_of=lambda n: f"{n.get('title') or ''} {(n.get('content') or '')[:300]}",
+            rank_key=lambda n: len(n.get("content") or ""),
+            body_of=lambda n: n.get("content") or "",
+            group_of=lambda n: (n.get("symbol"), publish_day(n.get("publish_time"))),
+        )
     
     async def sync_market_news(
         self,
@@ -0,0 +1,120 @@
+"""
+按股票并发同步的流水线
+
+历史数据同步的耗时主要花在等待数据源网络响应上。这里用多个拉取协程并发获取数据
+（并发数受 concurrency 约束，调用频率受数据源共享的令牌桶约束），拉取结果放入有界队列，
+由单个写入协程依次写入数据库，使拉取第 N+1 只股票与写入第 N 只股票重叠进行。
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+FetchFn = Callable[[str], Awaitable[Any]]
+SaveFn = Callable[[str, Any], Awaitable[int]]
+
+
+def _is_empty(data: Any) -> bool:
+    return data is None or bool(getattr(data, "empty", False))
+
+
+async def run_sync_pipeline(
+    symbols: Iterable[str],
+    fetch: FetchFn,
+    save: SaveFn,
+    concurrency: int = 4,
+    rate_limiter=None,
+    context: str = "sync_pipeline",
+) -> Dict[str, Any]:
+    """
+    并发拉取 + 流水线写入
+
+    Args:
+        symbols: 股票代码
+        fetch: 拉取单只股票数据的协程函数，返回 DataFrame（None/空表视为失败）
+        save: 写入单只股票数据的协程函数，返回写入记录数
+        concurrency: 同时进行的拉取数
+        rate_limiter: 带 acquire() 协程方法的限流器（每次拉取前获取一次许可）
+        context: 错误记录中的 context 字段
+
+    Returns:
+        统计信息：success_count / error_count / total_records / fetched_rows / errors /
+        duration / symbols_per_second / rows_per_second
+    """
+    symbols = list(symbols)
+    stats = {
+        "success_count": 0,
+        "error_count": 0,
+        "total_records": 0,
+        "fetched_rows": 0,
+        "errors": [],
+        "duration": 0.0,
+        "symbols_per_second": 0.0,
+        "rows_per_second": 0.0,
+    }
+    if not symbols:
+        return stats
+
+    concurrency = max(1, min(concurrency, len(symbols)))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    pending = iter(symbols)
+    start = time.perf_counter()
+
+    def record_error(symbol: str, error: str) -> None:
+        stats["error_count"] += 1
+        stats["errors"].append({"code": symbol, "error": error, "context": context})
+
+    async def fetcher() -> None:
+        # 所有拉取协程共享同一个迭代器（单线程事件循环内无竞争）
+        for symbol in pending:
+            try:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                data = await fetch(symbol)
+            except Exception as e:
+                record_error(symbol, str(e))
+                continue
+            if _is_empty(data):
+                record_error(symbol, "历史数据为空")
+                continue
+            await queue.put((symbol, data))
+
+    async def writer() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            symbol, data = item
+            try:
+                saved = await save(symbol, data)
+            except Exception as e:
+                record_error(symbol, str(e))
+                continue
+            stats["success_count"] += 1
+            stats["total_records"] += saved or 0
+            stats["fetched_rows"] += len(data)
+
+    writer_task = asyncio.create_task(writer())
+    fetchers = [asyncio.create_task(fetcher()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*fetchers)
+        await queue.put(None)
+        await writer_task
+    finally:
+        for task in fetchers + [writer_task]:
+            if not task.done():
+                task.cancel()
+
+    duration = time.perf_counter() - start
+    stats["duration"] = duration
+    if duration > 0:
+        stats["symbols_per_second"] = round(stats["success_count"] / duration, 3)
+        stats["rows_per_second"] = round(stats["total_records"] / duration, 1)
+    logger.debug(
+        f"🔀 {context}: {len(symbols)}只股票, 并发 {concurrency}, 成功 {stats['success_count']}, "
+        f"{stats['symbols_per_second']}只/秒, {stats['rows_per_second']}条/秒"
+    )
+    return stats
+
@@ -0,0 +1,82 @@
+"""
+增量历史同步计划
+
+同步开始前用一次聚合取得全部股票在 stock_daily_quotes 中的最新日期（本次同步期间复用），
+据此为每只股票确定起始日期；日线数据已经包含最新交易日的股票直接跳过，不再请求数据源。
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def latest_expected_trade_date(end_date: str) -> str:
+    """
+    不晚于 end_date 的最近一个工作日（YYYY-MM-DD）
+
+    不识别节假日：节假日当天会被当作交易日，相关股票照常拉取（与逐只同步行为一致），
+    因此不会误跳过需要更新的股票。
+    """
+    day = datetime.strptime(end_date[:10], "%Y-%m-%d")
+    while day.weekday() > 4:
+        day -= timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+def next_day(date_str: str) -> str:
+    """日期的下一天；格式无法解析时原样返回"""
+    try:
+        return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    except ValueError:
+        return date_str
+
+
+@dataclass
+class IncrementalSyncPlan:
+    """增量同步计划：需要同步的股票及其起始日期，以及已是最新而跳过的股票"""
+    start_dates: Dict[str, str] = field(default_factory=dict)
+    up_to_date: List[str] = field(default_factory=list)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.start_dates)
+
+
+def plan_incremental_sync(
+    symbols: Iterable[str],
+    latest_dates: Mapping[str, str],
+    end_date: str,
+    default_start: Callable[[str], str],
+    skip_up_to_date: bool = True,
+    latest_trade_date: Optional[str] = None,
+) -> IncrementalSyncPlan:
+    """
+    生成增量同步计划
+
+    Args:
+        symbols: 待同步股票
+        latest_dates: {symbol: 库中最新日期}（来自 HistoricalDataService.get_latest_dates）
+        end_date: 同步结束日期 (YYYY-MM-DD)
+        default_start: 库中没有数据的股票的起始日期
+        skip_up_to_date: 是否跳过已包含最新交易日的股票（只适用于日线）
+        latest_trade_date: 最新交易日，默认取不晚于 end_date 的最近工作日
+    """
+    expected = latest_trade_date or latest_expected_trade_date(end_date)
+    plan = IncrementalSyncPlan()
+    for symbol in symbols:
+        latest = latest_dates.get(symbol)
+        if not latest:
+            plan.start_dates[symbol] = default_start(symbol)
+        elif skip_up_to_date and latest >= expected:
+            plan.up_to_date.append(symbol)
+        else:
+            # 从最后日期的下一天开始（避免重复同步）
+            plan.start_dates[symbol] = next_day(latest)
+
+    logger.info(
+        f"📋 增量同步计划: 需同步 {len(plan.start_dates)} 只, 已是最新跳过 {len(plan.up_to_date)} 只 "
+        f"(最新交易日 {expected})"
+    )
+    return plan
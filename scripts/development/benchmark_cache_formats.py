@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+文件缓存 DataFrame 存储格式基准
+
+对比 CSV / Feather（Arrow IPC，内存映射）/ Parquet 在典型 1 年日K线（默认 250 根 × 200 只）上的：
+1. 写入耗时
+2. 完整加载耗时
+3. 只加载 close 列的耗时（列投影）
+4. 磁盘占用
+
+同时校验列类型是否能原样往返（CSV 会丢失 datetime / category 等类型）。
+
+使用方法：
+    python scripts/development/benchmark_cache_formats.py
+    python scripts/development/benchmark_cache_formats.py --symbols 500 --bars 250 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache.columnar import (  # noqa: E402
+    COLUMNAR_AVAILABLE, CSV, FEATHER, PARQUET, read_frame, write_frame,
+)
+
+
+def make_kline(code: str, bars: int, rng) -> pd.DataFrame:
+    """与 A 股日线缓存相同结构的 DataFrame"""
+    close = np.round(np.cumsum(rng.normal(0, 0.2, bars)) + 20, 2)
+    df = pd.DataFrame({
+        "code": code,
+        "open": np.round(close + rng.normal(0, 0.1, bars), 2),
+        "high": np.round(close + rng.uniform(0, 0.3, bars), 2),
+        "low": np.round(close - rng.uniform(0, 0.3, bars), 2),
+        "close": close,
+        "volume": rng.integers(1e5, 5e6, bars),
+        "amount": np.round(rng.uniform(1e6, 1e8, bars), 2),
+        "pct_chg": np.round(rng.normal(0, 1.5, bars), 2),
+    }, index=pd.bdate_range("2024-01-01", periods=bars, name="date"))
+    return df
+
+
+def _timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文件缓存 DataFrame 存储格式基准")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [make_kline(f"{600000 + i:06d}", args.bars, rng) for i in range(args.symbols)]
+    formats = [CSV] + ([FEATHER, PARQUET] if COLUMNAR_AVAILABLE else [])
+    if not COLUMNAR_AVAILABLE:
+        print("⚠️ 未安装 pyarrow，只测试 CSV")
+
+    print(f"📊 工作负载: {args.symbols} 个文件 × {args.bars} 根日K线")
+    print(f"  {'格式':<8} {'写入':>9} {'完整加载':>10} {'只读close':>10} {'磁盘占用':>10}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            paths = [Path(tmp) / f"{i}.{fmt}" for i in range(len(frames))]
+            write = _timeit(lambda: [write_frame(df, p, fmt) for df, p in zip(frames, paths)], args.repeat)
+            load = _timeit(lambda: [read_frame(p, fmt) for p in paths], args.repeat)
+            project = _timeit(lambda: [read_frame(p, fmt, columns=["close"]) for p in paths], args.repeat)
+            size = sum(p.stat().st_size for p in paths)
+            baseline = baseline or load
+            print(f"  {fmt:<8} {write:8.3f}s {load:9.3f}s {project:9.3f}s {size / 1024 / 1024:8.2f}MB"
+                  f"   (加载 {baseline / load:.1f}x)")
+
+            # 类型往返校验
+            loaded = read_frame(paths[0], fmt)
+            same = loaded.dtypes.equals(frames[0].dtypes) and loaded.index.dtype == frames[0].index.dtype
+            print(f"           类型往返: {'✅ 一致' if same else '⚠️ 不一致（索引: ' + str(loaded.index.dtype) + '）'}")
+
+
+if __name__ == "__main__":
+    main()
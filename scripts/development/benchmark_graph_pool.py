@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+TradingAgentsGraph 实例池基准
+
+连续执行 N 次分析（默认 20 次，相同配置），对比：
+1. 每个任务新建 TradingAgentsGraph（旧实现）
+2. 从 TradingGraphPool 获取共享实例，每次运行使用自己的 GraphRunContext
+
+统计每个任务的启动延迟（获取图实例耗时）和启动阶段分配的内存（tracemalloc 峰值增量）。
+LLM 调用不计入：编译后的图被替换为立即返回最终状态的桩，因此不需要网络和 API Key。
+
+使用方法：
+    python scripts/development/benchmark_graph_pool.py
+    python scripts/development/benchmark_graph_pool.py --runs 20 --memory
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from tradingagents.default_config import DEFAULT_CONFIG  # noqa: E402
+from tradingagents.graph.graph_pool import TradingGraphPool  # noqa: E402
+from tradingagents.graph.trading_graph import TradingAgentsGraph  # noqa: E402
+
+ANALYSTS = ["market", "social", "news", "fundamentals"]
+
+
+def _final_state(ticker, trade_date):
+    debate = {"bull_history": "", "bear_history": "", "history": "", "current_response": "", "judge_decision": ""}
+    risk = {"risky_history": "", "safe_history": "", "neutral_history": "", "history": "", "judge_decision": ""}
+    return {
+        "company_of_interest": ticker, "trade_date": trade_date, "market_report": "",
+        "sentiment_report": "", "news_report": "", "fundamentals_report": "",
+        "investment_debate_state": debate, "trader_investment_plan": "", "risk_debate_state": risk,
+        "investment_plan": "", "final_trade_decision": "持有",
+    }
+
+
+class _CompiledGraphStub:
+    def invoke(self, state, **kwargs):
+        return _final_state(state["company_of_interest"], state["trade_date"])
+
+
+def _stub(graph):
+    graph.graph = _CompiledGraphStub()
+    graph.process_signal = lambda signal, symbol=None: signal
+    return graph
+
+
+def run(label, acquire, runs):
+    latencies, allocated = [], []
+    for i in range(runs):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        graph = _stub(acquire())
+        latencies.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+        graph.propagate(f"{600000 + i}", "2024-01-05")
+
+    first, rest = latencies[0], latencies[1:] or latencies
+    print(f"{label}:")
+    print(f"  首个任务启动:        {first * 1000:8.1f} ms")
+    print(f"  后续任务启动(中位数): {statistics.median(rest) * 1000:8.2f} ms")
+    print(f"  {runs} 个任务启动合计:   {sum(latencies):8.2f} s")
+    print(f"  单任务启动内存(中位数): {statistics.median(allocated) / 1024 / 1024:8.2f} MB")
+    return sum(latencies), statistics.median(allocated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TradingAgentsGraph 实例池基准")
+    parser.add_argument("--runs", type=int, default=20, help="连续分析次数")
+    parser.add_argument("--memory", action="store_true", help="启用记忆集合（FinancialSituationMemory）")
+    args = parser.parse_args()
+
+    config = dict(DEFAULT_CONFIG, llm_provider="openai", memory_enabled=args.memory)
+    os.chdir(tempfile.mkdtemp(prefix="graph_pool_bench_"))
+    tracemalloc.start()
+
+    fresh_time, fresh_mem = run(
+        "每任务新建实例",
+        lambda: TradingAgentsGraph(ANALYSTS, config=config),
+        args.runs,
+    )
+    pool = TradingGraphPool(max_size=4)
+    pool_time, pool_mem = run(
+        "实例池",
+        lambda: pool.acquire(config, selected_analysts=ANALYSTS),
+        args.runs,
+    )
+
+    print(f"\n启动总耗时: {fresh_time:.2f}s → {pool_time:.2f}s ({fresh_time / max(pool_time, 1e-9):.1f}x)")
+    print(f"单任务启动内存: {fresh_mem / 1024 / 1024:.2f} MB → {pool_mem / 1024 / 1024:.3f} MB")
+    print(f"实例池统计: {pool.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
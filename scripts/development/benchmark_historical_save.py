@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+历史数据入库文档构建基准
+
+模拟全市场 1 年日K线回补（默认 5000 只 × 250 根），对比 HistoricalDataService 的：
+1. 逐行路径：iterrows() + _standardize_record + 每行构建 ReplaceOne（旧实现）
+2. 向量化路径：_build_documents（列式转换 + to_dict('records')）+ 构建 ReplaceOne
+
+逐行路径很慢，默认只在前 --row-symbols 只股票上实测，再按股票数线性外推。
+不连接 MongoDB，只测量 save_historical_data 日志中"准备"阶段的耗时。
+
+使用方法：
+    python scripts/development/benchmark_historical_save.py
+    python scripts/development/benchmark_historical_save.py --symbols 500 --row-symbols 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pymongo import ReplaceOne
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from app.services.historical_data_service import HistoricalDataService  # noqa: E402
+
+
+def make_daily(bars: int, rng) -> pd.DataFrame:
+    """与 Tushare 日线接口相同结构的 DataFrame"""
+    close = np.round(np.cumsum(rng.normal(0, 0.2, bars)) + 20, 2)
+    return pd.DataFrame({
+        "trade_date": pd.bdate_range("2024-01-01", periods=bars).strftime("%Y%m%d"),
+        "open": np.round(close + rng.normal(0, 0.1, bars), 2),
+        "high": np.round(close + rng.uniform(0, 0.3, bars), 2),
+        "low": np.round(close - rng.uniform(0, 0.3, bars), 2),
+        "close": close,
+        "pre_close": np.round(np.roll(close, 1), 2),
+        "vol": rng.integers(1e3, 5e5, bars).astype(float),
+        "amount": np.round(rng.uniform(1e3, 1e6, bars), 2),
+    })
+
+
+def _filter(doc):
+    return {"symbol": doc["symbol"], "trade_date": doc["trade_date"],
+            "data_source": doc["data_source"], "period": doc["period"]}
+
+
+def row_path(service, frames):
+    ops = 0
+    for symbol, df in frames:
+        for date_index, row in df.iterrows():
+            doc = service._standardize_record(symbol, row, "tushare", "CN", "daily", date_index)
+            ReplaceOne(_filter(doc), doc, upsert=True)
+            ops += 1
+    return ops
+
+
+def vectorized_path(service, frames):
+    ops = 0
+    for symbol, df in frames:
+        for doc in service._build_documents(symbol, df, "tushare", "CN", "daily"):
+            ReplaceOne(_filter(doc), doc, upsert=True)
+            ops += 1
+    return ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史数据入库文档构建基准")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--row-symbols", type=int, default=100, help="逐行路径实测的股票数（其余线性外推）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [(f"{600000 + i:06d}", make_daily(args.bars, rng)) for i in range(args.symbols)]
+    service = HistoricalDataService()
+    rows = args.symbols * args.bars
+
+    print(f"📊 工作负载: {args.symbols} 只股票 × {args.bars} 根日K线 = {rows} 条")
+
+    sample = frames[:min(args.row_symbols, args.symbols)]
+    start = time.perf_counter()
+    row_path(service, sample)
+    row_elapsed = (time.perf_counter() - start) * args.symbols / len(sample)
+    note = "" if len(sample) == args.symbols else f"（按 {len(sample)} 只外推）"
+    print(f"  逐行 iterrows : {row_elapsed:8.2f}s  {rows / row_elapsed:10.0f} 条/秒 {note}")
+
+    start = time.perf_counter()
+    vectorized_path(service, frames)
+    vec_elapsed = time.perf_counter() - start
+    print(f"  向量化转换     : {vec_elapsed:8.2f}s  {rows / vec_elapsed:10.0f} 条/秒   ({row_elapsed / vec_elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
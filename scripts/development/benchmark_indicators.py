@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+技术指标计算性能基准
+
+对比三种计算方式在 N 只股票 × M 根K线（默认 5000 × 250）上的耗时：
+1. legacy：重构前的实现（每个指标复制一次 DataFrame，KDJ 逐行 .iloc 写入）
+2. compute_many：单次计算、共享中间结果、KDJ 数组递推（逐只股票调用）
+3. compute_panel：横截面宽表一次计算所有股票
+
+legacy / compute_many 为逐只计算，默认只跑 --sample 只股票并按比例外推到全部股票。
+
+使用方法：
+    python scripts/development/benchmark_indicators.py
+    python scripts/development/benchmark_indicators.py --symbols 5000 --bars 250 --sample 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.tools.analysis.indicators import (  # noqa: E402
+    IndicatorSpec, atr, boll, compute_many, compute_panel, ema, macd, rsi, ma,
+)
+
+SPECS = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+
+def _legacy_kdj(high, low, close, n=9, m1=3, m2=3):
+    """重构前的 KDJ：Python 循环 + 逐元素 .iloc 写入"""
+    lowest_low = low.rolling(window=n, min_periods=n).min()
+    highest_high = high.rolling(window=n, min_periods=n).max()
+    rsv = ((close - lowest_low) / (highest_high - lowest_low) * 100).replace([np.inf, -np.inf], np.nan)
+    k = pd.Series(np.nan, index=close.index)
+    d = pd.Series(np.nan, index=close.index)
+    last_k = last_d = 50.0
+    for i in range(len(close)):
+        rv = rsv.iloc[i]
+        if np.isnan(rv):
+            continue
+        curr_k = (1 - 1 / m1) * last_k + (1 / m1) * rv
+        curr_d = (1 - 1 / m2) * last_d + (1 / m2) * curr_k
+        k.iloc[i] = curr_k
+        d.iloc[i] = curr_d
+        last_k, last_d = curr_k, curr_d
+    return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d})
+
+
+def _legacy_compute_many(df):
+    """重构前的 compute_many：每个指标一次 df.copy()，中间结果不共享"""
+    out = df.copy()
+    for n in (5, 10, 20, 60):
+        out = out.copy()
+        out[f"ma{n}"] = ma(out["close"], n)
+    for n in (12, 26):
+        out = out.copy()
+        out[f"ema{n}"] = ema(out["close"], n)
+    out = out.copy()
+    for c, v in macd(out["close"]).items():
+        out[c] = v
+    out = out.copy()
+    out["rsi14"] = rsi(out["close"], 14)
+    out = out.copy()
+    for c, v in boll(out["close"], 20, 2).items():
+        out[c] = v
+    out = out.copy()
+    out["atr14"] = atr(out["high"], out["low"], out["close"], 14)
+    out = out.copy()
+    for c, v in _legacy_kdj(out["high"], out["low"], out["close"]).items():
+        out[c] = v
+    return out
+
+
+def make_frames(symbols, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, (bars, symbols)), axis=0) + 100
+    high = close + rng.uniform(0, 2, close.shape)
+    low = close - rng.uniform(0, 2, close.shape)
+    vol = rng.uniform(1e5, 5e5, close.shape)
+    return {"open": close, "high": high, "low": low, "close": close, "vol": vol}
+
+
+def _timeit(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技术指标计算性能基准")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--sample", type=int, default=200, help="逐只计算时实际运行的股票数（结果按比例外推）")
+    args = parser.parse_args()
+
+    arrays = make_frames(args.symbols, args.bars)
+    sample = min(args.sample, args.symbols)
+    frames = [
+        pd.DataFrame({k: v[:, j] for k, v in arrays.items()})
+        for j in range(sample)
+    ]
+    scale = args.symbols / sample
+
+    print(f"📊 工作负载: {args.symbols} 只股票 × {args.bars} 根K线, {len(SPECS)} 个指标规格")
+
+    legacy = _timeit(lambda: [_legacy_compute_many(df) for df in frames]) * scale
+    print(f"  legacy (逐只, 外推)        : {legacy:8.2f}s")
+
+    single = _timeit(lambda: [compute_many(df, SPECS) for df in frames]) * scale
+    print(f"  compute_many (逐只, 外推)  : {single:8.2f}s   ({legacy / single:.1f}x)")
+
+    panel = {k: pd.DataFrame(v) for k, v in arrays.items()}
+    cross = _timeit(lambda: compute_panel(panel, SPECS))
+    print(f"  compute_panel (横截面)     : {cross:8.2f}s   ({legacy / cross:.1f}x)")
+
+    # 正确性抽查：三种方式结果一致
+    ref = _legacy_compute_many(frames[0])
+    got = compute_many(frames[0], SPECS)
+    pan = compute_panel({k: v.iloc[:, :1] for k, v in panel.items()}, SPECS)
+    for col in ["ma20", "rsi14", "boll_upper", "atr14", "kdj_k", "kdj_d", "dif"]:
+        assert np.allclose(ref[col], got[col], equal_nan=True), col
+        assert np.allclose(ref[col], pan[col][0], equal_nan=True), col
+    print("✅ 结果一致性校验通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,7 @@ class ConfigMigrator:
         self.settings_file = self.config_dir / "settings.json"
         self.pricing_file = self.config_dir / "pricing.json"
         self.usage_file = self.config_dir / "usage.json"
+        self.usage_ledger_file = self.config_dir / "usage.jsonl"
         
         # 备份目录
         self.backup_dir = self.config_dir / "backup"
@@ -98,7 +99,8 @@ class ConfigMigrator:
             self.models_file,
             self.settings_file,
             self.pricing_file,
-            self.usage_file
+            self.usage_file,
+            self.usage_ledger_file
         ]
         
         backed_up = 0
@@ -0,0 +1,100 @@
+import json
+from datetime import datetime, timedelta
+
+from tradingagents.config.runtime_settings import get_zoneinfo
+from tradingagents.config.usage_ledger import UsageLedger, get_usage_ledger
+from tradingagents.config.usage_models import UsageRecord
+
+
+def _record(days_ago=0, provider="dashscope", cost=0.5, session="s1"):
+    ts = (datetime.now(get_zoneinfo()) - timedelta(days=days_ago)).isoformat()
+    return UsageRecord(timestamp=ts, provider=provider, model_name="qwen-turbo",
+                       input_tokens=100, output_tokens=50, cost=cost, session_id=session)
+
+
+def test_append_is_buffered_and_statistics_are_incremental(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.jsonl", flush_interval=60)
+    ledger.append(_record())
+    ledger.append(_record(provider="deepseek", cost=0.25, session="s2"))
+    ledger.append(_record(days_ago=3))
+
+    # 统计立即可见，文件写入在后台
+    today = ledger.statistics(days=1)
+    assert today["total_requests"] == 2
+    assert today["total_cost"] == 0.75
+    assert set(today["provider_stats"]) == {"dashscope", "deepseek"}
+    assert ledger.statistics(days=7)["total_requests"] == 3
+    assert ledger.session_cost("s1") == 1.0
+
+    ledger.flush()
+    lines = (tmp_path / "usage.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3 and json.loads(lines[1])["provider"] == "deepseek"
+
+    # 新实例从文件重建汇总
+    reopened = UsageLedger(tmp_path / "usage.jsonl")
+    assert reopened.statistics(days=7) == ledger.statistics(days=7)
+    ledger.close()
+
+
+def test_compaction_keeps_latest_records(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.jsonl", max_records=10, flush_interval=60)
+    for i in range(16):
+        ledger.append(_record(cost=float(i)))
+        ledger.flush()
+
+    records = ledger.records()
+    assert 10 <= len(records) <= 15
+    assert records[-1].cost == 15.0
+    assert ledger.statistics(days=1)["total_requests"] == len(records)
+    ledger.close()
+
+
+def test_legacy_usage_json_is_migrated(tmp_path):
+    legacy = tmp_path / "usage.json"
+    legacy.write_text(json.dumps([vars(_record()), vars(_record(days_ago=1))]), encoding="utf-8")
+
+    ledger = UsageLedger(tmp_path / "usage.jsonl", legacy_path=legacy)
+    assert len(ledger.records()) == 2
+    assert not legacy.exists()
+    assert (tmp_path / "usage.json.migrated").exists()
+    ledger.close()
+
+
+def test_config_managers_share_one_ledger_per_file(tmp_path):
+    from tradingagents.config.config_manager import ConfigManager
+
+    first = ConfigManager(str(tmp_path))
+    second = ConfigManager(str(tmp_path))
+    assert first.usage_ledger is second.usage_ledger
+    assert get_usage_ledger(tmp_path / "usage.jsonl") is first.usage_ledger
+    assert get_usage_ledger(tmp_path / "other.jsonl") is not first.usage_ledger
+
+
+def test_ledgers_in_other_processes_share_file_and_statistics(tmp_path):
+    # 两个实例模拟 web 与 worker 进程写同一文件
+    web = UsageLedger(tmp_path / "usage.jsonl", max_records=10, flush_interval=60)
+    worker = UsageLedger(tmp_path / "usage.jsonl", max_records=10, flush_interval=60)
+
+    web.append(_record(cost=1.0))
+    web.flush()
+    worker.append(_record(cost=2.0, session="s2"))
+    worker.flush()
+
+    # 汇总包含另一进程写入的记录
+    assert web.statistics(days=1)["total_cost"] == 3.0
+    assert web.session_cost("s2") == 2.0
+
+    # worker 触发的压缩不丢失 web 已落盘的记录
+    for i in range(7):
+        web.append(_record(cost=10.0 + i))
+        web.flush()
+    for i in range(8):
+        worker.append(_record(cost=100.0 + i))
+        worker.flush()
+
+    costs = [r.cost for r in web.records()]
+    assert len(costs) <= 15
+    assert costs[-1] == 107.0 and 16.0 in costs
+    assert web.statistics(days=1)["total_requests"] == worker.statistics(days=1)["total_requests"] == len(costs)
+    web.close()
+    worker.close()
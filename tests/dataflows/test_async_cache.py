@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from tradingagents.dataflows.cache.adaptive import AdaptiveCacheSystem
+from tradingagents.dataflows.cache.async_cache import AsyncCacheFacade
+
+
+class _SyncRedis:
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+class _AsyncRedis(_SyncRedis):
+    async def get(self, key):
+        return _SyncRedis.get(self, key)
+
+    async def setex(self, key, ttl, value):
+        _SyncRedis.setex(self, key, ttl, value)
+
+
+def _adaptive(store, tmp_path):
+    adaptive = AdaptiveCacheSystem.__new__(AdaptiveCacheSystem)
+    adaptive.logger = logging.getLogger(__name__)
+    adaptive.db_manager = SimpleNamespace(get_redis_client=lambda: _SyncRedis(store))
+    adaptive.cache_dir = tmp_path
+    adaptive.cache_config = {"ttl_settings": {}}
+    adaptive.primary_backend = "redis"
+    adaptive.fallback_enabled = False
+    adaptive.dataframe_format = "pickle"
+    return adaptive
+
+
+def test_redis_backend_is_native_async_and_compatible_with_sync_cache(tmp_path):
+    store = {}
+    adaptive = _adaptive(store, tmp_path)
+    facade = AsyncCacheFacade(SimpleNamespace(use_adaptive=True, adaptive_cache=adaptive),
+                              redis_client=_AsyncRedis(store))
+    assert facade.native
+
+    async def main():
+        assert await facade.find_cached_stock_data(symbol="00700", data_source="hk_realtime_quote") is None
+        key = await facade.save_stock_data(symbol="00700", data='{"price": 1}', data_source="hk_realtime_quote")
+        found = await facade.find_cached_stock_data(symbol="00700", data_source="hk_realtime_quote")
+        return key, found, await facade.load_stock_data(found)
+
+    key, found, data = asyncio.run(main())
+
+    assert found == key and data == '{"price": 1}'
+    # 同步实现读取异步写入的数据（键和序列化格式一致）
+    assert adaptive.find_cached_data("00700", data_source="hk_realtime_quote") == key
+    assert adaptive.load_data(key) == '{"price": 1}'
+
+
+def test_file_backend_runs_on_io_executor_without_stalling_loop():
+    threads = []
+
+    class _SlowFileCache:
+        def find_cached_stock_data(self, symbol, start_date=None, end_date=None, data_source=None):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return f"{symbol}_{data_source}"
+
+    executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cache-io")
+    facade = AsyncCacheFacade(_SlowFileCache(), executor=executor)
+    assert not facade.native
+
+    async def main():
+        lag = 0.0
+
+        async def ticker():
+            nonlocal lag
+            for _ in range(10):
+                start = time.perf_counter()
+                await asyncio.sleep(0.02)
+                lag = max(lag, time.perf_counter() - start - 0.02)
+
+        results = await asyncio.gather(
+            ticker(),
+            *(facade.find_cached_stock_data(symbol=f"{i:05d}", data_source="hk") for i in range(8)),
+        )
+        return lag, results[1:]
+
+    start = time.perf_counter()
+    lag, keys = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    assert keys == [f"{i:05d}_hk" for i in range(8)]
+    assert all(name.startswith("cache-io") for name in threads)
+    assert lag < 0.1
+    assert elapsed < 0.2 * 8 / 2
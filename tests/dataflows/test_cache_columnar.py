@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+def _kline():
+    return pd.DataFrame({
+        "code": ["000001"] * 3,
+        "close": [10.0, 10.5, 10.2],
+        "volume": np.array([100, 200, 300], dtype="int64"),
+    }, index=pd.bdate_range("2024-01-02", periods=3, name="date"))
+
+
+def test_csv_format_supports_column_projection(tmp_path, monkeypatch):
+    monkeypatch.setenv("TA_CACHE_DATAFRAME_FORMAT", "csv")
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("000001", _kline(), "2024-01-01", "2024-01-31", data_source="akshare")
+
+    assert cache._load_metadata(key)["file_format"] == "csv"
+    loaded = cache.load_stock_data(key, columns=["close"])
+    assert list(loaded.columns) == ["close"]
+
+
+@pytest.mark.parametrize("fmt", ["feather", "parquet"])
+def test_columnar_round_trips_dtypes_and_projects_columns(tmp_path, monkeypatch, fmt):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("TA_CACHE_DATAFRAME_FORMAT", fmt)
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    df = _kline()
+    key = cache.save_stock_data("000001", df, "2024-01-01", "2024-01-31", data_source="akshare")
+
+    assert cache._load_metadata(key)["file_path"].endswith(f".{fmt}")
+    pd.testing.assert_frame_equal(cache.load_stock_data(key), df, check_freq=False)
+
+    projected = cache.load_stock_data(key, columns=["close"])
+    assert list(projected.columns) == ["close"]
+    assert isinstance(projected.index, pd.DatetimeIndex)
+
+
+def test_csv_entries_migrate_on_load_keeping_cached_at(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("TA_CACHE_DATAFRAME_FORMAT", "csv")
+    legacy = StockDataCache(cache_dir=str(tmp_path))
+    key = legacy.save_stock_data("000001", _kline(), "2024-01-01", "2024-01-31", data_source="akshare")
+    cached_at = legacy._load_metadata(key)["cached_at"]
+    legacy.metadata_index.close()
+
+    monkeypatch.setenv("TA_CACHE_DATAFRAME_FORMAT", "feather")
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    first = cache.load_stock_data(key)
+    meta = cache._load_metadata(key)
+
+    assert meta["file_format"] == "feather"
+    assert meta["cached_at"] == cached_at
+    assert not list(cache.china_stock_dir.glob("*.csv"))
+    pd.testing.assert_frame_equal(cache.load_stock_data(key), first)
+
+
+@pytest.mark.parametrize("fmt", ["feather", "parquet"])
+def test_mixed_type_object_column_falls_back_to_csv(tmp_path, monkeypatch, fmt):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("TA_CACHE_DATAFRAME_FORMAT", fmt)
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    df = _kline()
+    df["pe"] = [12.5, "亏损", None]  # 提供方常见：数值与文字混在同一列
+
+    key = cache.save_stock_data("000001", df, "2024-01-01", "2024-01-31", data_source="akshare")
+    meta = cache._load_metadata(key)
+
+    assert meta["file_format"] == "csv" and meta["file_path"].endswith(".csv")
+    loaded = cache.load_stock_data(key)
+    assert list(loaded["pe"].astype(str))[:2] == ["12.5", "亏损"]
+    assert list(loaded["close"]) == [10.0, 10.5, 10.2]
@@ -0,0 +1,100 @@
+import time
+
+from tradingagents.dataflows import circuit_breaker as cb_mod
+from tradingagents.dataflows.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, track_source_call,
+)
+
+
+def test_breaker_opens_on_error_rate_and_recovers_through_half_open():
+    breaker = CircuitBreaker("akshare", window_size=10, min_calls=4, error_threshold=0.5, open_seconds=0.05)
+    for ok in (True, False, False, False):
+        breaker.record(ok, 0.2)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()          # 单个探测请求
+    assert not breaker.allow_request()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("baostock", min_calls=1, error_threshold=0.5, open_seconds=0.01)
+    breaker.record(False, 1.0)
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record(False, 1.0)
+    assert breaker.state == OPEN
+
+
+def test_registry_skips_open_and_demotes_slow_sources():
+    registry = CircuitBreakerRegistry(min_calls=2, error_threshold=0.5, open_seconds=60)
+    for _ in range(3):
+        registry.record("tushare", False, 5.0)
+        registry.record("akshare", True, 25.0)
+        registry.record("baostock", True, 0.2)
+
+    assert registry.order(["tushare", "akshare", "baostock"]) == ["baostock", "akshare"]
+
+    snap = {s["name"]: s for s in registry.snapshot()}
+    assert snap["tushare"]["state"] == OPEN
+    assert snap["baostock"]["latency_p95"] == 0.2
+    assert sum(b["count"] for b in snap["akshare"]["latency_histogram"]) == 3
+
+
+def test_registry_keeps_original_order_when_everything_is_open():
+    registry = CircuitBreakerRegistry(min_calls=1, open_seconds=60)
+    registry.record("a", False, 0.1)
+    registry.record("b", False, 0.1)
+    assert registry.order(["a", "b"]) == ["a", "b"]
+
+
+def test_tracked_call_skips_fetcher_while_breaker_is_open(monkeypatch):
+    registry = CircuitBreakerRegistry(min_calls=2, error_threshold=0.5, open_seconds=60)
+    monkeypatch.setattr(cb_mod, "_registry", registry)
+    calls = []
+
+    def fetcher(symbol):
+        calls.append(symbol)
+        return "❌ 获取失败"
+
+    tracked = track_source_call("tushare", fetcher, is_ok=lambda r: "❌" not in r)
+    tracked("600519")
+    tracked("000001")
+    assert registry.get("tushare").state == OPEN
+
+    result = tracked("000858")
+    assert result.startswith("❌")
+    assert calls == ["600519", "000001"]
+    # 跳过的调用不计入窗口
+    assert registry.get("tushare").snapshot()["total_calls"] == 2
+
+
+def test_us_provider_skips_source_while_breaker_is_open(monkeypatch):
+    from types import SimpleNamespace
+
+    from tradingagents.dataflows.providers.us.optimized import OptimizedUSDataProvider
+
+    registry = CircuitBreakerRegistry(min_calls=1, error_threshold=0.5, open_seconds=60)
+    registry.record("yfinance", False, 1.0)
+    monkeypatch.setattr(cb_mod, "_registry", registry)
+
+    calls = []
+    provider = OptimizedUSDataProvider.__new__(OptimizedUSDataProvider)
+    provider.cache = SimpleNamespace(save_stock_data=lambda **kwargs: None)
+    provider.last_api_call = 0
+    provider.min_api_interval = 0
+    provider.us_manager = SimpleNamespace(_get_data_source_priority_order=lambda symbol: [
+        SimpleNamespace(value="yfinance"), SimpleNamespace(value="alpha_vantage"),
+    ])
+    provider._get_data_from_yfinance = lambda *args: calls.append("yfinance") or "yfinance data"
+    provider._get_data_from_alpha_vantage = lambda *args: calls.append("alpha_vantage") or "alpha data"
+
+    result = provider.get_stock_data("AAPL", "2024-01-01", "2024-01-31", force_refresh=True)
+
+    assert result == "alpha data"
+    assert calls == ["alpha_vantage"]
+    assert registry.get("yfinance").snapshot()["total_calls"] == 1
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.metadata_index import INDEX_FILENAME
+
+
+def _df():
+    return pd.DataFrame({"close": [10.0, 10.5]}, index=["2024-01-02", "2024-01-03"])
+
+
+def test_partial_match_lookup_uses_index(tmp_path, monkeypatch):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("000001", _df(), "2024-01-01", "2024-01-31", data_source="akshare")
+    cache.save_stock_data("000002", _df(), "2024-01-01", "2024-01-31", data_source="akshare")
+
+    # 部分匹配不应再扫描 metadata 目录
+    monkeypatch.setattr(type(cache.metadata_dir), "glob", lambda *_a, **_k: iter(()))
+    found = cache.find_cached_stock_data("000001", "2024-02-01", "2024-02-29", data_source="akshare")
+    assert found == key
+    assert cache.find_cached_stock_data("000001", data_source="tushare") is None
+    assert isinstance(cache.load_stock_data(found), pd.DataFrame)
+
+
+def test_clear_old_cache_and_stats(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    old_key = cache.save_fundamentals_data("000001", "old report", data_source="akshare")
+    new_key = cache.save_fundamentals_data("AAPL", "new report", data_source="finnhub")
+
+    old_meta = cache._load_metadata(old_key)
+    old_meta["cached_at"] = (datetime.now() - timedelta(days=30)).isoformat()
+    cache.metadata_index.upsert(old_key, old_meta, 10)
+
+    stats = cache.get_cache_stats()
+    assert stats["fundamentals_count"] == 2
+    assert stats["total_size"] == 10 + len("new report")
+
+    cache.clear_old_cache(max_age_days=7)
+    assert cache._load_metadata(old_key) is None
+    assert not (cache.metadata_dir / f"{old_key}_meta.json").exists()
+    assert cache.find_cached_fundamentals_data("AAPL") == new_key
+    assert cache.get_cache_stats()["fundamentals_count"] == 1
+
+
+def test_index_rebuilt_from_existing_metadata_files(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("AAPL", "price text", "2024-01-01", "2024-01-31", data_source="yfinance")
+    cache.metadata_index.close()
+    (cache.metadata_dir / INDEX_FILENAME).unlink()
+
+    reopened = StockDataCache(cache_dir=str(tmp_path))
+    assert reopened.metadata_index.count() == 1
+    entries = reopened.find_cache_entries("AAPL", "stock_data", "us")
+    assert [e["cache_key"] for e in entries] == [key]
+    assert json.loads((reopened.metadata_dir / f"{key}_meta.json").read_text(encoding="utf-8"))["symbol"] == "AAPL"
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from tradingagents.dataflows import hedging
+from tradingagents.dataflows.hedging import hedged_call, is_valid_result
+
+
+def _sleepy(result, delay, calls=None, name=None):
+    def _fn():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return result
+    return _fn
+
+
+def test_slow_primary_is_hedged_by_next_source():
+    start = time.time()
+    result, source = hedged_call(
+        [("akshare", _sleepy("slow data", 2.0)), ("baostock", _sleepy("fast data", 0.05))],
+        hedge_delay=0.1,
+    )
+    assert (result, source) == ("fast data", "baostock")
+    assert time.time() - start < 1.0
+
+
+def test_fast_primary_does_not_launch_fallback():
+    calls = []
+    result, source = hedged_call(
+        [("akshare", _sleepy("data", 0.01, calls, "akshare")), ("baostock", _sleepy("data", 0.01, calls, "baostock"))],
+        hedge_delay=1.0,
+    )
+    assert source == "akshare"
+    assert calls == ["akshare"]
+
+
+def test_failed_primary_starts_next_without_waiting_for_budget():
+    def _boom():
+        raise RuntimeError("down")
+
+    start = time.time()
+    result, source = hedged_call(
+        [("tushare", _boom), ("akshare", _sleepy("❌ 未获取到数据", 0.01)), ("baostock", _sleepy("data", 0.01))],
+        hedge_delay=5.0,
+    )
+    assert (result, source) == ("data", "baostock")
+    assert time.time() - start < 1.0
+
+
+def test_all_sources_invalid_returns_last_result():
+    result, source = hedged_call(
+        [("akshare", _sleepy("❌ a", 0.01)), ("baostock", _sleepy("获取错误 b", 0.01))],
+        hedge_delay=0.5,
+    )
+    assert source is None
+    assert result == "获取错误 b"
+    assert not is_valid_result(result)
+
+
+def test_source_with_full_in_flight_slots_is_not_hedged_again(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGE_MAX_IN_FLIGHT_PER_SOURCE", 2)
+    release = threading.Event()
+    stuck_calls = []
+
+    def _stuck():
+        stuck_calls.append(1)
+        release.wait(5)
+        return "late data"
+
+    try:
+        # 两次请求后 stuck 源的慢请求被丢弃但仍在运行，占满该数据源的名额
+        for _ in range(2):
+            assert hedged_call([("stuck", _stuck), ("akshare", _sleepy("data", 0.01))], hedge_delay=0.05)[1] == "akshare"
+
+        start = time.time()
+        result, source = hedged_call([("stuck", _stuck), ("akshare", _sleepy("data", 0.01))], hedge_delay=1.0)
+        assert (result, source) == ("data", "akshare")
+        assert time.time() - start < 0.5
+        assert len(stuck_calls) == 2
+
+        # 所有数据源都满时不做对冲，直接在调用线程中请求首选数据源
+        threads = []
+
+        def _inline():
+            threads.append(threading.current_thread())
+            return "inline data"
+
+        assert hedged_call([("stuck", _inline)], hedge_delay=0.05) == ("inline data", "stuck")
+        assert threads == [threading.current_thread()]
+    finally:
+        release.set()
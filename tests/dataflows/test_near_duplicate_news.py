@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from tradingagents.dataflows.news.near_duplicate import NearDuplicateDetector, dedupe_near_duplicates, publish_day
+from tradingagents.dataflows.news.realtime_news import NewsItem, RealtimeNewsAggregator
+
+WIRE_BODY = (
+    "贵州茅台晚间发布年度业绩公告，2024年公司实现营业收入1700亿元，同比增长16%；"
+    "归属于上市公司股东的净利润860亿元，同比增长15%，超出市场此前预期。"
+    "公司表示将继续推进渠道改革，并拟向全体股东每10股派发现金红利276元。"
+)
+SYNDICATED = [
+    "贵州茅台：2024年净利润同比增长15%，超市场预期。" + WIRE_BODY,
+    "贵州茅台2024年净利润同比增长15％ 超市场预期 " + WIRE_BODY.replace("，", " "),
+    "贵州茅台：2024年净利润同比增长15%，超市场预期 " + WIRE_BODY + "（来源：证券时报）",
+]
+DISTINCT = [
+    "宁德时代发布新一代钠离子电池，能量密度提升20%，预计明年实现量产，首批产品将应用于储能与两轮车市场，公司股价午后拉升。",
+    "央行宣布下调存款准备金率0.5个百分点，释放长期流动性约1万亿元，此举旨在保持银行体系流动性合理充裕，支持实体经济发展。",
+    "Apple reports record quarterly revenue of $120 billion, driven by strong iPhone sales in emerging markets and services growth.",
+    "Tesla shares fall after quarterly deliveries miss estimates as demand for electric vehicles cools in Europe and China markets.",
+]
+
+# 模板化公告标题：字符 2-gram 相似度很高，但是不同的公告
+TEMPLATED_TITLE_PAIRS = [
+    ("贵州茅台：关于召开2024年第一次临时股东大会的通知", "贵州茅台：关于召开2024年第二次临时股东大会的通知"),
+    ("贵州茅台：2024年第三季度报告", "贵州茅台：2024年半年度报告"),
+    ("贵州茅台：第四届董事会第十次会议决议公告", "贵州茅台：第四届监事会第十次会议决议公告"),
+]
+
+
+def test_syndicated_chinese_stories_cluster_together():
+    clusters = NearDuplicateDetector().cluster(SYNDICATED + DISTINCT)
+    assert clusters[0] == [0, 1, 2]
+    assert len(clusters) == 1 + len(DISTINCT)
+
+
+def test_best_representative_is_kept():
+    items = [{"title": t, "content": "x" * n} for t, n in zip(SYNDICATED, (10, 50, 20))] + [{"title": DISTINCT[0], "content": ""}]
+    result = dedupe_near_duplicates(items, text_of=lambda n: n["title"], rank_key=lambda n: len(n["content"]))
+    assert [n["title"] for n in result] == [SYNDICATED[1], DISTINCT[0]]
+
+
+def test_aggregator_dedup_merges_rewritten_wire_story():
+    now = datetime.now()
+
+    def _item(title, content, source, relevance):
+        return NewsItem(title=title, content=content, source=source, publish_time=now, url="",
+                        urgency="low", relevance_score=relevance)
+
+    items = [_item("贵州茅台：2024年净利润同比增长15%", WIRE_BODY, "新浪财经", 0.5),
+             _item("贵州茅台2024年净利润增长15%", WIRE_BODY.replace("，", " "), "东方财富", 0.9),
+             _item("茅台年报：净利润同比增长15%", WIRE_BODY + "（来源：证券时报）", "同花顺", 0.7),
+             _item("央行宣布降准0.5个百分点", DISTINCT[1], "财联社", 0.3)]
+    result = RealtimeNewsAggregator()._deduplicate_news(items)
+
+    assert [n.source for n in result] == ["东方财富", "财联社"]
+
+
+def _dedupe_for_sync(items):
+    """与 NewsDataSyncService._deduplicate_news 相同的参数（同一股票、同一天、带正文才合并）"""
+    return dedupe_near_duplicates(
+        items,
+        text_of=lambda n: f"{n.get('title') or ''} {(n.get('content') or '')[:300]}",
+        rank_key=lambda n: len(n.get("content") or ""),
+        body_of=lambda n: n.get("content") or "",
+        group_of=lambda n: (n.get("symbol"), publish_day(n.get("publish_time"))),
+    )
+
+
+def test_templated_announcement_titles_are_not_merged():
+    for first, second in TEMPLATED_TITLE_PAIRS:
+        items = [
+            {"symbol": "600519", "title": title, "content": "", "publish_time": datetime(2024, 10, 30)}
+            for title in (first, second)
+        ]
+        assert len(_dedupe_for_sync(items)) == 2, first
+        # 即使不分组，正文门槛也保证只有标题的公告不参与合并
+        assert len(dedupe_near_duplicates(items, text_of=lambda n: n["title"], body_of=lambda n: n["content"])) == 2
+
+
+def test_merges_only_same_stock_and_day():
+    base = {"content": WIRE_BODY, "publish_time": datetime(2024, 4, 2, 18, 30)}
+    items = [
+        {**base, "symbol": "600519", "title": "贵州茅台年度业绩超预期", "url": "a"},
+        {**base, "symbol": "600519", "title": "茅台年度业绩超预期", "url": "b"},
+        {**base, "symbol": "000858", "title": "茅台年度业绩超预期", "url": "c"},
+        {**base, "symbol": "600519", "title": "茅台年度业绩超预期", "url": "d", "publish_time": "2024-04-03 09:00:00"},
+    ]
+    assert [n["url"] for n in _dedupe_for_sync(items)] == ["a", "c", "d"]
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tradingagents.config.runtime_settings import get_timezone_name
+from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
+
+
+def _stub_server(payload, delay=0.0):
+    """本地 HTTP 服务，模拟一个新闻源"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps(payload).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+@pytest.fixture
+def feeds():
+    now = int(time.time())
+    finnhub, finnhub_url = _stub_server([{"headline": "AAPL beats earnings", "summary": "", "datetime": now, "url": "u1"}])
+    av, av_url = _stub_server({"feed": [{"title": "Apple launches product", "summary": "",
+                                         "time_published": datetime.now(ZoneInfo(get_timezone_name())).strftime("%Y%m%dT%H%M%S")}]})
+    newsapi, newsapi_url = _stub_server({"articles": [{"title": "Slow feed story", "publishedAt": "2030-01-01T00:00:00Z"}]},
+                                        delay=3.0)
+    yield {"finnhub": finnhub_url, "av": av_url, "newsapi": newsapi_url}
+    for server in (finnhub, av, newsapi):
+        server.shutdown()
+
+
+def _aggregator(feeds, monkeypatch, concurrent=True, budget=1.0):
+    for key in ("FINNHUB_API_KEY", "ALPHA_VANTAGE_API_KEY", "NEWSAPI_KEY"):
+        monkeypatch.setenv(key, "test")
+    agg = RealtimeNewsAggregator()
+    agg.finnhub_url, agg.alpha_vantage_url, agg.newsapi_url = feeds["finnhub"], feeds["av"], feeds["newsapi"]
+    agg.concurrent_fetch = concurrent
+    agg.total_budget = budget
+    agg.source_timeout = 5.0
+    agg._get_chinese_finance_news = lambda *_a, **_k: []
+    agg._get_chinese_financial_media_news = lambda *_a, **_k: []
+    return agg
+
+
+def test_concurrent_fetch_returns_partial_results_within_budget(feeds, monkeypatch):
+    agg = _aggregator(feeds, monkeypatch, budget=1.0)
+
+    start = time.time()
+    news = agg.get_realtime_stock_news("AAPL", hours_back=6, max_news=10)
+    elapsed = time.time() - start
+
+    assert elapsed < 2.0
+    assert {n.title for n in news} == {"AAPL beats earnings", "Apple launches product"}
+
+    stats = agg.get_source_stats()
+    assert stats["NewsAPI"]["timeouts"] == 1
+    assert stats["FinnHub"]["timeouts"] == 0 and stats["FinnHub"]["items"] == 1
+    assert stats["Alpha Vantage"]["last_latency"] < 1.0
+
+
+def test_sequential_mode_waits_for_every_source(feeds, monkeypatch):
+    agg = _aggregator(feeds, monkeypatch, concurrent=False)
+
+    news = agg.get_realtime_stock_news("AAPL", hours_back=6, max_news=10)
+
+    assert "Slow feed story" in {n.title for n in news}
+    assert agg.get_source_stats()["NewsAPI"]["last_latency"] >= 3.0
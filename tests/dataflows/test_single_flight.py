@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from tradingagents.dataflows.single_flight import SingleFlight, single_flight
+
+
+class _Provider:
+    def __init__(self, delay=0.2, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+        self.source = "akshare"
+        self._lock = threading.Lock()
+
+    @single_flight("test.stock_data", scope=lambda self: self.source, clone=list)
+    def get_stock_data(self, symbol, start_date=None, end_date=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [symbol, start_date, end_date]
+
+
+def _run_concurrently(fn, n=5):
+    results, errors = [None] * n, [None] * n
+    barrier = threading.Barrier(n)
+
+    def _worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_identical_concurrent_calls_execute_once():
+    provider = _Provider()
+    # 位置参数与关键字参数写法不同，但规范化后是同一请求
+    calls = [
+        lambda: provider.get_stock_data("000001", "2024-01-01", "2024-01-31"),
+        lambda: provider.get_stock_data("000001", start_date="2024-01-01", end_date="2024-01-31"),
+    ]
+    results, errors = _run_concurrently(lambda: calls[threading.get_ident() % 2](), n=6)
+
+    assert errors == [None] * 6
+    assert provider.calls == 1
+    assert all(r == ["000001", "2024-01-01", "2024-01-31"] for r in results)
+    # 等待者拿到的是副本，互不影响
+    assert len({id(r) for r in results}) == 6
+
+
+def test_different_arguments_or_source_are_not_coalesced():
+    provider = _Provider(delay=0.1)
+    other = _Provider(delay=0.1)
+    other.source = "baostock"
+
+    fns = [
+        lambda: provider.get_stock_data("000001", "2024-01-01", "2024-01-31"),
+        lambda: provider.get_stock_data("000002", "2024-01-01", "2024-01-31"),
+        lambda: provider.get_stock_data("000001", "2024-02-01", "2024-02-29"),
+        lambda: other.get_stock_data("000001", "2024-01-01", "2024-01-31"),
+    ]
+    barrier = threading.Barrier(len(fns))
+    threads = [threading.Thread(target=lambda f=f: (barrier.wait(), f())) for f in fns]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert provider.calls == 3
+    assert other.calls == 1
+
+
+def test_leader_error_is_shared_with_waiters():
+    provider = _Provider(error=RuntimeError("down"))
+    results, errors = _run_concurrently(lambda: provider.get_stock_data("000001"), n=4)
+
+    assert provider.calls == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # 失败后不缓存，下一次调用重新执行
+    with pytest.raises(RuntimeError):
+        provider.get_stock_data("000001")
+    assert provider.calls == 2
+
+
+def test_reentrant_call_in_same_thread_does_not_deadlock():
+    group = SingleFlight()
+
+    def _outer():
+        return group.do("k", lambda: "inner")[0] + "+outer"
+
+    assert group.do("k", _outer) == ("inner+outer", False)
+    assert group.in_flight() == 0
@@ -0,0 +1,89 @@
+import asyncio
+
+from app.core.config_snapshot import SystemConfigSnapshot
+
+
+class _Collection:
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = []
+
+    def find_one(self, query, projection=None, sort=None):
+        self.calls.append("version" if projection else "full")
+        if projection:
+            return {"version": self.doc["version"]}
+        return dict(self.doc)
+
+
+class _AsyncCollection(_Collection):
+    async def find_one(self, query, projection=None, sort=None):
+        return _Collection.find_one(self, query, projection, sort)
+
+
+class _DB:
+    def __init__(self, collection):
+        self.system_configs = collection
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_snapshot_serves_reads_without_io_until_invalidated():
+    collection = _Collection({"version": 3, "data_source_configs": [{"type": "akshare"}]})
+    snapshot = SystemConfigSnapshot(max_age_seconds=30, clock=_Clock())
+    db = _DB(collection)
+
+    assert snapshot.get_sync(db)["version"] == 3
+    for _ in range(100):
+        snapshot.get_sync(db)
+    assert collection.calls == ["full"]
+
+    # 旧版本的通知被忽略，新版本的通知触发重新加载
+    snapshot.invalidate(3)
+    snapshot.get_sync(db)
+    assert collection.calls == ["full"]
+
+    collection.doc = {"version": 4, "data_source_configs": []}
+    snapshot.invalidate(4)
+    assert snapshot.get_sync(db)["version"] == 4
+    assert collection.calls == ["full", "full"]
+
+
+def test_snapshot_revalidates_by_version_after_max_age():
+    clock = _Clock()
+    collection = _Collection({"version": 1})
+    snapshot = SystemConfigSnapshot(max_age_seconds=30, clock=clock)
+    db = _DB(collection)
+    snapshot.get_sync(db)
+
+    clock.now = 31
+    snapshot.get_sync(db)
+    assert collection.calls == ["full", "version"]
+
+    # 脚本直接改库（无通知）：到期校验发现版本变化后整体重新加载
+    collection.doc = {"version": 2}
+    clock.now = 62
+    assert snapshot.get_sync(db)["version"] == 2
+    assert collection.calls == ["full", "version", "version", "full"]
+
+
+def test_async_read_shares_snapshot_and_keeps_old_copy_on_error():
+    collection = _AsyncCollection({"version": 5})
+    snapshot = SystemConfigSnapshot(max_age_seconds=30, clock=_Clock())
+
+    assert asyncio.run(snapshot.get(_DB(collection)))["version"] == 5
+    # 同步读取直接命中异步加载的快照
+    assert snapshot.get_sync(_DB(None))["version"] == 5
+
+    class _Broken:
+        @property
+        def system_configs(self):
+            raise RuntimeError("mongo down")
+
+    snapshot.invalidate()
+    assert snapshot.get_sync(_Broken())["version"] == 5
@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.services.historical_data_service import AdaptiveBatchSizer, HistoricalDataService
+
+
+def _row_docs(service, symbol, df, market="CN"):
+    return [
+        service._standardize_record(symbol, row, "akshare", market, "daily", idx)
+        for idx, row in df.iterrows()
+    ]
+
+
+def _strip_times(docs):
+    return [{k: v for k, v in d.items() if k not in ("created_at", "updated_at")} for d in docs]
+
+
+def test_vectorized_documents_match_row_path():
+    service = HistoricalDataService()
+    df = pd.DataFrame({
+        "date": ["20240102", "2024-01-03", None],
+        "trade_date": ["20240101", "20240101", "20240104"],
+        "open": [10.0, 10.2, 10.4],
+        "high": [10.5, 10.6, 10.9],
+        "low": [9.8, 10.0, 10.1],
+        "close": [10.2, 10.4, 10.8],
+        "pre_close": [10.0, np.nan, 10.4],
+        "change": [None, 0.2, None],
+        "pct_chg": [None, 1.96, None],
+        "volume": [1000, 1500, 1200],
+        "amount": ["1.2e6", "1.5e6", "bad"],
+        "turn": [0.5, 0.6, 0.7],
+        "pe": [12.0, None, 12.5],
+    })
+
+    vectorized = service._build_documents_vectorized("600000", df, "akshare", "CN", "daily")
+    assert _strip_times(vectorized) == _strip_times(_row_docs(service, "600000", df))
+    assert vectorized[0]["full_symbol"] == "600000.SH"
+    assert vectorized[1]["pre_close"] is None and vectorized[1]["change"] == 0.2
+
+
+def test_datetime_index_is_used_when_no_date_column():
+    service = HistoricalDataService()
+    df = pd.DataFrame(
+        {"close": [1.0, 1.1], "pre_close": [0.9, 1.0]},
+        index=pd.to_datetime(["2024-03-01", "2024-03-04"]),
+    )
+
+    docs = service._build_documents("00700", df, "yfinance", "HK")
+    assert [d["trade_date"] for d in docs] == ["2024-03-01", "2024-03-04"]
+    assert "turnover_rate" not in docs[0]
+    assert docs[0]["pct_chg"] == 11.1111
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def bulk_write(self, ops, ordered=False):
+        self.batches.append(len(ops))
+
+        class _Result:
+            upserted_count = len(ops)
+            modified_count = 0
+
+        return _Result()
+
+
+def test_save_many_writes_multiple_symbols_per_batch():
+    service = HistoricalDataService()
+    service.collection = _FakeCollection()
+    frames = {
+        code: pd.DataFrame({"trade_date": ["20240102", "20240103"], "close": [1.0, 1.1], "vol": [10, 20]})
+        for code in ("000001", "000002", "600000")
+    }
+    frames["000003"] = pd.DataFrame()
+
+    saved = asyncio.run(service.save_historical_data_many(frames, "tushare"))
+
+    assert saved == 6
+    assert service.collection.batches == [6]
+    assert frames["000001"]["vol"].tolist() == [1000, 2000]  # 手 -> 股
+
+
+def test_adaptive_batch_sizer():
+    sizer = AdaptiveBatchSizer(initial=400, minimum=200, maximum=1600, target_seconds=2.0)
+    sizer.record(400, 0.5)
+    assert sizer.size == 800
+    sizer.record(100, 0.1)  # 未写满不扩大
+    assert sizer.size == 800
+    sizer.record(800, 5.0)
+    assert sizer.size == 400
+    for _ in range(5):
+        sizer.record(sizer.size, 9.0)
+    assert sizer.size == 200
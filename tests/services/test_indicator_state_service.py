@@ -0,0 +1,66 @@
+"""
+增量指标状态服务：指标快照文档与全市场增量推进
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def test_snapshot_doc_stores_latest_values_without_nan():
+    from app.services.indicator_state_service import snapshot_doc
+    from tradingagents.tools.analysis.streaming import IndicatorState
+
+    df = pd.DataFrame({
+        "trade_date": pd.date_range("2024-01-01", periods=5).strftime("%Y-%m-%d"),
+        "high": np.arange(5) + 11.0, "low": np.arange(5) + 9.0, "close": np.arange(5) + 10.0,
+    })
+    state = IndicatorState.from_history(df)
+    doc = snapshot_doc("000001", state, "akshare", datetime(2024, 1, 6))
+
+    assert doc["code"] == "000001"
+    assert doc["trade_date"] == "2024-01-05"
+    assert doc["close"] == 14.0
+    assert doc["ma5"] == 12.0
+    assert doc["ma20"] == 12.0  # min_periods=1
+    # 窗口未满的指标存为 None，范围查询不会命中
+    assert doc["atr14"] is None
+    assert doc["kdj_k"] is None
+
+
+def test_advance_market_loads_bars_per_last_trade_date():
+    from app.services.indicator_state_service import IndicatorStateService
+    from tradingagents.tools.analysis.streaming import IndicatorState
+
+    def _state(last_trade_date):
+        state = IndicatorState()
+        state.last_trade_date = last_trade_date
+        return state
+
+    class _Quotes:
+        def __init__(self):
+            self.queries = []
+
+        def find(self, query, _projection=None, batch_size=None):
+            self.queries.append(query)
+            return []
+
+        def distinct(self, _field, _query):
+            return ["000001", "000002", "600000"]
+
+    quotes = _Quotes()
+    svc = IndicatorStateService(db={"stock_daily_quotes": quotes})
+    svc.load_states = lambda symbols, period: (
+        {"000001": _state("2024-06-28"), "000002": _state("2024-01-05"), "600000": _state("2024-06-28")},
+        {"000001": "tushare", "000002": "tushare", "600000": "tushare"},
+    )
+
+    stats = svc.advance_market(end_date="2024-07-01")
+
+    # 停牌股（000002）单独从自己的日期开始读取，不会让其他股票回读半年K线
+    ranges = {tuple(q["symbol"]["$in"]): q["trade_date"] for q in quotes.queries}
+    assert ranges == {
+        ("000002",): {"$gt": "2024-01-05", "$lte": "2024-07-01"},
+        ("000001", "600000"): {"$gt": "2024-06-28", "$lte": "2024-07-01"},
+    }
+    assert stats["advanced"] == 0 and stats["bars"] == 0
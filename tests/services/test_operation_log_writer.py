@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from app.services import operation_log_writer as writer_mod
+from app.services.operation_log_writer import OperationLogWriter
+
+
+class _SlowCollection:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.batches.append(list(docs))
+
+
+def _patch_db(monkeypatch, collection):
+    monkeypatch.setattr(writer_mod, "get_mongo_db", lambda: {"operation_logs": collection})
+
+
+def test_submit_does_not_wait_for_mongodb_and_batches_writes(monkeypatch):
+    collection = _SlowCollection(delay=0.2)
+    _patch_db(monkeypatch, collection)
+
+    async def main():
+        writer = OperationLogWriter(max_queue_size=100, batch_size=10, flush_interval=0.05)
+        writer.start()
+        start = time.perf_counter()
+        for i in range(25):
+            assert writer.submit({"i": i})
+        submit_time = time.perf_counter() - start
+        await asyncio.sleep(0.1)
+        await writer.stop()
+        return submit_time, writer.get_stats()
+
+    submit_time, stats = asyncio.run(main())
+
+    assert submit_time < 0.05  # 与 MongoDB 写入耗时（0.2s/批）无关
+    assert sorted(d["i"] for batch in collection.batches for d in batch) == list(range(25))
+    assert max(len(b) for b in collection.batches) == 10
+    assert stats["written"] == 25 and stats["dropped"] == 0 and stats["pending"] == 0
+
+
+def test_full_queue_drops_and_counts(monkeypatch):
+    collection = _SlowCollection(delay=0)
+    _patch_db(monkeypatch, collection)
+
+    async def main():
+        writer = OperationLogWriter(max_queue_size=5, batch_size=100, flush_interval=10)
+        accepted = [writer.submit({"i": i}) for i in range(8)]
+        await writer.stop()
+        return accepted, writer.get_stats()
+
+    accepted, stats = asyncio.run(main())
+
+    assert accepted.count(False) == 3
+    assert stats["dropped"] == 3
+    # 关闭时写出队列中剩余的日志
+    assert stats["written"] == 5
+
+
+def test_stop_waits_for_in_flight_batch(monkeypatch):
+    collection = _SlowCollection(delay=0.2)
+    _patch_db(monkeypatch, collection)
+
+    async def main():
+        writer = OperationLogWriter(max_queue_size=100, batch_size=10, flush_interval=0.01)
+        writer.start()
+        for i in range(3):
+            writer.submit({"i": i})
+        await asyncio.sleep(0.05)  # 批量写入已开始
+        await writer.stop()
+        # stop() 返回时写入已经完成（之后关闭 MongoDB 连接不会丢失这一批）
+        return list(collection.batches), writer.get_stats()
+
+    batches, stats = asyncio.run(main())
+
+    assert [d["i"] for batch in batches for d in batch] == [0, 1, 2]
+    assert stats["written"] == 3
@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.services.quote_snapshot import QuoteSnapshot, TradeDateCache, build_quote_batch, quote_rows
+
+
+def _quotes(close_000001=10.0):
+    return {
+        "000001": {"close": close_000001, "pct_chg": 0.5, "amount": 1.0e8, "volume": 1000},
+        "600000": {"close": 9.8, "pct_chg": None, "amount": 7.5e7, "volume": 800},
+    }
+
+
+def test_only_changed_quotes_are_reported():
+    snap = QuoteSnapshot(capacity=1)  # 触发扩容
+    quotes = _quotes()
+    codes = list(quotes)
+    rows = quote_rows(list(quotes.values()))
+
+    assert snap.diff(codes, rows, "20240105").tolist() == [True, True]
+    snap.update(codes, rows, "20240105")
+
+    # 价格不变（包括 None 字段）→ 不需要写入
+    assert snap.diff(codes, rows, "20240105").tolist() == [False, False]
+
+    changed = _quotes(close_000001=10.1)
+    new_rows = quote_rows(list(changed.values()))
+    assert snap.diff(codes, new_rows, "20240105").tolist() == [True, False]
+
+    # 交易日变化时全部写入
+    assert snap.diff(codes, rows, "20240108").tolist() == [True, True]
+
+
+def test_new_codes_and_clear():
+    snap = QuoteSnapshot()
+    snap.update(["000001"], quote_rows([{"close": 10.0}]), "20240105")
+
+    mask = snap.diff(["000001", "300750"], quote_rows([{"close": 10.0}, {"close": 200.0}]), "20240105")
+    assert mask.tolist() == [False, True]
+
+    snap.clear()
+    assert len(snap) == 0
+    assert snap.diff(["000001"], quote_rows([{"close": 10.0}]), "20240105").all()
+
+
+def test_quote_rows_coerces_invalid_values_to_nan():
+    rows = quote_rows([{"close": "10.5", "volume": "n/a"}])
+    assert rows[0, 0] == 10.5
+    assert np.isnan(rows[0, 3])
+
+
+def test_build_quote_batch_normalizes_codes():
+    quotes = {"sz000001": {"close": 10.0}, "": {"close": 1.0}, "bad": {"close": 2.0}, "600000": {"close": 9.8}}
+    digits = lambda code: "".join(filter(str.isdigit, code))  # noqa: E731
+    batch = build_quote_batch(quotes, lambda code: digits(code).zfill(6) if digits(code) else "", "akshare_sina")
+
+    assert batch.codes == ["000001", "600000"]
+    assert len(batch) == 2
+    assert batch.rows[:, 0].tolist() == [10.0, 9.8]
+    assert batch.source == "akshare_sina"
+
+
+def test_trade_date_cache_expires_on_ttl_and_day_change():
+    now = [0.0]
+    cache = TradeDateCache(ttl_seconds=60, clock=lambda: now[0])
+    assert cache.get("20240105") is None
+
+    cache.put("20240105", "20240105")
+    now[0] = 59
+    assert cache.get("20240105") == "20240105"
+    assert cache.get("20240106") is None  # 跨自然日失效
+
+    now[0] = 60
+    assert cache.get("20240105") is None
@@ -133,3 +133,46 @@ def test_quotes_ingestion_run_once_writes_bulk(monkeypatch):
     import asyncio
     asyncio.run(_run())
 
+
+
+def test_unchanged_quotes_only_refresh_updated_at(monkeypatch):
+    import asyncio
+
+    from pymongo import UpdateMany, UpdateOne
+
+    from app.services.quote_snapshot import build_quote_batch
+    from app.services.quotes_ingestion_service import QuotesIngestionService
+    import app.services.quotes_ingestion_service as qis_mod
+
+    class _FakeResult:
+        matched_count = modified_count = 0
+        upserted_ids = None
+
+    class _FakeColl:
+        def __init__(self):
+            self.batches = []
+
+        async def bulk_write(self, ops, ordered=False):
+            self.batches.append(ops)
+            return _FakeResult()
+
+    coll = _FakeColl()
+    monkeypatch.setattr(qis_mod, "get_mongo_db", lambda: {"market_quotes": coll}, raising=True)
+    monkeypatch.setattr(qis_mod.settings, "QUOTES_DELTA_UPSERT_ENABLED", True, raising=False)
+    monkeypatch.setattr(qis_mod.settings, "QUOTES_FULL_REFRESH_SECONDS", 3600, raising=False)
+
+    svc = QuotesIngestionService()
+    quotes = {"000001": {"close": 10.1}, "600000": {"close": 9.8}}
+
+    async def _run():
+        await svc._write_batch(build_quote_batch(quotes, svc._normalize_stock_code, "fake"), "20240105")
+        quotes["000001"] = {"close": 10.2}
+        await svc._write_batch(build_quote_batch(quotes, svc._normalize_stock_code, "fake"), "20240105")
+
+    asyncio.run(_run())
+
+    ops = coll.batches[-1]
+    assert [type(op) for op in ops] == [UpdateOne, UpdateMany]
+    assert ops[0]._filter == {"code": "000001"}
+    assert ops[1]._filter == {"code": {"$in": ["600000"]}}
+    assert list(ops[1]._doc["$set"]) == ["updated_at"]
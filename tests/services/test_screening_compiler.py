@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from app.services.screening.compiler import compile_conditions, condition_key
+
+
+FIELDS = {"close", "ma5", "ma20", "rsi14", "kdj_k", "kdj_d"}
+OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
+
+
+def test_plan_is_cached_by_condition_hash():
+    a = {"logic": "AND", "children": [{"field": "close", "op": ">", "value": 10}]}
+    b = {"children": [{"value": 10, "op": ">", "field": "close"}], "logic": "AND"}
+
+    plan_a = compile_conditions(a, FIELDS, OPS)
+    plan_b = compile_conditions(b, FIELDS, OPS)
+
+    assert condition_key(a) == condition_key(b)
+    assert plan_a is plan_b
+
+
+def test_plan_fields_lookback_and_constant_folding():
+    cond = {"logic": "AND", "children": [
+        {"field": "kdj_k", "op": "cross_up", "right_field": "kdj_d"},
+        {"field": "rsi14", "op": "between", "value": [30, 70]},
+        {"field": "unknown", "op": ">", "value": 1},  # 非法字段 -> False
+    ]}
+    plan = compile_conditions(cond, FIELDS, OPS)
+    assert plan.fields == ()
+    assert plan.evaluate_row({"rsi14": 50}) is False
+
+    cond["children"].pop()
+    plan = compile_conditions(cond, FIELDS, OPS)
+    # 便宜的谓词排在前面
+    assert plan.fields == ("rsi14", "kdj_k", "kdj_d")
+    assert plan.lookback == 2
+
+    assert compile_conditions({}, FIELDS, OPS).evaluate_frame(pd.DataFrame()) is True
+    assert compile_conditions({"logic": "OR", "children": []}, FIELDS, OPS).evaluate_row({}) is False
+
+
+def test_plan_row_frame_and_panel_agree():
+    cond = {"logic": "OR", "children": [
+        {"field": "close", "op": ">", "right_field": "ma20"},
+        {"logic": "AND", "children": [
+            {"field": "kdj_k", "op": "cross_down", "right_field": "kdj_d"},
+            {"field": "ma5", "op": "!=", "value": 3},
+        ]},
+    ]}
+    plan = compile_conditions(cond, FIELDS, OPS)
+
+    rng = np.random.default_rng(7)
+    frames = {}
+    for i in range(40):
+        df = pd.DataFrame(rng.uniform(0, 10, size=(2, 5)), columns=["close", "ma5", "ma20", "kdj_k", "kdj_d"])
+        df.iloc[rng.integers(0, 2), rng.integers(0, 5)] = np.nan
+        frames[f"{i:06d}"] = df
+
+    t0 = pd.DataFrame({c: df.iloc[-1] for c, df in frames.items()}).T
+    t1 = pd.DataFrame({c: df.iloc[-2] for c, df in frames.items()}).T
+    mask = plan.evaluate_panel(t0, t1)
+
+    for i, (code, df) in enumerate(frames.items()):
+        assert plan.evaluate_frame(df) == mask[i]
+        assert plan.evaluate_row(df.iloc[-1].to_dict(), df.iloc[-2].to_dict()) == mask[i]
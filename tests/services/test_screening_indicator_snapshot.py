@@ -0,0 +1,183 @@
+import asyncio
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+    def sort(self, *_args, **_kwargs):
+        return self
+    def skip(self, *_args, **_kwargs):
+        return self
+    def limit(self, *_args, **_kwargs):
+        return self
+    async def __aiter__(self):
+        for d in self._docs:
+            yield dict(d)
+
+
+_OPS = {
+    "$lt": lambda a, b: a is not None and a < b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$in": lambda a, b: a in b,
+    "$ne": lambda a, b: a != b,
+}
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if not all(_OPS[op](value, arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _FakeColl:
+    def __init__(self, docs, match=False):
+        self._docs = docs
+        self._match = match
+        self.queries = []
+    def _select(self, query):
+        return [d for d in self._docs if _matches(d, query)] if self._match else self._docs
+    async def count_documents(self, query):
+        self.queries.append(query)
+        return len(self._select(query))
+    async def estimated_document_count(self):
+        return len(self._docs)
+    async def find_one(self, query, _projection=None, sort=None):
+        docs = [d for d in self._docs if _matches(d, query)]
+        if sort:
+            (key, direction), = sort
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+    def find(self, query, _projection=None):
+        self.queries.append(query)
+        return _FakeCursor(self._select(query))
+
+
+class _FakeDB:
+    def __init__(self, collections):
+        self._collections = collections
+    def __getitem__(self, name: str):
+        return self._collections.setdefault(name, _FakeColl([]))
+
+
+def test_technical_conditions_pushed_down_to_snapshot(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    view = _FakeColl([{"code": "000001", "name": "平安银行", "source": "akshare"}])
+    snapshot = _FakeColl([{"code": "000001", "trade_date": "2024-07-01", "rsi14": 25.5, "kdj_k": 18.0}])
+    db = _FakeDB({"stock_screening_view": view, "stock_indicator_snapshot": snapshot})
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: db, raising=True)
+
+    conditions = [
+        {"field": "rsi14", "operator": "<", "value": 30},
+        {"field": "pe", "operator": "between", "value": [0, 20]},
+    ]
+
+    async def _run():
+        svc = DatabaseScreeningService()
+        assert await svc.can_handle_conditions(conditions)
+        items, total = await svc.screen_stocks(conditions=conditions, source="akshare")
+
+        # 技术条件查询指标快照，视图只按候选代码 + 基础条件过滤
+        assert snapshot.queries[0] == {"rsi14": {"$lt": 30}, "trade_date": "2024-07-01"}
+        view_query = view.queries[0]
+        assert view_query["code"] == {"$in": ["000001"]}
+        assert view_query["pe"] == {"$gte": 0, "$lte": 20}
+        assert "rsi14" not in view_query
+
+        assert total == 1
+        assert items[0]["rsi14"] == 25.5
+        assert items[0]["kdj_k"] == 18.0
+
+    asyncio.run(_run())
+
+
+def test_stale_snapshot_rows_are_not_matched_or_reported(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    view = _FakeColl([
+        {"code": "000001", "name": "平安银行", "source": "akshare"},
+        {"code": "000002", "name": "万科A", "source": "akshare"},
+        {"code": "600000", "name": "浦发银行", "source": "akshare"},
+    ], match=True)
+    # 000002 已停牌：快照停留在旧交易日
+    snapshot = _FakeColl([
+        {"code": "000001", "trade_date": "2024-07-01", "rsi14": 25.5},
+        {"code": "000002", "trade_date": "2024-03-15", "rsi14": 12.0},
+        {"code": "600000", "trade_date": "2024-07-01", "rsi14": 55.0},
+    ], match=True)
+    db = _FakeDB({"stock_screening_view": view, "stock_indicator_snapshot": snapshot})
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: db, raising=True)
+
+    async def _run():
+        svc = DatabaseScreeningService()
+        items, total = await svc.screen_stocks(
+            conditions=[{"field": "rsi14", "operator": "<", "value": 30}], source="akshare"
+        )
+        assert total == 1
+        assert [i["code"] for i in items] == ["000001"]
+
+        # 基础条件筛选时，过期快照的指标值不回显
+        items, total = await svc.screen_stocks(conditions=[], source="akshare")
+        assert total == 3
+        rsi = {i["code"]: i.get("rsi14") for i in items}
+        assert rsi == {"000001": 25.5, "000002": None, "600000": 55.0}
+
+    asyncio.run(_run())
+
+
+def test_order_by_technical_field_sorts_through_snapshot(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    view = _FakeColl([
+        {"code": code, "name": code, "source": "akshare", "total_mv": mv}
+        for code, mv in (("000001", 300.0), ("000002", 200.0), ("600000", 100.0), ("600036", 50.0))
+    ], match=True)
+    snapshot = _FakeColl([
+        {"code": "000001", "trade_date": "2024-07-01", "rsi14": 40.0},
+        {"code": "000002", "trade_date": "2024-07-01", "rsi14": 70.0},
+        {"code": "600000", "trade_date": "2024-07-01", "rsi14": 20.0},
+    ], match=True)
+    db = _FakeDB({"stock_screening_view": view, "stock_indicator_snapshot": snapshot})
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: db, raising=True)
+
+    async def _run():
+        svc = DatabaseScreeningService()
+        order_by = [{"field": "rsi14", "direction": "desc"}]
+        assert await svc.can_handle_conditions([], order_by)
+
+        first, total = await svc.screen_stocks(conditions=[], order_by=order_by, limit=2, source="akshare")
+        second, _ = await svc.screen_stocks(conditions=[], order_by=order_by, limit=2, offset=2, source="akshare")
+        assert total == 4
+        # 按 RSI 降序分页，没有快照的股票排在最后
+        assert [i["code"] for i in first + second] == ["000002", "000001", "600000", "600036"]
+        assert [i.get("rsi14") for i in first] == [70.0, 40.0]
+
+        asc, _ = await svc.screen_stocks(
+            conditions=[{"field": "rsi14", "operator": "<", "value": 50}],
+            order_by=[{"field": "rsi14", "direction": "asc"}], source="akshare",
+        )
+        assert [i["code"] for i in asc] == ["600000", "000001"]
+
+    asyncio.run(_run())
+
+
+def test_technical_conditions_not_handled_without_snapshot(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: _FakeDB({}), raising=True)
+
+    async def _run():
+        svc = DatabaseScreeningService()
+        assert not await svc.can_handle_conditions([{"field": "ma20", "operator": ">", "value": 10}])
+        assert await svc.can_handle_conditions([{"field": "pe", "operator": ">", "value": 10}])
+
+    asyncio.run(_run())
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from app.services.screening.eval_utils import evaluate_conditions, evaluate_conditions_mask
+from app.services.screening.panel import build_panel, panel_row
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many, compute_panel
+
+
+SPECS = [
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+FIELDS = {"close", "pct_chg", "ma20", "dif", "dea", "macd_hist", "rsi14", "kdj_k", "kdj_d", "kdj_j"}
+OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
+
+CONDITIONS = {
+    "logic": "OR",
+    "children": [
+        {"field": "close", "op": ">", "right_field": "ma20"},
+        {"field": "kdj_k", "op": "cross_up", "right_field": "kdj_d"},
+        {"logic": "AND", "children": [
+            {"field": "rsi14", "op": "between", "value": [30, 70]},
+            {"field": "macd_hist", "op": ">", "value": 0},
+        ]},
+    ],
+}
+
+
+def _make_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, n)) + 50
+    return pd.DataFrame({
+        "trade_date": pd.bdate_range("2025-01-01", periods=n).strftime("%Y-%m-%d"),
+        "open": close,
+        "high": close + rng.uniform(0, 1, n),
+        "low": close - rng.uniform(0, 1, n),
+        "close": close,
+        "volume": rng.integers(1000, 5000, n).astype(float),
+        "amount": close * 1000,
+    })
+
+
+def test_build_panel_right_aligns_and_prefers_source():
+    bars = {"000001": _make_bars(5, 1), "600000": _make_bars(3, 2)}
+    records = pd.concat([b.assign(symbol=c, data_source="akshare") for c, b in bars.items()], ignore_index=True)
+    records = pd.concat([records, records.assign(data_source="baostock", close=1.0)], ignore_index=True)
+
+    panel = build_panel(records)
+
+    assert panel.codes == ["000001", "600000"]
+    close = panel.fields["close"]
+    assert close.shape == (5, 2)
+    assert close["600000"].isna().sum() == 2
+    assert close["600000"].iloc[-1] == bars["600000"]["close"].iloc[-1]
+    assert panel.last_trade_date["000001"] == bars["000001"]["trade_date"].iloc[-1]
+    # 600000 的最新K线早于面板最新交易日（停牌）
+    assert panel.current_mask().tolist() == [True, False]
+
+
+def test_panel_mask_matches_per_symbol_evaluation():
+    bars = {f"{i:06d}": _make_bars(1 + i * 6, seed=i) for i in range(0, 15)}
+    records = pd.concat([b.assign(symbol=c, data_source="akshare") for c, b in bars.items()], ignore_index=True)
+
+    panel = build_panel(records)
+    fields = dict(panel.fields)
+    fields["pct_chg"] = (fields["close"] / fields["close"].shift(1) - 1.0) * 100.0
+    fields = compute_panel(fields, SPECS)
+    mask = evaluate_conditions_mask(
+        panel_row(fields, panel.codes, -1), panel_row(fields, panel.codes, -2), CONDITIONS, FIELDS, OPS
+    )
+
+    expected = []
+    for code in panel.codes:
+        df = bars[code].rename(columns={"volume": "vol"})
+        df["pct_chg"] = df["close"].pct_change() * 100.0
+        expected.append(evaluate_conditions(compute_many(df, SPECS), CONDITIONS, FIELDS, OPS))
+
+    assert mask.tolist() == expected
+    assert 0 < mask.sum() < len(mask)
+
+
+def test_mask_leaf_edge_cases():
+    t0 = pd.DataFrame({"close": [10.0, np.nan, 5.0]}, index=["a", "b", "c"])
+    assert evaluate_conditions_mask(t0, None, {}, FIELDS, OPS).tolist() == [True, True, True]
+    assert evaluate_conditions_mask(t0, None, {"field": "close", "op": "!=", "value": 5}, FIELDS, OPS).tolist() == [True, False, False]
+    assert evaluate_conditions_mask(t0, None, {"field": "close", "op": "between", "value": [1]}, FIELDS, OPS).tolist() == [False] * 3
+    assert evaluate_conditions_mask(t0, None, {"field": "close", "op": ">", "value": None}, FIELDS, OPS).tolist() == [False] * 3
+    assert evaluate_conditions_mask(t0, None, {"field": "ma20", "op": "cross_up", "right_field": "close"}, FIELDS, OPS).tolist() == [False] * 3
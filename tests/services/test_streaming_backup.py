@@ -0,0 +1,124 @@
+import asyncio
+import json
+import tarfile
+from datetime import datetime
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.database import backups as backups_mod
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.size = None
+
+    def batch_size(self, size):
+        self.size = size
+        return self
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self.docs:
+                yield dict(doc)
+        return gen()
+
+
+class _Collection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.insert_batches = []
+
+    def find(self, *args, **kwargs):
+        return _Cursor(self.docs)
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_batches.append(len(docs))
+        ids = {d["_id"] for d in self.docs if "_id" in d}
+        inserted = [d for d in docs if d.get("_id") not in ids]
+        self.docs.extend(inserted)
+        if len(inserted) != len(docs):
+            raise BulkWriteError({"nInserted": len(inserted), "writeErrors": [{"code": 11000}]})
+        return SimpleNamespace(inserted_ids=[d.get("_id") for d in inserted])
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def delete_many(self, query):
+        count, self.docs = len(self.docs), []
+        return SimpleNamespace(deleted_count=count)
+
+
+class _DB(dict):
+    def __missing__(self, name):
+        self[name] = _Collection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+    async def list_collection_names(self):
+        return list(self.keys())
+
+
+def _seed():
+    created = datetime(2024, 1, 5, 9, 30)
+    return _DB(
+        stock_basic_info=_Collection([{"_id": ObjectId(), "code": f"{600000 + i}", "created_at": created} for i in range(25)]),
+        llm_providers=_Collection([{"_id": ObjectId(), "name": "deepseek", "api_key": "sk-secret", "max_tokens": 4000}]),
+        users=_Collection([{"_id": ObjectId(), "username": "admin", "hashed_password": "x"}]),
+    )
+
+
+def test_backup_archive_round_trip_preserves_types(monkeypatch, tmp_path):
+    source = _seed()
+    monkeypatch.setattr(backups_mod, "get_mongo_db", lambda: source)
+    monkeypatch.setattr(backups_mod.settings, "BACKUP_BATCH_SIZE", 10, raising=False)
+    progress = []
+
+    result = asyncio.run(backups_mod.create_backup(
+        "nightly", str(tmp_path), collections=["stock_basic_info", "llm_providers"],
+        progress=lambda name, done, total: progress.append((name, done, total)),
+    ))
+
+    assert result["backup_type"] == "ndjson"
+    assert result["document_counts"] == {"stock_basic_info": 25, "llm_providers": 1}
+    assert ("stock_basic_info", 25, 25) in progress
+    with tarfile.open(result["file_path"]) as tar:
+        assert tar.getnames() == ["manifest.json", "stock_basic_info.ndjson.gz", "llm_providers.ndjson.gz"]
+    assert not (tmp_path / (result["filename"] + ".parts")).exists()
+
+    target = _DB()
+    monkeypatch.setattr(backups_mod, "get_mongo_db", lambda: target)
+    with open(result["file_path"], "rb") as fh:
+        imported = asyncio.run(backups_mod.import_data(fh, "ignored", filename=result["filename"]))
+
+    assert imported["mode"] == "archive"
+    assert imported["total_inserted"] == 26
+    assert target["stock_basic_info"].insert_batches == [10, 10, 5]
+    assert target["stock_basic_info"].docs == source["stock_basic_info"].docs
+
+    # 再次导入（不覆盖）：_id 重复的文档被跳过
+    with open(result["file_path"], "rb") as fh:
+        again = asyncio.run(backups_mod.import_archive(fh))
+    assert again["total_inserted"] == 0 and again["skipped"] == 26
+
+
+def test_json_export_is_streamed_in_legacy_structure(monkeypatch, tmp_path):
+    db = _seed()
+    monkeypatch.setattr(backups_mod, "get_mongo_db", lambda: db)
+
+    path = asyncio.run(backups_mod.export_data(export_dir=str(tmp_path), format="json", sanitize=True))
+
+    with open(path, encoding="utf-8") as fh:
+        exported = json.load(fh)
+    assert set(exported) == {"export_info", "data"}
+    assert len(exported["data"]["stock_basic_info"]) == 25
+    assert exported["data"]["users"] == []
+    provider = exported["data"]["llm_providers"][0]
+    assert provider["api_key"] == "" and provider["max_tokens"] == 4000
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from app.core.rate_limiter import TokenBucketRateLimiter
+from app.worker.sync_pipeline import run_sync_pipeline
+
+
+def test_pipeline_fetches_concurrently_and_overlaps_writes():
+    active = {"fetch": 0, "peak": 0}
+    events = []
+
+    async def fetch(symbol):
+        active["fetch"] += 1
+        active["peak"] = max(active["peak"], active["fetch"])
+        await asyncio.sleep(0.05)
+        active["fetch"] -= 1
+        if symbol == "000003":
+            return pd.DataFrame()
+        if symbol == "000004":
+            raise RuntimeError("network")
+        return pd.DataFrame({"close": [1.0, 2.0]})
+
+    async def save(symbol, df):
+        events.append(("save", symbol, active["fetch"]))
+        await asyncio.sleep(0.01)
+        return len(df)
+
+    symbols = [f"{i:06d}" for i in range(1, 13)]
+    start = time.perf_counter()
+    stats = asyncio.run(run_sync_pipeline(symbols, fetch, save, concurrency=4, context="test"))
+    elapsed = time.perf_counter() - start
+
+    assert active["peak"] == 4
+    assert elapsed < 12 * 0.05  # 明显快于串行
+    assert stats["success_count"] == 10
+    assert stats["total_records"] == 20
+    assert stats["error_count"] == 2
+    assert {e["code"] for e in stats["errors"]} == {"000003", "000004"}
+    assert stats["symbols_per_second"] > 0 and stats["rows_per_second"] > 0
+    # 写入期间仍有拉取在进行（流水线重叠）
+    assert any(in_flight > 0 for _, _, in_flight in events)
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        limiter = TokenBucketRateLimiter(rate=50, capacity=5, name="test")
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(15)))
+        return limiter, time.perf_counter() - start
+
+    limiter, elapsed = asyncio.run(run())
+    # 5 个突发令牌立即可用，其余 10 个按 50/秒补充
+    assert 0.17 <= elapsed < 0.5
+    assert limiter.get_stats()["total_calls"] == 15
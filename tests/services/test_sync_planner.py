@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.historical_data_service import HistoricalDataService
+from app.worker.sync_planner import latest_expected_trade_date, plan_incremental_sync
+
+
+def test_latest_expected_trade_date_rolls_back_weekends():
+    assert latest_expected_trade_date("2024-01-05") == "2024-01-05"  # 周五
+    assert latest_expected_trade_date("2024-01-07") == "2024-01-05"  # 周日
+    assert latest_expected_trade_date("2024-01-08") == "2024-01-08"
+
+
+def test_plan_skips_up_to_date_symbols():
+    latest = {"000001": "2024-01-05", "000002": "2024-01-03", "000003": "2024-01-06"}
+    plan = plan_incremental_sync(
+        ["000001", "000002", "000003", "000004"], latest, "2024-01-07", lambda s: "2010-01-01"
+    )
+
+    assert plan.up_to_date == ["000001", "000003"]
+    assert plan.start_dates == {"000002": "2024-01-04", "000004": "2010-01-01"}
+    assert plan.symbols == ["000002", "000004"]
+
+
+def test_plan_without_skipping_for_weekly():
+    plan = plan_incremental_sync(["000001"], {"000001": "2024-01-05"}, "2024-01-05",
+                                 lambda s: "1990-01-01", skip_up_to_date=False)
+    assert plan.start_dates == {"000001": "2024-01-06"}
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self._docs:
+            yield doc
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.calls = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append((pipeline, kwargs))
+        return _Cursor([{"_id": "000001", "latest": "2024-01-05"}, {"_id": "600000", "latest": "2024-01-04"}])
+
+
+def test_get_latest_dates_uses_single_aggregation():
+    service = HistoricalDataService()
+    service.collection = _FakeCollection()
+
+    latest = asyncio.run(service.get_latest_dates("akshare", "daily"))
+
+    assert latest == {"000001": "2024-01-05", "600000": "2024-01-04"}
+    assert len(service.collection.calls) == 1
+    pipeline, kwargs = service.collection.calls[0]
+    assert pipeline[0] == {"$match": {"data_source": "akshare", "period": "daily"}}
+    assert kwargs["hint"] == "symbol_date_index"
@@ -0,0 +1,197 @@
+"""
+app/worker.py 并发执行：worker 内同时运行的任务数、用户并发限制和 SIGTERM 后的排空
+"""
+
+import asyncio
+import importlib.util
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services.queue.keys import USER_PROCESSING_PREFIX
+
+# app/worker.py 与 app/worker/ 包同名，按文件路径加载
+_spec = importlib.util.spec_from_file_location(
+    "webapi_queue_worker", Path(__file__).resolve().parent.parent / "app" / "worker.py"
+)
+worker = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(worker)
+
+
+class FakeRedis:
+    def __init__(self, tasks):
+        self.lists = {worker.READY_LIST: [tid for tid, _ in tasks]}
+        self.hashes = {worker.TASK_PREFIX + tid: {"user": user} for tid, user in tasks}
+        self.sets = {}
+
+    async def blpop(self, key, timeout=0):
+        items = self.lists.get(key, [])
+        if items:
+            return key, items.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    async def srem(self, key, value):
+        self.sets.get(key, set()).discard(value)
+
+    async def publish(self, channel, message):
+        pass
+
+    async def scard(self, key):
+        return len(self.sets.get(key, set()))
+
+
+def _run(monkeypatch, tasks, concurrency, user_limit, hold=0.05):
+    r = FakeRedis(tasks)
+    stats = {"active": 0, "peak": 0, "user_peak": 0, "done": []}
+
+    async def fake_process_task(task_id, executor=None):
+        user = r.hashes[worker.TASK_PREFIX + task_id]["user"]
+        stats["active"] += 1
+        stats["peak"] = max(stats["peak"], stats["active"])
+        stats["user_peak"] = max(stats["user_peak"], await r.scard(USER_PROCESSING_PREFIX + user))
+        try:
+            await asyncio.sleep(hold)
+            stats["done"].append(task_id)
+        finally:
+            stats["active"] -= 1
+            await worker.unmark_task_processing(r, task_id, user)
+
+    monkeypatch.setattr(worker, "get_redis_client", lambda: r)
+    monkeypatch.setattr(worker, "process_task", fake_process_task)
+    monkeypatch.setattr(worker, "settings", SimpleNamespace(
+        WORKER_CONCURRENCY=concurrency,
+        DEFAULT_USER_CONCURRENT_LIMIT=user_limit,
+        GLOBAL_CONCURRENT_LIMIT=50,
+        QUEUE_POLL_INTERVAL_SECONDS=0.01,
+        WORKER_DRAIN_TIMEOUT_SECONDS=0,
+    ))
+    return r, stats
+
+
+def test_worker_runs_tasks_concurrently_within_user_limit(monkeypatch):
+    tasks = [("t1", "u1"), ("t2", "u1"), ("t3", "u1"), ("t4", "u2"), ("t5", "u2")]
+    r, stats = _run(monkeypatch, tasks, concurrency=3, user_limit=2)
+
+    async def main():
+        stop = asyncio.Event()
+        loop_task = asyncio.create_task(worker.worker_loop(stop))
+        while len(stats["done"]) < len(tasks):
+            await asyncio.sleep(0.01)
+        stop.set()
+        await loop_task
+
+    asyncio.run(main())
+
+    assert sorted(stats["done"]) == ["t1", "t2", "t3", "t4", "t5"]
+    assert stats["peak"] == 3
+    assert stats["user_peak"] <= 2
+    assert not r.sets.get(worker.SET_PROCESSING)
+
+
+def test_shutdown_drains_in_flight_tasks(monkeypatch):
+    tasks = [("t1", "u1"), ("t2", "u2"), ("t3", "u3")]
+    r, stats = _run(monkeypatch, tasks, concurrency=2, user_limit=3, hold=0.2)
+
+    async def main():
+        stop = asyncio.Event()
+        loop_task = asyncio.create_task(worker.worker_loop(stop))
+        while stats["active"] < 2:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await loop_task
+
+    asyncio.run(main())
+
+    # 进行中的两个任务执行完毕，未开始的任务留在队列中
+    assert sorted(stats["done"]) == ["t1", "t2"]
+    assert r.lists[worker.READY_LIST] == ["t3"]
+
+
+def test_missing_task_hash_releases_reserved_slot(monkeypatch):
+    r = FakeRedis([])
+    r.lists[worker.READY_LIST] = ["gone"]
+    monkeypatch.setattr(worker, "get_redis_client", lambda: r)
+    monkeypatch.setattr(worker, "settings", SimpleNamespace(
+        WORKER_CONCURRENCY=1,
+        DEFAULT_USER_CONCURRENT_LIMIT=1,
+        GLOBAL_CONCURRENT_LIMIT=1,
+        QUEUE_POLL_INTERVAL_SECONDS=0.01,
+        WORKER_DRAIN_TIMEOUT_SECONDS=0,
+    ))
+
+    async def main():
+        stop = asyncio.Event()
+        loop_task = asyncio.create_task(worker.worker_loop(stop))
+        while r.lists[worker.READY_LIST]:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        stop.set()
+        await loop_task
+
+    asyncio.run(main())
+
+    # 任务哈希已被删除：预占的处理中名额被释放，不会永久占用全局/用户并发
+    assert not r.sets.get(worker.SET_PROCESSING)
+    assert not r.sets.get(USER_PROCESSING_PREFIX)
+
+
+def test_drain_timeout_does_not_requeue_running_analysis(monkeypatch):
+    r = FakeRedis([("t1", "u1")])
+    r.hashes[worker.TASK_PREFIX + "t1"]["symbol"] = "600519"
+    release = threading.Event()
+    runs = []
+
+    def run_stock_analysis(**kwargs):
+        runs.append(kwargs["stock_symbol"])
+        release.wait(5)
+        return {"success": True}
+
+    monkeypatch.setitem(sys.modules, "web.utils.analysis_runner", SimpleNamespace(run_stock_analysis=run_stock_analysis))
+    monkeypatch.setattr(worker, "get_redis_client", lambda: r)
+    monkeypatch.setattr(worker, "settings", SimpleNamespace(
+        WORKER_CONCURRENCY=1,
+        DEFAULT_USER_CONCURRENT_LIMIT=1,
+        GLOBAL_CONCURRENT_LIMIT=50,
+        QUEUE_POLL_INTERVAL_SECONDS=0.01,
+        WORKER_DRAIN_TIMEOUT_SECONDS=0.1,
+    ))
+
+    async def main():
+        stop = asyncio.Event()
+        loop_task = asyncio.create_task(worker.worker_loop(stop))
+        while not runs:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await loop_task
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+
+    # 分析线程无法取消：任务标记失败而不是放回队列，避免被另一个 worker 重复执行
+    assert runs == ["600519"]
+    assert r.lists[worker.READY_LIST] == []
+    assert r.hashes[worker.TASK_PREFIX + "t1"]["status"] == "failed"
+    assert "t1" in r.sets[worker.SET_FAILED]
+    assert not r.sets.get(worker.SET_PROCESSING)
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.graph import graph_pool
+from tradingagents.graph.graph_pool import TradingGraphPool, graph_fingerprint
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+
+class _FakeGraph:
+    builds = 0
+
+    def __init__(self, selected_analysts, debug, config):
+        type(self).builds += 1
+        time.sleep(0.05)
+        self.config = config
+
+
+@pytest.fixture
+def fake_graph(monkeypatch):
+    _FakeGraph.builds = 0
+    monkeypatch.setattr(graph_pool, "TradingAgentsGraph", _FakeGraph)
+    return _FakeGraph
+
+
+def test_pool_builds_each_fingerprint_once(fake_graph):
+    pool = TradingGraphPool(max_size=2)
+    config = {"llm_provider": "dashscope", "quick_think_llm": "qwen-turbo", "max_debate_rounds": 1}
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(pool.acquire(config, ["market"])))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fake_graph.builds == 1
+    assert len({id(g) for g in results}) == 1
+    # 调用方修改自己的配置不影响池中实例
+    config["quick_think_llm"] = "qwen-plus"
+    assert results[0].config["quick_think_llm"] == "qwen-turbo"
+    assert pool.get_stats()["hits"] == 7
+
+
+def test_pool_evicts_least_recently_used(fake_graph):
+    pool = TradingGraphPool(max_size=2)
+    a = pool.acquire({"m": "a"}, ["market"])
+    pool.acquire({"m": "b"}, ["market"])
+    assert pool.acquire({"m": "a"}, ["market"]) is a
+    pool.acquire({"m": "c"}, ["market"])  # 淘汰 b
+
+    assert pool.acquire({"m": "a"}, ["market"]) is a
+    builds = fake_graph.builds
+    pool.acquire({"m": "b"}, ["market"])
+    assert fake_graph.builds == builds + 1
+    assert graph_fingerprint({"m": "a"}, ["market"]) != graph_fingerprint({"m": "a"}, ["market", "news"])
+
+
+def _final_state(ticker, trade_date):
+    debate = {"bull_history": "", "bear_history": "", "history": "", "current_response": "", "judge_decision": ""}
+    risk = {"risky_history": "", "safe_history": "", "neutral_history": "", "history": "", "judge_decision": ""}
+    return {
+        "company_of_interest": ticker, "trade_date": trade_date, "market_report": ticker,
+        "sentiment_report": "", "news_report": "", "fundamentals_report": "",
+        "investment_debate_state": debate, "trader_investment_plan": "", "risk_debate_state": risk,
+        "investment_plan": "", "final_trade_decision": f"BUY {ticker}",
+    }
+
+
+class _CompiledStub:
+    def invoke(self, state, **kwargs):
+        time.sleep(0.05)
+        return _final_state(state["company_of_interest"], state["trade_date"])
+
+
+def test_shared_graph_keeps_run_state_per_thread(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    config = dict(DEFAULT_CONFIG, llm_provider="openai", memory_enabled=False)
+    graph = TradingAgentsGraph(["market"], config=config)
+    graph.graph = _CompiledStub()
+    monkeypatch.setattr(graph, "process_signal", lambda signal, symbol=None: signal)
+
+    seen = {}
+
+    def run(ticker):
+        _, decision = graph.propagate(ticker, "2024-01-05")
+        seen[ticker] = (decision, graph.ticker, graph.curr_state["company_of_interest"])
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in ("AAPL", "MSFT", "000001")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for ticker, (decision, own_ticker, state_ticker) in seen.items():
+        assert decision == f"BUY {ticker}"
+        assert own_ticker == ticker and state_ticker == ticker
+    assert (tmp_path / "eval_results" / "MSFT" / "TradingAgentsStrategy_logs" / "full_states_log.json").exists()
+
+
+def test_propagate_rejects_positional_run_context(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    graph = TradingAgentsGraph(["market"], config=dict(DEFAULT_CONFIG, llm_provider="openai", memory_enabled=False))
+    invoked = []
+    graph.graph = type("_Graph", (), {"invoke": lambda self, state, **kw: invoked.append(state)})()
+
+    # 旧调用方式 propagate(symbol, date, progress_callback) 应在运行图之前失败
+    with pytest.raises(TypeError):
+        graph.propagate("AAPL", "2024-01-05", lambda message: None)
+    assert invoked == []
+
+
+def test_config_gate_serializes_only_different_configs():
+    from tradingagents.graph.trading_graph import _GlobalConfigGate
+
+    gate = _GlobalConfigGate()
+    applied, events = [], []
+    lock = threading.Lock()
+
+    def run(key, name):
+        with gate.hold(key, lambda: applied.append(key)):
+            with lock:
+                events.append(("start", name))
+            time.sleep(0.05)
+            with lock:
+                events.append(("end", name))
+
+    threads = [threading.Thread(target=run, args=("a", "a1")), threading.Thread(target=run, args=("a", "a2"))]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    other = threading.Thread(target=run, args=("b", "b1"))
+    other.start()
+    for t in threads + [other]:
+        t.join()
+
+    # 相同配置并发执行，不同配置等前面的全部结束后才开始
+    assert {e[0] for e in events[:2]} == {"start"}
+    assert events.index(("start", "b1")) > max(events.index(("end", "a1")), events.index(("end", "a2")))
+    assert applied == ["a", "b"]
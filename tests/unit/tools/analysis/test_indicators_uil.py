@@ -48,3 +48,58 @@ def test_no_inplace_modification():
     out = compute_many(df, [IndicatorSpec('ma', {'n': 5})])
     assert 'ma5' in out.columns and 'ma5' not in df.columns
 
+
+
+def test_compute_panel_matches_compute_many():
+    from tradingagents.tools.analysis.indicators import compute_panel
+
+    specs = [
+        IndicatorSpec('ma', {'n': 20}),
+        IndicatorSpec('ema', {'n': 12}),
+        IndicatorSpec('macd'),
+        IndicatorSpec('rsi', {'n': 14}),
+        IndicatorSpec('boll', {'n': 20, 'k': 2}),
+        IndicatorSpec('atr', {'n': 14}),
+        IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+    ]
+    # 不同长度的序列右对齐放入面板（前部 NaN 填充）
+    frames = {'A': make_df(80, seed=1), 'B': make_df(50, seed=2), 'C': make_df(12, seed=3)}
+    depth = max(len(f) for f in frames.values())
+    panel = {}
+    for col in ['open', 'high', 'low', 'close']:
+        panel[col] = pd.DataFrame({
+            code: np.concatenate([np.full(depth - len(f), np.nan), f[col].to_numpy(dtype=float)])
+            for code, f in frames.items()
+        })
+
+    out = compute_panel(panel, specs)
+    for code, f in frames.items():
+        expected = compute_many(f, specs)
+        for col in ['ma20', 'ema12', 'dif', 'dea', 'macd_hist', 'rsi14', 'boll_mid', 'boll_upper', 'atr14', 'kdj_k', 'kdj_d', 'kdj_j']:
+            got = out[col][code].to_numpy()[depth - len(f):]
+            np.testing.assert_allclose(got, expected[col].to_numpy(dtype=float), rtol=1e-12, equal_nan=True, err_msg=f"{code}:{col}")
+
+
+def test_kdj_smooth_1d_and_2d_are_identical():
+    from tradingagents.tools.analysis.indicators import _kdj_smooth
+
+    rng = np.random.default_rng(5)
+    rsv = rng.uniform(0, 100, size=(30, 4))
+    rsv[:8] = np.nan          # 窗口未满
+    rsv[15, 1] = np.nan       # 中途无效值：输出 NaN，状态沿用
+    k2, d2 = _kdj_smooth(rsv)
+    for j in range(rsv.shape[1]):
+        k1, d1 = _kdj_smooth(rsv[:, j])
+        assert np.array_equal(k1, k2[:, j], equal_nan=True)
+        assert np.array_equal(d1, d2[:, j], equal_nan=True)
+    assert np.isnan(k2[15, 1]) and not np.isnan(k2[16, 1])
+    assert k2[8, 0] == (1 - 1 / 3.0) * 50.0 + (1 / 3.0) * rsv[8, 0]
+
+
+def test_compute_many_overwrites_existing_indicator_columns():
+    df = make_df(30)
+    df['ma5'] = -1.0
+    out = compute_many(df, [IndicatorSpec('ma', {'n': 5}), IndicatorSpec('rsi', {'n': 14})])
+    assert list(out.columns).count('ma5') == 1
+    assert (out['ma5'] > 0).all()
+    assert (df['ma5'] == -1.0).all()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+from tradingagents.tools.analysis.streaming import DEFAULT_STREAMING_SPECS, IndicatorState
+
+
+def make_df(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, n)) + 50
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    return pd.DataFrame({
+        'trade_date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d'),
+        'high': high, 'low': low, 'close': close,
+    })
+
+
+def assert_bit_identical(ref, got, columns):
+    for col in columns:
+        assert np.array_equal(ref[col].to_numpy(), got[col].to_numpy(), equal_nan=True), col
+
+
+def test_streaming_matches_batch_bit_for_bit():
+    df = make_df()
+    # 缺失值与平盘窗口（标准差为 0、KDJ 分母为 0）
+    df.loc[[10, 11, 40], 'close'] = np.nan
+    df.loc[60:75, ['high', 'low', 'close']] = 12.5
+
+    ref = compute_many(df, DEFAULT_STREAMING_SPECS)
+    got = IndicatorState().update_many(df)
+    assert_bit_identical(ref, got, got.columns)
+
+
+def test_streaming_state_roundtrip_continues_identically():
+    df = make_df(150)
+    specs = DEFAULT_STREAMING_SPECS + [IndicatorSpec('ma', {'n': 1})]
+    ref = compute_many(df, specs)
+
+    state = IndicatorState.from_history(df.iloc[:100], specs)
+    state = IndicatorState.from_dict(state.to_dict())
+    assert state.last_trade_date == df['trade_date'].iloc[99]
+
+    rows = [state.update(rec) for rec in df.iloc[100:].to_dict('records')]
+    got = pd.DataFrame(rows, index=df.index[100:])
+    assert_bit_identical(ref.iloc[100:], got, got.columns)
@@ -0,0 +1,64 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import tradingagents.utils.enhanced_news_filter as enf
+
+
+class _FakeModel:
+    """按字符哈希生成确定性向量，记录 encode 调用"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.calls.append(len(texts))
+        out = np.zeros((len(texts), 16), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for ch in text:
+                out[i, zlib.crc32(ch.encode()) % 16] += 1.0
+        return out
+
+
+def _install(monkeypatch):
+    model = _FakeModel()
+    monkeypatch.setattr(enf, "_sentence_models", {enf.SEMANTIC_MODEL_NAME: model})
+    monkeypatch.setattr(enf, "_company_embeddings", {})
+    return model
+
+
+def _legacy_score(model, company_texts, text):
+    emb = model.encode([text])[0]
+    company = model.encode(company_texts)
+    sims = [np.dot(emb, c) / (np.linalg.norm(emb) * np.linalg.norm(c)) for c in company]
+    return max(0, min(100, max(sims) * 100))
+
+
+def test_filter_encodes_all_news_in_one_batch(monkeypatch):
+    model = _install(monkeypatch)
+    news = pd.DataFrame([
+        {"新闻标题": f"招商银行第{i}季度业绩", "新闻内容": "净利润同比增长" * (i + 1)} for i in range(120)
+    ])
+
+    flt = enf.EnhancedNewsFilter("600036", "招商银行", use_semantic=True)
+    model.calls.clear()
+    result = flt.filter_news_enhanced(news, min_score=0)
+
+    assert model.calls == [120]
+    assert len(result) == 120
+
+    texts = [f"{t} {c[:200]}" for t, c in zip(news["新闻标题"], news["新闻内容"])]
+    expected = [_legacy_score(model, flt._company_texts(), t) for t in texts[:5]]
+    got = flt.calculate_semantic_similarities(texts[:5])
+    assert np.allclose(got, expected, atol=1e-4)
+
+
+def test_company_embedding_cached_across_instances(monkeypatch):
+    model = _install(monkeypatch)
+    enf.EnhancedNewsFilter("600036", "招商银行", use_semantic=True)
+    enf.EnhancedNewsFilter("600036", "招商银行", use_semantic=True)
+    enf.EnhancedNewsFilter("000001", "平安银行", use_semantic=True)
+
+    # 每只股票的公司文本只编码一次
+    assert model.calls == [6, 6]
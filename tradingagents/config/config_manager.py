@@ -40,6 +40,7 @@ logger = get_logger('agents')
 
 # 导入数据模型（避免循环导入）
 from .usage_models import UsageRecord, ModelConfig, PricingConfig
+from .usage_ledger import UsageLedger, get_usage_ledger
 
 try:
     from .mongodb_storage import MongoDBStorage
@@ -67,8 +68,10 @@ class ConfigManager:
 
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
-        self.usage_file = self.config_dir / "usage.json"
+        self.usage_file = self.config_dir / "usage.json"  # 旧版格式，首次加载时迁移到 usage.jsonl
+        self.usage_ledger_file = self.config_dir / "usage.jsonl"
         self.settings_file = self.config_dir / "settings.json"
+        self.usage_ledger: Optional[UsageLedger] = None
 
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
@@ -79,6 +82,13 @@ class ConfigManager:
 
         self._init_default_configs()
 
+        # JSON 回退存储：追加写入的使用记录账本（同一文件的 ConfigManager 实例共用）
+        self.usage_ledger = get_usage_ledger(
+            self.usage_ledger_file,
+            legacy_path=self.usage_file,
+            max_records=self.load_settings().get("max_usage_records", 10000),
+        )
+
     def _load_env_file(self):
         """加载.env文件（保持向后兼容）"""
         # 尝试从项目根目录加载.env文件
@@ -366,21 +376,15 @@ class ConfigManager:
     def load_usage_records(self) -> List[UsageRecord]:
         """加载使用记录"""
         try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
+            return self.usage_ledger.records()
         except Exception as e:
             logger.error(f"加载使用记录失败: {e}")
             return []
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
+        """保存使用记录（整体替换）"""
         try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.usage_ledger.replace(records)
         except Exception as e:
             logger.error(f"保存使用记录失败: {e}")
     
@@ -422,20 +426,11 @@ class ConfigManager:
             elif not self.mongodb_storage.is_connected():
                 logger.warning(f"⚠️ [Token记录] MongoDB未连接 (is_connected=False)")
 
-            logger.info(f"📄 [Token记录] 使用 JSON 文件存储: {self.usage_file}")
-
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
+            logger.info(f"📄 [Token记录] 使用 JSON 文件存储: {self.usage_ledger_file}")
 
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
-
-        self.save_usage_records(records)
-        logger.info(f"✅ [Token记录] JSON 文件保存成功: {self.usage_file}")
+        # 回退到JSON文件存储：追加到账本缓冲，由后台线程写入（超过上限时自动压缩）
+        self.usage_ledger.append(record)
+        logger.info(f"✅ [Token记录] 已写入 JSON 账本: {self.usage_ledger_file}")
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> tuple[float, str]:
@@ -537,6 +532,8 @@ class ConfigManager:
 
     def save_settings(self, settings: Dict[str, Any]):
         """保存设置"""
+        if self.usage_ledger is not None and "max_usage_records" in settings:
+            self.usage_ledger.max_records = settings["max_usage_records"]
         try:
             with open(self.settings_file, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
@@ -573,52 +570,8 @@ class ConfigManager:
             except Exception as e:
                 logger.error(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
         
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
-        
-        return {
-            "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
-        }
+        # 回退到JSON文件统计（按日增量汇总，无需逐条解析记录）
+        return self.usage_ledger.statistics(days)
     
     def get_data_dir(self) -> str:
         """获取数据目录路径"""
@@ -739,9 +692,7 @@ class TokenTracker:
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        return self.config_manager.usage_ledger.session_cost(session_id)
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> tuple[float, str]:
@@ -24,6 +24,9 @@ class DatabaseManager:
         self.redis_available = False
         self.mongodb_client = None
         self.redis_client = None
+        # 异步客户端（motor / redis.asyncio），供 FastAPI 中的 AsyncCacheFacade 使用，首次获取时创建
+        self._async_mongodb_client = None
+        self._async_redis_client = None
 
         # 检测数据库可用性
         self._detect_databases()
@@ -200,24 +203,7 @@ class DatabaseManager:
             try:
                 import pymongo
 
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.mongodb_config["host"],
-                    "port": self.mongodb_config["port"],
-                    "serverSelectionTimeoutMS": self.mongodb_config["server_selection_timeout"],
-                    "connectTimeoutMS": self.mongodb_config["connect_timeout"],
-                    "socketTimeoutMS": self.mongodb_config["socket_timeout"]
-                }
-
-                # 如果有用户名和密码，添加认证
-                if self.mongodb_config["username"] and self.mongodb_config["password"]:
-                    connect_kwargs.update({
-                        "username": self.mongodb_config["username"],
-                        "password": self.mongodb_config["password"],
-                        "authSource": self.mongodb_config["auth_source"]
-                    })
-
-                self.mongodb_client = pymongo.MongoClient(**connect_kwargs)
+                self.mongodb_client = pymongo.MongoClient(**self._mongodb_connect_kwargs())
                 self.logger.info("MongoDB客户端初始化成功")
             except Exception as e:
                 self.logger.error(f"MongoDB客户端初始化失败: {e}")
@@ -228,24 +214,73 @@ class DatabaseManager:
             try:
                 import redis
 
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.redis_config["host"],
-                    "port": self.redis_config["port"],
-                    "db": self.redis_config["db"],
-                    "socket_timeout": self.redis_config["timeout"]
-                }
-
-                # 如果有密码，添加密码
-                if self.redis_config["password"]:
-                    connect_kwargs["password"] = self.redis_config["password"]
-
-                self.redis_client = redis.Redis(**connect_kwargs)
+                self.redis_client = redis.Redis(**self._redis_connect_kwargs())
                 self.logger.info("Redis客户端初始化成功")
             except Exception as e:
                 self.logger.error(f"Redis客户端初始化失败: {e}")
                 self.redis_available = False
     
+    def _mongodb_connect_kwargs(self) -> Dict[str, Any]:
+        """MongoDB 连接参数（同步/异步客户端共用）"""
+        connect_kwargs = {
+            "host": self.mongodb_config["host"],
+            "port": self.mongodb_config["port"],
+            "serverSelectionTimeoutMS": self.mongodb_config["server_selection_timeout"],
+            "connectTimeoutMS": self.mongodb_config["connect_timeout"],
+            "socketTimeoutMS": self.mongodb_config["socket_timeout"]
+        }
+
+        # 如果有用户名和密码，添加认证
+        if self.mongodb_config["username"] and self.mongodb_config["password"]:
+            connect_kwargs.update({
+                "username": self.mongodb_config["username"],
+                "password": self.mongodb_config["password"],
+                "authSource": self.mongodb_config["auth_source"]
+            })
+        return connect_kwargs
+
+    def _redis_connect_kwargs(self) -> Dict[str, Any]:
+        """Redis 连接参数（同步/异步客户端共用）"""
+        connect_kwargs = {
+            "host": self.redis_config["host"],
+            "port": self.redis_config["port"],
+            "db": self.redis_config["db"],
+            "socket_timeout": self.redis_config["timeout"]
+        }
+
+        # 如果有密码，添加密码
+        if self.redis_config["password"]:
+            connect_kwargs["password"] = self.redis_config["password"]
+        return connect_kwargs
+
+    def get_async_mongodb_client(self):
+        """获取异步MongoDB客户端（motor）；MongoDB 不可用或未安装 motor 时返回 None"""
+        if not self.mongodb_available:
+            return None
+        if self._async_mongodb_client is None:
+            try:
+                from motor.motor_asyncio import AsyncIOMotorClient
+                self._async_mongodb_client = AsyncIOMotorClient(**self._mongodb_connect_kwargs())
+                self.logger.info("异步MongoDB客户端初始化成功")
+            except Exception as e:
+                self.logger.error(f"异步MongoDB客户端初始化失败: {e}")
+                return None
+        return self._async_mongodb_client
+
+    def get_async_redis_client(self):
+        """获取异步Redis客户端（redis.asyncio）；Redis 不可用时返回 None"""
+        if not self.redis_available:
+            return None
+        if self._async_redis_client is None:
+            try:
+                import redis.asyncio as aioredis
+                self._async_redis_client = aioredis.Redis(**self._redis_connect_kwargs())
+                self.logger.info("异步Redis客户端初始化成功")
+            except Exception as e:
+                self.logger.error(f"异步Redis客户端初始化失败: {e}")
+                return None
+        return self._async_redis_client
+
     def get_mongodb_client(self):
         """获取MongoDB客户端"""
         if self.mongodb_available and self.mongodb_client:
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Token 使用记录账本（JSON Lines）
+
+MongoDB 不可用时，ConfigManager 把使用记录追加写入 usage.jsonl，每行一条记录：
+- 写入先进入内存缓冲，由后台线程按间隔/批量追加到文件，LLM 调用路径上没有文件 IO
+- 记录数超过上限的一定比例后压缩文件，只保留最近 max_records 条
+- 按 (日期, 供应商) 增量维护汇总，get_usage_statistics 不再逐条解析全部记录
+
+web、worker、CLI 等多个进程可能写同一个文件：追加与压缩都持有 usage.jsonl.lock 上的
+fcntl 文件锁（Windows 无 fcntl 时不加锁）；文件被其他进程改动后，汇总在下次读取时从文件重建。
+
+旧版 usage.json 会在首次加载时导入并重命名为 usage.json.migrated。
+"""
+
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_zoneinfo
+from tradingagents.utils.logging_manager import get_logger
+
+from .usage_models import UsageRecord
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = get_logger('agents')
+
+# 文件行数超过 max_records 的倍数后触发压缩
+COMPACT_RATIO = 1.5
+
+
+def _empty_bucket() -> Dict[str, float]:
+    return {"cost": 0, "input_tokens": 0, "output_tokens": 0, "requests": 0}
+
+
+class UsageLedger:
+    """追加写入的使用记录账本（线程安全）"""
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_path: Optional[Path] = None,
+        max_records: int = 10000,
+        flush_interval: float = 1.0,
+        flush_batch: int = 100,
+    ):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+
+        self._lock = threading.RLock()
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._buffer: List[UsageRecord] = []
+        self._loaded = False
+        self._line_count = 0
+        # 本进程最后一次读写后文件的 (inode, 大小, 修改时间)，用于发现其他进程的写入
+        self._file_key: Optional[Tuple[int, int, int]] = None
+        # (日期, 供应商) -> 汇总；会话 -> 成本
+        self._daily: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._session_costs: Dict[str, float] = {}
+
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    # ---- 跨进程同步 ----
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程排他锁（锁文件独立于数据文件，压缩时 os.replace 不影响加锁）；调用方须已持有 self._lock"""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, 'a') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _reload(self) -> None:
+        """从文件重建汇总（加上本进程尚未落盘的缓冲）；调用方须持有文件锁"""
+        self._rebuild(self._read_file())
+        for record in self._buffer:
+            self._aggregate(record)
+        self._file_key = self._stat_key()
+
+    def _refresh_if_changed(self) -> None:
+        """其他进程写入或压缩过文件时重建汇总"""
+        with self._lock:
+            if self._stat_key() == self._file_key:
+                return
+            with self._file_lock():
+                self._reload()
+
+    # ---- 加载与汇总 ----
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with self._file_lock():
+                self._migrate_legacy()
+                self._reload()
+            self._loaded = True
+
+    def _migrate_legacy(self) -> None:
+        """导入旧版 usage.json（整体 JSON 数组）"""
+        if self.path.exists() or not self.legacy_path or not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                records = [UsageRecord(**item) for item in json.load(f)]
+            self._write_all(records[-self.max_records:])
+            self.legacy_path.rename(self.legacy_path.with_name(self.legacy_path.name + ".migrated"))
+            logger.info(f"🔄 [Token记录] 已将 {len(records)} 条旧记录从 {self.legacy_path.name} 迁移到 {self.path.name}")
+        except Exception as e:
+            logger.error(f"❌ [Token记录] 迁移旧版使用记录失败: {e}")
+
+    def _read_file(self) -> List[UsageRecord]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(UsageRecord(**json.loads(line)))
+                except Exception:
+                    # 进程崩溃可能留下半行，跳过
+                    continue
+        return records
+
+    def _rebuild(self, records: List[UsageRecord]) -> None:
+        self._daily.clear()
+        self._session_costs.clear()
+        self._line_count = len(records)
+        for record in records:
+            self._aggregate(record)
+
+    def _aggregate(self, record: UsageRecord) -> None:
+        bucket = self._daily.setdefault((record.timestamp[:10], record.provider), _empty_bucket())
+        bucket["cost"] += record.cost
+        bucket["input_tokens"] += record.input_tokens
+        bucket["output_tokens"] += record.output_tokens
+        bucket["requests"] += 1
+        if record.session_id:
+            self._session_costs[record.session_id] = self._session_costs.get(record.session_id, 0) + record.cost
+
+    # ---- 写入 ----
+
+    def append(self, record: UsageRecord) -> None:
+        """记录进入缓冲并立即计入汇总，文件写入由后台线程完成"""
+        self._ensure_loaded()
+        with self._lock:
+            self._buffer.append(record)
+            self._aggregate(record)
+            if len(self._buffer) >= self.flush_batch:
+                self._wakeup.set()
+        self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stopped = False
+            self._flusher = threading.Thread(target=self._flush_loop, name="usage-ledger-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ [Token记录] 写入使用记录失败: {e}")
+
+    def flush(self) -> None:
+        """把缓冲中的记录追加到文件，必要时压缩"""
+        with self._lock:
+            if not self._buffer:
+                return
+            pending, self._buffer = self._buffer, []
+            with self._file_lock():
+                external = self._stat_key() != self._file_key
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(''.join(json.dumps(asdict(r), ensure_ascii=False) + '\n' for r in pending))
+                except Exception:
+                    # 写入失败时放回缓冲，下次重试
+                    self._buffer = pending + self._buffer
+                    raise
+                if external:
+                    # 其他进程写过文件：行数与汇总以文件为准
+                    self._reload()
+                else:
+                    self._line_count += len(pending)
+                    self._file_key = self._stat_key()
+                if self._line_count > self.max_records * COMPACT_RATIO:
+                    self._compact_locked()
+
+    def compact(self) -> None:
+        """重写文件，只保留最近 max_records 条，并重建汇总"""
+        with self._lock:
+            with self._file_lock():
+                self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        # 持有文件锁时读取与替换，其他进程的追加不会在两者之间丢失
+        records = self._read_file()
+        kept = records[-self.max_records:]
+        self._write_all(kept)
+        self._reload()
+        if len(records) > len(kept):
+            logger.info(f"🧹 [Token记录] 压缩使用记录: {len(records)} → {len(kept)} 条")
+
+    def _write_all(self, records: List[UsageRecord]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(asdict(r), ensure_ascii=False) + '\n' for r in records))
+        os.replace(tmp, self.path)
+
+    # ---- 读取 ----
+
+    def records(self) -> List[UsageRecord]:
+        """全部记录（含尚未落盘的缓冲）"""
+        self._ensure_loaded()
+        with self._lock:
+            self.flush()
+            return self._read_file()
+
+    def replace(self, records: List[UsageRecord]) -> None:
+        """用给定记录整体替换账本"""
+        self._ensure_loaded()
+        with self._lock:
+            self._buffer = []
+            kept = list(records)[-self.max_records:]
+            with self._file_lock():
+                self._write_all(kept)
+                self._reload()
+
+    def statistics(self, days: int = 30) -> Dict[str, object]:
+        """
+        最近 days 个自然日（含今天）的统计，由增量维护的按日汇总计算
+
+        days=1 表示今天。
+        """
+        self._ensure_loaded()
+        self._refresh_if_changed()
+        cutoff = (datetime.now(get_zoneinfo()).date() - timedelta(days=max(days, 1) - 1)).isoformat()
+        totals = _empty_bucket()
+        provider_stats: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for (day, provider), bucket in self._daily.items():
+                if day < cutoff:
+                    continue
+                target = provider_stats.setdefault(provider, _empty_bucket())
+                for key, value in bucket.items():
+                    target[key] += value
+                    totals[key] += value
+
+        return {
+            "period_days": days,
+            "total_cost": round(totals["cost"], 4),
+            "total_input_tokens": totals["input_tokens"],
+            "total_output_tokens": totals["output_tokens"],
+            "total_requests": totals["requests"],
+            "provider_stats": provider_stats,
+            "records_count": totals["requests"],
+        }
+
+    def session_cost(self, session_id: str) -> float:
+        self._ensure_loaded()
+        self._refresh_if_changed()
+        with self._lock:
+            return self._session_costs.get(session_id, 0.0)
+
+    def close(self) -> None:
+        """停止后台线程并写出剩余缓冲"""
+        self._stopped = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"❌ [Token记录] 退出时写入使用记录失败: {e}")
+
+
+_ledgers: Dict[Path, UsageLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_usage_ledger(path: Path, legacy_path: Optional[Path] = None,
+                     max_records: Optional[int] = None) -> UsageLedger:
+    """同一文件共用一个账本（每个账本有自己的后台线程和 atexit 注册，不能按调用创建）"""
+    key = Path(path).resolve()
+    with _ledgers_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = UsageLedger(key, legacy_path=legacy_path, max_records=max_records or 10000)
+            _ledgers[key] = ledger
+        elif max_records:
+            ledger.max_records = max_records
+        return ledger
@@ -10,6 +10,10 @@
     from tradingagents.dataflows.cache import get_cache
     cache = get_cache()  # 自动选择最佳缓存策略
 
+    # FastAPI 等异步代码中使用异步门面，避免阻塞事件循环
+    from tradingagents.dataflows.cache import get_async_cache
+    cache_key = await get_async_cache().find_cached_stock_data(symbol="AAPL")
+
 配置缓存策略：
     export TA_CACHE_STRATEGY=integrated  # 启用集成缓存（MongoDB/Redis）
     export TA_CACHE_STRATEGY=file        # 使用文件缓存（默认）
@@ -71,6 +75,9 @@ except ImportError:
     MongoDBCacheAdapter = None
     MONGODB_CACHE_ADAPTER_AVAILABLE = False
 
+# 导入异步缓存门面
+from .async_cache import AsyncCacheFacade, get_async_cache, get_cache_io_executor
+
 # 全局缓存实例
 _cache_instance = None
 
@@ -116,12 +123,15 @@ def get_cache() -> Union[StockDataCache, IntegratedCacheManager]:
 __all__ = [
     # 统一入口（推荐使用）
     'get_cache',
+    'get_async_cache',
 
     # 缓存类（供高级用户直接使用）
     'StockDataCache',
     'IntegratedCacheManager',
     'DatabaseCacheManager',
     'AdaptiveCacheSystem',
+    'AsyncCacheFacade',
+    'get_cache_io_executor',
 
     # 可用性标志
     'FILE_CACHE_AVAILABLE',
@@ -15,6 +15,7 @@ from typing import Any, Dict, Optional, Union
 import pandas as pd
 
 from tradingagents.config.database_manager import get_database_manager
+from .columnar import COLUMNAR_FORMATS, read_frame, resolve_dataframe_format, write_frame
 
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
@@ -39,6 +40,9 @@ class AdaptiveCacheSystem:
         # 初始化缓存后端
         self.primary_backend = self.cache_config["primary_backend"]
         self.fallback_enabled = self.cache_config["fallback_enabled"]
+
+        # 文件后端中 DataFrame 以列式格式单独保存，pickle 只保存元数据
+        self.dataframe_format = resolve_dataframe_format()
         
         self.logger.info(f"自适应缓存系统初始化 - 主要后端: {self.primary_backend}")
     
@@ -79,6 +83,13 @@ class AdaptiveCacheSystem:
                 'timestamp': datetime.now(),
                 'backend': 'file'
             }
+
+            if isinstance(data, pd.DataFrame) and self.dataframe_format in COLUMNAR_FORMATS:
+                data_file = self.cache_dir / f"{cache_key}.{self.dataframe_format}"
+                data_file, data_format = write_frame(data, data_file, self.dataframe_format)
+                cache_data['data'] = None
+                cache_data['data_file'] = data_file.name
+                cache_data['data_format'] = data_format
             
             with open(cache_file, 'wb') as f:
                 pickle.dump(cache_data, f)
@@ -99,6 +110,9 @@ class AdaptiveCacheSystem:
             
             with open(cache_file, 'rb') as f:
                 cache_data = pickle.load(f)
+
+            if cache_data.get('data_file'):
+                cache_data['data'] = read_frame(self.cache_dir / cache_data['data_file'], cache_data['data_format'])
             
             self.logger.debug(f"文件缓存加载成功: {cache_key}")
             return cache_data
@@ -114,15 +128,7 @@ class AdaptiveCacheSystem:
             return False
         
         try:
-            cache_data = {
-                'data': data,
-                'metadata': metadata,
-                'timestamp': datetime.now().isoformat(),
-                'backend': 'redis'
-            }
-            
-            serialized_data = pickle.dumps(cache_data)
-            redis_client.setex(cache_key, ttl_seconds, serialized_data)
+            redis_client.setex(cache_key, ttl_seconds, self._encode_redis_payload(data, metadata))
             
             self.logger.debug(f"Redis缓存保存成功: {cache_key}")
             return True
@@ -142,11 +148,7 @@ class AdaptiveCacheSystem:
             if not serialized_data:
                 return None
             
-            cache_data = pickle.loads(serialized_data)
-            
-            # 转换时间戳
-            if isinstance(cache_data['timestamp'], str):
-                cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
+            cache_data = self._decode_redis_payload(serialized_data)
             
             self.logger.debug(f"Redis缓存加载成功: {cache_key}")
             return cache_data
@@ -165,24 +167,7 @@ class AdaptiveCacheSystem:
             db = mongodb_client.tradingagents
             collection = db.cache
             
-            # 序列化数据
-            if isinstance(data, pd.DataFrame):
-                serialized_data = data.to_json()
-                data_type = 'dataframe'
-            else:
-                serialized_data = pickle.dumps(data).hex()
-                data_type = 'pickle'
-            
-            cache_doc = {
-                '_id': cache_key,
-                'data': serialized_data,
-                'data_type': data_type,
-                'metadata': metadata,
-                'timestamp': datetime.now(),
-                'expires_at': datetime.now() + timedelta(seconds=ttl_seconds),
-                'backend': 'mongodb'
-            }
-            
+            cache_doc = self._build_mongodb_doc(cache_key, data, metadata, ttl_seconds)
             collection.replace_one({'_id': cache_key}, cache_doc, upsert=True)
             
             self.logger.debug(f"MongoDB缓存保存成功: {cache_key}")
@@ -211,18 +196,7 @@ class AdaptiveCacheSystem:
                 collection.delete_one({'_id': cache_key})
                 return None
             
-            # 反序列化数据
-            if doc['data_type'] == 'dataframe':
-                data = pd.read_json(doc['data'])
-            else:
-                data = pickle.loads(bytes.fromhex(doc['data']))
-            
-            cache_data = {
-                'data': data,
-                'metadata': doc['metadata'],
-                'timestamp': doc['timestamp'],
-                'backend': 'mongodb'
-            }
+            cache_data = self._decode_mongodb_doc(doc)
             
             self.logger.debug(f"MongoDB缓存加载成功: {cache_key}")
             return cache_data
@@ -231,13 +205,64 @@ class AdaptiveCacheSystem:
             self.logger.error(f"MongoDB缓存加载失败: {e}")
             return None
     
-    def save_data(self, symbol: str, data: Any, start_date: str = "", end_date: str = "", 
-                  data_source: str = "default", data_type: str = "stock_data") -> str:
-        """保存数据到缓存"""
-        # 生成缓存键
+    # ---- 序列化（同步实现与 AsyncCacheFacade 共用）----
+
+    @staticmethod
+    def _encode_redis_payload(data: Any, metadata: Dict) -> bytes:
+        return pickle.dumps({
+            'data': data,
+            'metadata': metadata,
+            'timestamp': datetime.now().isoformat(),
+            'backend': 'redis'
+        })
+
+    @staticmethod
+    def _decode_redis_payload(serialized_data: bytes) -> Dict:
+        cache_data = pickle.loads(serialized_data)
+        # 转换时间戳
+        if isinstance(cache_data['timestamp'], str):
+            cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
+        return cache_data
+
+    @staticmethod
+    def _build_mongodb_doc(cache_key: str, data: Any, metadata: Dict, ttl_seconds: int) -> Dict:
+        # 序列化数据
+        if isinstance(data, pd.DataFrame):
+            serialized_data = data.to_json()
+            data_type = 'dataframe'
+        else:
+            serialized_data = pickle.dumps(data).hex()
+            data_type = 'pickle'
+
+        return {
+            '_id': cache_key,
+            'data': serialized_data,
+            'data_type': data_type,
+            'metadata': metadata,
+            'timestamp': datetime.now(),
+            'expires_at': datetime.now() + timedelta(seconds=ttl_seconds),
+            'backend': 'mongodb'
+        }
+
+    @staticmethod
+    def _decode_mongodb_doc(doc: Dict) -> Dict:
+        # 反序列化数据
+        if doc['data_type'] == 'dataframe':
+            data = pd.read_json(doc['data'])
+        else:
+            data = pickle.loads(bytes.fromhex(doc['data']))
+
+        return {
+            'data': data,
+            'metadata': doc['metadata'],
+            'timestamp': doc['timestamp'],
+            'backend': 'mongodb'
+        }
+
+    def _prepare_save(self, symbol: str, start_date: str, end_date: str,
+                      data_source: str, data_type: str):
+        """生成缓存键、元数据和TTL"""
         cache_key = self._get_cache_key(symbol, start_date, end_date, data_source, data_type)
-        
-        # 准备元数据
         metadata = {
             'symbol': symbol,
             'start_date': start_date,
@@ -245,9 +270,30 @@ class AdaptiveCacheSystem:
             'data_source': data_source,
             'data_type': data_type
         }
-        
-        # 获取TTL
-        ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+        return cache_key, metadata, self._get_ttl_seconds(symbol, data_type)
+
+    def _unwrap(self, cache_key: str, cache_data: Optional[Dict]) -> Optional[Any]:
+        """取出缓存数据；文件缓存过期时返回 None"""
+        if not cache_data:
+            return None
+
+        # 检查缓存是否有效（仅对文件缓存，数据库缓存有自己的TTL机制）
+        if cache_data.get('backend') == 'file':
+            symbol = cache_data['metadata'].get('symbol', '')
+            data_type = cache_data['metadata'].get('data_type', 'stock_data')
+            ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+
+            if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
+                self.logger.debug(f"文件缓存已过期: {cache_key}")
+                return None
+
+        return cache_data['data']
+
+    def save_data(self, symbol: str, data: Any, start_date: str = "", end_date: str = "", 
+                  data_source: str = "default", data_type: str = "stock_data") -> str:
+        """保存数据到缓存"""
+        # 生成缓存键、元数据和TTL
+        cache_key, metadata, ttl_seconds = self._prepare_save(symbol, start_date, end_date, data_source, data_type)
         
         # 根据主要后端保存
         success = False
@@ -288,20 +334,7 @@ class AdaptiveCacheSystem:
             self.logger.debug(f"主要后端({self.primary_backend})加载失败，尝试文件缓存")
             cache_data = self._load_from_file(cache_key)
         
-        if not cache_data:
-            return None
-        
-        # 检查缓存是否有效（仅对文件缓存，数据库缓存有自己的TTL机制）
-        if cache_data.get('backend') == 'file':
-            symbol = cache_data['metadata'].get('symbol', '')
-            data_type = cache_data['metadata'].get('data_type', 'stock_data')
-            ttl_seconds = self._get_ttl_seconds(symbol, data_type)
-            
-            if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
-                self.logger.debug(f"文件缓存已过期: {cache_key}")
-                return None
-        
-        return cache_data['data']
+        return self._unwrap(cache_key, cache_data)
     
     def find_cached_data(self, symbol: str, start_date: str = "", end_date: str = "", 
                         data_source: str = "default", data_type: str = "stock_data") -> Optional[str]:
@@ -386,11 +419,12 @@ class AdaptiveCacheSystem:
 
         # 文件缓存统计
         if self.primary_backend == 'file' or self.fallback_enabled:
-            for pkl_file in self.cache_dir.glob("*.pkl"):
-                try:
-                    total_size_bytes += pkl_file.stat().st_size
-                except:
-                    pass
+            for pattern in ["*.pkl"] + [f"*.{fmt}" for fmt in COLUMNAR_FORMATS]:
+                for cache_file in self.cache_dir.glob(pattern):
+                    try:
+                        total_size_bytes += cache_file.stat().st_size
+                    except:
+                        pass
 
         # 设置总大小
         stats['total_size'] = total_size_bytes
@@ -417,6 +451,8 @@ class AdaptiveCacheSystem:
                 ttl_seconds = self._get_ttl_seconds(symbol, data_type)
                 
                 if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
+                    if cache_data.get('data_file'):
+                        (self.cache_dir / cache_data['data_file']).unlink(missing_ok=True)
                     cache_file.unlink()
                     cleared_files += 1
                     
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+异步缓存门面
+
+get_cache() 返回的缓存管理器（IntegratedCacheManager / StockDataCache / DatabaseCacheManager）
+都是同步实现：文件后端会遍历目录、读写文件，数据库后端使用阻塞的 pymongo / redis 客户端。
+在 FastAPI 的 async 处理函数中直接调用会阻塞事件循环。
+
+AsyncCacheFacade 提供相同语义的 async 接口：
+- 自适应缓存（IntegratedCacheManager 启用 AdaptiveCacheSystem）主后端为 Redis / MongoDB 时，
+  使用 redis.asyncio / motor 直接访问，键与序列化格式与同步实现一致（两者可混用）
+- 文件后端及其他同步实现在专用的 I/O 线程池中执行（TA_CACHE_IO_WORKERS，默认 4），
+  不占用默认线程池
+
+使用方法：
+    from tradingagents.dataflows.cache import get_async_cache
+    cache = get_async_cache()
+    cache_key = await cache.find_cached_stock_data(symbol="00700", data_source="hk_realtime_quote")
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def get_cache_io_executor() -> ThreadPoolExecutor:
+    """缓存文件 I/O 专用线程池"""
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                from tradingagents.config.runtime_settings import get_int
+                workers = max(1, get_int("TA_CACHE_IO_WORKERS", "ta_cache_io_workers", 4))
+                _io_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-io")
+                logger.info(f"📁 缓存 I/O 线程池已创建: {workers} 个线程")
+    return _io_executor
+
+
+class AsyncCacheFacade:
+    """同步缓存管理器的异步门面"""
+
+    def __init__(self, cache, executor: Optional[ThreadPoolExecutor] = None,
+                 redis_client=None, mongodb_client=None):
+        """
+        Args:
+            cache: get_cache() 返回的同步缓存管理器
+            executor: 执行同步操作的线程池，默认使用 get_cache_io_executor()
+            redis_client: redis.asyncio 客户端，默认从 DatabaseManager 获取
+            mongodb_client: motor 客户端，默认从 DatabaseManager 获取
+        """
+        self.cache = cache
+        self._executor = executor
+        self._redis_client = redis_client
+        self._mongodb_client = mongodb_client
+
+        # 只有自适应缓存的 Redis / MongoDB 后端走原生异步实现
+        adaptive = getattr(cache, "adaptive_cache", None) if getattr(cache, "use_adaptive", False) else None
+        self.adaptive = adaptive
+        self.native = adaptive is not None and adaptive.primary_backend in ("redis", "mongodb")
+
+    # ---- 基础设施 ----
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在缓存 I/O 线程池中执行同步缓存操作（用于门面未覆盖的方法）"""
+        loop = asyncio.get_running_loop()
+        executor = self._executor or get_cache_io_executor()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def _get_redis(self):
+        if self._redis_client is None:
+            self._redis_client = self.adaptive.db_manager.get_async_redis_client()
+        return self._redis_client
+
+    def _get_mongodb_collection(self):
+        if self._mongodb_client is None:
+            self._mongodb_client = self.adaptive.db_manager.get_async_mongodb_client()
+        if self._mongodb_client is None:
+            return None
+        # 与 AdaptiveCacheSystem 使用同一集合
+        return self._mongodb_client.tradingagents.cache
+
+    # ---- 股票数据 ----
+
+    async def find_cached_stock_data(self, symbol: str, start_date: str = None,
+                                     end_date: str = None, data_source: str = "default",
+                                     **kwargs) -> Optional[str]:
+        """查找缓存的股票数据，返回缓存键或 None"""
+        if not self.native:
+            return await self.run(self.cache.find_cached_stock_data, symbol=symbol, start_date=start_date,
+                                  end_date=end_date, data_source=data_source, **kwargs)
+
+        cache_key = self.adaptive._get_cache_key(symbol, start_date or "", end_date or "",
+                                                 data_source, "stock_data")
+        if await self._load_adaptive(cache_key) is not None:
+            return cache_key
+        return None
+
+    async def load_stock_data(self, cache_key: str, **kwargs) -> Optional[Any]:
+        """从缓存加载股票数据"""
+        if not self.native:
+            return await self.run(self.cache.load_stock_data, cache_key, **kwargs)
+        return await self._load_adaptive(cache_key)
+
+    async def save_stock_data(self, symbol: str, data: Any, start_date: str = None,
+                              end_date: str = None, data_source: str = "default",
+                              **kwargs) -> str:
+        """保存股票数据到缓存，返回缓存键"""
+        if not self.native:
+            return await self.run(self.cache.save_stock_data, symbol=symbol, data=data, start_date=start_date,
+                                  end_date=end_date, data_source=data_source, **kwargs)
+        return await self._save_adaptive(symbol, data, start_date or "", end_date or "",
+                                         data_source, "stock_data")
+
+    # ---- 自适应缓存的原生异步实现（语义同 AdaptiveCacheSystem.load_data / save_data）----
+
+    async def _load_adaptive(self, cache_key: str) -> Optional[Any]:
+        adaptive = self.adaptive
+        if adaptive.primary_backend == "redis":
+            cache_data = await self._load_from_redis(cache_key)
+        else:
+            cache_data = await self._load_from_mongodb(cache_key)
+
+        # 如果主要后端失败，尝试降级
+        if not cache_data and adaptive.fallback_enabled:
+            cache_data = await self.run(adaptive._load_from_file, cache_key)
+
+        return adaptive._unwrap(cache_key, cache_data)
+
+    async def _save_adaptive(self, symbol: str, data: Any, start_date: str, end_date: str,
+                             data_source: str, data_type: str) -> str:
+        adaptive = self.adaptive
+        cache_key, metadata, ttl_seconds = adaptive._prepare_save(symbol, start_date, end_date,
+                                                                  data_source, data_type)
+        if adaptive.primary_backend == "redis":
+            success = await self._save_to_redis(cache_key, data, metadata, ttl_seconds)
+        else:
+            success = await self._save_to_mongodb(cache_key, data, metadata, ttl_seconds)
+
+        # 如果主要后端失败，使用降级策略
+        if not success and adaptive.fallback_enabled:
+            logger.warning(f"主要后端({adaptive.primary_backend})保存失败，使用文件缓存降级")
+            success = await self.run(adaptive._save_to_file, cache_key, data, metadata)
+
+        if success:
+            logger.info(f"数据缓存成功: {symbol} -> {cache_key} (后端: {adaptive.primary_backend})")
+        else:
+            logger.error(f"数据缓存失败: {symbol}")
+        return cache_key
+
+    async def _load_from_redis(self, cache_key: str) -> Optional[Dict]:
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return None
+        try:
+            serialized_data = await redis_client.get(cache_key)
+            if not serialized_data:
+                return None
+            return self.adaptive._decode_redis_payload(serialized_data)
+        except Exception as e:
+            logger.error(f"Redis缓存加载失败: {e}")
+            return None
+
+    async def _save_to_redis(self, cache_key: str, data: Any, metadata: Dict, ttl_seconds: int) -> bool:
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return False
+        try:
+            payload = self.adaptive._encode_redis_payload(data, metadata)
+            await redis_client.setex(cache_key, ttl_seconds, payload)
+            return True
+        except Exception as e:
+            logger.error(f"Redis缓存保存失败: {e}")
+            return False
+
+    async def _load_from_mongodb(self, cache_key: str) -> Optional[Dict]:
+        collection = self._get_mongodb_collection()
+        if collection is None:
+            return None
+        try:
+            doc = await collection.find_one({'_id': cache_key})
+            if not doc:
+                return None
+
+            # 检查是否过期
+            if doc.get('expires_at') and doc['expires_at'] < datetime.now():
+                await collection.delete_one({'_id': cache_key})
+                return None
+
+            return self.adaptive._decode_mongodb_doc(doc)
+        except Exception as e:
+            logger.error(f"MongoDB缓存加载失败: {e}")
+            return None
+
+    async def _save_to_mongodb(self, cache_key: str, data: Any, metadata: Dict, ttl_seconds: int) -> bool:
+        collection = self._get_mongodb_collection()
+        if collection is None:
+            return False
+        try:
+            cache_doc = self.adaptive._build_mongodb_doc(cache_key, data, metadata, ttl_seconds)
+            await collection.replace_one({'_id': cache_key}, cache_doc, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"MongoDB缓存保存失败: {e}")
+            return False
+
+
+_async_cache: Optional[AsyncCacheFacade] = None
+
+
+def get_async_cache() -> AsyncCacheFacade:
+    """获取全局异步缓存门面（包装 get_cache() 返回的缓存实例）"""
+    global _async_cache
+    if _async_cache is None:
+        from . import get_cache
+        _async_cache = AsyncCacheFacade(get_cache())
+        backend = f"原生异步 ({_async_cache.adaptive.primary_backend})" if _async_cache.native else "I/O 线程池"
+        logger.info(f"✅ 异步缓存门面已创建: {backend}")
+    return _async_cache
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+DataFrame 列式存储（Parquet / Feather）
+
+文件缓存中的 DataFrame 默认以 Arrow IPC（Feather，未压缩，可内存映射）保存，
+保留列类型与索引，加载时支持只读取部分列。未安装 pyarrow 时退回 CSV。
+
+格式通过环境变量 TA_CACHE_DATAFRAME_FORMAT 配置：auto（默认）/ feather / parquet / csv。
+Arrow 无法转换的 DataFrame（如同一 object 列中混有数字和字符串）写入时退回 CSV，
+write_frame 返回实际使用的路径和格式，调用方需记录到元数据中。
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    COLUMNAR_AVAILABLE = True
+except ImportError:
+    pa = feather = pq = None
+    COLUMNAR_AVAILABLE = False
+
+CSV = "csv"
+FEATHER = "feather"
+PARQUET = "parquet"
+COLUMNAR_FORMATS = (FEATHER, PARQUET)
+
+
+def resolve_dataframe_format(requested: Optional[str] = None) -> str:
+    """解析配置的 DataFrame 存储格式；列式格式不可用时退回 CSV"""
+    fmt = (requested or os.getenv("TA_CACHE_DATAFRAME_FORMAT", "auto")).strip().lower()
+    if fmt == "auto":
+        return FEATHER if COLUMNAR_AVAILABLE else CSV
+    if fmt in COLUMNAR_FORMATS and not COLUMNAR_AVAILABLE:
+        logger.warning(f"⚠️ 未安装 pyarrow，缓存格式 {fmt} 不可用，使用 CSV")
+        return CSV
+    if fmt not in (CSV,) + COLUMNAR_FORMATS:
+        logger.warning(f"⚠️ 未知的缓存格式 {fmt}，使用 CSV")
+        return CSV
+    return fmt
+
+
+def _index_columns(schema) -> List[str]:
+    """pandas 元数据中以列形式保存的索引（RangeIndex 不占列）"""
+    meta = schema.pandas_metadata or {}
+    return [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+
+
+def write_frame(df: pd.DataFrame, path: Union[str, Path], fmt: str, fallback: bool = True) -> Tuple[Path, str]:
+    """
+    按格式写入 DataFrame（保留索引与列类型）
+
+    Args:
+        fallback: 列式格式无法转换该 DataFrame 时改写为同名 .csv 文件；为 False 时抛出异常
+
+    Returns:
+        (实际写入的路径, 实际使用的格式)
+    """
+    path = Path(path)
+    if fmt == CSV:
+        df.to_csv(path, index=True)
+        return path, CSV
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"不支持的缓存格式: {fmt}")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        if fmt == FEATHER:
+            # 不压缩，读取时可直接内存映射
+            feather.write_feather(table, str(path), compression="uncompressed")
+        else:
+            pq.write_table(table, str(path))
+        return path, fmt
+    except (pa.ArrowException, TypeError) as e:
+        if path.exists():
+            path.unlink()
+        if not fallback:
+            raise
+        csv_path = path.with_suffix(f".{CSV}")
+        logger.debug(f"DataFrame 无法以 {fmt} 保存，改用 CSV: {csv_path.name}: {e}")
+        df.to_csv(csv_path, index=True)
+        return csv_path, CSV
+
+
+def read_frame(path: Union[str, Path], fmt: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """按格式读取 DataFrame；columns 指定时只读取这些列（索引始终保留）"""
+    path = Path(path)
+    if fmt == CSV:
+        df = pd.read_csv(path, index_col=0)
+        return df[[c for c in columns if c in df.columns]] if columns is not None else df
+
+    if fmt == FEATHER:
+        table = feather.read_table(str(path), memory_map=True)
+        if columns is not None:
+            wanted = [c for c in columns if c in table.column_names]
+            table = table.select(wanted + [c for c in _index_columns(table.schema) if c not in wanted])
+        return table.to_pandas()
+    if fmt == PARQUET:
+        if columns is not None:
+            schema = pq.read_schema(str(path))
+            wanted = [c for c in columns if c in schema.names]
+            return pq.read_table(str(path), columns=wanted + _index_columns(schema)).to_pandas()
+        return pq.read_table(str(path)).to_pandas()
+    raise ValueError(f"不支持的缓存格式: {fmt}")
@@ -17,6 +17,9 @@ import hashlib
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .metadata_index import CacheMetadataIndex, INDEX_FILENAME
+from .columnar import CSV, COLUMNAR_FORMATS, read_frame, resolve_dataframe_format, write_frame
+
 
 class StockDataCache:
     """股票数据缓存管理器 - 支持美股和A股数据缓存优化"""
@@ -92,6 +95,13 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # DataFrame 存储格式（默认 Feather；旧的 CSV 条目在加载时迁移）
+        self.dataframe_format = resolve_dataframe_format()
+        self.migrate_csv_on_load = os.getenv('TA_CACHE_MIGRATE_CSV', 'true').lower() == 'true'
+
+        # 元数据索引：部分匹配查找、清理、统计走索引查询，不再扫描 metadata 目录
+        self.metadata_index = self._open_metadata_index()
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -204,21 +214,83 @@ class StockDataCache:
 
         return base_dir / f"{cache_key}.{file_format}"
     
+    def _open_metadata_index(self) -> Optional[CacheMetadataIndex]:
+        """打开元数据索引；索引为空而已有 JSON 元数据时做一次性重建。失败时退回目录扫描"""
+        try:
+            index = CacheMetadataIndex(self.metadata_dir / INDEX_FILENAME)
+            if index.count() == 0 and next(self.metadata_dir.glob("*_meta.json"), None) is not None:
+                index.rebuild_from_metadata_dir(self.metadata_dir)
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存元数据索引不可用，退回目录扫描: {e}")
+            return None
+
+    def _scan_metadata_files(self) -> List[Dict[str, Any]]:
+        """目录扫描（仅在索引不可用时使用）"""
+        entries = []
+        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                metadata['cache_key'] = metadata_file.stem[:-len('_meta')]
+                entries.append(metadata)
+            except Exception:
+                continue
+        entries.sort(key=lambda m: m.get('cached_at') or '', reverse=True)
+        return entries
+
+    def find_cache_entries(self, symbol: str = None, data_type: str = None,
+                           market_type: str = None, data_source: str = None) -> List[Dict[str, Any]]:
+        """
+        按条件查找缓存条目（不检查TTL，最新的在前）
+
+        Returns:
+            元数据字典列表，每项包含 cache_key
+        """
+        if self.metadata_index is not None:
+            try:
+                return self.metadata_index.find(symbol=symbol, data_type=data_type,
+                                                market_type=market_type, data_source=data_source)
+            except Exception as e:
+                logger.warning(f"⚠️ 查询缓存元数据索引失败，退回目录扫描: {e}")
+
+        filters = {'symbol': symbol, 'data_type': data_type,
+                   'market_type': market_type, 'data_source': data_source}
+        return [m for m in self._scan_metadata_files()
+                if all(v is None or m.get(k) == v for k, v in filters.items())]
+
     def _get_metadata_path(self, cache_key: str) -> Path:
         """获取元数据文件路径"""
         return self.metadata_dir / f"{cache_key}_meta.json"
     
-    def _save_metadata(self, cache_key: str, metadata: Dict[str, Any]):
-        """保存元数据"""
+    def _save_metadata(self, cache_key: str, metadata: Dict[str, Any], touch: bool = True):
+        """保存元数据（touch=False 时保留原缓存时间，用于格式迁移）"""
         metadata_path = self._get_metadata_path(cache_key)
         metadata_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-        metadata['cached_at'] = datetime.now().isoformat()
+        if touch or 'cached_at' not in metadata:
+            metadata['cached_at'] = datetime.now().isoformat()
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        if self.metadata_index is not None:
+            try:
+                file_path = Path(metadata.get('file_path', ''))
+                file_size = file_path.stat().st_size if file_path.is_file() else None
+                self.metadata_index.upsert(cache_key, metadata, file_size)
+            except Exception as e:
+                logger.warning(f"⚠️ 更新缓存元数据索引失败: {e}")
     
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
+        if self.metadata_index is not None:
+            try:
+                metadata = self.metadata_index.get(cache_key)
+                if metadata is not None:
+                    return metadata
+            except Exception:
+                pass
+
         metadata_path = self._get_metadata_path(cache_key)
         if not metadata_path.exists():
             return None
@@ -302,10 +374,14 @@ class StockDataCache:
 
         # 保存数据
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
+            file_format = self.dataframe_format
+            cache_path = self._get_cache_path("stock_data", cache_key, file_format, symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            # 列式格式无法转换时退回 CSV，元数据记录实际格式
+            cache_path, file_format = write_frame(data, cache_path, file_format)
         else:
+            file_format = 'txt'
+
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
             with open(cache_path, 'w', encoding='utf-8') as f:
@@ -320,7 +396,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
@@ -331,8 +407,14 @@ class StockDataCache:
         logger.info(f"💾 {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
-    def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
-        """从缓存加载股票数据"""
+    def load_stock_data(self, cache_key: str, columns: List[str] = None) -> Optional[Union[pd.DataFrame, str]]:
+        """
+        从缓存加载股票数据
+
+        Args:
+            cache_key: 缓存键
+            columns: 只加载指定列（仅对 DataFrame 有效，列式格式下不读取其余列）
+        """
         metadata = self._load_metadata(cache_key)
         if not metadata:
             return None
@@ -342,8 +424,12 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
+            file_format = metadata['file_format']
+            if file_format == CSV and self.migrate_csv_on_load and self.dataframe_format in COLUMNAR_FORMATS:
+                df = self._migrate_csv_entry(cache_key, metadata)
+                return df[[c for c in columns if c in df.columns]] if columns is not None else df
+            if file_format == CSV or file_format in COLUMNAR_FORMATS:
+                return read_frame(cache_path, file_format, columns)
             else:
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     return f.read()
@@ -351,6 +437,40 @@ class StockDataCache:
             logger.error(f"⚠️ 加载缓存数据失败: {e}")
             return None
     
+    def _migrate_csv_entry(self, cache_key: str, metadata: Dict[str, Any]) -> pd.DataFrame:
+        """把旧的 CSV 条目改写为列式格式（保留原缓存时间），返回读取到的数据"""
+        csv_path = Path(metadata['file_path'])
+        df = read_frame(csv_path, CSV)
+        try:
+            new_path = csv_path.with_suffix(f".{self.dataframe_format}")
+            write_frame(df, new_path, self.dataframe_format, fallback=False)
+            self._save_metadata(cache_key, {**metadata, 'file_path': str(new_path),
+                                            'file_format': self.dataframe_format}, touch=False)
+            csv_path.unlink()
+            logger.debug(f"🔄 缓存条目已从 CSV 迁移为 {self.dataframe_format}: {cache_key}")
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存条目格式迁移失败（继续使用 CSV）: {cache_key}: {e}")
+        return df
+
+    def migrate_csv_cache(self) -> int:
+        """批量把所有 CSV 格式的股票数据缓存迁移为列式格式，返回迁移条目数"""
+        if self.dataframe_format not in COLUMNAR_FORMATS:
+            logger.warning("⚠️ 列式格式不可用（未安装 pyarrow 或已配置为 CSV），跳过迁移")
+            return 0
+        migrated = 0
+        for entry in self.find_cache_entries(data_type='stock_data'):
+            metadata = self._load_metadata(entry['cache_key'])
+            if not metadata or metadata.get('file_format') != CSV or not Path(metadata['file_path']).exists():
+                continue
+            try:
+                self._migrate_csv_entry(entry['cache_key'], metadata)
+                if (self._load_metadata(entry['cache_key']) or {}).get('file_format') != CSV:
+                    migrated += 1
+            except Exception as e:
+                logger.warning(f"⚠️ 迁移缓存条目失败: {entry['cache_key']}: {e}")
+        logger.info(f"🔄 已将 {migrated} 个 CSV 缓存条目迁移为 {self.dataframe_format}")
+        return migrated
+
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
                               max_age_hours: int = None) -> Optional[str]:
@@ -388,23 +508,12 @@ class StockDataCache:
             return search_key
 
         # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        for entry in self.find_cache_entries(symbol, 'stock_data', market_type, data_source):
+            cache_key = entry['cache_key']
+            if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
+                desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+                logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+                return cache_key
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
@@ -529,23 +638,12 @@ class StockDataCache:
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
         # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        for entry in self.find_cache_entries(symbol, 'fundamentals', market_type, data_source):
+            cache_key = entry['cache_key']
+            if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
+                desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+                logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+                return cache_key
         
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
@@ -555,7 +653,23 @@ class StockDataCache:
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         cleared_count = 0
-        
+
+        if self.metadata_index is not None:
+            try:
+                expired = self.metadata_index.find(cached_before=cutoff_time)
+                for entry in expired:
+                    for path in (Path(entry.get('file_path') or ''), self._get_metadata_path(entry['cache_key'])):
+                        try:
+                            if path.is_file():
+                                path.unlink()
+                        except Exception as e:
+                            logger.warning(f"⚠️ 清理缓存时出错: {e}")
+                cleared_count = self.metadata_index.delete(entry['cache_key'] for entry in expired)
+                logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ 按索引清理缓存失败，退回目录扫描: {e}")
+
         for metadata_file in self.metadata_dir.glob("*_meta.json"):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -593,7 +707,23 @@ class StockDataCache:
 
         # 统计有元数据的缓存文件
         metadata_files_count = 0
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+        index_stats = None
+        if self.metadata_index is not None:
+            try:
+                index_stats = self.metadata_index.stats()
+            except Exception as e:
+                logger.warning(f"⚠️ 读取缓存元数据索引统计失败，退回目录扫描: {e}")
+
+        if index_stats is not None:
+            for data_type, item in index_stats.items():
+                if f'{data_type}_count' in stats:
+                    stats[f'{data_type}_count'] += item['count']
+                stats['skipped_count'] += item['missing']
+                stats['total_files'] += item['count']
+                total_size_bytes += item['size']
+                metadata_files_count += item['count']
+
+        for metadata_file in ([] if index_stats is not None else self.metadata_dir.glob("*_meta.json")):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
                     metadata = json.load(f)
@@ -211,6 +211,11 @@ class IntegratedCacheManager:
         else:
             return self.legacy_cache.find_cached_fundamentals_data(symbol, data_source, max_age_hours)
 
+    def find_cache_entries(self, symbol: str = None, data_type: str = None,
+                           market_type: str = None, data_source: str = None) -> list:
+        """按条件查找文件缓存条目（元数据索引查询，不检查TTL）"""
+        return self.legacy_cache.find_cache_entries(symbol, data_type, market_type, data_source)
+
     def is_fundamentals_cache_valid(self, symbol: str, data_source: str = None,
                                    max_age_hours: int = None) -> bool:
         """
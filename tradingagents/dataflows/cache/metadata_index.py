@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+文件缓存元数据索引
+
+StockDataCache 的每个缓存条目仍写一份 *_meta.json（兼容旧工具），同时写入本索引
+（SQLite，位于 metadata 目录下）。部分匹配查找、过期清理、统计都走索引查询，
+不再逐个打开 JSON 文件扫描目录。
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+INDEX_FILENAME = "index.sqlite3"
+
+_COLUMNS = (
+    "cache_key", "symbol", "data_type", "market_type", "data_source",
+    "start_date", "end_date", "file_path", "file_format", "file_size",
+    "cached_at", "metadata",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_index (
+    cache_key   TEXT PRIMARY KEY,
+    symbol      TEXT,
+    data_type   TEXT,
+    market_type TEXT,
+    data_source TEXT,
+    start_date  TEXT,
+    end_date    TEXT,
+    file_path   TEXT,
+    file_format TEXT,
+    file_size   INTEGER,
+    cached_at   TEXT,
+    metadata    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lookup ON cache_index (symbol, data_type, market_type, data_source, cached_at);
+CREATE INDEX IF NOT EXISTS idx_cache_cached_at ON cache_index (cached_at);
+"""
+
+
+class CacheMetadataIndex:
+    """缓存元数据的 SQLite 索引（线程安全，可多进程共享同一文件）"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # --- 写入 ---
+    @staticmethod
+    def _row(cache_key: str, metadata: Dict[str, Any], file_size: Optional[int]) -> tuple:
+        return (
+            cache_key,
+            metadata.get('symbol'),
+            metadata.get('data_type'),
+            metadata.get('market_type'),
+            metadata.get('data_source'),
+            metadata.get('start_date'),
+            metadata.get('end_date'),
+            metadata.get('file_path'),
+            metadata.get('file_format'),
+            file_size,
+            metadata.get('cached_at'),
+            json.dumps(metadata, ensure_ascii=False),
+        )
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any], file_size: Optional[int] = None) -> None:
+        self.upsert_many([(cache_key, metadata, file_size)])
+
+    def upsert_many(self, entries: Iterable[tuple]) -> int:
+        """entries: [(cache_key, metadata, file_size)]"""
+        rows = [self._row(*entry) for entry in entries]
+        if not rows:
+            return 0
+        sql = f"INSERT OR REPLACE INTO cache_index ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+        return len(rows)
+
+    def delete(self, cache_keys: Iterable[str]) -> int:
+        keys = [(k,) for k in cache_keys]
+        if not keys:
+            return 0
+        with self._lock:
+            self._conn.executemany("DELETE FROM cache_index WHERE cache_key = ?", keys)
+            self._conn.commit()
+        return len(keys)
+
+    # --- 查询 ---
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM cache_index WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return json.loads(row["metadata"]) if row else None
+
+    def find(
+        self,
+        symbol: Optional[str] = None,
+        data_type: Optional[str] = None,
+        market_type: Optional[str] = None,
+        data_source: Optional[str] = None,
+        cached_after: Optional[datetime] = None,
+        cached_before: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """按条件查询条目（最新的在前），返回包含 cache_key 的行字典"""
+        clauses, params = [], []
+        for column, value in (
+            ("symbol", symbol), ("data_type", data_type),
+            ("market_type", market_type), ("data_source", data_source),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if cached_after is not None:
+            clauses.append("cached_at >= ?")
+            params.append(cached_after.isoformat())
+        if cached_before is not None:
+            clauses.append("cached_at < ?")
+            params.append(cached_before.isoformat())
+
+        sql = f"SELECT {', '.join(_COLUMNS[:-1])} FROM cache_index"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY cached_at DESC"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def stats(self) -> Dict[str, Any]:
+        """按 data_type 汇总条目数与文件大小"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data_type, COUNT(*) AS n, COALESCE(SUM(file_size), 0) AS size, "
+                "SUM(CASE WHEN file_size IS NULL THEN 1 ELSE 0 END) AS missing "
+                "FROM cache_index GROUP BY data_type"
+            ).fetchall()
+        return {r["data_type"]: {"count": r["n"], "size": r["size"], "missing": r["missing"]} for r in rows}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_index").fetchone()[0]
+
+    # --- 迁移 ---
+    def rebuild_from_metadata_dir(self, metadata_dir: Union[str, Path]) -> int:
+        """从已有的 *_meta.json 文件重建索引（只在索引为空时做一次）"""
+        entries = []
+        for metadata_file in Path(metadata_dir).glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                file_path = Path(metadata.get('file_path', ''))
+                file_size = file_path.stat().st_size if file_path.is_file() else None
+                entries.append((metadata_file.stem[:-len('_meta')], metadata, file_size))
+            except Exception:
+                continue
+        count = self.upsert_many(entries)
+        if count:
+            logger.info(f"📇 缓存元数据索引已重建: {count} 条")
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
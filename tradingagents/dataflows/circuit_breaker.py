@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+数据源熔断器与健康评分
+
+每个数据源一个熔断器，记录最近 N 次调用的成败与耗时：
+- closed：正常调用；滚动错误率超过阈值后转为 open
+- open：冷却期内跳过该数据源；冷却结束后转为 half_open
+- half_open：只放行一个探测请求，成功则恢复 closed，失败重新 open
+
+DataSourceManager 与 USDataSourceManager 共用同一个注册表，按熔断状态与健康评分
+动态调整降级顺序。状态与耗时直方图可通过 /api/health/data-sources 查看。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 耗时直方图分桶上界（秒）
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class CircuitBreaker:
+    """单个数据源的熔断器（线程安全）"""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 50,
+        min_calls: int = 5,
+        error_threshold: float = 0.5,
+        open_seconds: float = 60.0,
+        slow_call_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+
+        self._lock = threading.Lock()
+        self._calls: deque = deque(maxlen=window_size)  # (ok, latency)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._histogram = [0] * len(LATENCY_BUCKETS)
+        self._total_calls = 0
+        self._total_errors = 0
+
+    # --- 状态 ---
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.time() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"🟡 [熔断器] {self.name} 冷却结束，进入半开状态")
+        return self._state
+
+    def allow_request(self) -> bool:
+        """是否放行一次调用（半开状态下只放行一个探测请求）"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """不占用探测名额的可用性判断（用于排序）"""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    # --- 记录 ---
+    def record(self, ok: bool, latency: float) -> None:
+        # 超过慢调用阈值也视为失败（下游已经在超时边缘）
+        ok = bool(ok) and latency < self.slow_call_seconds
+        with self._lock:
+            self._calls.append((ok, latency))
+            self._total_calls += 1
+            if not ok:
+                self._total_errors += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    self._histogram[i] += 1
+                    break
+
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._calls.append((ok, latency))
+                    logger.info(f"🟢 [熔断器] {self.name} 探测成功，恢复正常")
+                else:
+                    self._trip()
+            elif state == CLOSED and len(self._calls) >= self.min_calls:
+                if self._error_rate() >= self.error_threshold:
+                    self._trip()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.time()
+        logger.warning(
+            f"🔴 [熔断器] {self.name} 熔断打开: 错误率 {self._error_rate():.0%}"
+            f"（最近 {len(self._calls)} 次），{self.open_seconds:.0f}s 内跳过该数据源"
+        )
+
+    def _error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    # --- 评分与快照 ---
+    def health_score(self) -> float:
+        """0~1：成功率 × 延迟惩罚；open 为 0，无调用记录视为健康"""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN:
+                return 0.0
+            if not self._calls:
+                return 1.0
+            latencies = sorted(lat for _, lat in self._calls)
+            p95 = _percentile(latencies, 0.95) or 0.0
+            return (1.0 - self._error_rate()) / (1.0 + p95 / 10.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            latencies = sorted(lat for _, lat in self._calls)
+            return {
+                "name": self.name,
+                "state": state,
+                "error_rate": round(self._error_rate(), 4),
+                "window_calls": len(self._calls),
+                "total_calls": self._total_calls,
+                "total_errors": self._total_errors,
+                "latency_p50": _percentile(latencies, 0.50),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_p99": _percentile(latencies, 0.99),
+                "latency_histogram": [
+                    {"le": "+Inf" if bound == float("inf") else bound, "count": count}
+                    for bound, count in zip(LATENCY_BUCKETS, self._histogram)
+                ],
+                "open_remaining_seconds": (
+                    max(0.0, round(self.open_seconds - (time.time() - self._opened_at), 1)) if state == OPEN else 0.0
+                ),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._state = CLOSED
+            self._probe_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """按数据源名称管理熔断器"""
+
+    _STATE_RANK = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, **breaker_kwargs):
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        name = str(name).lower()
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, **self._breaker_kwargs)
+                self._breakers[name] = breaker
+            return breaker
+
+    def record(self, name: str, ok: bool, latency: float) -> None:
+        self.get(name).record(ok, latency)
+
+    def order(self, sources: Iterable[Any], key=lambda s: getattr(s, "value", s)) -> List[Any]:
+        """
+        按熔断状态与健康评分调整数据源顺序。
+
+        跳过处于 open（或半开且已有探测在途）的数据源；其余按 (状态, 评分档位, 原优先级) 排序，
+        评分按 0.1 分档，健康程度相近的数据源保持配置的优先级。全部不可用时返回原顺序。
+        """
+        sources = list(sources)
+        ranked = []
+        for idx, source in enumerate(sources):
+            breaker = self.get(key(source))
+            if not breaker.is_available():
+                continue
+            ranked.append((self._STATE_RANK[breaker.state], -round(breaker.health_score(), 1), idx, source))
+        if not ranked:
+            return sources
+        ranked.sort(key=lambda t: t[:3])
+        ordered = [t[3] for t in ranked]
+        if len(ordered) < len(sources) or ordered != sources:
+            logger.info(f"🔀 [熔断器] 数据源顺序调整: {[key(s) for s in sources]} -> {[key(s) for s in ordered]}")
+        return ordered
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [b.snapshot() for b in sorted(breakers, key=lambda b: b.name)]
+
+    def reset(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            breakers = list(self._breakers.values()) if name is None else [self._breakers.get(str(name).lower())]
+        for b in breakers:
+            if b is not None:
+                b.reset()
+
+
+_registry: Optional[CircuitBreakerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker_registry() -> CircuitBreakerRegistry:
+    """全局熔断器注册表（中国/美股数据源管理器共用）"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from tradingagents.config.runtime_settings import get_float, get_int
+                _registry = CircuitBreakerRegistry(
+                    window_size=get_int("TA_CIRCUIT_BREAKER_WINDOW", None, 50),
+                    min_calls=get_int("TA_CIRCUIT_BREAKER_MIN_CALLS", None, 5),
+                    error_threshold=get_float("TA_CIRCUIT_BREAKER_ERROR_THRESHOLD", None, 0.5),
+                    open_seconds=get_float("TA_CIRCUIT_BREAKER_OPEN_SECONDS", None, 60.0),
+                )
+    return _registry
+
+
+def record_source_call(name: str, started: float, ok: bool) -> None:
+    """记录一次数据源调用（started 为 time.time() 起始时间）"""
+    try:
+        get_circuit_breaker_registry().record(name, ok, time.time() - started)
+    except Exception:
+        pass
+
+
+def track_source_call(name: str, fn: Callable[..., str],
+                      is_ok: Callable[[str], bool] = bool) -> Callable[..., str]:
+    """
+    包装返回字符串的数据源调用：熔断中直接返回不可用结果（不调用 fn），否则记录成败与耗时。
+
+    不可用结果以 "❌" 开头，调用方的降级链据此切换到下一个数据源。
+    """
+    def _call(*args, **kwargs):
+        # 半开状态下占用探测名额；open 或探测已在途时跳过
+        if not get_circuit_breaker_registry().get(name).allow_request():
+            logger.info(f"⏭️ [熔断器] {name} 熔断中，跳过调用")
+            return f"❌ {name} 数据源熔断中，暂不可用"
+        started = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            record_source_call(name, started, False)
+            raise
+        record_source_call(name, started, is_ok(result))
+        return result
+
+    return _call
@@ -23,6 +23,12 @@ logger = setup_dataflow_logging()
 
 # 导入统一数据源编码
 from tradingagents.constants import DataSourceCode
+from tradingagents.dataflows.single_flight import single_flight
+
+
+def _current_source(manager) -> str:
+    """请求合并 key 的数据源成分"""
+    return manager.current_source.value
 
 
 class ChinaDataSource(Enum):
@@ -66,6 +72,11 @@ class DataSourceManager:
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
 
+        # 对冲请求：当前数据源超过延迟预算未返回时并发启动下一个数据源
+        from tradingagents.config.runtime_settings import get_bool, get_float
+        self.hedge_enabled = get_bool("TA_DATA_SOURCE_HEDGING", "ta_data_source_hedging", True)
+        self.hedge_delay = get_float("TA_DATA_SOURCE_HEDGE_DELAY_SECONDS", "ta_data_source_hedge_delay_seconds", 3.0)
+
         # 初始化统一缓存管理器
         self.cache_manager = None
         self.cache_enabled = False
@@ -82,6 +93,7 @@ class DataSourceManager:
         logger.info(f"   统一缓存: {'✅ 已启用' if self.cache_enabled else '❌ 未启用'}")
         logger.info(f"   默认数据源: {self.default_source.value}")
         logger.info(f"   可用数据源: {[s.value for s in self.available_sources]}")
+        logger.info(f"   对冲请求: {'✅ 已启用' if self.hedge_enabled else '❌ 未启用'} (延迟预算 {self.hedge_delay:.1f}s)")
 
     def _check_mongodb_enabled(self) -> bool:
         """检查是否启用MongoDB缓存"""
@@ -89,6 +101,19 @@ class DataSourceManager:
         return use_app_cache_enabled()
 
     def _get_data_source_priority_order(self, symbol: Optional[str] = None) -> List[ChinaDataSource]:
+        """
+        数据源降级顺序：配置的优先级经熔断器调整（跳过熔断中的数据源，健康度差的后移）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            按当前健康状况排序的数据源列表
+        """
+        from .circuit_breaker import get_circuit_breaker_registry
+        return get_circuit_breaker_registry().order(self._get_configured_priority_order(symbol))
+
+    def _get_configured_priority_order(self, symbol: Optional[str] = None) -> List[ChinaDataSource]:
         """
         从数据库获取数据源优先级顺序（用于降级）
 
@@ -102,16 +127,9 @@ class DataSourceManager:
         market_category = self._identify_market_category(symbol)
 
         try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
+            # 🔥 读取数据源配置（进程内系统配置快照，命中时无数据库访问）
+            from app.core.config_snapshot import get_system_config_snapshot
+            config_data = get_system_config_snapshot().get_sync()
 
             if config_data and config_data.get('data_source_configs'):
                 data_source_configs = config_data.get('data_source_configs', [])
@@ -246,6 +264,7 @@ class DataSourceManager:
             # 恢复原始数据源
             self.current_source = original_source
 
+    @single_flight("cn.fundamentals", scope=_current_source)
     def get_fundamentals_data(self, symbol: str) -> str:
         """
         获取基本面数据，支持多数据源和自动降级
@@ -326,6 +345,7 @@ class DataSourceManager:
         # 重定向到统一接口
         return self._get_tushare_fundamentals(symbol)
 
+    @single_flight("cn.news", scope=_current_source, clone=list)
     def get_news_data(self, symbol: str = None, hours_back: int = 24, limit: int = 20) -> List[Dict[str, Any]]:
         """
         获取新闻数据的统一接口，支持多数据源和自动降级
@@ -415,15 +435,9 @@ class DataSourceManager:
         # 🔥 从数据库读取数据源配置，获取启用状态
         enabled_sources_in_db = set()
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
+            # 读取激活配置（进程内系统配置快照）
+            from app.core.config_snapshot import get_system_config_snapshot
+            config_data = get_system_config_snapshot().get_sync()
 
             if config_data and config_data.get('data_source_configs'):
                 data_source_configs = config_data.get('data_source_configs', [])
@@ -509,11 +523,9 @@ class DataSourceManager:
     def _get_datasource_configs_from_db(self) -> dict:
         """从数据库读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
+            # 读取激活的配置（进程内系统配置快照）
+            from app.core.config_snapshot import get_system_config_snapshot
+            config = get_system_config_snapshot().get_sync()
             if not config:
                 return {}
 
@@ -1028,6 +1040,7 @@ class DataSourceManager:
 
         return out
 
+    @single_flight("cn.stock_data", scope=_current_source)
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> str:
         """
         获取股票数据的统一接口，支持多周期数据
@@ -1066,16 +1079,24 @@ class DataSourceManager:
 
             if self.current_source == ChinaDataSource.MONGODB:
                 result, actual_source = self._get_mongodb_data(symbol, start_date, end_date, period)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}', period='{period}'")
-                result = self._get_tushare_data(symbol, start_date, end_date, period)
-                actual_source = "tushare"
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date, period)
-                actual_source = "akshare"
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date, period)
-                actual_source = "baostock"
+            elif self.hedge_enabled and self.current_source in self._get_fetchers():
+                # 对冲模式：当前数据源与备用数据源按优先级对冲执行，取最先返回的有效结果
+                from .circuit_breaker import get_circuit_breaker_registry
+                sources = get_circuit_breaker_registry().order(
+                    [self.current_source] + self._get_fallback_candidates(symbol)
+                )
+                result, actual_source = self._hedged_fetch(sources, symbol, start_date, end_date, period)
+                if actual_source is not None:
+                    duration = time.time() - start_time
+                    logger.info(f"✅ [数据来源: {actual_source}] 成功获取股票数据: {symbol} ({len(result)}字符, 耗时{duration:.2f}秒)")
+                    return result
+                logger.error(f"❌ [数据来源: 所有数据源失败] 所有数据源都无法获取有效数据: {symbol}")
+                return result or f"❌ 所有数据源都无法获取{symbol}的{period}数据"
+            elif self.current_source in self._get_fetchers():
+                if self.current_source == ChinaDataSource.TUSHARE:
+                    logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}', period='{period}'")
+                result = self._get_fetchers()[self.current_source](symbol, start_date, end_date, period)
+                actual_source = self.current_source.value
             # TDX 已移除
             else:
                 result = f"❌ 不支持的数据源: {self.current_source.value}"
@@ -1118,7 +1139,7 @@ class DataSourceManager:
                               })
 
                 # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
+                fallback_result, _ = self._try_fallback_sources(symbol, start_date, end_date, period)
                 if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
                     logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取数据: {symbol}")
                     return fallback_result
@@ -1138,7 +1159,8 @@ class DataSourceManager:
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            fallback_result, _ = self._try_fallback_sources(symbol, start_date, end_date, period)
+            return fallback_result
 
     def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
         """
@@ -1379,6 +1401,44 @@ class DataSourceManager:
             logger.error(f"❌ 获取成交量失败: {e}")
             return 0
 
+    def _get_fetchers(self) -> Dict[ChinaDataSource, Any]:
+        """数据源 -> 多周期数据获取方法（MongoDB 缓存单独处理；调用结果计入熔断器）"""
+        return {
+            ChinaDataSource.TUSHARE: self._tracked(ChinaDataSource.TUSHARE, self._get_tushare_data),
+            ChinaDataSource.AKSHARE: self._tracked(ChinaDataSource.AKSHARE, self._get_akshare_data),
+            ChinaDataSource.BAOSTOCK: self._tracked(ChinaDataSource.BAOSTOCK, self._get_baostock_data),
+        }
+
+    @staticmethod
+    def _tracked(source: ChinaDataSource, fn):
+        """包装数据源调用：熔断中跳过调用，否则记录成败与耗时到熔断器"""
+        from .circuit_breaker import track_source_call
+
+        return track_source_call(
+            source.value, fn, lambda result: bool(result) and "❌" not in result and "错误" not in result
+        )
+
+    def _get_fallback_candidates(self, symbol: str) -> List[ChinaDataSource]:
+        """按优先级排列的备用数据源（不含当前数据源与MongoDB）"""
+        fetchers = self._get_fetchers()
+        return [
+            source for source in self._get_data_source_priority_order(symbol)
+            if source != self.current_source and source in self.available_sources and source in fetchers
+        ]
+
+    def _hedged_fetch(self, sources: List[ChinaDataSource], symbol: str, start_date: str, end_date: str,
+                      period: str = "daily") -> tuple[str, str | None]:
+        """对冲执行多个数据源，返回 (结果字符串, 实际使用的数据源名称)"""
+        from .hedging import hedged_call
+
+        fetchers = self._get_fetchers()
+        calls = [
+            (source.value, lambda f=fetchers[source]: f(symbol, start_date, end_date, period))
+            for source in sources
+        ]
+        logger.info(f"🔀 [对冲请求] {symbol} {period}: {[s.value for s in sources]} (延迟预算 {self.hedge_delay:.1f}s)")
+        return hedged_call(calls, self.hedge_delay)
+
     def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
         """
         尝试备用数据源 - 避免递归调用
@@ -1390,34 +1450,33 @@ class DataSourceManager:
 
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
         # 注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
-        fallback_order = self._get_data_source_priority_order(symbol)
+        fallback_order = self._get_fallback_candidates(symbol)
+
+        if self.hedge_enabled and len(fallback_order) > 1:
+            result, actual_source = self._hedged_fetch(fallback_order, symbol, start_date, end_date, period)
+            if actual_source is not None:
+                logger.info(f"✅ [备用数据源-{actual_source}] 成功获取{period}数据: {symbol}")
+                return result, actual_source
+            logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
+            return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
 
+        fetchers = self._get_fetchers()
         for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 [备用数据源] 尝试 {source.value} 获取{period}数据: {symbol}")
+            try:
+                logger.info(f"🔄 [备用数据源] 尝试 {source.value} 获取{period}数据: {symbol}")
 
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date, period)
-                    # TDX 已移除
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
+                # 直接调用具体的数据源方法，避免递归
+                result = fetchers[source](symbol, start_date, end_date, period)
 
-                    if "❌" not in result:
-                        logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
-                        return result, source.value  # 返回结果和实际使用的数据源
-                    else:
-                        logger.warning(f"⚠️ [备用数据源-{source.value}] 返回错误结果: {symbol}")
+                if "❌" not in result:
+                    logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
+                    return result, source.value  # 返回结果和实际使用的数据源
+                else:
+                    logger.warning(f"⚠️ [备用数据源-{source.value}] 返回错误结果: {symbol}")
 
-                except Exception as e:
-                    logger.error(f"❌ [备用数据源-{source.value}] 获取失败: {symbol}, 错误: {e}")
-                    continue
+            except Exception as e:
+                logger.error(f"❌ [备用数据源-{source.value}] 获取失败: {symbol}, 错误: {e}")
+                continue
 
         logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
         return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
@@ -2018,6 +2077,7 @@ class DataSourceManager:
 
     def _try_fallback_fundamentals(self, symbol: str) -> str:
         """基本面数据降级处理"""
+        from .circuit_breaker import record_source_call
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取基本面...")
 
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
@@ -2029,12 +2089,14 @@ class DataSourceManager:
                     logger.info(f"🔄 尝试备用数据源获取基本面: {source.value}")
 
                     # 直接调用具体的数据源方法，避免递归
+                    started = time.time()
                     if source == ChinaDataSource.TUSHARE:
                         result = self._get_tushare_fundamentals(symbol)
                     elif source == ChinaDataSource.AKSHARE:
                         result = self._get_akshare_fundamentals(symbol)
                     else:
                         continue
+                    record_source_call(source.value, started, bool(result) and "❌" not in result)
 
                     if result and "❌" not in result:
                         logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {source.value}")
@@ -2248,6 +2310,19 @@ class USDataSourceManager:
         return use_app_cache_enabled()
 
     def _get_data_source_priority_order(self, symbol: Optional[str] = None) -> List[USDataSource]:
+        """
+        美股数据源降级顺序：配置的优先级经熔断器调整（与中国数据源共用熔断器注册表）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            按当前健康状况排序的数据源列表
+        """
+        from .circuit_breaker import get_circuit_breaker_registry
+        return get_circuit_breaker_registry().order(self._get_configured_priority_order(symbol))
+
+    def _get_configured_priority_order(self, symbol: Optional[str] = None) -> List[USDataSource]:
         """
         从数据库获取美股数据源优先级顺序（用于降级）
 
@@ -2422,11 +2497,9 @@ class USDataSourceManager:
     def _get_datasource_configs_from_db(self) -> dict:
         """从数据库读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
+            # 读取激活的配置（进程内系统配置快照）
+            from app.core.config_snapshot import get_system_config_snapshot
+            config = get_system_config_snapshot().get_sync()
             if not config:
                 return {}
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+对冲请求（hedged request）
+
+按优先级依次调用多个数据源：当前数据源在延迟预算内未返回时，并发启动下一个数据源，
+取第一个通过质量检查的结果，其余请求被取消（尚未开始）或丢弃（已在运行）。
+某个数据源提前失败时立即启动下一个，无需等待预算耗尽。
+
+被丢弃的慢请求仍占用线程直到返回，因此每个数据源的在途请求数有上限：
+达到上限的数据源不再被对冲启动；所有数据源都满时不做对冲，直接在调用线程中请求首选数据源。
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+# 被丢弃的慢请求仍会在线程中跑完，线程池需容纳若干个并发的对冲请求
+HEDGE_MAX_WORKERS = 16
+# 每个数据源同时在途的请求上限（含已丢弃但仍在运行的慢请求），避免卡住的数据源占满线程池
+HEDGE_MAX_IN_FLIGHT_PER_SOURCE = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_in_flight: Counter = Counter()
+_in_flight_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+    return _executor
+
+
+def _acquire_slot(name: str) -> bool:
+    with _in_flight_lock:
+        if _in_flight[name] >= HEDGE_MAX_IN_FLIGHT_PER_SOURCE:
+            return False
+        _in_flight[name] += 1
+        return True
+
+
+def _release_slot(name: str) -> None:
+    with _in_flight_lock:
+        _in_flight[name] -= 1
+        if _in_flight[name] <= 0:
+            del _in_flight[name]
+
+
+def is_valid_result(result: Any) -> bool:
+    """与 DataSourceManager 一致的质量检查：非空且不包含错误标记"""
+    return isinstance(result, str) and bool(result) and "❌" not in result and "错误" not in result
+
+
+def hedged_call(
+    calls: Sequence[Tuple[str, Callable[[], Any]]],
+    hedge_delay: float,
+    accept: Callable[[Any], bool] = is_valid_result,
+    on_result: Optional[Callable[[str, Any, Optional[BaseException], float], None]] = None,
+) -> Tuple[Any, Optional[str]]:
+    """
+    按顺序对冲执行 calls，返回 (第一个被接受的结果, 数据源名称)。
+
+    Args:
+        calls: [(数据源名称, 无参调用)]，按优先级排列
+        hedge_delay: 每个数据源的延迟预算（秒）；超过后并发启动下一个数据源
+        accept: 结果质量检查
+        on_result: 每个请求完成时的回调 (名称, 结果, 异常, 耗时)，用于统计
+
+    全部失败时返回 (最后一个完成的结果或 None, None)。
+    """
+    if not calls:
+        return None, None
+
+    executor = _get_executor()
+    pending: dict = {}
+    queue: List[Tuple[str, Callable[[], Any]]] = list(calls)
+    last_result: Any = None
+
+    def _notify(name, result, error, elapsed):
+        if on_result:
+            try:
+                on_result(name, result, error, elapsed)
+            except Exception:
+                pass
+
+    def _launch():
+        """启动队列中下一个有空闲名额的数据源，返回其名称；没有可启动的数据源时返回 None"""
+        while queue:
+            name, fn = queue.pop(0)
+            if not _acquire_slot(name):
+                logger.warning(f"⏭️ [对冲请求] {name} 已有 {HEDGE_MAX_IN_FLIGHT_PER_SOURCE} 个在途请求，跳过")
+                continue
+            started = time.time()
+            fut = executor.submit(fn)
+            # 名额在请求真正结束时释放（被丢弃的慢请求跑完之前一直占用）
+            fut.add_done_callback(lambda _f, n=name: _release_slot(n))
+            pending[fut] = (name, started)
+            return name
+        return None
+
+    if _launch() is None:
+        # 所有数据源的在途请求都已满：不做对冲，在调用线程中直接请求首选数据源
+        name, fn = calls[0]
+        logger.warning(f"⚠️ [对冲请求] 所有数据源在途请求已满，不做对冲，直接调用 {name}")
+        started = time.time()
+        try:
+            result = fn()
+        except Exception as e:
+            _notify(name, None, e, time.time() - started)
+            logger.warning(f"⚠️ [对冲请求] {name} 异常: {e}")
+            return None, None
+        _notify(name, result, None, time.time() - started)
+        return (result, name) if accept(result) else (result, None)
+
+    while pending:
+        timeout = hedge_delay if queue else None
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done:
+            # 延迟预算耗尽：对冲启动下一个有空闲名额的数据源
+            name = _launch()
+            if name is not None:
+                logger.info(f"⏱️ [对冲请求] 超过 {hedge_delay:.1f}s 未返回，并发启动 {name}")
+            continue
+
+        for fut in done:
+            name, started = pending.pop(fut)
+            elapsed = time.time() - started
+            error = fut.exception()
+            result = None if error else fut.result()
+            _notify(name, result, error, elapsed)
+
+            if error is None and accept(result):
+                for other in pending:
+                    other.cancel()
+                if pending:
+                    logger.info(f"✅ [对冲请求] {name} 最先返回有效结果（{elapsed:.2f}s），丢弃其余 {len(pending)} 个请求")
+                return result, name
+
+            if error is not None:
+                logger.warning(f"⚠️ [对冲请求] {name} 异常: {error}")
+            else:
+                last_result = result
+                logger.warning(f"⚠️ [对冲请求] {name} 返回无效结果（{elapsed:.2f}s）")
+
+        # 有请求失败且没有其他在途请求时，立即启动下一个
+        if queue and not pending:
+            _launch()
+
+    return last_result, None
@@ -60,15 +60,9 @@ def _get_enabled_hk_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['akshare', 'yfinance']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
+        # 读取激活配置（进程内系统配置快照，命中时无数据库访问）
+        from app.core.config_snapshot import get_system_config_snapshot
+        config_data = get_system_config_snapshot().get_sync()
 
         if config_data and config_data.get('data_source_configs'):
             data_source_configs = config_data.get('data_source_configs', [])
@@ -120,15 +114,9 @@ def _get_enabled_us_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['yfinance', 'finnhub']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
+        # 读取激活配置（进程内系统配置快照，命中时无数据库访问）
+        from app.core.config_snapshot import get_system_config_snapshot
+        config_data = get_system_config_snapshot().get_sync()
 
         if config_data and config_data.get('data_source_configs'):
             data_source_configs = config_data.get('data_source_configs', [])
@@ -1167,6 +1155,7 @@ def get_fundamentals_openai(ticker, curr_date):
         # 导入缓存管理器和数据源管理器
         from .cache import get_cache
         from .data_source_manager import get_us_data_source_manager, USDataSource
+        from .circuit_breaker import track_source_call
 
         cache = get_cache()
         us_manager = get_us_data_source_manager()
@@ -1195,29 +1184,31 @@ def get_fundamentals_openai(ticker, curr_date):
         priority_order = us_manager._get_data_source_priority_order(ticker)
         logger.info(f"📊 [美股基本面] 数据源优先级: {[s.value for s in priority_order]}")
 
-        # 按优先级尝试每个数据源
-        for source in priority_order:
-            try:
-                if source == USDataSource.ALPHA_VANTAGE:
-                    result = _get_fundamentals_alpha_vantage(ticker, curr_date, cache)
-                    if result:
-                        return result
+        fetchers = {
+            USDataSource.ALPHA_VANTAGE: lambda: _get_fundamentals_alpha_vantage(ticker, curr_date, cache),
+            USDataSource.YFINANCE: lambda: _get_fundamentals_yfinance(ticker, curr_date, cache),
+            USDataSource.FINNHUB: lambda: get_fundamentals_finnhub(ticker, curr_date),
+        }
 
-                elif source == USDataSource.YFINANCE:
-                    result = _get_fundamentals_yfinance(ticker, curr_date, cache)
-                    if result:
-                        return result
-
-                elif source == USDataSource.FINNHUB:
-                    result = get_fundamentals_finnhub(ticker, curr_date)
-                    if result and "❌" not in result:
-                        cache.save_fundamentals_data(ticker, result, data_source="finnhub")
-                        return result
+        def _is_valid(result):
+            return bool(result) and "❌" not in result
 
+        # 按优先级尝试每个数据源（熔断中的数据源直接跳过）
+        for source in priority_order:
+            fetch = fetchers.get(source)
+            if fetch is None:
+                continue
+            try:
+                result = track_source_call(source.value, fetch, _is_valid)()
             except Exception as e:
                 logger.warning(f"⚠️ [{source.value}] 获取失败: {e}，尝试下一个数据源")
                 continue
 
+            if _is_valid(result):
+                if source == USDataSource.FINNHUB:
+                    cache.save_fundamentals_data(ticker, result, data_source="finnhub")
+                return result
+
         # 🔥 特殊处理：OpenAI（如果配置了）
         config = get_config()
         openai_api_key = os.getenv("OPENAI_API_KEY")
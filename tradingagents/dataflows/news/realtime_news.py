@@ -9,17 +9,34 @@ import json
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 # 导入日志模块
-from tradingagents.config.runtime_settings import get_timezone_name
+from tradingagents.config.runtime_settings import get_bool, get_float, get_timezone_name
 
+from tradingagents.dataflows.news.near_duplicate import dedupe_near_duplicates, publish_day
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+# 新闻源并发查询线程池（超时被放弃的请求仍会在后台跑完）
+NEWS_FETCH_MAX_WORKERS = 12
+
+_news_executor: Optional[ThreadPoolExecutor] = None
+_news_executor_lock = threading.Lock()
+
+
+def _get_news_executor() -> ThreadPoolExecutor:
+    global _news_executor
+    if _news_executor is None:
+        with _news_executor_lock:
+            if _news_executor is None:
+                _news_executor = ThreadPoolExecutor(max_workers=NEWS_FETCH_MAX_WORKERS, thread_name_prefix="news")
+    return _news_executor
 
 
 @dataclass
@@ -46,6 +63,18 @@ class RealtimeNewsAggregator:
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
+
+        # API地址（测试时可指向本地服务）
+        self.finnhub_url = "https://finnhub.io/api/v1/company-news"
+        self.alpha_vantage_url = "https://www.alphavantage.co/query"
+        self.newsapi_url = "https://newsapi.org/v2/everything"
+
+        # 并发查询配置：单个新闻源的HTTP超时、整体时间预算
+        self.concurrent_fetch = get_bool("TA_NEWS_CONCURRENT_FETCH", "ta_news_concurrent_fetch", True)
+        self.source_timeout = get_float("TA_NEWS_SOURCE_TIMEOUT_SECONDS", "ta_news_source_timeout_seconds", 8.0)
+        self.total_budget = get_float("TA_NEWS_TOTAL_BUDGET_SECONDS", "ta_news_total_budget_seconds", 10.0)
+        self._source_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
         
         # 中文财经媒体新闻缓存
         # 重要: 设置15分钟缓存,防止频繁请求被金十数据拉黑IP
@@ -53,105 +82,132 @@ class RealtimeNewsAggregator:
         self._media_news_cache_time = None
         self._media_cache_duration = timedelta(minutes=15)  # 15分钟缓存
 
-    def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
-        """
-        获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
-
-        Args:
-            ticker: 股票代码
-            hours_back: 回溯小时数
-            max_news: 最大新闻数量，默认10条
-        """
-        logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
-        start_time = datetime.now(ZoneInfo(get_timezone_name()))
-        all_news = []
-
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now(ZoneInfo(get_timezone_name()))
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now(ZoneInfo(get_timezone_name())) - finnhub_start).total_seconds()
+    def get_source_stats(self) -> Dict[str, Dict[str, float]]:
+        """各新闻源的调用统计（次数、超时、异常、平均/最近耗时）"""
+        with self._stats_lock:
+            return {name: dict(stat) for name, stat in self._source_stats.items()}
+
+    def _record_source(self, name: str, elapsed: float, count: int = 0, timeout: bool = False, error: bool = False):
+        with self._stats_lock:
+            stat = self._source_stats.setdefault(name, {
+                'calls': 0, 'timeouts': 0, 'errors': 0, 'items': 0,
+                'total_latency': 0.0, 'avg_latency': 0.0, 'last_latency': 0.0,
+            })
+            stat['calls'] += 1
+            stat['timeouts'] += int(timeout)
+            stat['errors'] += int(error)
+            stat['items'] += count
+            stat['total_latency'] += elapsed
+            stat['avg_latency'] = stat['total_latency'] / stat['calls']
+            stat['last_latency'] = elapsed
+
+    def _news_sources(self, ticker: str, hours_back: int) -> List[Tuple[str, Callable[[], List[NewsItem]]]]:
+        """按优先级列出本次要查询的新闻源"""
+        sources = [
+            # 1. FinnHub实时新闻 (最高优先级)
+            ("FinnHub", lambda: self._get_finnhub_realtime_news(ticker, hours_back)),
+            # 2. Alpha Vantage新闻
+            ("Alpha Vantage", lambda: self._get_alpha_vantage_news(ticker, hours_back)),
+        ]
 
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
+        # 3. NewsAPI (如果配置了)
+        if self.newsapi_key:
+            sources.append(("NewsAPI", lambda: self._get_newsapi_news(ticker, hours_back)))
         else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-
-        all_news.extend(finnhub_news)
+            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
 
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now(ZoneInfo(get_timezone_name()))
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now(ZoneInfo(get_timezone_name())) - av_start).total_seconds()
+        # 4. 中文财经新闻源
+        sources.append(("中文财经新闻", lambda: self._get_chinese_finance_news(ticker, hours_back)))
 
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
+        # 5. Yahoo Finance 新闻 (港股优先)
+        is_hk_stock = '.HK' in ticker.upper() or ticker.isdigit() and len(ticker) == 4
+        if is_hk_stock:
+            logger.info(f"[新闻聚合器] 检测到港股代码 {ticker}，将从 Yahoo Finance 获取新闻")
+            sources.append(("Yahoo Finance", lambda: self._get_yahoo_finance_news(ticker, hours_back)))
 
-        all_news.extend(av_news)
+        # 6. 中文财经媒体新闻 (金十数据、华尔街见闻、格隆汇)，通用财经快讯,适用于所有市场
+        sources.append(("中文财经媒体", lambda: self._get_chinese_financial_media_news(hours_back)))
+        return sources
 
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now(ZoneInfo(get_timezone_name()))
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now(ZoneInfo(get_timezone_name())) - newsapi_start).total_seconds()
+    def _fetch_sequentially(self, sources) -> List[NewsItem]:
+        all_news = []
+        for name, fetch in sources:
+            logger.info(f"[新闻聚合器] 尝试从 {name} 获取新闻")
+            items, latency, error = self._timed_fetch(name, fetch)
+            self._record_source(name, latency, len(items), error=error)
+            if items:
+                logger.info(f"[新闻聚合器] 成功从 {name} 获取 {len(items)} 条新闻，耗时: {latency:.2f}秒")
+            else:
+                logger.info(f"[新闻聚合器] {name} 未返回新闻，耗时: {latency:.2f}秒")
+            all_news.extend(items)
+        return all_news
 
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
+    @staticmethod
+    def _timed_fetch(name: str, fetch: Callable[[], List[NewsItem]]) -> Tuple[List[NewsItem], float, bool]:
+        started = time.time()
+        try:
+            return fetch() or [], time.time() - started, False
+        except Exception as e:
+            logger.error(f"[新闻聚合器] {name} 获取异常: {e}")
+            return [], time.time() - started, True
+
+    def _fetch_concurrently(self, sources) -> List[NewsItem]:
+        """并发查询所有新闻源，在总时间预算内收集已返回的结果，超时的新闻源直接放弃"""
+        executor = _get_news_executor()
+        started = time.time()
+        futures = {executor.submit(self._timed_fetch, name, fetch): name for name, fetch in sources}
+        done, not_done = wait(futures, timeout=self.total_budget)
+        elapsed = time.time() - started
+
+        results: Dict[str, List[NewsItem]] = {}
+        for fut in done:
+            name = futures[fut]
+            items, latency, error = fut.result()
+            results[name] = items
+            self._record_source(name, latency, len(items), error=error)
+            if items:
+                logger.info(f"[新闻聚合器] 成功从 {name} 获取 {len(items)} 条新闻，耗时: {latency:.2f}秒")
             else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
+                logger.info(f"[新闻聚合器] {name} 未返回新闻，耗时: {latency:.2f}秒")
 
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
+        for fut in not_done:
+            name = futures[fut]
+            fut.cancel()
+            self._record_source(name, elapsed, timeout=True)
+            logger.warning(f"⏱️ [新闻聚合器] {name} 超过 {self.total_budget:.1f}s 时间预算未返回，放弃等待")
 
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now(ZoneInfo(get_timezone_name()))
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now(ZoneInfo(get_timezone_name())) - chinese_start).total_seconds()
+        # 按新闻源优先级拼接，保证去重时保留高优先级来源
+        all_news = []
+        for name, _ in sources:
+            all_news.extend(results.get(name, []))
 
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
+        logger.info(
+            f"[新闻聚合器] 并发获取完成: {len(done)}/{len(futures)} 个新闻源按时返回，"
+            f"共 {len(all_news)} 条，耗时: {elapsed:.2f}秒"
+        )
+        return all_news
 
-        all_news.extend(chinese_news)
+    def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
+        """
+        获取实时股票新闻
+        优先级：专业API > 新闻API > 搜索引擎
 
-        # 5. Yahoo Finance 新闻 (港股优先)
-        # 检测是否为港股代码
-        is_hk_stock = '.HK' in ticker.upper() or ticker.isdigit() and len(ticker) == 4
-        
-        if is_hk_stock:
-            logger.info(f"[新闻聚合器] 检测到港股代码 {ticker}，尝试从 Yahoo Finance 获取新闻")
-            yahoo_start = datetime.now(ZoneInfo(get_timezone_name()))
-            yahoo_news = self._get_yahoo_finance_news(ticker, hours_back)
-            yahoo_time = (datetime.now(ZoneInfo(get_timezone_name())) - yahoo_start).total_seconds()
-            
-            if yahoo_news:
-                logger.info(f"[新闻聚合器] 成功从 Yahoo Finance 获取 {len(yahoo_news)} 条新闻，耗时: {yahoo_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] Yahoo Finance 未返回新闻，耗时: {yahoo_time:.2f}秒")
-            
-            all_news.extend(yahoo_news)
-
-        # 6. 中文财经媒体新闻 (金十数据、华尔街见闻、格隆汇)
-        # 通用财经快讯,适用于所有市场
-        logger.info(f"[新闻聚合器] 尝试获取中文财经媒体快讯")
-        media_start = datetime.now(ZoneInfo(get_timezone_name()))
-        media_news = self._get_chinese_financial_media_news(hours_back)
-        media_time = (datetime.now(ZoneInfo(get_timezone_name())) - media_start).total_seconds()
-        
-        if media_news:
-            logger.info(f"[新闻聚合器] 成功从中文财经媒体获取 {len(media_news)} 条新闻，耗时: {media_time:.2f}秒")
+        并发模式（默认）下所有新闻源同时查询，只等待总时间预算，慢的新闻源结果被放弃；
+        顺序模式下依次查询（TA_NEWS_CONCURRENT_FETCH=false）。
+
+        Args:
+            ticker: 股票代码
+            hours_back: 回溯小时数
+            max_news: 最大新闻数量，默认10条
+        """
+        logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
+        start_time = datetime.now(ZoneInfo(get_timezone_name()))
+
+        sources = self._news_sources(ticker, hours_back)
+        if self.concurrent_fetch:
+            all_news = self._fetch_concurrently(sources)
         else:
-            logger.info(f"[新闻聚合器] 中文财经媒体未返回新闻，耗时: {media_time:.2f}秒")
-        
-        all_news.extend(media_news)
+            all_news = self._fetch_sequentially(sources)
 
         # 去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
@@ -192,7 +248,7 @@ class RealtimeNewsAggregator:
             start_time = end_time - timedelta(hours=hours_back)
 
             # FinnHub API调用
-            url = "https://finnhub.io/api/v1/company-news"
+            url = self.finnhub_url
             params = {
                 'symbol': ticker,
                 'from': start_time.strftime('%Y-%m-%d'),
@@ -200,7 +256,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             news_data = response.json()
@@ -237,7 +293,7 @@ class RealtimeNewsAggregator:
             return []
 
         try:
-            url = "https://www.alphavantage.co/query"
+            url = self.alpha_vantage_url
             params = {
                 'function': 'NEWS_SENTIMENT',
                 'tickers': ticker,
@@ -245,7 +301,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -296,7 +352,7 @@ class RealtimeNewsAggregator:
 
             query = f"{ticker} OR {company_names.get(ticker, ticker)}"
 
-            url = "https://newsapi.org/v2/everything"
+            url = self.newsapi_url
             params = {
                 'q': query,
                 'language': 'en',
@@ -305,7 +361,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -849,10 +905,22 @@ class RealtimeNewsAggregator:
             seen_titles.add(title_key)
             unique_news.append(item)
 
+        # 近似重复聚类：同一通稿被多家媒体改写转载，每簇保留相关度最高、内容最完整的一条
+        before_cluster = len(unique_news)
+        unique_news = dedupe_near_duplicates(
+            unique_news,
+            text_of=lambda n: f"{n.title} {(n.content or '')[:300]}",
+            rank_key=lambda n: (n.relevance_score, len(n.content or '')),
+            body_of=lambda n: n.content or '',
+            group_of=lambda n: publish_day(n.publish_time),
+        )
+        near_duplicate_count = before_cluster - len(unique_news)
+
         # 记录去重结果
         time_taken = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
         logger.info(f"[新闻去重] 去重完成，原始新闻: {len(news_items)}条，去重后: {len(unique_news)}条，")
-        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
+        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，近似重复: {near_duplicate_count}条，"
+                    f"标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
 
         return unique_news
 
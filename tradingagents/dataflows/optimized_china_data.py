@@ -15,6 +15,7 @@ from .cache import get_cache
 from tradingagents.config.config_manager import config_manager
 
 from tradingagents.config.runtime_settings import get_float, get_timezone_name
+from .single_flight import single_flight
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -101,6 +102,7 @@ class OptimizedChinaDataProvider:
             logger.warning(f"⚠️ 格式化财务数据失败: {e}")
             return f"# {symbol} 基本面数据\n\n❌ 数据格式化失败: {str(e)}"
 
+    @single_flight("optimized_cn.stock_data")
     def get_stock_data(self, symbol: str, start_date: str, end_date: str,
                       force_refresh: bool = False) -> str:
         """
@@ -195,6 +197,7 @@ class OptimizedChinaDataProvider:
             # 生成备用数据
             return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
 
+    @single_flight("optimized_cn.fundamentals")
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
         获取A股基本面数据 - 优先使用缓存
@@ -220,25 +223,17 @@ class OptimizedChinaDataProvider:
 
         # 2. 检查文件缓存（除非强制刷新）
         if not force_refresh:
-            # 查找基本面数据缓存
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'fundamentals' and
-                        metadata.get('market_type') == 'china'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
-                            cached_data = self.cache.load_stock_data(cache_key)
-                            if cached_data:
-                                logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol}")
-                                return cached_data
-                except Exception:
-                    continue
+            # 查找基本面数据缓存（元数据索引查询）
+            try:
+                for entry in self.cache.find_cache_entries(symbol, 'fundamentals', 'china'):
+                    cache_key = entry['cache_key']
+                    if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
+                        cached_data = self.cache.load_stock_data(cache_key)
+                        if cached_data:
+                            logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol}")
+                            return cached_data
+            except Exception:
+                pass
 
         # 缓存未命中，生成基本面分析
         logger.debug(f"🔍 [数据来源: 生成分析] 生成A股基本面分析: {symbol}")
@@ -2057,21 +2052,11 @@ class OptimizedChinaDataProvider:
         """尝试获取过期的缓存数据作为备用"""
         try:
             # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
+            for entry in self.cache.find_cache_entries(symbol, 'stock_data', 'china'):
                 try:
-                    import json
-
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'china'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
+                    cached_data = self.cache.load_stock_data(entry['cache_key'])
+                    if cached_data:
+                        return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
         except Exception:
@@ -15,6 +15,7 @@ from tradingagents.config.runtime_settings import get_timezone_name
 import os
 
 from tradingagents.config.runtime_settings import get_float, get_int
+from tradingagents.dataflows.single_flight import single_flight
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -45,6 +46,7 @@ class HKStockProvider:
 
         self.last_request_time = time.time()
 
+    @single_flight("hk.stock_data", clone=lambda df: df.copy())
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> Optional[pd.DataFrame]:
         """
         获取港股历史数据
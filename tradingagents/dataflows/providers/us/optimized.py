@@ -30,6 +30,8 @@ except ImportError:
         return {}
 
 from tradingagents.config.runtime_settings import get_float, get_timezone_name
+from tradingagents.dataflows.circuit_breaker import track_source_call
+from tradingagents.dataflows.single_flight import single_flight
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -67,6 +69,7 @@ class OptimizedUSDataProvider:
 
         self.last_api_call = time.time()
 
+    @single_flight("optimized_us.stock_data")
     def get_stock_data(self, symbol: str, start_date: str, end_date: str,
                       force_refresh: bool = False) -> str:
         """
@@ -90,7 +93,7 @@ class OptimizedUSDataProvider:
             us_manager = get_us_data_source_manager()
 
             # 获取数据源优先级顺序
-            priority_order = us_manager._get_data_source_priority_order(symbol)
+            priority_order = us_manager._get_configured_priority_order(symbol)
 
             # 数据源名称映射
             source_name_mapping = {
@@ -145,20 +148,27 @@ class OptimizedUSDataProvider:
         for source in source_priority:
             try:
                 source_name = source.value
-                logger.info(f"🌐 [数据来源: API调用-{source_name.upper()}] 尝试从 {source_name.upper()} 获取数据: {symbol}")
-                self._wait_for_rate_limit()
-
                 # 根据数据源类型调用不同的方法
-                if source_name == 'finnhub':
-                    formatted_data = self._get_data_from_finnhub(symbol, start_date, end_date)
-                elif source_name == 'alpha_vantage':
-                    formatted_data = self._get_data_from_alpha_vantage(symbol, start_date, end_date)
-                elif source_name == 'yfinance':
-                    formatted_data = self._get_data_from_yfinance(symbol, start_date, end_date)
-                else:
+                fetchers = {
+                    'finnhub': self._get_data_from_finnhub,
+                    'alpha_vantage': self._get_data_from_alpha_vantage,
+                    'yfinance': self._get_data_from_yfinance,
+                }
+                fetch = fetchers.get(source_name)
+                if fetch is None:
                     logger.warning(f"⚠️ 未知的数据源类型: {source_name}")
                     continue
 
+                def _call(fetch=fetch):
+                    self._wait_for_rate_limit()
+                    return fetch(symbol, start_date, end_date)
+
+                logger.info(f"🌐 [数据来源: API调用-{source_name.upper()}] 尝试从 {source_name.upper()} 获取数据: {symbol}")
+                # 熔断中的数据源直接返回不可用结果，不占用 API 限额
+                formatted_data = track_source_call(
+                    source_name, _call, lambda r: bool(r) and "❌" not in r
+                )()
+
                 if formatted_data and "❌" not in formatted_data:
                     data_source = source_name
                     logger.info(f"✅ [数据来源: API调用成功-{source_name.upper()}] {source_name.upper()} 数据获取成功: {symbol}")
@@ -324,20 +334,11 @@ class OptimizedUSDataProvider:
         """尝试获取过期的缓存数据作为备用"""
         try:
             # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
+            for entry in self.cache.find_cache_entries(symbol, 'stock_data', 'us'):
                 try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'us'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
+                    cached_data = self.cache.load_stock_data(entry['cache_key'])
+                    if cached_data:
+                        return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
         except Exception:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）
+
+同一时刻多个线程发起完全相同的数据请求（同一数据源、股票、日期范围、周期）时，
+只有第一个线程真正调用数据源，其余线程等待并共享它的结果（或异常）。
+请求完成后立即移除，不做结果缓存——缓存仍由各数据源自己的缓存层负责。
+"""
+
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters", "owner")
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按 key 合并并发的相同调用（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """执行或加入 key 对应的在途调用，返回 (结果, 是否共享了他人的结果)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.owner == threading.get_ident():
+                # 同一线程内的重入调用：直接执行，避免等待自己
+                call = None
+                leader = None
+            elif call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if leader is None:
+            return fn(), False
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+            if call.waiters:
+                logger.info(f"🔗 [请求合并] {key} 共享给 {call.waiters} 个并发请求")
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_group = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """全局请求合并组（所有数据源共用）"""
+    return _group
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def single_flight(
+    namespace: str,
+    scope: Optional[Callable[[Any], Any]] = None,
+    clone: Optional[Callable[[Any], Any]] = None,
+):
+    """
+    方法装饰器：以 (namespace, scope(self), 规范化后的参数) 为 key 合并并发的相同调用。
+
+    Args:
+        namespace: 调用类别，如 "cn.stock_data"
+        scope: 从 self 取额外的 key 成分（如当前数据源），同一参数在不同数据源下不合并
+        clone: 共享结果返回给等待者前的复制函数（用于 DataFrame/list 等可变结果）
+    """
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                bound = sig.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                params = tuple((k, _freeze(v)) for k, v in list(bound.arguments.items())[1:])
+            except TypeError:
+                return fn(self, *args, **kwargs)
+
+            key = (namespace, _freeze(scope(self)) if scope else None, params)
+            result, shared = _group.do(key, lambda: fn(self, *args, **kwargs))
+            if shared and clone is not None and result is not None:
+                return clone(result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,127 @@
+# TradingAgents/graph/graph_pool.py
+
+"""
+TradingAgentsGraph 实例池
+
+构建 TradingAgentsGraph 需要创建两个 LLM 客户端（含 HTTP 连接池）、Toolkit、五个记忆集合、
+全部 ToolNode，并重新编译 LangGraph。这些部分在运行期间不会被修改，每次运行的状态保存在
+GraphRunContext 中，因此同一配置的任务可以共享一个已构建好的实例。
+
+实例按配置指纹（供应商、模型、分析深度等完整配置 + 分析师列表 + debug）缓存，按 LRU 淘汰。
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from tradingagents.config.runtime_settings import get_int
+from tradingagents.utils.logging_manager import get_logger
+
+from .trading_graph import TradingAgentsGraph
+
+logger = get_logger('agents')
+
+DEFAULT_ANALYSTS = ["market", "fundamentals"]
+
+
+def graph_fingerprint(config: Dict[str, Any], selected_analysts: Iterable[str], debug: bool = False) -> str:
+    """配置指纹：配置内容相同的任务得到同一个指纹"""
+    payload = json.dumps(
+        {"config": config, "analysts": list(selected_analysts), "debug": bool(debug)},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class TradingGraphPool:
+    """按配置指纹缓存 TradingAgentsGraph（线程安全）"""
+
+    def __init__(self, max_size: int = 4):
+        # max_size <= 0 表示不缓存，每次都构建新实例
+        self.max_size = max_size
+        self._graphs: "OrderedDict[str, TradingAgentsGraph]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def acquire(
+        self,
+        config: Dict[str, Any],
+        selected_analysts: Optional[Iterable[str]] = None,
+        debug: bool = False,
+    ) -> TradingAgentsGraph:
+        """获取与配置匹配的实例，没有则构建（同一指纹只构建一次）"""
+        analysts = list(selected_analysts or config.get("selected_analysts") or DEFAULT_ANALYSTS)
+        if self.max_size <= 0:
+            return self._build(config, analysts, debug)
+
+        key = graph_fingerprint(config, analysts, debug)
+        graph = self._lookup(key)
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            # 等待期间其他线程可能已构建完成
+            graph = self._lookup(key)
+            if graph is not None:
+                return graph
+
+            graph = self._build(config, analysts, debug)
+            with self._lock:
+                self._misses += 1
+                self._graphs[key] = graph
+                self._building.pop(key, None)
+                while len(self._graphs) > self.max_size:
+                    evicted, _ = self._graphs.popitem(last=False)
+                    logger.info(f"🧹 [图实例池] 淘汰最久未使用的实例: {evicted[:8]}")
+        logger.info(f"✅ [图实例池] 新建实例 {key[:8]}（池中 {len(self._graphs)}/{self.max_size}）")
+        return graph
+
+    def _lookup(self, key: str) -> Optional[TradingAgentsGraph]:
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                self._hits += 1
+            return graph
+
+    def _build(self, config: Dict[str, Any], analysts, debug: bool) -> TradingAgentsGraph:
+        # 复制配置：调用方之后修改自己的 config 不影响共享实例
+        return TradingAgentsGraph(selected_analysts=analysts, debug=debug, config=copy.deepcopy(config))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._graphs),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+_pool: Optional[TradingGraphPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_trading_graph_pool() -> TradingGraphPool:
+    """全局实例池，大小由 TA_GRAPH_POOL_SIZE 配置（0 表示禁用缓存）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TradingGraphPool(max_size=get_int("TA_GRAPH_POOL_SIZE", "ta_graph_pool_size", 4))
+    return _pool
@@ -1,6 +1,11 @@
 # TradingAgents/graph/trading_graph.py
 
+import hashlib
 import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 import json
 from datetime import date
@@ -37,6 +42,70 @@ from .reflection import Reflector
 from .signal_processing import SignalProcessor
 
 
+@dataclass
+class GraphRunContext:
+    """Mutable state of one analysis run.
+
+    The compiled graph, LLM clients and memories of a TradingAgentsGraph are shared by
+    every run; everything a run writes lives here so concurrent runs don't interfere.
+    """
+    ticker: Optional[str] = None
+    curr_state: Optional[Dict[str, Any]] = None
+    log_states_dict: Dict[str, Any] = field(default_factory=dict)  # date to full state dict
+
+
+def _config_key(config: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _GlobalConfigGate:
+    """Serializes graph builds/runs whose configs differ.
+
+    interface.set_config and Toolkit._config are module-level and shared by every graph.
+    Holders with the same config run concurrently; a holder with another config waits
+    until they finish (and new same-config holders queue behind it), then applies its own.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._key: Optional[str] = None
+        self._active = 0
+        self._waiting: Counter = Counter()
+
+    def _can_enter(self, key: str) -> bool:
+        if self._active == 0:
+            return True
+        others_waiting = sum(n for k, n in self._waiting.items() if k != key)
+        return self._key == key and not others_waiting
+
+    @contextmanager
+    def hold(self, key: str, apply=None):
+        with self._cond:
+            self._waiting[key] += 1
+            try:
+                while not self._can_enter(key):
+                    self._cond.wait()
+            finally:
+                self._waiting[key] -= 1
+                if not self._waiting[key]:
+                    del self._waiting[key]
+            if self._active == 0:
+                self._key = key
+                if apply is not None:
+                    apply()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                if self._active == 0:
+                    self._cond.notify_all()
+
+
+_CONFIG_GATE = _GlobalConfigGate()
+
+
 class TradingAgentsGraph:
     """Main class that orchestrates the trading agents framework."""
 
@@ -53,8 +122,15 @@ class TradingAgentsGraph:
             debug: Whether to run in debug mode
             config: Configuration dictionary. If None, uses default config
         """
+        config = config or DEFAULT_CONFIG
+        self._config_key = _config_key(config)
+        # Building writes the module-level configs too, so it must not overlap other-config runs
+        with _CONFIG_GATE.hold(self._config_key):
+            self._build(selected_analysts, debug, config)
+
+    def _build(self, selected_analysts, debug, config: Dict[str, Any]):
         self.debug = debug
-        self.config = config or DEFAULT_CONFIG
+        self.config = config
 
         # Update the interface's config
         set_config(self.config)
@@ -276,14 +352,37 @@ class TradingAgentsGraph:
         self.reflector = Reflector(self.quick_thinking_llm)
         self.signal_processor = SignalProcessor(self.quick_thinking_llm)
 
-        # State tracking
-        self.curr_state = None
-        self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        # State tracking: one GraphRunContext per thread, so a shared instance is safe
+        self._local = threading.local()
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
 
+    @property
+    def run_context(self) -> GraphRunContext:
+        """Run context of the calling thread (the latest propagate call in this thread)"""
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = GraphRunContext()
+        return context
+
+    @property
+    def ticker(self):
+        return self.run_context.ticker
+
+    @property
+    def curr_state(self):
+        return self.run_context.curr_state
+
+    @property
+    def log_states_dict(self):
+        return self.run_context.log_states_dict
+
+    def _apply_global_config(self):
+        """Re-apply this graph's config to the module-level configs shared by all graphs"""
+        set_config(self.config)
+        Toolkit.update_config(self.config)
+
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources."""
         return {
@@ -329,17 +428,42 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def propagate(self, company_name, trade_date, *, run_context: Optional[GraphRunContext] = None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            run_context: State holder for this run. Defaults to the calling thread's context
+                when it is for the same ticker (states of several dates accumulate as before),
+                otherwise a new one.
+        """
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的company_name: '{company_name}' (类型: {type(company_name)})")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的trade_date: '{trade_date}' (类型: {type(trade_date)})")
 
-        self.ticker = company_name
+        if run_context is None:
+            current = getattr(self._local, "context", None)
+            run_context = current if current is not None and current.ticker == company_name else GraphRunContext()
+        self._local.context = run_context
+        run_context.ticker = company_name
         logger.debug(f"🔍 [GRAPH DEBUG] 设置self.ticker: '{self.ticker}'")
 
+        # A pooled instance may run after a graph with another config was built; runs with
+        # different configs take turns so they don't overwrite each other's module-level config
+        with _CONFIG_GATE.hold(self._config_key, self._apply_global_config):
+            final_state = self._run_graph(company_name, trade_date)
+
+        # Store current state for reflection
+        run_context.curr_state = final_state
+
+        # Log state
+        self._log_state(trade_date, final_state, run_context)
+
+        # Return decision and processed signal
+        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+
+    def _run_graph(self, company_name, trade_date) -> Dict[str, Any]:
         # Initialize state
         logger.debug(f"🔍 [GRAPH DEBUG] 创建初始状态，传递参数: company_name='{company_name}', trade_date='{trade_date}'")
         init_agent_state = self.propagator.create_initial_state(
@@ -364,18 +488,11 @@ class TradingAgentsGraph:
             # Standard mode without tracing
             final_state = self.graph.invoke(init_agent_state, **args)
 
-        # Store current state for reflection
-        self.curr_state = final_state
-
-        # Log state
-        self._log_state(trade_date, final_state)
-
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+        return final_state
 
-    def _log_state(self, trade_date, final_state):
+    def _log_state(self, trade_date, final_state, run_context: GraphRunContext):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        run_context.log_states_dict[str(trade_date)] = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -406,31 +523,32 @@ class TradingAgentsGraph:
         }
 
         # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        directory = Path(f"eval_results/{run_context.ticker}/TradingAgentsStrategy_logs/")
         directory.mkdir(parents=True, exist_ok=True)
 
         with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
+            f"eval_results/{run_context.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
             "w",
         ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+            json.dump(run_context.log_states_dict, f, indent=4)
 
-    def reflect_and_remember(self, returns_losses):
+    def reflect_and_remember(self, returns_losses, *, run_context: Optional[GraphRunContext] = None):
         """Reflect on decisions and update memory based on returns."""
+        curr_state = (run_context or self.run_context).curr_state
         self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
+            curr_state, returns_losses, self.bull_memory
         )
         self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
+            curr_state, returns_losses, self.bear_memory
         )
         self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
+            curr_state, returns_losses, self.trader_memory
         )
         self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
+            curr_state, returns_losses, self.invest_judge_memory
         )
         self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+            curr_state, returns_losses, self.risk_manager_memory
         )
 
     def process_signal(self, full_signal, stock_symbol=None):
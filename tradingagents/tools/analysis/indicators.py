@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -16,12 +16,6 @@ class IndicatorSpec:
 SUPPORTED = {"ma", "ema", "macd", "rsi", "boll", "atr", "kdj"}
 
 
-def _require_cols(df: pd.DataFrame, cols: Iterable[str]):
-    missing = [c for c in cols if c not in df.columns]
-    if missing:
-        raise ValueError(f"DataFrame缺少必要列: {missing}, 现有列: {list(df.columns)[:10]}...")
-
-
 def ma(close: pd.Series, n: int, min_periods: int = None) -> pd.Series:
     """
     计算移动平均线（Moving Average）
@@ -95,7 +89,11 @@ def rsi(close: pd.Series, n: int = 14, method: str = 'ema') -> pd.Series:
         - 'sma': 使用 rolling(window=n).mean()，简单移动平均
         - 'china': 使用 ewm(com=n-1, adjust=True)，与同花顺/通达信一致
     """
-    delta = close.diff()
+    return _rsi_from_delta(close.diff(), n, method)
+
+
+def _rsi_from_delta(delta, n: int, method: str = 'ema'):
+    """由价格差分计算 RSI（差分可在多个 RSI 周期/口径间共享）"""
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
 
@@ -146,126 +144,220 @@ def boll(close: pd.Series, n: int = 20, k: float = 2.0, min_periods: int = None)
     return pd.DataFrame({"boll_mid": mid, "boll_upper": upper, "boll_lower": lower})
 
 
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Series:
+def _true_range(high, low, close):
+    """真实波幅；对 Series 与宽表（DataFrame）同样适用，NaN 被忽略（与逐列取 max 一致）"""
     prev_close = close.shift(1)
-    tr = pd.concat([
-        (high - low).abs(),
-        (high - prev_close).abs(),
-        (low - prev_close).abs(),
-    ], axis=1).max(axis=1)
+    return np.fmax(np.fmax((high - low).abs(), (high - prev_close).abs()), (low - prev_close).abs())
+
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Series:
+    tr = _true_range(high, low, close)
     return tr.rolling(window=int(n), min_periods=int(n)).mean()
 
 
-def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int = 3, m2: int = 3) -> pd.DataFrame:
+def _kdj_rsv(high, low, close, n: int):
     lowest_low = low.rolling(window=int(n), min_periods=int(n)).min()
     highest_high = high.rolling(window=int(n), min_periods=int(n)).max()
     rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
     # 处理除零与起始NaN
-    rsv = rsv.replace([np.inf, -np.inf], np.nan)
+    return rsv.replace([np.inf, -np.inf], np.nan)
 
-    # 按经典公式递推（初始化 50）
-    k = pd.Series(np.nan, index=close.index)
-    d = pd.Series(np.nan, index=close.index)
+
+def _kdj_smooth(rsv: np.ndarray, m1: int = 3, m2: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    K/D 的递推平滑（初始化 50，RSV 为 NaN 时输出 NaN 并沿用上一状态）
+
+    rsv 为一维（单只股票）时在 Python 浮点上递推；二维（行=时间、列=股票）时
+    每一步对所有股票做向量运算。两种路径运算顺序相同，结果逐位一致。
+    """
     alpha_k = 1 / float(m1)
     alpha_d = 1 / float(m2)
-    last_k = 50.0
-    last_d = 50.0
-    for i in range(len(close)):
-        rv = rsv.iloc[i]
-        if np.isnan(rv):
-            k.iloc[i] = np.nan
-            d.iloc[i] = np.nan
-            continue
+
+    if rsv.ndim == 1:
+        k_out = [np.nan] * len(rsv)
+        d_out = [np.nan] * len(rsv)
+        last_k = 50.0
+        last_d = 50.0
+        for i, rv in enumerate(rsv.tolist()):
+            if rv != rv:  # NaN
+                continue
+            last_k = (1 - alpha_k) * last_k + alpha_k * rv
+            last_d = (1 - alpha_d) * last_d + alpha_d * last_k
+            k_out[i] = last_k
+            d_out[i] = last_d
+        return np.array(k_out, dtype=float), np.array(d_out, dtype=float)
+
+    k_arr = np.full(rsv.shape, np.nan)
+    d_arr = np.full(rsv.shape, np.nan)
+    last_k = np.full(rsv.shape[1], 50.0)
+    last_d = np.full(rsv.shape[1], 50.0)
+    for i in range(rsv.shape[0]):
+        rv = rsv[i]
+        valid = ~np.isnan(rv)
         curr_k = (1 - alpha_k) * last_k + alpha_k * rv
         curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
-        k.iloc[i] = curr_k
-        d.iloc[i] = curr_d
-        last_k, last_d = curr_k, curr_d
+        k_arr[i] = np.where(valid, curr_k, np.nan)
+        d_arr[i] = np.where(valid, curr_d, np.nan)
+        last_k = np.where(valid, curr_k, last_k)
+        last_d = np.where(valid, curr_d, last_d)
+    return k_arr, d_arr
+
+
+def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int = 3, m2: int = 3) -> pd.DataFrame:
+    rsv = _kdj_rsv(high, low, close, n)
+    k_arr, d_arr = _kdj_smooth(rsv.to_numpy(dtype=float), m1, m2)
+    k = pd.Series(k_arr, index=close.index)
+    d = pd.Series(d_arr, index=close.index)
     j = 3 * k - 2 * d
     return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": j})
 
 
+class _Intermediates:
+    """
+    单次批量计算内共享的中间结果
+
+    同一输入上的多个指标会重复用到 close.diff()、同窗口滚动均值（MA20 与 BOLL 中轨）、
+    同周期 EMA（EMA12/26 与 MACD）等，这里按键缓存，只算一次。
+    输入既可以是 Series（单只股票），也可以是宽表 DataFrame（行=K线、列=股票）。
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._memo: Dict[tuple, Any] = {}
+
+    def _get(self, key: tuple, fn):
+        value = self._memo.get(key)
+        if value is None:
+            value = fn()
+            self._memo[key] = value
+        return value
+
+    def sma(self, n: int):
+        return self._get(("sma", n), lambda: self.data["close"].rolling(window=n, min_periods=1).mean())
+
+    def std(self, n: int):
+        return self._get(("std", n), lambda: self.data["close"].rolling(window=n, min_periods=1).std())
+
+    def ema(self, span: int):
+        return self._get(("ema", span), lambda: self.data["close"].ewm(span=span, adjust=False).mean())
+
+    def delta(self):
+        return self._get(("delta",), lambda: self.data["close"].diff())
+
+    def rsi(self, n: int, method: str = "ema"):
+        return self._get(("rsi", n, method), lambda: _rsi_from_delta(self.delta(), n, method))
+
+    def true_range(self):
+        return self._get(("tr",), lambda: _true_range(self.data["high"], self.data["low"], self.data["close"]))
+
+
+def _compute_specs(data: Dict[str, Any], specs: List[IndicatorSpec], wrap) -> Dict[str, Any]:
+    """
+    按规格批量计算指标，返回 {列名: 结果}（按规格顺序，已去重）
+
+    data 为 {字段: Series 或 宽表}；wrap(ndarray, like) 把 KDJ 的数组结果包装回与输入同型的对象。
+    """
+    inter = _Intermediates(data)
+    results: Dict[str, Any] = {}
+
+    def _require(cols: Iterable[str]):
+        missing = [c for c in cols if c not in data]
+        if missing:
+            raise ValueError(f"DataFrame缺少必要列: {missing}, 现有列: {list(data.keys())[:10]}...")
+
+    seen = set()
+    for spec in specs or []:
+        name = spec.name.lower()
+        params = spec.params or {}
+        key = (name, tuple(sorted(params.items())))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        if name == "ma":
+            _require(["close"])
+            n = int(params.get("n", params.get("period", 20)))
+            results[f"ma{n}"] = inter.sma(n)
+        elif name == "ema":
+            _require(["close"])
+            n = int(params.get("n", params.get("period", 20)))
+            results[f"ema{n}"] = inter.ema(n)
+        elif name == "macd":
+            _require(["close"])
+            fast = int(params.get("fast", 12))
+            slow = int(params.get("slow", 26))
+            signal = int(params.get("signal", 9))
+            dif = inter.ema(fast) - inter.ema(slow)
+            dea = dif.ewm(span=signal, adjust=False).mean()
+            results["dif"], results["dea"], results["macd_hist"] = dif, dea, dif - dea
+        elif name == "rsi":
+            _require(["close"])
+            n = int(params.get("n", params.get("period", 14)))
+            results[f"rsi{n}"] = inter.rsi(n)
+        elif name == "boll":
+            _require(["close"])
+            n = int(params.get("n", 20))
+            k = float(params.get("k", 2.0))
+            mid, std = inter.sma(n), inter.std(n)
+            results["boll_mid"], results["boll_upper"], results["boll_lower"] = mid, mid + k * std, mid - k * std
+        elif name == "atr":
+            _require(["high", "low", "close"])
+            n = int(params.get("n", 14))
+            results[f"atr{n}"] = inter.true_range().rolling(window=n, min_periods=n).mean()
+        elif name == "kdj":
+            _require(["high", "low", "close"])
+            n = int(params.get("n", 9))
+            m1 = int(params.get("m1", 3))
+            m2 = int(params.get("m2", 3))
+            rsv = _kdj_rsv(data["high"], data["low"], data["close"], n)
+            k_arr, d_arr = _kdj_smooth(rsv.to_numpy(dtype=float), m1, m2)
+            k, d = wrap(k_arr, rsv), wrap(d_arr, rsv)
+            results["kdj_k"], results["kdj_d"], results["kdj_j"] = k, d, 3 * k - 2 * d
+        else:
+            raise ValueError(f"不支持的指标: {name}")
+
+    return results
+
+
 def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
-    name = spec.name.lower()
-    params = spec.params or {}
-    out = df.copy()
-
-    if name == "ma":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 20)))
-        out[f"ma{n}"] = ma(df["close"], n)
-        return out
-
-    if name == "ema":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 20)))
-        out[f"ema{n}"] = ema(df["close"], n)
-        return out
-
-    if name == "macd":
-        _require_cols(df, ["close"])
-        fast = int(params.get("fast", 12))
-        slow = int(params.get("slow", 26))
-        signal = int(params.get("signal", 9))
-        macd_df = macd(df["close"], fast=fast, slow=slow, signal=signal)
-        for c in macd_df.columns:
-            out[c] = macd_df[c]
-        return out
-
-    if name == "rsi":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 14)))
-        out[f"rsi{n}"] = rsi(df["close"], n)
-        return out
-
-    if name == "boll":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", 20))
-        k = float(params.get("k", 2.0))
-        boll_df = boll(df["close"], n=n, k=k)
-        for c in boll_df.columns:
-            out[c] = boll_df[c]
-        return out
-
-    if name == "atr":
-        _require_cols(df, ["high", "low", "close"])
-        n = int(params.get("n", 14))
-        out[f"atr{n}"] = atr(df["high"], df["low"], df["close"], n=n)
-        return out
-
-    if name == "kdj":
-        _require_cols(df, ["high", "low", "close"])
-        n = int(params.get("n", 9))
-        m1 = int(params.get("m1", 3))
-        m2 = int(params.get("m2", 3))
-        kdj_df = kdj(df["high"], df["low"], df["close"], n=n, m1=m1, m2=m2)
-        for c in kdj_df.columns:
-            out[c] = kdj_df[c]
-        return out
-
-    raise ValueError(f"不支持的指标: {name}")
+    return compute_many(df, [spec])
 
 
 def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
+    """
+    一次性计算多个指标：共享中间结果，所有指标列一次性拼接到输出（不再逐指标复制 DataFrame）
+    """
     if not specs:
         return df.copy()
-    # 粗略去重（按 name+sorted(params)）
-    def key(s: IndicatorSpec):
-        p = s.params or {}
-        items = tuple(sorted(p.items()))
-        return (s.name.lower(), items)
 
-    unique_specs: List[IndicatorSpec] = []
-    seen = set()
-    for s in specs:
-        k = key(s)
-        if k not in seen:
-            seen.add(k)
-            unique_specs.append(s)
-
-    out = df.copy()
-    for s in unique_specs:
-        out = compute_indicator(out, s)
+    data = {c: df[c] for c in ("high", "low", "close") if c in df.columns}
+    results = _compute_specs(data, specs, lambda arr, like: pd.Series(arr, index=like.index))
+
+    new_cols = pd.DataFrame({c: v.to_numpy() for c, v in results.items()}, index=df.index)
+    # 已存在的同名列以新结果为准
+    overlap = [c for c in new_cols.columns if c in df.columns]
+    base = df.drop(columns=overlap) if overlap else df
+    return pd.concat([base, new_cols], axis=1)
+
+
+def compute_panel(panel: Dict[str, pd.DataFrame], specs: List[IndicatorSpec]) -> Dict[str, pd.DataFrame]:
+    """
+    横截面批量计算指标（compute_many 的面板版本）
+
+    Args:
+        panel: {字段名: 宽表}，宽表的行为K线（按时间升序），列为股票代码；
+            各股票的序列应右对齐（最后一行即各自最新一根K线），前部缺失以 NaN 填充
+        specs: 指标规格列表，与 compute_many 相同
+
+    Returns:
+        新的 {列名: 宽表} 字典，包含原始字段与指标列，列名与 compute_many 一致
+        （如 ma20、dif/dea/macd_hist、boll_mid/boll_upper/boll_lower、kdj_k/kdj_d/kdj_j）
+    """
+    out: Dict[str, pd.DataFrame] = dict(panel)
+    out.update(_compute_specs(
+        panel, specs,
+        lambda arr, like: pd.DataFrame(arr, index=like.index, columns=like.columns),
+    ))
     return out
 
 
@@ -317,37 +409,42 @@ def add_all_indicators(df: pd.DataFrame, close_col: str = 'close',
     if close_col not in df.columns:
         raise ValueError(f"DataFrame缺少收盘价列: {close_col}")
 
+    # 同一收盘价序列上的中间结果（差分、滚动均值、EMA）只计算一次
+    inter = _Intermediates({"close": df[close_col]})
+
     # 计算移动平均线（MA5, MA10, MA20, MA60）
-    df['ma5'] = ma(df[close_col], 5, min_periods=1)
-    df['ma10'] = ma(df[close_col], 10, min_periods=1)
-    df['ma20'] = ma(df[close_col], 20, min_periods=1)
-    df['ma60'] = ma(df[close_col], 60, min_periods=1)
+    df['ma5'] = inter.sma(5)
+    df['ma10'] = inter.sma(10)
+    df['ma20'] = inter.sma(20)
+    df['ma60'] = inter.sma(60)
 
-    # 计算RSI指标
+    # 计算RSI指标（各周期/口径共享 close.diff()）
     if rsi_style == 'china':
         # 中国风格：RSI6, RSI12, RSI24（使用中国式SMA）
-        df['rsi6'] = rsi(df[close_col], 6, method='china')
-        df['rsi12'] = rsi(df[close_col], 12, method='china')
-        df['rsi24'] = rsi(df[close_col], 24, method='china')
+        df['rsi6'] = inter.rsi(6, method='china')
+        df['rsi12'] = inter.rsi(12, method='china')
+        df['rsi24'] = inter.rsi(24, method='china')
         # 保留RSI14作为国际标准参考（使用简单移动平均）
-        df['rsi14'] = rsi(df[close_col], 14, method='sma')
+        df['rsi14'] = inter.rsi(14, method='sma')
         # 为了兼容性，也添加 'rsi' 列（指向 rsi12）
         df['rsi'] = df['rsi12']
     else:
         # 国际标准：RSI14（使用EMA）
-        df['rsi'] = rsi(df[close_col], 14, method='ema')
-
-    # 计算MACD
-    macd_df = macd(df[close_col], fast=12, slow=26, signal=9)
-    df['macd_dif'] = macd_df['dif']
-    df['macd_dea'] = macd_df['dea']
-    df['macd'] = macd_df['macd_hist'] * 2  # 注意：这里乘以2是为了与通达信/同花顺保持一致
-
-    # 计算布林带（20日，2倍标准差）
-    boll_df = boll(df[close_col], n=20, k=2.0, min_periods=1)
-    df['boll_mid'] = boll_df['boll_mid']
-    df['boll_upper'] = boll_df['boll_upper']
-    df['boll_lower'] = boll_df['boll_lower']
+        df['rsi'] = inter.rsi(14, method='ema')
+
+    # 计算MACD（复用 EMA12/EMA26）
+    dif = inter.ema(12) - inter.ema(26)
+    dea = dif.ewm(span=9, adjust=False).mean()
+    df['macd_dif'] = dif
+    df['macd_dea'] = dea
+    df['macd'] = (dif - dea) * 2  # 注意：这里乘以2是为了与通达信/同花顺保持一致
+
+    # 计算布林带（20日，2倍标准差；中轨即 MA20）
+    mid = inter.sma(20)
+    std = inter.std(20)
+    df['boll_mid'] = mid
+    df['boll_upper'] = mid + 2.0 * std
+    df['boll_lower'] = mid - 2.0 * std
 
     return df
 
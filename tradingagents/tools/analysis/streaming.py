@@ -0,0 +1,520 @@
+"""
+增量（流式）技术指标状态
+
+为单只股票保存计算 MA/EMA/MACD/RSI/BOLL/ATR/KDJ 所需的最小状态（滚动窗口缓冲、EMA 递推值、
+KDJ 上一期 K/D），新到一根K线时以 O(1) 推进，无需重算全部历史。
+
+各状态机逐步复刻 pandas 的窗口算法（rolling mean 的 Kahan 求和、rolling var 的 Welford 算法、
+ewm 的递推），因此对同一段历史逐根推进得到的结果与 indicators.py 中的批量函数逐位一致。
+状态可通过 to_dict()/from_dict() 持久化（例如与 stock_daily_quotes 一起存入 MongoDB）。
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+
+NaN = float("nan")
+
+# 默认维护的指标（与筛选使用的固定参数一致）
+DEFAULT_STREAMING_SPECS: List[IndicatorSpec] = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+
+def _isnan(v: float) -> bool:
+    return v != v
+
+
+def _finite(v: float) -> float:
+    # pandas 窗口函数在计算前会把 ±inf 视为缺失值
+    return NaN if math.isinf(v) else v
+
+
+def _as_float(v: Any) -> float:
+    try:
+        return NaN if v is None else float(v)
+    except (TypeError, ValueError):
+        return NaN
+
+
+# ---------------------------------------------------------------------------
+# 基础状态机（与 pandas._libs.window.aggregations 的实现一一对应）
+# ---------------------------------------------------------------------------
+
+class _RollingMean:
+    """rolling(window, min_periods).mean() 的增量版本"""
+
+    FIELDS = ("window", "minp", "buf", "nobs", "sum_x", "neg_ct", "comp_add", "comp_remove", "same", "prev")
+
+    def __init__(self, window: int, minp: int):
+        self.window = int(window)
+        self.minp = int(minp)
+        self.buf: deque = deque()
+        self._reset()
+
+    def _reset(self):
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev: Optional[float] = None
+
+    def push(self, val: float) -> float:
+        val = _finite(val)
+        if self.prev is None or self.window == 1:
+            # 对应 pandas 首个窗口的 setup（窗口为 1 时每步都重新 setup）
+            self._reset()
+            self.buf.clear()
+            self.prev = val
+        if len(self.buf) == self.window:
+            self._remove(self.buf.popleft())
+        self.buf.append(val)
+        self._add(val)
+        return self._calc()
+
+    def _add(self, val: float):
+        if _isnan(val):
+            return
+        self.nobs += 1
+        y = val - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+        if val == self.prev:
+            self.same += 1
+        else:
+            self.same = 1
+        self.prev = val
+
+    def _remove(self, val: float):
+        if _isnan(val):
+            return
+        self.nobs -= 1
+        y = -val - self.comp_remove
+        t = self.sum_x + y
+        self.comp_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def _calc(self) -> float:
+        if self.nobs >= self.minp and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same >= self.nobs:
+                result = self.prev
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return NaN
+
+
+class _RollingStd:
+    """rolling(window, min_periods).std()（ddof=1）的增量版本"""
+
+    FIELDS = ("window", "minp", "buf", "nobs", "mean_x", "ssqdm_x", "comp_add", "comp_remove", "same", "prev")
+
+    def __init__(self, window: int, minp: int):
+        self.window = int(window)
+        self.minp = max(int(minp), 1)
+        self.buf: deque = deque()
+        self._reset()
+
+    def _reset(self):
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev: Optional[float] = None
+
+    def push(self, val: float) -> float:
+        val = _finite(val)
+        if self.prev is None or self.window == 1:
+            self._reset()
+            self.buf.clear()
+            self.prev = val
+        if len(self.buf) == self.window:
+            self._remove(self.buf.popleft())
+        self.buf.append(val)
+        self._add(val)
+        var = self._calc()
+        if _isnan(var):
+            return NaN
+        return math.sqrt(var) if var >= 0 else 0.0
+
+    def _add(self, val: float):
+        if _isnan(val):
+            return
+        self.nobs += 1
+        if val == self.prev:
+            self.same += 1
+        else:
+            self.same = 1
+        self.prev = val
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        delta = t
+        if self.nobs:
+            self.mean_x = self.mean_x + delta / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val: float):
+        if _isnan(val):
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.comp_remove
+            y = val - self.comp_remove
+            t = y - self.mean_x
+            self.comp_remove = t + self.mean_x - y
+            delta = t
+            self.mean_x = self.mean_x - delta / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def _calc(self) -> float:
+        if self.nobs >= self.minp and self.nobs > 1:
+            if self.nobs == 1 or self.same >= self.nobs:
+                return 0.0
+            return self.ssqdm_x / (self.nobs - 1.0)
+        return NaN
+
+
+class _RollingExtreme:
+    """rolling(window, min_periods).min()/max() 的增量版本（窗口很小，直接在缓冲上取极值）"""
+
+    FIELDS = ("window", "minp", "is_max", "buf")
+
+    def __init__(self, window: int, minp: int, is_max: bool):
+        self.window = int(window)
+        self.minp = int(minp)
+        self.is_max = bool(is_max)
+        self.buf: deque = deque(maxlen=self.window)
+
+    def push(self, val: float) -> float:
+        self.buf.append(_finite(val))
+        valid = [v for v in self.buf if not _isnan(v)]
+        if not valid or len(valid) < self.minp:
+            return NaN
+        return max(valid) if self.is_max else min(valid)
+
+
+class _Ewm:
+    """ewm(com=..., adjust=..., ignore_na=False).mean() 的增量版本"""
+
+    FIELDS = ("alpha", "adjust", "weighted", "old_wt", "nobs", "started")
+
+    def __init__(self, com: float, adjust: bool):
+        self.alpha = 1.0 / (1.0 + com)
+        self.adjust = bool(adjust)
+        self.weighted = NaN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    @classmethod
+    def from_span(cls, span: float, adjust: bool = False) -> "_Ewm":
+        return cls(com=(span - 1) / 2, adjust=adjust)
+
+    @classmethod
+    def from_alpha(cls, alpha: float, adjust: bool = False) -> "_Ewm":
+        return cls(com=(1 - alpha) / alpha, adjust=adjust)
+
+    def push(self, cur: float) -> float:
+        cur = _finite(cur)
+        is_obs = not _isnan(cur)
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_obs)
+            self.old_wt = 1.0
+        else:
+            self.nobs += is_obs
+            if not _isnan(self.weighted):
+                # ignore_na=False：缺失值同样衰减旧权重
+                self.old_wt *= 1.0 - self.alpha
+                if is_obs:
+                    new_wt = 1.0 if self.adjust else self.alpha
+                    if self.weighted != cur:
+                        self.weighted = self.old_wt * self.weighted + new_wt * cur
+                        self.weighted /= (self.old_wt + new_wt)
+                    if self.adjust:
+                        self.old_wt += new_wt
+                    else:
+                        self.old_wt = 1.0
+            elif is_obs:
+                self.weighted = cur
+        return self.weighted if self.nobs >= 1 else NaN
+
+
+_MACHINES = {"mean": _RollingMean, "std": _RollingStd, "extreme": _RollingExtreme, "ewm": _Ewm}
+
+
+def _dump_machine(kind: str, m: Any) -> Dict[str, Any]:
+    data = {"kind": kind}
+    for f in m.FIELDS:
+        v = getattr(m, f)
+        data[f] = list(v) if isinstance(v, deque) else v
+    return data
+
+
+def _load_machine(data: Mapping[str, Any]) -> Any:
+    cls = _MACHINES[data["kind"]]
+    m = cls.__new__(cls)
+    for f in cls.FIELDS:
+        v = data.get(f)
+        if f == "buf":
+            maxlen = int(data["window"]) if cls is _RollingExtreme else None
+            v = deque((_as_float(x) for x in (v or [])), maxlen=maxlen)
+        setattr(m, f, v)
+    return m
+
+
+# ---------------------------------------------------------------------------
+# 单只股票的指标状态
+# ---------------------------------------------------------------------------
+
+def _dedupe(specs: Iterable[IndicatorSpec]) -> List[IndicatorSpec]:
+    """与 compute_many 一致：同名同参的规格只计算一次"""
+    out: List[IndicatorSpec] = []
+    seen = set()
+    for spec in specs:
+        key = (spec.name.lower(), tuple(sorted((spec.params or {}).items())))
+        if key not in seen:
+            seen.add(key)
+            out.append(spec)
+    return out
+
+
+class IndicatorState:
+    """
+    单只股票的增量指标状态
+
+    用法：
+        state = IndicatorState.from_history(df)        # 首次：回放历史建立状态
+        values = state.update({"high": .., "low": .., "close": ..}, trade_date="2025-01-02")
+        doc = state.to_dict()                           # 持久化
+        state = IndicatorState.from_dict(doc)           # 恢复后继续推进
+    """
+
+    def __init__(self, specs: Optional[Iterable[IndicatorSpec]] = None):
+        self.specs: List[IndicatorSpec] = _dedupe(specs if specs is not None else DEFAULT_STREAMING_SPECS)
+        self.machines: Dict[str, Any] = {}
+        self.kinds: Dict[str, str] = {}
+        self.prev_close: float = NaN
+        self.last_trade_date: Optional[str] = None
+        self.bars: int = 0
+        self.kdj_last: Dict[str, List[float]] = {}
+        self.values: Dict[str, float] = {}
+        self._build()
+
+    # --- 状态机注册 ---
+    def _m(self, key: str, kind: str, factory):
+        if key not in self.machines:
+            self.machines[key] = factory()
+            self.kinds[key] = kind
+        return self.machines[key]
+
+    def _build(self):
+        for spec in self.specs:
+            name = spec.name.lower()
+            p = spec.params or {}
+            if name == "ma":
+                n = int(p.get("n", p.get("period", 20)))
+                self._m(f"sma{n}", "mean", lambda: _RollingMean(n, 1))
+            elif name == "ema":
+                n = int(p.get("n", p.get("period", 20)))
+                self._m(f"ema{n}", "ewm", lambda: _Ewm.from_span(n))
+            elif name == "macd":
+                fast, slow, signal = int(p.get("fast", 12)), int(p.get("slow", 26)), int(p.get("signal", 9))
+                self._m(f"ema{fast}", "ewm", lambda: _Ewm.from_span(fast))
+                self._m(f"ema{slow}", "ewm", lambda: _Ewm.from_span(slow))
+                self._m(f"dea{fast}_{slow}_{signal}", "ewm", lambda: _Ewm.from_span(signal))
+            elif name == "rsi":
+                n = int(p.get("n", p.get("period", 14)))
+                self._m(f"rsi_gain{n}", "ewm", lambda: _Ewm.from_alpha(1 / float(n)))
+                self._m(f"rsi_loss{n}", "ewm", lambda: _Ewm.from_alpha(1 / float(n)))
+            elif name == "boll":
+                n = int(p.get("n", 20))
+                self._m(f"sma{n}", "mean", lambda: _RollingMean(n, 1))
+                self._m(f"std{n}", "std", lambda: _RollingStd(n, 1))
+            elif name == "atr":
+                n = int(p.get("n", 14))
+                self._m(f"atr{n}", "mean", lambda: _RollingMean(n, n))
+            elif name == "kdj":
+                n = int(p.get("n", 9))
+                self._m(f"llv{n}", "extreme", lambda: _RollingExtreme(n, n, is_max=False))
+                self._m(f"hhv{n}", "extreme", lambda: _RollingExtreme(n, n, is_max=True))
+            else:
+                raise ValueError(f"不支持的指标: {name}")
+
+    # --- 推进 ---
+    def update(self, bar: Mapping[str, Any], trade_date: Optional[str] = None) -> Dict[str, float]:
+        """推进一根K线，返回该K线上的指标值（列名与 compute_many 一致）"""
+        close = _as_float(bar.get("close"))
+        high = _as_float(bar.get("high"))
+        low = _as_float(bar.get("low"))
+        prev_close = self.prev_close
+        delta = close - prev_close if self.bars else NaN
+
+        # 先推进所有共享状态机（每根K线每个状态机只推进一次）
+        step: Dict[str, float] = {}
+        for key, m in self.machines.items():
+            if key.startswith(("sma", "std")):
+                step[key] = m.push(close)
+            elif key.startswith("ema"):
+                step[key] = m.push(close)
+            elif key.startswith("rsi_gain"):
+                step[key] = m.push(delta if delta > 0 else 0.0)
+            elif key.startswith("rsi_loss"):
+                step[key] = m.push(-(delta if delta < 0 else 0.0))
+            elif key.startswith("atr"):
+                step[key] = m.push(self._true_range(high, low, prev_close))
+            elif key.startswith("llv"):
+                step[key] = m.push(low)
+            elif key.startswith("hhv"):
+                step[key] = m.push(high)
+
+        out: Dict[str, float] = {}
+        for spec in self.specs:
+            name = spec.name.lower()
+            p = spec.params or {}
+            if name == "ma":
+                n = int(p.get("n", p.get("period", 20)))
+                out[f"ma{n}"] = step[f"sma{n}"]
+            elif name == "ema":
+                n = int(p.get("n", p.get("period", 20)))
+                out[f"ema{n}"] = step[f"ema{n}"]
+            elif name == "macd":
+                fast, slow, signal = int(p.get("fast", 12)), int(p.get("slow", 26)), int(p.get("signal", 9))
+                dif = step[f"ema{fast}"] - step[f"ema{slow}"]
+                dea = self.machines[f"dea{fast}_{slow}_{signal}"].push(dif)
+                out["dif"], out["dea"], out["macd_hist"] = dif, dea, dif - dea
+            elif name == "rsi":
+                n = int(p.get("n", p.get("period", 14)))
+                gain, loss = step[f"rsi_gain{n}"], step[f"rsi_loss{n}"]
+                out[f"rsi{n}"] = NaN if (loss == 0 or _isnan(loss) or _isnan(gain)) else 100 - (100 / (1 + gain / loss))
+            elif name == "boll":
+                n = int(p.get("n", 20))
+                k = float(p.get("k", 2.0))
+                mid, std = step[f"sma{n}"], step[f"std{n}"]
+                out["boll_mid"], out["boll_upper"], out["boll_lower"] = mid, mid + k * std, mid - k * std
+            elif name == "atr":
+                n = int(p.get("n", 14))
+                out[f"atr{n}"] = step[f"atr{n}"]
+            elif name == "kdj":
+                out.update(self._kdj(spec, close, step))
+
+        self.prev_close = close
+        self.bars += 1
+        if trade_date is not None:
+            self.last_trade_date = str(trade_date)
+        self.values = out
+        return out
+
+    @staticmethod
+    def _true_range(high: float, low: float, prev_close: float) -> float:
+        # 与 np.fmax 一致：忽略 NaN，全部为 NaN 时返回 NaN
+        parts = [abs(high - low), abs(high - prev_close), abs(low - prev_close)]
+        valid = [v for v in parts if not _isnan(v)]
+        return max(valid) if valid else NaN
+
+    def _kdj(self, spec: IndicatorSpec, close: float, step: Dict[str, float]) -> Dict[str, float]:
+        p = spec.params or {}
+        n, m1, m2 = int(p.get("n", 9)), int(p.get("m1", 3)), int(p.get("m2", 3))
+        ll, hh = step[f"llv{n}"], step[f"hhv{n}"]
+        denom = hh - ll
+        rsv = NaN if (denom == 0 or _isnan(denom)) else (close - ll) / denom * 100
+        if math.isinf(rsv):
+            rsv = NaN
+
+        key = f"kdj{n}_{m1}_{m2}"
+        last_k, last_d = self.kdj_last.get(key, [50.0, 50.0])
+        if _isnan(rsv):
+            return {"kdj_k": NaN, "kdj_d": NaN, "kdj_j": NaN}
+        alpha_k = 1 / float(m1)
+        alpha_d = 1 / float(m2)
+        k = (1 - alpha_k) * last_k + alpha_k * rsv
+        d = (1 - alpha_d) * last_d + alpha_d * k
+        self.kdj_last[key] = [k, d]
+        return {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+
+    def update_many(self, df: pd.DataFrame, date_col: Optional[str] = "trade_date") -> pd.DataFrame:
+        """按顺序推进多根K线，返回每根K线的指标值"""
+        rows = []
+        has_date = date_col is not None and date_col in df.columns
+        for rec in df.to_dict("records"):
+            rows.append(self.update(rec, trade_date=rec.get(date_col) if has_date else None))
+        return pd.DataFrame(rows, index=df.index)
+
+    @classmethod
+    def from_history(
+        cls,
+        df: pd.DataFrame,
+        specs: Optional[Iterable[IndicatorSpec]] = None,
+        date_col: Optional[str] = "trade_date",
+    ) -> "IndicatorState":
+        """回放历史K线建立状态（仅首次需要，之后按根推进）"""
+        state = cls(specs)
+        if df is not None and not df.empty:
+            state.update_many(df, date_col=date_col)
+        return state
+
+    # --- 持久化 ---
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "specs": [{"name": s.name, "params": dict(s.params or {})} for s in self.specs],
+            "machines": {k: _dump_machine(self.kinds[k], m) for k, m in self.machines.items()},
+            "prev_close": self.prev_close,
+            "kdj_last": {k: list(v) for k, v in self.kdj_last.items()},
+            "last_trade_date": self.last_trade_date,
+            "bars": self.bars,
+            "values": dict(self.values),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "IndicatorState":
+        specs = [IndicatorSpec(s["name"], s.get("params") or None) for s in data.get("specs", [])]
+        state = cls.__new__(cls)
+        state.specs = _dedupe(specs or DEFAULT_STREAMING_SPECS)
+        state.machines = {}
+        state.kinds = {}
+        for key, m in (data.get("machines") or {}).items():
+            state.machines[key] = _load_machine(m)
+            state.kinds[key] = m["kind"]
+        state.prev_close = _as_float(data.get("prev_close"))
+        state.kdj_last = {k: [float(x) for x in v] for k, v in (data.get("kdj_last") or {}).items()}
+        state.last_trade_date = data.get("last_trade_date")
+        state.bars = int(data.get("bars", 0))
+        state.values = dict(data.get("values") or {})
+        # 若规格新增了指标，补齐缺失的状态机（新指标从此刻开始累计）
+        state._build()
+        return state
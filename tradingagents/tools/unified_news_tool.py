@@ -11,6 +11,8 @@ import logging
 from datetime import datetime
 import re
 
+from tradingagents.dataflows.news.near_duplicate import dedupe_near_duplicates, publish_day
+
 logger = logging.getLogger(__name__)
 
 class UnifiedNewsAnalyzer:
@@ -144,12 +146,21 @@ class UnifiedNewsAnalyzer:
 
             news_items = []
             for query in query_list:
-                cursor = collection.find(query).sort('publish_time', -1).limit(max_news)
+                # 多取一些，近似去重后再截断到 max_news
+                cursor = collection.find(query).sort('publish_time', -1).limit(max_news * 3)
                 news_items = list(cursor)
                 if news_items:
                     logger.info(f"[统一新闻工具] 📊 使用查询 {query} 找到 {len(news_items)} 条新闻")
                     break
 
+            # 同一通稿的多家转载只保留一条，避免重复内容占用 LLM 上下文
+            news_items = dedupe_near_duplicates(
+                news_items,
+                text_of=lambda n: f"{n.get('title') or ''} {(n.get('content') or n.get('summary') or '')[:300]}",
+                body_of=lambda n: n.get('content') or n.get('summary') or '',
+                group_of=lambda n: publish_day(n.get('publish_time')),
+            )[:max_news]
+
             if not news_items:
                 logger.info(f"[统一新闻工具] 数据库中没有找到 {stock_code} 的新闻")
                 return ""
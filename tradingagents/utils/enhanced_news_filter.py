@@ -6,6 +6,7 @@
 import pandas as pd
 import re
 import logging
+import threading
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 import numpy as np
@@ -15,6 +16,30 @@ from .news_filter import NewsRelevanceFilter, create_news_filter, get_company_na
 
 logger = logging.getLogger(__name__)
 
+SEMANTIC_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
+
+# 进程级缓存：语义模型只加载一次；公司文本 embedding（已归一化）按股票缓存，跨过滤器实例复用
+_sentence_models: Dict[str, object] = {}
+_company_embeddings: Dict[Tuple[str, str, str], np.ndarray] = {}
+_semantic_cache_lock = threading.Lock()
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _get_sentence_model(model_name: str):
+    with _semantic_cache_lock:
+        model = _sentence_models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+            _sentence_models[model_name] = model
+        return model
+
 class EnhancedNewsFilter(NewsRelevanceFilter):
     """增强新闻过滤器，集成本地模型和多种过滤策略"""
     
@@ -35,6 +60,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         # 语义模型相关
         self.sentence_model = None
         self.company_embedding = None
+        self.semantic_batch_size = self._get_semantic_batch_size()
         
         # 本地分类模型相关
         self.classification_model = None
@@ -53,23 +79,12 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             
             # 尝试使用sentence-transformers
             try:
-                from sentence_transformers import SentenceTransformer
-                
-                # 使用轻量级中文模型
-                model_name = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
-                self.sentence_model = SentenceTransformer(model_name)
+                # 使用轻量级中文模型（进程内只加载一次）
+                model_name = SEMANTIC_MODEL_NAME
+                self.sentence_model = _get_sentence_model(model_name)
                 
-                # 预计算公司相关的embedding
-                company_texts = [
-                    self.company_name,
-                    f"{self.company_name}股票",
-                    f"{self.company_name}公司",
-                    f"{self.stock_code}",
-                    f"{self.company_name}业绩",
-                    f"{self.company_name}财报"
-                ]
-                
-                self.company_embedding = self.sentence_model.encode(company_texts)
+                # 预计算公司相关的embedding（按股票缓存）
+                self.company_embedding = self._get_company_embedding(model_name)
                 logger.info(f"[增强过滤器] ✅ 语义模型加载成功: {model_name}")
                 
             except ImportError:
@@ -80,6 +95,68 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             logger.error(f"[增强过滤器] 语义模型初始化失败: {e}")
             self.use_semantic = False
     
+    @staticmethod
+    def _get_semantic_batch_size() -> int:
+        try:
+            from tradingagents.config.runtime_settings import get_int
+            return max(1, get_int("TA_NEWS_FILTER_BATCH_SIZE", "ta_news_filter_batch_size", 64))
+        except Exception:
+            return 64
+
+    def _company_texts(self) -> List[str]:
+        return [
+            self.company_name,
+            f"{self.company_name}股票",
+            f"{self.company_name}公司",
+            f"{self.stock_code}",
+            f"{self.company_name}业绩",
+            f"{self.company_name}财报"
+        ]
+
+    def _get_company_embedding(self, model_name: str) -> np.ndarray:
+        """公司相关文本的归一化 embedding，按 (模型, 股票代码, 公司名) 缓存"""
+        key = (model_name, str(self.stock_code), str(self.company_name))
+        with _semantic_cache_lock:
+            cached = _company_embeddings.get(key)
+        if cached is not None:
+            return cached
+        embedding = _normalize_rows(self.sentence_model.encode(self._company_texts()))
+        with _semantic_cache_lock:
+            _company_embeddings[key] = embedding
+        return embedding
+
+    def calculate_semantic_similarities(self, texts: List[str]) -> np.ndarray:
+        """
+        批量计算语义相似度评分：一次 encode 所有文本，一次矩阵乘法得到相似度矩阵
+
+        Args:
+            texts: 待评分文本列表（通常是标题 + 内容前200字符）
+
+        Returns:
+            np.ndarray: 每条文本的语义相似度评分 (0-100)
+        """
+        if not texts or not self.use_semantic or self.sentence_model is None:
+            return np.zeros(len(texts))
+
+        try:
+            embeddings = _normalize_rows(self.sentence_model.encode(
+                list(texts), batch_size=self.semantic_batch_size, convert_to_numpy=True
+            ))
+            company = _normalize_rows(self.company_embedding)
+            # (新闻数 × 公司文本数) 余弦相似度矩阵，取每条新闻的最高相似度
+            max_similarity = (embeddings @ company.T).max(axis=1)
+            return np.clip(max_similarity * 100, 0, 100)
+        except Exception as e:
+            logger.error(f"[增强过滤器] 批量语义相似度计算失败: {e}")
+            return np.zeros(len(texts))
+
+    @staticmethod
+    def _semantic_text(title, content) -> str:
+        title = title if isinstance(title, str) else ''
+        content = content if isinstance(content, str) else ''
+        # 组合标题和内容的前200字符
+        return f"{title} {content[:200]}"
+
     def _init_classification_model(self):
         """初始化本地分类模型"""
         try:
@@ -120,33 +197,9 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         if not self.use_semantic or self.sentence_model is None:
             return 0
         
-        try:
-            # 组合标题和内容的前200字符
-            text = f"{title} {content[:200]}"
-            
-            # 计算文本embedding
-            text_embedding = self.sentence_model.encode([text])
-            
-            # 计算与公司相关文本的相似度
-            similarities = []
-            for company_emb in self.company_embedding:
-                similarity = np.dot(text_embedding[0], company_emb) / (
-                    np.linalg.norm(text_embedding[0]) * np.linalg.norm(company_emb)
-                )
-                similarities.append(similarity)
-            
-            # 取最高相似度
-            max_similarity = max(similarities)
-            
-            # 转换为0-100评分
-            semantic_score = max(0, min(100, max_similarity * 100))
-            
-            logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
-            return semantic_score
-            
-        except Exception as e:
-            logger.error(f"[增强过滤器] 语义相似度计算失败: {e}")
-            return 0
+        semantic_score = float(self.calculate_semantic_similarities([self._semantic_text(title, content)])[0])
+        logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
+        return semantic_score
     
     def classify_news_relevance(self, title: str, content: str) -> float:
         """
@@ -202,13 +255,15 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             logger.error(f"[增强过滤器] 本地模型分类失败: {e}")
             return 0
     
-    def calculate_enhanced_relevance_score(self, title: str, content: str) -> Dict[str, float]:
+    def calculate_enhanced_relevance_score(self, title: str, content: str,
+                                           semantic_score: Optional[float] = None) -> Dict[str, float]:
         """
         计算增强相关性评分（综合多种方法）
         
         Args:
             title: 新闻标题
             content: 新闻内容
+            semantic_score: 已批量计算好的语义评分（None 时单独计算）
             
         Returns:
             Dict: 包含各种评分的字典
@@ -221,8 +276,9 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         
         # 2. 语义相似度评分
         if self.use_semantic:
-            semantic_score = self.calculate_semantic_similarity(title, content)
-            scores['semantic_score'] = semantic_score
+            if semantic_score is None:
+                semantic_score = self.calculate_semantic_similarity(title, content)
+            scores['semantic_score'] = float(semantic_score)
         else:
             scores['semantic_score'] = 0
         
@@ -271,16 +327,22 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         logger.info(f"[增强过滤器] 开始增强过滤，原始数量: {len(news_df)}条，最低评分阈值: {min_score}")
         
         filtered_news = []
+        rows = news_df.to_dict('records')
+        titles = [row.get('新闻标题', row.get('标题', '')) for row in rows]
+        contents = [row.get('新闻内容', row.get('内容', '')) for row in rows]
+
+        # 语义评分批量计算（一次 encode + 一次矩阵乘法）
+        semantic_scores = [None] * len(rows)
+        if self.use_semantic and self.sentence_model is not None:
+            semantic_scores = self.calculate_semantic_similarities(
+                [self._semantic_text(t, c) for t, c in zip(titles, contents)]
+            ).tolist()
         
-        for idx, row in news_df.iterrows():
-            title = row.get('新闻标题', row.get('标题', ''))
-            content = row.get('新闻内容', row.get('内容', ''))
-            
+        for row_dict, title, content, semantic_score in zip(rows, titles, contents, semantic_scores):
             # 计算增强评分
-            scores = self.calculate_enhanced_relevance_score(title, content)
+            scores = self.calculate_enhanced_relevance_score(title, content, semantic_score=semantic_score)
             
             if scores['final_score'] >= min_score:
-                row_dict = row.to_dict()
                 row_dict.update(scores)  # 添加所有评分信息
                 filtered_news.append(row_dict)
                 
@@ -224,7 +224,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
 
     try:
         # 导入必要的模块
-        from tradingagents.graph.trading_graph import TradingAgentsGraph
+        from tradingagents.graph.graph_pool import get_trading_graph_pool
         from tradingagents.default_config import DEFAULT_CONFIG
 
         # 创建配置
@@ -455,9 +455,9 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
 
         logger.debug(f"🔍 [RUNNER DEBUG] 最终传递给分析引擎的股票代码: '{formatted_symbol}'")
 
-        # 初始化交易图
+        # 初始化交易图（同一配置复用实例池中已编译的图）
         update_progress("🔧 初始化分析引擎...")
-        graph = TradingAgentsGraph(analysts, config=config, debug=False)
+        graph = get_trading_graph_pool().acquire(config, selected_analysts=analysts, debug=False)
 
         # 执行分析
         update_progress(f"📊 开始分析 {formatted_symbol} 股票，这可能需要几分钟时间...")